@@ -44,26 +44,39 @@ except ImportError:
     MigrationExecutor = None
 
 try:
-    from analyzer.data_validator import DataValidator
+    from analyzer.data_validator import DataValidator, load_validation_rules
+    from analyzer.validation_cache import ValidationCache
 except ImportError:
     DataValidator = None
+    load_validation_rules = None
+    ValidationCache = None
 
 try:
     from analyzer.excel_reader import ExcelReader
 except ImportError:
     ExcelReader = None
 
+try:
+    from analyzer.entry_partitioner import EntryPartitioner, first_lines_by_entry
+except ImportError:
+    EntryPartitioner = None
+    first_lines_by_entry = None
+
 try:
     from analyzer.supabase_connection import SupabaseConnectionManager
 except ImportError:
     SupabaseConnectionManager = None
 
 try:
-    from services.schema_manager import SchemaManager
+    from analyzer.schema_manager import SchemaManager
 except ImportError:
     SchemaManager = None
 
 
+# Findings listed in validation_report.json; the full set goes to validation_errors.csv
+MAX_REPORT_EXAMPLES = 1000
+
+
 class MigrationCLI:
     """Command-line interface for Excel to Supabase migration."""
     
@@ -78,6 +91,15 @@ class MigrationCLI:
         self.backups_dir.mkdir(exist_ok=True)
         self.reports_dir.mkdir(exist_ok=True)
         
+    def _build_load_plan(self, tables: list):
+        """Order tables by their foreign keys using the schema in reports/supabase_schema.json."""
+        return SchemaManager(str(self.reports_dir / "supabase_schema.json")).build_load_plan(tables)
+    
+    def _create_validator(self) -> "DataValidator":
+        """Create a validator with the custom rules in config/validation_rules.json, if present."""
+        rules_path = self.config_dir / "validation_rules.json"
+        return DataValidator(load_validation_rules(str(rules_path)) if rules_path.exists() else None)
+    
     def validate_command(self, args: argparse.Namespace) -> int:
         """
         Validate Excel data without migration.
@@ -93,7 +115,7 @@ class MigrationCLI:
         try:
             # Load Excel data
             logger.info(f"Reading Excel file: {self.excel_file}")
-            excel_reader = ExcelReader(str(self.excel_file))
+            excel_reader = ExcelReader(str(self.excel_file), apply_dtype_plan=True)
             result = excel_reader.read_transactions_sheet()
             if not result.success:
                 error_msg = "; ".join(result.errors) if result.errors else "Unknown error"
@@ -105,8 +127,14 @@ class MigrationCLI:
             
             # Validate data
             logger.info("Validating data...")
-            validator = DataValidator()
-            validation_report = validator.validate(df)
+            validator = self._create_validator()
+            cache = ValidationCache(str(self.reports_dir / "validation_cache"))
+            if getattr(args, 'full', False):
+                cache.clear()
+            validation_report = validator.validate(
+                df, max_examples=MAX_REPORT_EXAMPLES, workers=getattr(args, 'workers', None),
+                cache=cache
+            )
             
             # Generate report
             report_path = self.reports_dir / "validation_report.json"
@@ -114,9 +142,16 @@ class MigrationCLI:
                 json.dump(validation_report, f, indent=2, default=str)
             logger.info(f"Validation report saved to {report_path}")
             
-            # Summary
-            error_count = len([e for e in validation_report.get('errors', []) if e['level'] == 'ERROR'])
-            warning_count = len([e for e in validation_report.get('errors', []) if e['level'] == 'WARNING'])
+            # Stream every finding, not just the examples in the JSON report
+            if validator.last_result is not None and validator.last_result.errors:
+                errors_path = self.reports_dir / "validation_errors.csv"
+                validator.last_result.export_errors(str(errors_path))
+                logger.info(f"All validation errors saved to {errors_path}")
+            
+            # Summary (counts cover every finding, the report lists examples)
+            summary = validation_report.get('summary', {})
+            error_count = summary.get('error_count', len([e for e in validation_report.get('errors', []) if e['level'] == 'ERROR']))
+            warning_count = summary.get('warning_count', len(validation_report.get('warnings', [])))
             
             print(f"\n{'='*60}")
             print(f"VALIDATION SUMMARY")
@@ -124,6 +159,12 @@ class MigrationCLI:
             print(f"Records validated: {validation_report['total_records']}")
             print(f"Errors: {error_count}")
             print(f"Warnings: {warning_count}")
+            diff = summary.get('since_last_run')
+            if diff and not diff['full_revalidation']:
+                print(f"Rows re-validated: {diff['revalidated_rows']} "
+                      f"({diff['new_rows']} new or edited, {diff['removed_rows']} removed)")
+                print(f"New findings: {sum(diff['new_findings'].values())}, "
+                      f"resolved: {sum(diff['resolved_findings'].values())}")
             print(f"Status: {'PASS' if error_count == 0 else 'FAIL'}")
             print(f"Report: {report_path}")
             print(f"{'='*60}\n")
@@ -258,6 +299,8 @@ class MigrationCLI:
         mode = args.mode.lower()
         batch_size = args.batch_size
         dry_run = mode == 'dry-run'
+        partitions = getattr(args, 'partitions', 0) or 0
+        partition_set = None
         
         logger.info(f"Starting migration in {mode} mode (batch_size={batch_size})")
         
@@ -277,18 +320,28 @@ class MigrationCLI:
             
             # Step 1: Validate data
             logger.info("Step 1/4: Validating data...")
-            excel_reader = ExcelReader(str(self.excel_file))
-            result = excel_reader.read_transactions_sheet()
-            if not result.success:
-                error_msg = "; ".join(result.errors) if result.errors else "Unknown error"
-                logger.error(f"Failed to read Excel: {error_msg}")
-                print(f"\nFailed to read Excel: {error_msg}\n")
-                return 1
-            df = result.data
-            
-            validator = DataValidator()
-            validation_report = validator.validate(df)
-            error_count = len([e for e in validation_report.get('errors', []) if e['level'] == 'ERROR'])
+            excel_reader = ExcelReader(str(self.excel_file), apply_dtype_plan=True)
+            validator = self._create_validator()
+            if partitions:
+                # Spill lines to entry partitions and validate one partition at a time
+                partition_set = EntryPartitioner(partitions=partitions).write(excel_reader.iter_transaction_chunks())
+                record_count = partition_set.total_rows
+                error_count = sum(
+                    self._validation_error_count(validator.validate(lines, max_examples=MAX_REPORT_EXAMPLES))
+                    for lines in partition_set
+                )
+            else:
+                result = excel_reader.read_transactions_sheet()
+                if not result.success:
+                    error_msg = "; ".join(result.errors) if result.errors else "Unknown error"
+                    logger.error(f"Failed to read Excel: {error_msg}")
+                    print(f"\nFailed to read Excel: {error_msg}\n")
+                    return 1
+                df = result.data
+                record_count = len(df)
+                
+                validation_report = validator.validate(df, max_examples=MAX_REPORT_EXAMPLES)
+                error_count = self._validation_error_count(validation_report)
             
             if error_count > 0:
                 logger.error(f"Validation failed with {error_count} errors")
@@ -322,7 +375,9 @@ class MigrationCLI:
             print(f"{'='*60}")
             print(f"Mode: {mode.upper()}")
             print(f"Batch size: {batch_size}")
-            print(f"Records to migrate: {len(df)}")
+            print(f"Records to migrate: {record_count}")
+            if partition_set is not None:
+                print(f"Partitions: {partitions} (largest: {max(partition_set.row_counts)} lines)")
             if backup_timestamp:
                 print(f"Backup timestamp: {backup_timestamp}")
             print(f"{'='*60}\n")
@@ -344,22 +399,36 @@ class MigrationCLI:
                 logger.info("Creating executor in dry-run mode without database connection")
                 executor = create_migration_executor(supabase_manager, batch_size=batch_size, dry_run=True, org_id=args.org_id)
             
-            # Migrate transactions
-            logger.info("Migrating transactions...")
-            # Group by (entry_no, entry_date) to create unique transaction records
-            # Phase 0 identified 2,164 unique transactions from 14,224 detail rows
-            # Note: Column names are already mapped to English by ExcelReader
-            transactions_df = df.groupby(['entry_no', 'entry_date']).first().reset_index()
-            logger.info(f"Grouped {len(df)} rows into {len(transactions_df)} unique transactions")
-            trans_success, trans_batches = executor.migrate_transactions(transactions_df)
+            # Tables are loaded in foreign key order: transactions before their lines
+            load_plan = self._build_load_plan(['transactions', 'transaction_lines'])
+            if partition_set is not None:
+                # Each partition holds complete entries: migrate its transactions, then its lines
+                trans_batches, lines_batches = [], []
+                for index, lines in enumerate(partition_set):
+                    transactions_df = first_lines_by_entry(lines)
+                    logger.info(f"Partition {index + 1}: {len(lines)} rows in {len(transactions_df)} transactions")
+                    results = executor.run_load_plan(
+                        load_plan, {'transactions': transactions_df, 'transaction_lines': lines}
+                    )
+                    trans_batches.extend(results['transactions'][1])
+                    lines_batches.extend(results['transaction_lines'][1])
+            else:
+                # Group by (entry_no, entry_date) to create unique transaction records
+                # Phase 0 identified 2,164 unique transactions from 14,224 detail rows
+                # Note: Column names are already mapped to English by ExcelReader
+                transactions_df = df.groupby(['entry_no', 'entry_date']).first().reset_index()
+                logger.info(f"Grouped {len(df)} rows into {len(transactions_df)} unique transactions")
+                results = executor.run_load_plan(
+                    load_plan, {'transactions': transactions_df, 'transaction_lines': df}
+                )
+                trans_batches = results['transactions'][1]
+                lines_batches = results['transaction_lines'][1]
+            
             trans_attempted = sum(b.records_attempted for b in trans_batches)
             trans_succeeded = sum(b.records_succeeded for b in trans_batches)
             trans_failed = sum(b.records_failed for b in trans_batches)
             logger.info(f"Transactions: {trans_succeeded}/{trans_attempted} succeeded")
             
-            # Migrate transaction lines
-            logger.info("Migrating transaction lines...")
-            lines_success, lines_batches = executor.migrate_transaction_lines(df)
             lines_attempted = sum(b.records_attempted for b in lines_batches)
             lines_succeeded = sum(b.records_succeeded for b in lines_batches)
             lines_failed = sum(b.records_failed for b in lines_batches)
@@ -403,6 +472,16 @@ class MigrationCLI:
             logger.error(f"Migration failed: {e}", exc_info=True)
             print(f"\nMigration failed: {e}\n")
             return 1
+        finally:
+            if partition_set is not None:
+                partition_set.cleanup()
+    
+    @staticmethod
+    def _validation_error_count(validation_report: dict) -> int:
+        """Number of errors in a validation report."""
+        return validation_report.get('summary', {}).get(
+            'error_count', len([e for e in validation_report.get('errors', []) if e['level'] == 'ERROR'])
+        )
 
 
 def main():
@@ -424,6 +503,9 @@ Examples:
   # Execute migration
   python migrate.py --mode execute --batch-size 100 --org-id 731a3a00-6fa6-4282-9bec-8b5a8678e127
   
+  # Migrate a ledger larger than memory in 64 on-disk entry partitions
+  python migrate.py --mode execute --partitions 64 --org-id 731a3a00-6fa6-4282-9bec-8b5a8678e127
+  
   # Rollback from backup
   python migrate.py rollback --backup-timestamp 20260213_143022
         """
@@ -432,7 +514,18 @@ Examples:
     subparsers = parser.add_subparsers(dest='command', help='Command to run')
     
     # Validate command
-    subparsers.add_parser('validate', help='Validate Excel data without migration')
+    validate_parser = subparsers.add_parser('validate', help='Validate Excel data without migration')
+    validate_parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help='Validate row chunks in this many processes (default: single process)'
+    )
+    validate_parser.add_argument(
+        '--full',
+        action='store_true',
+        help='Validate every row instead of only rows changed since the last run'
+    )
     
     # Backup command
     subparsers.add_parser('backup', help='Create backup of current Supabase data')
@@ -457,6 +550,13 @@ Examples:
         default=100,
         help='Batch size for inserts (default: 100)'
     )
+    parser.add_argument(
+        '--partitions',
+        type=int,
+        default=0,
+        help='Spill lines to this many on-disk entry partitions and migrate them one at a time '
+             '(default: 0, whole file in memory)'
+    )
     parser.add_argument(
         '--org-id',
         type=str,
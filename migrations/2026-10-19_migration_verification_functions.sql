@@ -0,0 +1,81 @@
+-- Functions: verify_migration_references
+-- Purpose: Server-side reference checks for migrated transaction_lines, so
+--          post-migration verification returns a few aggregate rows instead
+--          of downloading the ledger and reference tables
+-- Date: 2026-10-19
+--
+-- Called by VerificationEngine (src/executor/verification_engine.py) via
+-- supabase.rpc('verify_migration_references', {'p_org_id': ...}).
+
+CREATE OR REPLACE FUNCTION public.verify_migration_references(p_org_id uuid DEFAULT NULL)
+RETURNS TABLE (
+  org_id uuid,
+  reference_column text,
+  total_lines bigint,
+  missing_lines bigint,
+  orphaned_lines bigint
+)
+LANGUAGE sql
+STABLE
+SECURITY INVOKER
+SET search_path = public
+AS $$
+  -- One anti-join per reference: missing = NULL reference, orphaned = no parent row
+  SELECT tl.org_id, 'transaction_id', count(*),
+         count(*) FILTER (WHERE tl.transaction_id IS NULL),
+         count(*) FILTER (WHERE tl.transaction_id IS NOT NULL AND t.id IS NULL)
+  FROM public.transaction_lines tl
+  LEFT JOIN public.transactions t ON t.id = tl.transaction_id
+  WHERE p_org_id IS NULL OR tl.org_id = p_org_id
+  GROUP BY tl.org_id
+
+  UNION ALL
+  SELECT tl.org_id, 'account_id', count(*),
+         count(*) FILTER (WHERE tl.account_id IS NULL),
+         count(*) FILTER (WHERE tl.account_id IS NOT NULL AND a.id IS NULL)
+  FROM public.transaction_lines tl
+  LEFT JOIN public.accounts a ON a.id = tl.account_id
+  WHERE p_org_id IS NULL OR tl.org_id = p_org_id
+  GROUP BY tl.org_id
+
+  UNION ALL
+  SELECT tl.org_id, 'project_id', count(*),
+         count(*) FILTER (WHERE tl.project_id IS NULL),
+         count(*) FILTER (WHERE tl.project_id IS NOT NULL AND p.id IS NULL)
+  FROM public.transaction_lines tl
+  LEFT JOIN public.projects p ON p.id = tl.project_id
+  WHERE p_org_id IS NULL OR tl.org_id = p_org_id
+  GROUP BY tl.org_id
+
+  UNION ALL
+  SELECT tl.org_id, 'classification_id', count(*),
+         count(*) FILTER (WHERE tl.classification_id IS NULL),
+         count(*) FILTER (WHERE tl.classification_id IS NOT NULL AND c.id IS NULL)
+  FROM public.transaction_lines tl
+  LEFT JOIN public.classifications c ON c.id = tl.classification_id
+  WHERE p_org_id IS NULL OR tl.org_id = p_org_id
+  GROUP BY tl.org_id
+
+  UNION ALL
+  SELECT tl.org_id, 'work_analysis_id', count(*),
+         count(*) FILTER (WHERE tl.work_analysis_id IS NULL),
+         count(*) FILTER (WHERE tl.work_analysis_id IS NOT NULL AND w.id IS NULL)
+  FROM public.transaction_lines tl
+  LEFT JOIN public.work_analysis w ON w.id = tl.work_analysis_id
+  WHERE p_org_id IS NULL OR tl.org_id = p_org_id
+  GROUP BY tl.org_id
+
+  UNION ALL
+  SELECT tl.org_id, 'sub_tree_id', count(*),
+         count(*) FILTER (WHERE tl.sub_tree_id IS NULL),
+         count(*) FILTER (WHERE tl.sub_tree_id IS NOT NULL AND s.id IS NULL)
+  FROM public.transaction_lines tl
+  LEFT JOIN public.sub_tree s ON s.id = tl.sub_tree_id
+  WHERE p_org_id IS NULL OR tl.org_id = p_org_id
+  GROUP BY tl.org_id;
+$$;
+
+COMMENT ON FUNCTION public.verify_migration_references(uuid) IS
+  'Per organization and reference column of transaction_lines: lines, NULL references and references without a parent row';
+
+GRANT EXECUTE ON FUNCTION public.verify_migration_references(uuid) TO authenticated, service_role;
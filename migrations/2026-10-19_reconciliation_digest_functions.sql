@@ -0,0 +1,107 @@
+-- Functions: reconcile_partition_digests, reconcile_entry_digests
+-- Purpose: Order-independent digests of migrated transaction_lines per
+--          (fiscal_year, month, account_code) partition and per entry, so
+--          the Excel migration can reconcile values by comparing a few
+--          aggregate rows and drill only into partitions that differ
+-- Date: 2026-10-19
+--
+-- Called by ReconciliationEngine (src/executor/reconciliation_engine.py).
+-- A line hashes to the first 64 bits of
+--   md5(entry_no | entry_date | account_code | debit minor units | credit minor units)
+-- and a digest is the sum of its line hashes modulo 2^64, the same as
+-- line_digests() computes on the Excel side. fiscal_year and month are
+-- the calendar year and month of the entry date on both sides. Minor
+-- units are computed in numeric so ties round half away from zero like
+-- to_minor_units() (10 ^ p_scale is double precision and rounds to even).
+-- Digests are returned as text because they do not fit a JSON double.
+
+CREATE OR REPLACE FUNCTION public.reconciliation_line_hashes(p_org_id uuid DEFAULT NULL, p_scale integer DEFAULT 2)
+RETURNS TABLE (
+  fiscal_year integer,
+  month integer,
+  account_code text,
+  entry_no text,
+  debit_units bigint,
+  credit_units bigint,
+  line_hash numeric
+)
+LANGUAGE sql
+STABLE
+SECURITY INVOKER
+SET search_path = public
+AS $$
+  WITH lines AS (
+    SELECT
+      extract(year FROM t.entry_date)::integer AS fiscal_year,
+      extract(month FROM t.entry_date)::integer AS month,
+      coalesce(tl.account_code, '') AS account_code,
+      coalesce(tl.entry_no::text, t.entry_number::text, '') AS entry_no,
+      coalesce(to_char(t.entry_date, 'YYYY-MM-DD'), '') AS entry_date,
+      round(coalesce(tl.debit_amount, 0) * power(10::numeric, p_scale))::bigint AS debit_units,
+      round(coalesce(tl.credit_amount, 0) * power(10::numeric, p_scale))::bigint AS credit_units
+    FROM public.transaction_lines tl
+    JOIN public.transactions t ON t.id = tl.transaction_id
+    WHERE p_org_id IS NULL OR tl.org_id = p_org_id
+  ), hashed AS (
+    SELECT lines.*,
+           ('x' || substr(md5(concat_ws('|', entry_no, entry_date, account_code, debit_units, credit_units)), 1, 16))::bit(64)::bigint AS signed_hash
+    FROM lines
+  )
+  SELECT fiscal_year, month, account_code, entry_no, debit_units, credit_units,
+         -- bit(64)::bigint is signed; shift back to the unsigned value
+         CASE WHEN signed_hash < 0 THEN signed_hash::numeric + 18446744073709551616 ELSE signed_hash::numeric END
+  FROM hashed;
+$$;
+
+CREATE OR REPLACE FUNCTION public.reconcile_partition_digests(p_org_id uuid DEFAULT NULL, p_scale integer DEFAULT 2)
+RETURNS TABLE (
+  fiscal_year integer,
+  month integer,
+  account_code text,
+  line_count bigint,
+  debit_units numeric,
+  credit_units numeric,
+  digest text
+)
+LANGUAGE sql
+STABLE
+SECURITY INVOKER
+SET search_path = public
+AS $$
+  SELECT fiscal_year, month, account_code, count(*), sum(debit_units), sum(credit_units),
+         mod(sum(line_hash), 18446744073709551616)::text
+  FROM public.reconciliation_line_hashes(p_org_id, p_scale)
+  GROUP BY fiscal_year, month, account_code;
+$$;
+
+CREATE OR REPLACE FUNCTION public.reconcile_entry_digests(
+  p_fiscal_year integer,
+  p_month integer,
+  p_account_code text,
+  p_org_id uuid DEFAULT NULL,
+  p_scale integer DEFAULT 2
+)
+RETURNS TABLE (
+  entry_no text,
+  line_count bigint,
+  debit_units numeric,
+  credit_units numeric,
+  digest text
+)
+LANGUAGE sql
+STABLE
+SECURITY INVOKER
+SET search_path = public
+AS $$
+  SELECT entry_no, count(*), sum(debit_units), sum(credit_units),
+         mod(sum(line_hash), 18446744073709551616)::text
+  FROM public.reconciliation_line_hashes(p_org_id, p_scale)
+  WHERE fiscal_year IS NOT DISTINCT FROM p_fiscal_year
+    AND month IS NOT DISTINCT FROM p_month
+    AND account_code = p_account_code
+  GROUP BY entry_no;
+$$;
+
+GRANT EXECUTE ON FUNCTION public.reconciliation_line_hashes(uuid, integer) TO authenticated, service_role;
+GRANT EXECUTE ON FUNCTION public.reconcile_partition_digests(uuid, integer) TO authenticated, service_role;
+GRANT EXECUTE ON FUNCTION public.reconcile_entry_digests(integer, integer, text, uuid, integer) TO authenticated, service_role;
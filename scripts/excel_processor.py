@@ -4,7 +4,10 @@ ExcelProcessor: Data cleaning, normalization, and type conversion.
 Requirements: 2.2, 2.3, 2.4, 2.5
 """
 
+import sys
+import types
 import logging
+from pathlib import Path
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
@@ -19,6 +22,16 @@ except ImportError:
     logger.error("Missing pandas or numpy. Install with: pip install pandas numpy")
     exit(1)
 
+# Register the analyzer package without running its __init__, which pulls in
+# the Supabase client; only the module imported below is loaded
+ANALYZER_DIR = Path(__file__).parent.parent / "src" / "analyzer"
+if "analyzer" not in sys.modules:
+    analyzer_package = types.ModuleType("analyzer")
+    analyzer_package.__path__ = [str(ANALYZER_DIR)]
+    sys.modules["analyzer"] = analyzer_package
+
+from analyzer.arabic_normalizer import VALUE_NORMALIZER
+
 
 @dataclass
 class ProcessingRule:
@@ -97,16 +110,8 @@ class ExcelProcessor:
         return value
     
     def _handle_arabic_text(self, value: Any) -> Any:
-        """Handle Arabic text encoding properly."""
-        if not isinstance(value, str):
-            return value
-        try:
-            if isinstance(value, bytes):
-                return value.decode('utf-8')
-            return value
-        except (UnicodeDecodeError, AttributeError):
-            logger.warning(f"Failed to handle Arabic text: {value}")
-            return value
+        """Normalize Arabic digits, tatweel, bidi marks and whitespace."""
+        return VALUE_NORMALIZER.normalize_text(value)
     
     def _convert_to_integer(self, value: Any, column_name: str, record_index: int) -> Tuple[Optional[int], Optional[ValidationError]]:
         """Convert value to integer."""
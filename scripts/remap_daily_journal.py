@@ -30,8 +30,20 @@ import io
 import json
 import os
 import sys
+import types
+from pathlib import Path
 from typing import Dict, List, Optional
 
+# Register the analyzer package without running its __init__, which pulls in
+# the Supabase client and pandas; arabic_digits uses the standard library only
+ANALYZER_DIR = Path(__file__).parent.parent / "src" / "analyzer"
+if "analyzer" not in sys.modules:
+    analyzer_package = types.ModuleType("analyzer")
+    analyzer_package.__path__ = [str(ANALYZER_DIR)]
+    sys.modules["analyzer"] = analyzer_package
+
+from analyzer.arabic_digits import normalize_digits
+
 PREFERRED_ENCODINGS = [
     "cp1256",      # Arabic (Windows-1256)
     "utf-8-sig",  # UTF-8 with BOM
@@ -75,17 +87,6 @@ OUTPUT_COLUMNS_RAW_STAGE = [
     "source_file",
 ]
 
-ARABIC_TO_ASCII_DIGITS = str.maketrans(
-    # Arabic-Indic 0-9
-    "٠١٢٣٤٥٦٧٨٩",
-    "0123456789"
-)
-PERSIAN_TO_ASCII_DIGITS = str.maketrans(
-    # Extended Arabic-Indic (Persian) 0-9
-    "۰۱۲۳۴۵۶۷۸۹",
-    "0123456789"
-)
-
 
 def detect_delimiter(sample: str) -> str:
     # Prefer ';' if present; else fall back to ','
@@ -110,15 +111,6 @@ def try_read(path: str, encoding: Optional[str] = None) -> tuple[str, str]:
     raise RuntimeError(f"Failed to decode {path} with encodings {encodings}: {last_err}")
 
 
-def normalize_digits(value: str) -> str:
-    if value is None:
-        return value
-    # Convert Arabic/Persian digits to ASCII
-    v = value.translate(ARABIC_TO_ASCII_DIGITS)
-    v = v.translate(PERSIAN_TO_ASCII_DIGITS)
-    return v
-
-
 def load_mapping(path: str) -> Dict[str, str]:
     with open(path, "r", encoding="utf-8") as f:
         mapping = json.load(f)
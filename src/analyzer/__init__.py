@@ -17,6 +17,7 @@ from .schema_manager import (
     ColumnDefinition,
     ForeignKey,
     SchemaValidationResult,
+    LoadPlan,
     create_schema_manager
 )
 
@@ -28,6 +29,18 @@ from .excel_reader import (
     create_excel_reader
 )
 
+from .dtype_plan import (
+    DtypePlan,
+    MemoryReport,
+    create_dtype_plan
+)
+
+from .arabic_normalizer import (
+    ArabicNormalizer,
+    NormalizationOptions,
+    create_arabic_normalizer
+)
+
 from .excel_processor import (
     ExcelProcessor,
     ProcessingRule,
@@ -42,7 +55,27 @@ from .data_validator import (
     ValidationResult,
     ValidationError as DataValidationError,
     ValidationWarning,
-    create_data_validator
+    create_data_validator,
+    load_validation_rules
+)
+
+from .rule_engine import (
+    CompiledRuleSet,
+    compile_rules
+)
+
+from .validation_store import FindingStore
+
+from .validation_cache import (
+    ValidationCache,
+    ValidationDiff,
+    create_validation_cache
+)
+
+from .hierarchy_index import (
+    HierarchyIndex,
+    HierarchyIssues,
+    create_hierarchy_index
 )
 
 __all__ = [
@@ -58,6 +91,7 @@ __all__ = [
     "ColumnDefinition",
     "ForeignKey",
     "SchemaValidationResult",
+    "LoadPlan",
     "create_schema_manager",
     
     # Excel Reading
@@ -67,6 +101,16 @@ __all__ = [
     "ReadResult",
     "create_excel_reader",
     
+    # Dtype Planning
+    "DtypePlan",
+    "MemoryReport",
+    "create_dtype_plan",
+    
+    # Arabic Normalization
+    "ArabicNormalizer",
+    "NormalizationOptions",
+    "create_arabic_normalizer",
+    
     # Excel Processing
     "ExcelProcessor",
     "ProcessingRule",
@@ -80,5 +124,21 @@ __all__ = [
     "ValidationResult",
     "DataValidationError",
     "ValidationWarning",
-    "create_data_validator"
+    "FindingStore",
+    "create_data_validator",
+    "load_validation_rules",
+    
+    # Declarative Validation Rules
+    "CompiledRuleSet",
+    "compile_rules",
+    
+    # Incremental Validation
+    "ValidationCache",
+    "ValidationDiff",
+    "create_validation_cache",
+    
+    # Account and Sub-tree Hierarchies
+    "HierarchyIndex",
+    "HierarchyIssues",
+    "create_hierarchy_index"
 ]
\ No newline at end of file
@@ -0,0 +1,273 @@
+"""
+Account Code Index for Excel Data Migration
+
+This module suggests mappings for unmapped legacy account codes:
+- Sorted arrays of legacy and new codes for longest-common-prefix search
+- Parent-code inference (truncated or zero-padded prefixes that exist)
+- Name similarity on MATCHING_NORMALIZER names via a trigram index
+- Ranked candidates per unmapped code, many codes per call
+
+Neighbours in sorted order share the longest prefix with a query, so a
+prefix lookup is one binary search; name candidates come from the
+trigram postings of the query instead of a scan over all accounts.
+"""
+
+import logging
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+from .arabic_normalizer import MATCHING_NORMALIZER
+
+logger = logging.getLogger(__name__)
+
+
+# Weights of the prefix and name scores when a name is given
+PREFIX_WEIGHT = 0.6
+NAME_WEIGHT = 0.4
+
+# Candidates taken around the insertion point of a prefix match
+MAX_PREFIX_CANDIDATES = 10
+
+# Minimum Dice coefficient of name trigrams for a name candidate
+MIN_NAME_SIMILARITY = 0.3
+
+# Most similar names kept per query
+MAX_NAME_CANDIDATES = 10
+
+DEFAULT_SUGGESTIONS = 5
+
+
+@dataclass
+class CodeSuggestion:
+    """A candidate new account for an unmapped code"""
+    code: str
+    candidate_code: str
+    account_id: str
+    account_name: str
+    score: float  # 0.0 to 1.0
+    reasons: List[str] = field(default_factory=list)  # e.g. 'prefix:legacy:3', 'parent:1200', 'name:0.82'
+
+
+def _common_prefix_length(a: str, b: str) -> int:
+    length = min(len(a), len(b))
+    for i in range(length):
+        if a[i] != b[i]:
+            return i
+    return length
+
+
+def _trigrams(text: str) -> List[str]:
+    padded = f"  {text} "
+    return list({padded[i:i + 3] for i in range(len(padded) - 2)})
+
+
+class AccountCodeIndex:
+    """
+    Index over the codes and names of the new chart of accounts.
+
+    Both legacy codes (through their known mappings) and new codes point
+    at a target account, so a query code is matched against either
+    numbering scheme.
+    """
+
+    def __init__(self, accounts: pd.DataFrame, legacy_codes: Optional[pd.DataFrame] = None):
+        """
+        Build the index.
+
+        Args:
+            accounts: New accounts with code, name and account_id columns
+            legacy_codes: Known mappings with legacy_code and code columns
+        """
+        accounts = accounts.drop_duplicates("code", keep="last").reset_index(drop=True)
+        self.codes = accounts["code"].astype(str).to_numpy(dtype=object)
+        self.account_ids = accounts["account_id"].astype(object).to_numpy()
+        self.names = accounts["name"].fillna("").astype(str).to_numpy(dtype=object)
+        self.code_positions = {code: position for position, code in enumerate(self.codes)}
+
+        # Sorted keys: new codes and legacy codes, each pointing at a target account
+        keys = [(code, "new", position) for position, code in enumerate(self.codes)]
+        if legacy_codes is not None and not legacy_codes.empty:
+            for legacy_code, code in zip(legacy_codes["legacy_code"].astype(str), legacy_codes["code"].astype(str)):
+                if code in self.code_positions:
+                    keys.append((legacy_code, "legacy", self.code_positions[code]))
+        keys.sort()
+        self.keys = np.array([key for key, _, _ in keys], dtype=str)
+        self.key_kinds = [kind for _, kind, _ in keys]
+        self.key_targets = np.array([target for _, _, target in keys], dtype=np.int64)
+        self.exact = defaultdict(list)
+        for position, key in enumerate(self.keys):
+            self.exact[str(key)].append(position)
+
+        # Trigram postings of the normalized names
+        normalized = MATCHING_NORMALIZER.normalize_series(pd.Series(self.names, dtype=object)).str.lower()
+        self.name_sizes = np.zeros(len(self.codes), dtype=np.int64)
+        postings: Dict[str, List[int]] = defaultdict(list)
+        for position, name in enumerate(normalized):
+            if name:
+                grams = _trigrams(name)
+                self.name_sizes[position] = len(grams)
+                for gram in grams:
+                    postings[gram].append(position)
+        self.postings = {gram: np.array(positions, dtype=np.int64) for gram, positions in postings.items()}
+
+        logger.info(f"Built account code index: {len(self.codes)} accounts, {len(self.keys)} codes")
+
+    @classmethod
+    def from_mappings(cls, mappings: Iterable[Any], accounts: Optional[pd.DataFrame] = None) -> "AccountCodeIndex":
+        """
+        Build the index from AccountMapping objects.
+
+        Args:
+            mappings: AccountMapping objects (legacy_code → current_code)
+            accounts: Further new accounts (code, name, account_id), e.g.
+                all Supabase accounts including ones not mapped yet
+
+        Returns:
+            AccountCodeIndex instance
+        """
+        mappings = list(mappings)
+        targets = pd.DataFrame(
+            [(m.current_code, m.account_name, m.account_id) for m in mappings],
+            columns=["code", "name", "account_id"]
+        )
+        if accounts is not None:
+            targets = pd.concat([targets, accounts[["code", "name", "account_id"]]], ignore_index=True)
+        legacy = pd.DataFrame(
+            [(m.legacy_code, m.current_code) for m in mappings],
+            columns=["legacy_code", "code"]
+        )
+        return cls(targets, legacy)
+
+    def suggest(self, code: Any, name: Optional[str] = None,
+                limit: int = DEFAULT_SUGGESTIONS) -> List[CodeSuggestion]:
+        """
+        Ranked candidates for one unmapped code.
+
+        Args:
+            code: Unmapped legacy code
+            name: Account name from the Excel file (optional)
+            limit: Maximum number of suggestions
+
+        Returns:
+            Suggestions, best first
+        """
+        return self.suggest_many([code], [name], limit)[str(code).strip()]
+
+    def suggest_many(self, codes: Iterable[Any], names: Optional[Iterable[Optional[str]]] = None,
+                     limit: int = DEFAULT_SUGGESTIONS) -> Dict[str, List[CodeSuggestion]]:
+        """
+        Ranked candidates for many unmapped codes.
+
+        All insertion points are found with one vectorized binary search.
+
+        Args:
+            codes: Unmapped legacy codes
+            names: Account name per code (optional)
+            limit: Maximum number of suggestions per code
+
+        Returns:
+            Dictionary of code → suggestions, best first
+        """
+        codes = [str(code).strip() for code in codes]
+        names = list(names) if names is not None else [None] * len(codes)
+        normalized = MATCHING_NORMALIZER.normalize_series(pd.Series(names, dtype=object))
+
+        insert_at = np.searchsorted(self.keys, np.array(codes, dtype=str)) if len(self.keys) else None
+        results = {}
+        for i, code in enumerate(codes):
+            prefix_scores = self._prefix_candidates(code, int(insert_at[i])) if insert_at is not None else {}
+            name = normalized.iloc[i]
+            name_scores = self._name_candidates(name.lower()) if isinstance(name, str) and name else {}
+            results[code] = self._rank(code, prefix_scores, name_scores, limit)
+        return results
+
+    def _prefix_candidates(self, code: str, insert_at: int) -> Dict[int, Tuple[float, List[str]]]:
+        """Targets sharing the longest prefix with the code, plus its inferred parent"""
+        candidates: Dict[int, Tuple[float, List[str]]] = {}
+        if not code:
+            return candidates
+
+        def add(target: int, score: float, reason: str):
+            previous_score, reasons = candidates.get(target, (0.0, []))
+            if reason not in reasons:
+                reasons.append(reason)
+            candidates[target] = (max(previous_score, score), reasons)
+
+        # The longest common prefix is shared with a neighbour of the insertion point
+        neighbours = [p for p in (insert_at - 1, insert_at) if 0 <= p < len(self.keys)]
+        best = max((_common_prefix_length(code, str(self.keys[p])) for p in neighbours), default=0)
+        if best > 0:
+            prefix = code[:best]
+            start = int(np.searchsorted(self.keys, prefix, side="left"))
+            end = int(np.searchsorted(self.keys, prefix + "\uffff", side="left"))
+            low = max(start, insert_at - MAX_PREFIX_CANDIDATES // 2)
+            for position in range(low, min(end, low + MAX_PREFIX_CANDIDATES)):
+                key = str(self.keys[position])
+                score = best / max(len(code), len(key))
+                add(int(self.key_targets[position]), score, f"prefix:{self.key_kinds[position]}:{best}")
+
+        # Parent inference: the longest truncated or zero-padded prefix that exists
+        for length in range(len(code) - 1, 0, -1):
+            parent = next((p for p in (code[:length], code[:length] + "0" * (len(code) - length))
+                           if p in self.exact), None)
+            if parent is not None:
+                for position in self.exact[parent]:
+                    add(int(self.key_targets[position]), length / len(code), f"parent:{parent}")
+                break
+        return candidates
+
+    def _name_candidates(self, name: str) -> Dict[int, float]:
+        """Targets whose name trigrams overlap the query (Dice coefficient)"""
+        grams = _trigrams(name)
+        hits = [self.postings[gram] for gram in grams if gram in self.postings]
+        if not hits:
+            return {}
+        shared = np.bincount(np.concatenate(hits), minlength=len(self.codes))
+        similarity = 2.0 * shared / (len(grams) + self.name_sizes)
+        matches = np.flatnonzero(similarity >= MIN_NAME_SIMILARITY)
+        if len(matches) > MAX_NAME_CANDIDATES:
+            top = np.argpartition(-similarity[matches], MAX_NAME_CANDIDATES - 1)[:MAX_NAME_CANDIDATES]
+            matches = matches[top]
+        return {int(target): float(similarity[target]) for target in matches}
+
+    def _rank(self, code: str, prefix_scores: Dict[int, Tuple[float, List[str]]],
+              name_scores: Dict[int, float], limit: int) -> List[CodeSuggestion]:
+        """Combine prefix and name scores and keep the best candidates"""
+        use_names = bool(name_scores)
+        suggestions = []
+        for target in set(prefix_scores) | set(name_scores):
+            prefix_score, reasons = prefix_scores.get(target, (0.0, []))
+            name_score = name_scores.get(target, 0.0)
+            score = PREFIX_WEIGHT * prefix_score + NAME_WEIGHT * name_score if use_names else prefix_score
+            reasons = list(reasons)
+            if target in name_scores:
+                reasons.append(f"name:{name_score:.2f}")
+            suggestions.append(CodeSuggestion(
+                code=code,
+                candidate_code=str(self.codes[target]),
+                account_id=self.account_ids[target],
+                account_name=self.names[target],
+                score=round(float(score), 4),
+                reasons=reasons
+            ))
+        suggestions.sort(key=lambda s: (-s.score, s.candidate_code))
+        return suggestions[:limit]
+
+
+# Factory function for easy creation
+def create_account_code_index(accounts: pd.DataFrame,
+                              legacy_codes: Optional[pd.DataFrame] = None) -> AccountCodeIndex:
+    """
+    Factory function to create account code index.
+
+    Args:
+        accounts: New accounts with code, name and account_id columns
+        legacy_codes: Known mappings with legacy_code and code columns
+
+    Returns:
+        AccountCodeIndex instance
+    """
+    return AccountCodeIndex(accounts, legacy_codes)
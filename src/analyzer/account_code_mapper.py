@@ -6,14 +6,71 @@ Implements Requirements 4.1, 4.2, 4.3, 4.4, 4.5
 """
 
 import json
+import time
 import logging
 import csv
-from typing import Dict, Optional, List, Tuple
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, List, Tuple
+from urllib.parse import quote
 from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+
+from .account_code_index import AccountCodeIndex, CodeSuggestion, DEFAULT_SUGGESTIONS
 
 logger = logging.getLogger(__name__)
 
 
+# Budget for the encoded values of one in.(...) filter, well below the
+# 8 KB request line limit of common proxies in front of PostgREST
+MAX_FILTER_URL_LENGTH = 6000
+
+# Bump when the account id cache layout changes
+ACCOUNT_CACHE_FORMAT_VERSION = 2
+
+# Seconds the account id cache is reused without checking the accounts table
+DEFAULT_ACCOUNT_CACHE_TTL = 3600
+
+
+def chunk_by_url_length(values: List[str], max_length: int = MAX_FILTER_URL_LENGTH) -> List[List[str]]:
+    """
+    Split values into chunks whose in.(...) filter fits in max_length.
+
+    Each value is counted URL-encoded and quoted, plus its separator.
+
+    Args:
+        values: Filter values
+        max_length: Maximum encoded length of one chunk
+
+    Returns:
+        List of chunks (a value longer than max_length gets its own chunk)
+    """
+    chunks: List[List[str]] = []
+    current: List[str] = []
+    length = 0
+    for value in values:
+        value_length = len(quote(f'"{value}"', safe='')) + 1
+        if current and length + value_length > max_length:
+            chunks.append(current)
+            current, length = [], 0
+        current.append(value)
+        length += value_length
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def normalize_account_code(value) -> Optional[str]:
+    """Account code as text ('1001.0' read from Excel becomes '1001'; blanks None)"""
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return None
+    if isinstance(value, (float, np.floating)) and float(value).is_integer():
+        return str(int(value))
+    text = str(value).strip()
+    return text or None
+
+
 @dataclass
 class AccountMapping:
     """Represents a mapping between Excel and Supabase account codes"""
@@ -24,6 +81,7 @@ class AccountMapping:
     account_id: str  # UUID
     mapping_confidence: float  # 0.0 to 1.0
     requires_review: bool = False
+    account_id_resolved: bool = False  # account_id is the Supabase UUID, not current_code
 
 
 class UnmappedAccountCodeError(Exception):
@@ -40,30 +98,45 @@ class AccountCodeMapper:
     Strategy:
     1. Load account mappings from reports/account_mapping.csv (Phase 0 output)
     2. Load manual mappings from config/manual_account_mappings.json (if exists)
-    3. Provide fast lookup: excel_code → account_id (UUID)
-    4. Raise error if unmapped code encountered
+    3. Resolve current codes to account UUIDs of the organization in bulk
+       (cached on disk per org, rechecked against the accounts table)
+    4. Provide fast lookup: excel_code → account_id (UUID), per code or per column
+    5. Raise error if unmapped code encountered
     
     Implements Requirements 4.1, 4.2, 4.3, 4.4, 4.5
     """
     
     def __init__(self, supabase_client=None, mapping_file: str = 'reports/account_mapping.csv',
-                 manual_mapping_file: str = 'config/manual_account_mappings.json'):
+                 manual_mapping_file: str = 'config/manual_account_mappings.json',
+                 org_id: Optional[str] = None, cache_dir: Optional[str] = None,
+                 max_filter_length: int = MAX_FILTER_URL_LENGTH,
+                 cache_ttl: float = DEFAULT_ACCOUNT_CACHE_TTL):
         """
         Initialize the account code mapper.
         
         Args:
-            supabase_client: Supabase client for querying accounts table
+            supabase_client: Supabase client (or SupabaseConnectionManager) for querying accounts table
             mapping_file: Path to account mapping CSV from Phase 0
             manual_mapping_file: Path to manual mappings JSON (optional)
+            org_id: Organization whose accounts are resolved (required to
+                resolve codes to UUIDs; without it codes stay unresolved)
+            cache_dir: Directory for the code → UUID cache (no cache if None)
+            max_filter_length: Maximum encoded length of one in.(...) filter
+            cache_ttl: Seconds the cache is reused without checking the accounts table
         """
         self.supabase_client = supabase_client
         self.mapping_file = mapping_file
         self.manual_mapping_file = manual_mapping_file
+        self.org_id = org_id
+        self.cache_dir = cache_dir
+        self.max_filter_length = max_filter_length
+        self.cache_ttl = cache_ttl
         
         # Cache for fast lookups
         self.excel_to_account_id: Dict[str, str] = {}  # excel_code → account_id
         self.excel_to_mapping: Dict[str, AccountMapping] = {}  # excel_code → AccountMapping
         self.unmapped_codes: List[str] = []
+        self.unresolved_codes: List[str] = []  # current codes without a Supabase account
         
         logger.info("AccountCodeMapper initialized")
     
@@ -83,6 +156,12 @@ class AccountCodeMapper:
             # Load manual mappings if they exist
             self._load_manual_mappings()
             
+            # Replace current codes by account UUIDs
+            if not self.org_id:
+                logger.warning("No org_id given: current codes are not resolved to account ids")
+            elif self._get_client() is not None or self._cache_path() is not None:
+                self.resolve_account_ids()
+            
             logger.info(f"Loaded {len(self.excel_to_account_id)} account mappings")
             return True
             
@@ -107,14 +186,13 @@ class AccountCodeMapper:
                     account_name = row.get('new_name', '').strip()
                     
                     if excel_code and current_code:
-                        # For now, use current_code as placeholder for account_id
-                        # In real scenario, this would be queried from Supabase
+                        # account_id holds current_code until resolve_account_ids runs
                         mapping = AccountMapping(
                             excel_code=excel_code,
                             legacy_code=legacy_code,
                             current_code=current_code,
                             account_name=account_name,
-                            account_id=current_code,  # Placeholder - should be UUID from Supabase
+                            account_id=current_code,
                             mapping_confidence=0.95,
                             requires_review=False
                         )
@@ -158,6 +236,7 @@ class AccountCodeMapper:
                         # Update or create mapping
                         if excel_code in self.excel_to_mapping:
                             self.excel_to_mapping[excel_code].account_id = account_id
+                            self.excel_to_mapping[excel_code].account_id_resolved = True
                             self.excel_to_mapping[excel_code].requires_review = True
                         else:
                             mapping = AccountMapping(
@@ -167,7 +246,8 @@ class AccountCodeMapper:
                                 account_name=account_name,
                                 account_id=account_id,
                                 mapping_confidence=0.85,
-                                requires_review=True
+                                requires_review=True,
+                                account_id_resolved=True
                             )
                             self.excel_to_mapping[excel_code] = mapping
                         
@@ -184,6 +264,236 @@ class AccountCodeMapper:
             logger.error(f"Error loading manual mappings: {e}")
             return False
     
+    def _get_client(self):
+        """Supabase client, also when a SupabaseConnectionManager was passed"""
+        client = self.supabase_client
+        if client is not None and not hasattr(client, 'table'):
+            client = getattr(client, 'client', None)
+        return client
+    
+    def _cache_path(self) -> Optional[Path]:
+        """Code → UUID cache file of the organization (None without a cache directory)"""
+        if not self.cache_dir:
+            return None
+        return Path(self.cache_dir) / f"account_ids_{self.org_id}.json"
+    
+    def _accounts_marker(self) -> Optional[Dict[str, Any]]:
+        """
+        Row count and latest updated_at of the organization's accounts.
+        
+        A deleted and re-created account changes the latest updated_at even
+        when the count is unchanged; accounts without updated_at sort last.
+        Returns None if it cannot be read.
+        """
+        client = self._get_client()
+        if client is None:
+            return None
+        try:
+            response = (
+                client.table('accounts').select('updated_at', count='exact')
+                .eq('org_id', self.org_id)
+                .order('updated_at', desc=True, nullsfirst=False)
+                .limit(1)
+                .execute()
+            )
+        except Exception as e:
+            logger.warning(f"Could not read the freshness of the accounts table: {e}")
+            return None
+        data = response.data or []
+        return {
+            'count': response.count,
+            'max_updated_at': data[0].get('updated_at') if data else None,
+        }
+    
+    def _load_id_cache(self) -> Dict[str, Any]:
+        """
+        Cached code → UUID entries of the organization, if still fresh.
+        
+        Within cache_ttl seconds the cache is used without any request;
+        afterwards only while the accounts marker is unchanged.
+        
+        Returns:
+            Cache content ('account_ids', 'markers', 'checked_at'), empty if
+            there is no usable cache
+        """
+        path = self._cache_path()
+        if path is None or not path.exists():
+            return {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            if cached.get('format_version') != ACCOUNT_CACHE_FORMAT_VERSION or cached.get('org_id') != self.org_id:
+                logger.info(f"Ignoring account id cache with old format: {path}")
+                return {}
+            
+            age = time.time() - cached['checked_at']
+            if age > self.cache_ttl:
+                if self._get_client() is None:
+                    logger.info(f"Using account id cache {path} ({age:.0f}s old) without a Supabase client")
+                    return cached
+                markers = self._accounts_marker()
+                if markers is None or markers != cached['markers']:
+                    logger.info(f"Account id cache {path} is stale, resolving again")
+                    return {}
+                cached['checked_at'] = time.time()
+                self._save_id_cache(cached['account_ids'], markers, cached['checked_at'])
+            return cached
+        except Exception as e:
+            logger.warning(f"Could not read account id cache {path}: {e}")
+            return {}
+    
+    def _save_id_cache(self, account_ids: Dict[str, str], markers: Optional[Dict[str, Any]],
+                       checked_at: float):
+        """
+        Save resolved ids.
+        
+        Args:
+            account_ids: Code → UUID entries
+            markers: Accounts marker read before the ids were fetched
+            checked_at: Time the marker was read
+        """
+        path = self._cache_path()
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = path.with_suffix('.tmp')
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'format_version': ACCOUNT_CACHE_FORMAT_VERSION,
+                    'org_id': self.org_id,
+                    'saved_at': datetime.now().isoformat(),
+                    'checked_at': checked_at,
+                    'markers': markers,
+                    'account_ids': account_ids
+                }, f, indent=2, ensure_ascii=False)
+            temp_path.replace(path)
+            logger.info(f"Account id cache saved to {path}")
+        except Exception as e:
+            logger.warning(f"Could not save account id cache {path}: {e}")
+    
+    def fetch_account_ids(self, codes: Iterable[str], lookup_column: str = 'code') -> Dict[str, str]:
+        """
+        Look up account UUIDs for codes in a few bulk requests.
+        
+        Codes are sent in in.(...) filters, split so that each request URL
+        stays within max_filter_length.
+        
+        Args:
+            codes: Account codes to look up
+            lookup_column: accounts column holding the codes
+            
+        Returns:
+            Dictionary of code → account UUID for the codes found
+            
+        Raises:
+            ValueError: If no org_id is set (codes are unique per organization only)
+        """
+        if not self.org_id:
+            raise ValueError("org_id is required to resolve account ids")
+        client = self._get_client()
+        if client is None:
+            logger.warning("No Supabase client available for resolving account ids")
+            return {}
+        
+        found: Dict[str, str] = {}
+        chunks = chunk_by_url_length(sorted(set(codes)), self.max_filter_length)
+        for chunk in chunks:
+            query = client.table('accounts').select(f'id, {lookup_column}').eq('org_id', self.org_id)
+            response = query.in_(lookup_column, chunk).execute()
+            for row in response.data or []:
+                code = normalize_account_code(row.get(lookup_column))
+                if code:
+                    found[code] = row['id']
+        logger.info(f"Resolved {len(found)} account ids in {len(chunks)} requests")
+        return found
+    
+    def resolve_account_ids(self) -> int:
+        """
+        Replace the current codes of the Phase 0 mappings by account UUIDs.
+        
+        Every distinct current code is looked up once: first in the disk
+        cache of the organization, the rest with fetch_account_ids. The
+        cache is dropped when the accounts table changed since it was
+        saved. Codes that do not exist in Supabase are dropped from the
+        lookup and listed in unresolved_codes; without a client, codes
+        missing from the cache keep their current code.
+        
+        Returns:
+            Number of mappings resolved
+            
+        Raises:
+            ValueError: If no org_id is set
+        """
+        if not self.org_id:
+            raise ValueError("org_id is required to resolve account ids")
+        pending = {m.current_code for m in self.excel_to_mapping.values() if not m.account_id_resolved}
+        cached = self._load_id_cache()
+        account_ids = dict(cached.get('account_ids', {}))
+        can_fetch = self._get_client() is not None
+        if pending - set(account_ids) and can_fetch:
+            # Marker read before the fetch; ids cached under other markers are fetched again
+            checked_at = time.time()
+            markers = self._accounts_marker()
+            if markers is None or markers != cached.get('markers'):
+                account_ids = {}
+            fetched = self.fetch_account_ids(pending - set(account_ids))
+            if fetched:
+                account_ids.update(fetched)
+                self._save_id_cache(account_ids, markers, checked_at)
+        
+        resolved = 0
+        unresolved = set()
+        for excel_code, mapping in self.excel_to_mapping.items():
+            if mapping.account_id_resolved:
+                continue
+            account_id = account_ids.get(mapping.current_code)
+            if account_id:
+                mapping.account_id = account_id
+                mapping.account_id_resolved = True
+                self.excel_to_account_id[excel_code] = account_id
+                resolved += 1
+            elif can_fetch:
+                unresolved.add(mapping.current_code)
+                self.excel_to_account_id.pop(excel_code, None)
+        
+        self.unresolved_codes = sorted(unresolved)
+        if unresolved:
+            logger.warning(f"{len(unresolved)} current codes not found in Supabase accounts")
+        logger.info(f"Resolved {resolved} account mappings to Supabase ids")
+        return resolved
+    
+    def map_series(self, excel_codes: pd.Series) -> Tuple[pd.Series, pd.Series]:
+        """
+        Map a column of Excel account codes to account ids.
+        
+        Each distinct code is normalized and looked up once. The distinct
+        unmapped codes are stored in unmapped_codes.
+        
+        Args:
+            excel_codes: Series of Excel account codes
+            
+        Returns:
+            Tuple of (account_ids: object Series with None where not mapped,
+            unmapped: bool Series marking non-blank codes without a mapping)
+        """
+        positions, uniques = pd.factorize(excel_codes)
+        keys = [normalize_account_code(value) for value in uniques]
+        lookup = pd.Index(list(self.excel_to_account_id), dtype=object)
+        found = lookup.get_indexer(pd.Index(keys, dtype=object))
+        
+        ids = np.append(np.asarray(list(self.excel_to_account_id.values()), dtype=object), None)
+        unique_ids = np.append(ids[found], None)
+        unique_unmapped = np.append((found < 0) & np.array([key is not None for key in keys], dtype=bool), False)
+        
+        self.unmapped_codes = sorted(key for key, missing in zip(keys, unique_unmapped) if missing)
+        if self.unmapped_codes:
+            logger.warning(f"{len(self.unmapped_codes)} unmapped account codes")
+        return (
+            pd.Series(unique_ids[positions], index=excel_codes.index, dtype=object),
+            pd.Series(unique_unmapped[positions], index=excel_codes.index, dtype=bool)
+        )
+    
     def map_excel_code_to_account_id(self, excel_code: str) -> str:
         """
         Map an Excel account code to a Supabase account ID.
@@ -254,6 +564,33 @@ class AccountCodeMapper:
         
         return all_mapped, unmapped
     
+    def suggest_mappings(self, excel_codes: Optional[List[str]] = None,
+                         names: Optional[Dict[str, str]] = None,
+                         accounts: Optional[pd.DataFrame] = None,
+                         limit: int = DEFAULT_SUGGESTIONS) -> Dict[str, List[CodeSuggestion]]:
+        """
+        Suggest new accounts for unmapped codes.
+        
+        Candidates are ranked by longest common prefix with known legacy
+        and new codes, inferred parent codes and, where a name is given,
+        similarity of the normalized Arabic names.
+        
+        Args:
+            excel_codes: Unmapped codes (default: unmapped_codes of the last check)
+            names: Account name per Excel code (optional)
+            accounts: Further new accounts (code, name, account_id) to suggest
+            limit: Maximum number of suggestions per code
+            
+        Returns:
+            Dictionary of code → suggestions, best first
+        """
+        codes = self.unmapped_codes if excel_codes is None else excel_codes
+        if not codes:
+            return {}
+        index = AccountCodeIndex.from_mappings(self.excel_to_mapping.values(), accounts)
+        names = names or {}
+        return index.suggest_many(codes, [names.get(code) for code in codes], limit)
+    
     def save_mapping_report(self, output_file: str = 'reports/account_mapping_report.csv') -> bool:
         """
         Save a detailed mapping report to CSV.
@@ -0,0 +1,44 @@
+"""
+Arabic Digits for Excel Data Migration
+
+This module holds the digit translation shared by the normalizer and the
+standalone scripts:
+- Arabic-Indic and Persian digit translation table
+- Arabic decimal and thousands separators
+- normalize_digits for single strings
+
+It uses the standard library only, so scripts can load it without pandas,
+numpy or the Supabase client.
+"""
+
+from typing import Optional
+
+
+# Arabic-Indic (U+0660-U+0669) and Extended Arabic-Indic / Persian (U+06F0-U+06F9) digits
+ARABIC_INDIC_DIGITS = "٠١٢٣٤٥٦٧٨٩"
+PERSIAN_DIGITS = "۰۱۲۳۴۵۶۷۸۹"
+ASCII_DIGITS = "0123456789"
+
+DIGIT_TRANSLATION = str.maketrans(
+    ARABIC_INDIC_DIGITS + PERSIAN_DIGITS,
+    ASCII_DIGITS + ASCII_DIGITS
+)
+
+# Arabic decimal separator (U+066B) and thousands separator (U+066C)
+ARABIC_DECIMAL_SEPARATOR = "٫"
+ARABIC_THOUSANDS_SEPARATOR = "٬"
+
+
+def normalize_digits(value: Optional[str]) -> Optional[str]:
+    """
+    Convert Arabic-Indic and Persian digits in a string to ASCII digits.
+
+    Args:
+        value: String value (None is returned unchanged)
+
+    Returns:
+        String with ASCII digits
+    """
+    if value is None:
+        return value
+    return value.translate(DIGIT_TRANSLATION)
@@ -0,0 +1,239 @@
+"""
+Arabic Normalizer for Excel Data Migration
+
+This module provides one shared normalizer for Arabic text and numerals:
+- Convert Arabic-Indic and Persian digits to ASCII digits
+- Remove tatweel (kashida) and bidirectional/zero-width marks
+- Optionally fold alef, yeh and teh marbuta variants for matching
+- Normalize and collapse whitespace
+
+Whole Series are normalized with str.translate tables and precompiled
+regular expressions. Values are factorized first, so each distinct value
+is translated once regardless of how often it repeats.
+"""
+
+import re
+import logging
+from typing import Dict, Optional, Any, Iterable, Tuple
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+
+from .arabic_digits import (
+    ARABIC_INDIC_DIGITS,
+    PERSIAN_DIGITS,
+    ASCII_DIGITS,
+    DIGIT_TRANSLATION,
+    ARABIC_DECIMAL_SEPARATOR,
+    ARABIC_THOUSANDS_SEPARATOR,
+    normalize_digits
+)
+
+logger = logging.getLogger(__name__)
+
+
+TATWEEL = "ـ"
+
+# Bidirectional controls, Arabic letter mark, zero-width space and BOM
+BIDI_MARKS = (
+    "\u200e\u200f"                      # LRM, RLM
+    "\u202a\u202b\u202c\u202d\u202e"  # LRE, RLE, PDF, LRO, RLO
+    "\u2066\u2067\u2068\u2069"          # LRI, RLI, FSI, PDI
+    "\u061c"                            # Arabic letter mark
+    "\u200b\ufeff"                      # zero-width space, BOM
+)
+
+# Non-breaking, typographic and ideographic spaces plus tabs/newlines map to a plain space
+SPACE_VARIANTS = "\u00a0\u2000\u2001\u2002\u2003\u2004\u2005\u2006\u2007\u2008\u2009\u200a\u202f\u3000\t\r\n"
+
+# Letter variants folded for matching
+ALEF_VARIANTS = "أإآٱ"  # hamza above, hamza below, madda, wasla
+YEH_VARIANTS = "ىی"     # alef maksura, Farsi yeh
+TEH_MARBUTA = "ة"
+
+WHITESPACE_RUN_PATTERN = re.compile(r" {2,}")
+
+
+@dataclass
+class NormalizationOptions:
+    """Options controlling which normalizations are applied"""
+    digits: bool = True
+    remove_tatweel: bool = True
+    strip_bidi_marks: bool = True
+    normalize_whitespace: bool = True
+    fold_alef: bool = False
+    fold_yeh: bool = False
+    fold_teh_marbuta: bool = False
+    numeric_separators: bool = False  # Arabic decimal/thousands separators to '.' and ''
+
+
+class ArabicNormalizer:
+    """
+    Vectorized normalizer for Arabic text and numerals.
+
+    The translation table and patterns are built once per options set and
+    reused for every Series.
+    """
+
+    def __init__(self, options: Optional[NormalizationOptions] = None):
+        """
+        Initialize Arabic normalizer.
+
+        Args:
+            options: NormalizationOptions (default: digits, tatweel, bidi marks, whitespace)
+        """
+        self.options = options or NormalizationOptions()
+        self.translation = self._build_translation(self.options)
+
+    @staticmethod
+    def _build_translation(options: NormalizationOptions) -> Dict[int, Optional[str]]:
+        """Build the str.translate table for the given options"""
+        table: Dict[int, Optional[str]] = {}
+
+        if options.digits:
+            table.update(DIGIT_TRANSLATION)
+        if options.remove_tatweel:
+            table[ord(TATWEEL)] = None
+        if options.strip_bidi_marks:
+            table.update({ord(ch): None for ch in BIDI_MARKS})
+        if options.normalize_whitespace:
+            table.update({ord(ch): " " for ch in SPACE_VARIANTS})
+        if options.fold_alef:
+            table.update({ord(ch): "ا" for ch in ALEF_VARIANTS})
+        if options.fold_yeh:
+            table.update({ord(ch): "ي" for ch in YEH_VARIANTS})
+        if options.fold_teh_marbuta:
+            table[ord(TEH_MARBUTA)] = "ه"
+        if options.numeric_separators:
+            table[ord(ARABIC_DECIMAL_SEPARATOR)] = "."
+            table[ord(ARABIC_THOUSANDS_SEPARATOR)] = None
+
+        return table
+
+    def normalize_text(self, value: Any) -> Any:
+        """
+        Normalize a single value (non-string values are returned unchanged).
+
+        Args:
+            value: Value to normalize
+
+        Returns:
+            Normalized string, or the original value if it is not a string
+        """
+        if not isinstance(value, str):
+            return value
+
+        text = value.translate(self.translation)
+        if self.options.normalize_whitespace:
+            text = WHITESPACE_RUN_PATTERN.sub(" ", text).strip()
+        return text
+
+    def normalize_series(self, series: pd.Series) -> pd.Series:
+        """
+        Normalize all string values of a Series.
+
+        Non-string values (numbers, timestamps, nulls) are left untouched.
+
+        Args:
+            series: Series to normalize
+
+        Returns:
+            Normalized Series (same index and name)
+        """
+        normalized, _ = self._normalize_with_count(series)
+        return normalized
+
+    def _normalize_with_count(self, series: pd.Series) -> Tuple[pd.Series, int]:
+        """
+        Normalize a Series and count the values that changed.
+
+        Values are factorized first, so each distinct value is translated
+        once and only the positions whose value changed are written back.
+        """
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            return self._normalize_categorical(series)
+        if not (pd.api.types.is_object_dtype(series.dtype) or pd.api.types.is_string_dtype(series.dtype)):
+            return series, 0
+
+        codes, uniques = pd.factorize(series)
+        if len(uniques) == 0:
+            return series, 0
+
+        unique_values = np.asarray(uniques, dtype=object)
+        normalized_uniques = np.array([self.normalize_text(v) for v in unique_values], dtype=object)
+        changed_uniques = normalized_uniques != unique_values
+        if not changed_uniques.any():
+            return series, 0
+
+        # Null values have code -1 and are never changed
+        changed_mask = (codes >= 0) & changed_uniques[codes]
+        normalized = series.copy()
+        normalized[changed_mask] = normalized_uniques[codes[changed_mask]]
+        return normalized, int(changed_mask.sum())
+
+    def _normalize_categorical(self, series: pd.Series) -> Tuple[pd.Series, int]:
+        """Normalize the categories of a categorical Series instead of its values"""
+        categories = np.asarray(series.cat.categories, dtype=object)
+        normalized_categories = np.array([self.normalize_text(v) for v in categories], dtype=object)
+        changed_categories = normalized_categories != categories
+        if not changed_categories.any():
+            return series, 0
+
+        codes = series.cat.codes.to_numpy()
+        changed = int(((codes >= 0) & changed_categories[codes]).sum())
+
+        if len(set(normalized_categories)) == len(normalized_categories):
+            return series.cat.rename_categories(list(normalized_categories)), changed
+
+        # Several categories normalize to the same value; rebuild the categories
+        values = pd.Series(normalized_categories[codes], index=series.index, name=series.name)
+        values[codes < 0] = np.nan
+        return values.astype("category"), changed
+
+    def normalize_frame(self, data: pd.DataFrame, columns: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        """
+        Normalize columns of a DataFrame in place.
+
+        Args:
+            data: DataFrame to normalize
+            columns: Columns to normalize (default: all columns)
+
+        Returns:
+            Dictionary of column name to number of values changed
+        """
+        changed_counts: Dict[str, int] = {}
+
+        for column in (columns if columns is not None else list(data.columns)):
+            if column not in data.columns:
+                continue
+
+            normalized, changed = self._normalize_with_count(data[column])
+            if changed:
+                data[column] = normalized
+                changed_counts[column] = changed
+
+        return changed_counts
+
+
+# Shared instances for the common profiles
+VALUE_NORMALIZER = ArabicNormalizer()
+NUMERIC_NORMALIZER = ArabicNormalizer(NormalizationOptions(numeric_separators=True))
+MATCHING_NORMALIZER = ArabicNormalizer(NormalizationOptions(
+    fold_alef=True,
+    fold_yeh=True,
+    fold_teh_marbuta=True
+))
+
+
+# Factory function for easy creation
+def create_arabic_normalizer(options: Optional[NormalizationOptions] = None) -> ArabicNormalizer:
+    """
+    Factory function to create Arabic normalizer.
+
+    Args:
+        options: NormalizationOptions
+
+    Returns:
+        ArabicNormalizer instance
+    """
+    return ArabicNormalizer(options)
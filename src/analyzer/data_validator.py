@@ -8,14 +8,71 @@ Requirements: 5.1, 5.2, 5.3, 5.4, 5.5, 5.6, 5.7
 """
 
 import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 import pandas as pd
 import numpy as np
 
+from .money import from_minor_units
+from .dtype_plan import MINOR_UNIT_SCALES_ATTR
+from .validation_store import DeferredDetails, FindingStore
+from .rule_engine import (
+    CompiledRuleSet,
+    blank_mask,
+    coerce_float,
+    compile_rules,
+    date_years,
+    read_rules_file,
+    stripped_text
+)
+from .validation_cache import (
+    CachedRun,
+    ValidationCache,
+    ValidationDiff,
+    changed_codes,
+    diff_findings,
+    match_rows,
+    row_fingerprints,
+    take_payload
+)
+
 logger = logging.getLogger(__name__)
 
+# Version of the validation rules; bump when a rule changes so cached results are discarded
+RULESET_VERSION = "1"
+
+# Column checked against each valid-code set
+REFERENCE_CODE_COLUMNS = {
+    'account': 'account_code',
+    'project': 'project_code',
+    'classification': 'classification_code',
+    'work_analysis': 'work_analysis_code',
+    'sub_tree': 'sub_tree_code'
+}
+
+# Record kind checked by custom rules in each validation method
+RULE_RECORD_KINDS = {
+    'validate_transactions': 'transactions',
+    'validate_transaction_lines': 'transaction_lines'
+}
+
+# Rows per chunk for parallel validation
+DEFAULT_CHUNK_SIZE = 250_000
+
+# Row-level validation methods that can run on independent chunks
+CHUNKABLE_METHODS = ('validate_transactions', 'validate_transaction_lines', 'validate_dimension_codes')
+
+# Findings of one rule: (field_name, type, flagged row positions, builder of the remaining fields)
+Finding = Tuple[str, str, np.ndarray, Callable[[int], Dict[str, Any]]]
+
+
+def _format_amount(value: float, is_null: bool) -> str:
+    """Format an amount as the row check printed it (null amounts count as 0)"""
+    return "0" if is_null else str(float(value))
+
 
 @dataclass
 class ValidationError:
@@ -38,32 +95,99 @@ class ValidationWarning:
     actual_value: Any = None
 
 
+def create_error_store() -> FindingStore:
+    """Create an empty columnar store of ValidationError findings"""
+    return FindingStore(ValidationError, 'error_type')
+
+
+def create_warning_store() -> FindingStore:
+    """Create an empty columnar store of ValidationWarning findings"""
+    return FindingStore(ValidationWarning, 'warning_type')
+
+
 @dataclass
 class ValidationResult:
-    """Result of validation run"""
+    """
+    Result of validation run.
+    
+    errors and warnings are FindingStores: they behave like lists but keep
+    findings columnar and build objects only when read. Plain lists passed
+    in are wrapped.
+    """
     passed: bool
     total_records: int
     valid_records: int
     invalid_records: int
-    errors: List[ValidationError] = field(default_factory=list)
-    warnings: List[ValidationWarning] = field(default_factory=list)
+    errors: FindingStore = field(default_factory=create_error_store)
+    warnings: FindingStore = field(default_factory=create_warning_store)
     summary: Dict[str, Any] = field(default_factory=dict)
 
+    def __post_init__(self):
+        if not isinstance(self.errors, FindingStore):
+            errors = create_error_store()
+            errors.extend(self.errors)
+            self.errors = errors
+        if not isinstance(self.warnings, FindingStore):
+            warnings = create_warning_store()
+            warnings.extend(self.warnings)
+            self.warnings = warnings
+
+    def export_errors(self, output_path: str, file_format: Optional[str] = None) -> int:
+        """Stream all errors to a CSV or Parquet file; returns the number written"""
+        return self.errors.export(output_path, file_format)
+
+    def export_warnings(self, output_path: str, file_format: Optional[str] = None) -> int:
+        """Stream all warnings to a CSV or Parquet file; returns the number written"""
+        return self.warnings.export(output_path, file_format)
+
 
 @dataclass
 class ValidationRule:
-    """Defines a validation rule"""
-    field_name: str
-    rule_type: str  # 'required', 'data_type', 'range', 'date', 'account_code', 'referential_integrity', 'business_rule'
+    """
+    Defines a validation rule.
+    
+    Rules are compiled by rule_engine.compile_rules into vectorized
+    predicates; see that module for the rule types and the file format.
+    """
+    field_name: Optional[str]
+    rule_type: str  # 'required', 'data_type', 'range', 'pattern', 'allowed_values', 'compare', 'exactly_one', 'group', 'custom'
     required: bool = False
-    data_type: Optional[str] = None  # 'int', 'float', 'str', 'date', 'uuid'
-    min_value: Optional[float] = None
-    max_value: Optional[float] = None
+    data_type: Optional[str] = None  # 'int', 'float', 'date'
+    min_value: Optional[Any] = None
+    max_value: Optional[Any] = None
     date_format: Optional[str] = None
     min_date: Optional[datetime] = None
     max_date: Optional[datetime] = None
     allowed_values: Optional[Set[Any]] = None
-    custom_validator: Optional[callable] = None
+    custom_validator: Optional[callable] = None  # column -> mask of valid values
+    name: Optional[str] = None
+    severity: str = 'error'  # 'error' or 'warning'
+    message: Optional[str] = None  # template with {field}, {value}, {expected}, ...
+    applies_to: Optional[str] = None  # 'transactions', 'transaction_lines' or None for both
+    if_present: bool = False  # required rules: skip frames without the column
+    pattern: Optional[str] = None
+    code_set: Optional[str] = None  # 'account', 'project', 'classification', 'work_analysis', 'sub_tree'
+    other_field: Optional[str] = None
+    operator: Optional[str] = None
+    value: Optional[Any] = None
+    fields: Optional[List[str]] = None
+    group_by: Optional[str] = None
+    check: Optional[str] = None  # group checks: 'balanced', 'unique', 'min_rows'
+    tolerance: Optional[float] = None
+    min_rows: Optional[int] = None
+
+
+def load_validation_rules(path: str) -> List[ValidationRule]:
+    """
+    Load declarative validation rules from a JSON or YAML file.
+    
+    Args:
+        path: Rule file (e.g. config/validation_rules.json)
+        
+    Returns:
+        List of ValidationRule objects
+    """
+    return [ValidationRule(**{'field_name': None, **rule}) for rule in read_rules_file(path)]
 
 
 class DataValidator:
@@ -84,12 +208,20 @@ class DataValidator:
         """
         Initialize validator with optional custom rules.
         
+        Custom rules are compiled once and checked in addition to the
+        built-in rules of validate_transactions and validate_transaction_lines.
+        
         Args:
             validation_rules: List of ValidationRule objects
         """
         self.validation_rules = validation_rules or []
-        self.errors: List[ValidationError] = []
-        self.warnings: List[ValidationWarning] = []
+        self.rule_set: Optional[CompiledRuleSet] = compile_rules(self.validation_rules) if self.validation_rules else None
+        # Group rules need the whole frame; chunked and incremental runs check them separately
+        self._group_rules_enabled = True
+        self.errors: FindingStore = create_error_store()
+        self.warnings: FindingStore = create_warning_store()
+        self.last_result: Optional[ValidationResult] = None
+        self.last_diff: Optional[ValidationDiff] = None
         self._valid_account_codes: Optional[Set[str]] = None
         self._valid_project_codes: Optional[Set[str]] = None
         self._valid_classification_codes: Optional[Set[str]] = None
@@ -116,19 +248,27 @@ class DataValidator:
         """Set the set of valid sub_tree codes for validation"""
         self._valid_sub_tree_codes = codes
 
-    def validate(self, data: pd.DataFrame) -> Dict[str, Any]:
+    def validate(self, data: pd.DataFrame, max_examples: Optional[int] = None,
+                 workers: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 cache: Optional[ValidationCache] = None) -> Dict[str, Any]:
         """
         Generic validation method that detects data type and validates accordingly.
 
         Args:
             data: DataFrame to validate
+            max_examples: Maximum errors and warnings listed in the dictionary
+                (default: all); counts in the summary always cover every finding
+            workers: Validate row chunks in this many processes (default: one process)
+            chunk_size: Rows per chunk when validating in parallel
+            cache: Reuse the findings of unchanged rows from the last run in
+                this cache; the summary then includes 'since_last_run'
 
         Returns:
             Dictionary with validation results (for CLI compatibility)
         """
         # Reset errors and warnings for fresh validation
-        self.errors = []
-        self.warnings = []
+        self.errors = create_error_store()
+        self.warnings = create_warning_store()
 
         if data.empty:
             result = ValidationResult(
@@ -140,30 +280,269 @@ class DataValidator:
                     row_number=0,
                     field_name="data",
                     error_type="EMPTY_DATA",
-                    message="Input data is empty",
-                    level="ERROR"
+                    error_message="Input data is empty"
                 )],
                 warnings=[]
             )
-            return self._result_to_dict(result)
+            self.last_result = result
+            return self._result_to_dict(result, max_examples)
 
         # Detect data type based on columns
         columns = set(data.columns)
 
         # Check if it's transaction lines data (has line_item_id or similar)
         if 'line_item_id' in columns or 'line_number' in columns:
-            result = self.validate_transaction_lines(data)
+            method = 'validate_transaction_lines'
         # Check if it's transactions data (has transaction_id)
         elif 'transaction_id' in columns or 'trans_id' in columns:
-            result = self.validate_transactions(data)
+            method = 'validate_transactions'
         # Default to transactions validation
         else:
-            result = self.validate_transactions(data)
+            method = 'validate_transactions'
 
-        return self._result_to_dict(result)
+        if cache is not None:
+            result = self.validate_incremental(data, cache, method, workers=workers, chunk_size=chunk_size)
+        else:
+            result = self._run_method(data, method, workers, chunk_size)
+
+        self.last_result = result
+        return self._result_to_dict(result, max_examples)
+
+    def validate_in_chunks(self, data: pd.DataFrame, method: str = 'validate_transaction_lines',
+                           workers: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                           transactions: Optional[pd.DataFrame] = None) -> ValidationResult:
+        """
+        Validate row-range chunks in a process pool and merge the results.
+        
+        The valid-code sets and custom rules are sent once to each worker
+        process; chunks keep their index, so row numbers stay global. Checks
+        that need the whole frame (group rules, referential integrity
+        against transactions) run once on the full data in the reduce step.
+        Workers ship only the flagged positions of each rule; the fields of
+        the findings that are read (e.g. report examples) are rebuilt here
+        by validating just their rows.
+        
+        Args:
+            data: DataFrame to validate
+            method: Row-level validation method (see CHUNKABLE_METHODS)
+            workers: Number of worker processes (default: CPU count)
+            chunk_size: Rows per chunk
+            transactions: Transaction headers for the referential integrity check
+            
+        Returns:
+            Merged ValidationResult
+        """
+        if method not in CHUNKABLE_METHODS:
+            raise ValueError(f"Method cannot be validated in chunks: {method}")
+        
+        workers = workers or os.cpu_count() or 1
+        offsets = list(range(0, len(data), chunk_size))
+        logger.info(f"Validating {len(data)} rows in {len(offsets)} chunks with {workers} workers")
+        
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_validation_worker,
+                                 initargs=(self._valid_code_sets(), self.validation_rules)) as executor:
+            payloads = list(executor.map(
+                _validate_chunk,
+                [method] * len(offsets),
+                (data.iloc[offset:offset + chunk_size] for offset in offsets)
+            ))
+        
+        # Reduce: merge chunk findings in row order
+        self.errors = create_error_store()
+        self.warnings = create_warning_store()
+        row_numbers = self._row_numbers(data)
+        row_validator = _row_validator(self._valid_code_sets(), self.validation_rules)
+        error_details = DeferredDetails(lambda rows: getattr(row_validator, method)(data.iloc[rows]).errors)
+        warning_details = DeferredDetails(lambda rows: getattr(row_validator, method)(data.iloc[rows]).warnings)
+        for offset, (error_payload, warning_payload) in zip(offsets, payloads):
+            self.errors.add_payload(error_payload, row_numbers, offset, details=error_details)
+            self.warnings.add_payload(warning_payload, row_numbers, offset, details=warning_details)
+        
+        self._add_group_rule_findings(data, method)
+        
+        if transactions is not None:
+            errors, warnings = self.errors, self.warnings
+            integrity = self.validate_referential_integrity(transactions, data)
+            errors.add_payload(integrity.errors.to_payload(), row_numbers)
+            warnings.add_payload(integrity.warnings.to_payload(), row_numbers)
+            self.errors, self.warnings = errors, warnings
+        
+        return self._create_validation_result(data)
 
-    def _result_to_dict(self, result: ValidationResult) -> Dict[str, Any]:
+    def validate_incremental(self, data: pd.DataFrame, cache: ValidationCache,
+                             method: str = 'validate_transaction_lines',
+                             workers: Optional[int] = None,
+                             chunk_size: int = DEFAULT_CHUNK_SIZE) -> ValidationResult:
+        """
+        Validate only the rows that changed since the last run.
+        
+        Every row is fingerprinted by its values. Rows seen in the last run
+        reuse its findings unless they reference a code whose validity
+        changed; the rest are validated again. The cached run is discarded
+        when the rule-set version, the columns or the amount scales differ.
+        The diff since the last run is stored in self.last_diff and in the
+        result summary under 'since_last_run'.
+        
+        Args:
+            data: DataFrame to validate
+            cache: Cache holding the last run
+            method: Row-level validation method (see CHUNKABLE_METHODS)
+            workers: Validate changed rows in this many processes
+            chunk_size: Rows per chunk when validating in parallel
+            
+        Returns:
+            ValidationResult covering every row
+        """
+        if method not in CHUNKABLE_METHODS:
+            raise ValueError(f"Method cannot be validated incrementally: {method}")
+        
+        fingerprints = row_fingerprints(data)
+        code_sets = self._valid_code_sets()
+        key = {
+            'ruleset_version': RULESET_VERSION,
+            'custom_rules': self.rule_set.version if self.rule_set is not None else None,
+            'columns': [str(column) for column in data.columns],
+            'minor_unit_scales': dict(data.attrs.get(MINOR_UNIT_SCALES_ATTR, {}))
+        }
+        
+        previous = cache.load(method)
+        reason = None
+        if previous is None:
+            reason = 'no previous run'
+        elif previous.key != key:
+            reason = 'rule set or columns changed'
+        
+        source = np.full(len(data), -1, dtype=np.int64)
+        reference_affected = np.zeros(len(data), dtype=bool)
+        if reason is None:
+            source = match_rows(previous.fingerprints, fingerprints)
+            for name, column in REFERENCE_CODE_COLUMNS.items():
+                if column not in data.columns:
+                    continue
+                # The account check is skipped for an empty set, like for None
+                before, after = previous.valid_code_sets.get(name), code_sets[name]
+                if name == 'account':
+                    before, after = before or None, after or None
+                codes = changed_codes(before, after)
+                if codes is None:
+                    reference_affected |= data[column].notna().to_numpy()
+                elif codes:
+                    reference_affected |= stripped_text(data[column]).isin(codes).to_numpy()
+            reference_affected &= source >= 0
+            source[reference_affected] = -1
+        
+        # Validate changed rows (keeping their index, so row numbers stay global)
+        changed = np.flatnonzero(source < 0)
+        row_numbers = self._row_numbers(data)
+        errors, warnings = create_error_store(), create_warning_store()
+        if previous is not None and reason is None:
+            errors.add_payload(take_payload(previous.errors, source), row_numbers)
+            warnings.add_payload(take_payload(previous.warnings, source), row_numbers)
+        if len(changed):
+            self._group_rules_enabled = False
+            try:
+                partial = self._run_method(data.iloc[changed], method, workers, chunk_size)
+            finally:
+                self._group_rules_enabled = True
+            errors.add_payload(partial.errors.to_payload(), row_numbers, positions_map=changed)
+            warnings.add_payload(partial.warnings.to_payload(), row_numbers, positions_map=changed)
+        
+        self.errors, self.warnings = errors, warnings
+        error_payload, warning_payload = errors.to_payload(), warnings.to_payload()
+        
+        # Group rules depend on other rows and are never cached
+        self._add_group_rule_findings(data, method)
+        result = self._create_validation_result(data)
+        
+        new_findings: Dict[str, int] = {}
+        resolved_findings: Dict[str, int] = {}
+        if previous is not None:
+            for current_payload, previous_payload in ((error_payload, previous.errors),
+                                                      (warning_payload, previous.warnings)):
+                new, resolved = diff_findings(current_payload, fingerprints,
+                                              previous_payload, previous.fingerprints)
+                for target, counts in ((new_findings, new), (resolved_findings, resolved)):
+                    for finding_type, count in counts.items():
+                        target[finding_type] = target.get(finding_type, 0) + count
+        
+        new_rows, removed = len(data), 0
+        if previous is not None:
+            new_rows = int((~np.isin(fingerprints, previous.fingerprints)).sum())
+            removed = int((~np.isin(previous.fingerprints, fingerprints)).sum())
+        self.last_diff = ValidationDiff(
+            previous_run=previous.created_at if previous is not None else None,
+            full_revalidation=reason is not None,
+            reason=reason,
+            total_rows=len(data),
+            reused_rows=len(data) - len(changed),
+            revalidated_rows=len(changed),
+            new_rows=new_rows,
+            reference_affected_rows=int(reference_affected.sum()),
+            removed_rows=removed,
+            new_findings=new_findings,
+            resolved_findings=resolved_findings
+        )
+        result.summary['since_last_run'] = self.last_diff.to_dict()
+        logger.info(f"Incremental validation: {len(changed)} of {len(data)} rows validated "
+                    f"({reason or 'reused last run'})")
+        
+        cache.save(method, CachedRun(
+            key=key,
+            valid_code_sets=code_sets,
+            fingerprints=fingerprints,
+            errors=error_payload,
+            warnings=warning_payload,
+            created_at=datetime.now().isoformat()
+        ))
+        return result
+
+    def _run_method(self, data: pd.DataFrame, method: str, workers: Optional[int],
+                    chunk_size: int) -> ValidationResult:
+        """Run a validation method, in a process pool when workers are requested"""
+        if workers and workers > 1 and len(data) > chunk_size:
+            return self.validate_in_chunks(data, method, workers=workers, chunk_size=chunk_size)
+        return getattr(self, method)(data)
+
+    def _rule_findings(self, data: pd.DataFrame, applies_to: str,
+                       include_row_rules: bool = True) -> List[Finding]:
+        """
+        Evaluate the custom rules for a record kind.
+        
+        Error findings are returned; warning findings are added to the
+        warning store directly.
+        """
+        if self.rule_set is None:
+            return []
+        errors, warnings = self.rule_set.evaluate(
+            data, applies_to, self._valid_code_sets(),
+            include_row_rules=include_row_rules,
+            include_group_rules=self._group_rules_enabled
+        )
+        row_numbers = self._row_numbers(data)
+        for field_name, warning_type, positions, build in warnings:
+            self.warnings.add_block(field_name, warning_type, positions, row_numbers, build)
+        return errors
+
+    def _add_group_rule_findings(self, data: pd.DataFrame, method: str) -> None:
+        """Add findings of group rules, checked once over the whole frame"""
+        if self.rule_set is None or not self.rule_set.has_group_rules() or method not in RULE_RECORD_KINDS:
+            return
+        self._store_errors(data, self._rule_findings(data, RULE_RECORD_KINDS[method], include_row_rules=False))
+
+    def _valid_code_sets(self) -> Dict[str, Optional[Set[str]]]:
+        """Valid-code sets configured on this validator"""
+        return {
+            'account': self._valid_account_codes,
+            'project': self._valid_project_codes,
+            'classification': self._valid_classification_codes,
+            'work_analysis': self._valid_work_analysis_codes,
+            'sub_tree': self._valid_sub_tree_codes
+        }
+
+    def _result_to_dict(self, result: ValidationResult, max_examples: Optional[int] = None) -> Dict[str, Any]:
         """Convert ValidationResult to dictionary format for CLI compatibility"""
+        errors = result.errors if max_examples is None else result.errors[:max_examples]
+        warnings = result.warnings if max_examples is None else result.warnings[:max_examples]
         return {
             'passed': result.passed,
             'total_records': result.total_records,
@@ -177,7 +556,7 @@ class DataValidator:
                     'message': e.error_message,
                     'level': 'ERROR'
                 }
-                for e in result.errors
+                for e in errors
             ],
             'warnings': [
                 {
@@ -186,7 +565,7 @@ class DataValidator:
                     'warning_type': w.warning_type,
                     'message': w.warning_message
                 }
-                for w in result.warnings
+                for w in warnings
             ],
             'summary': result.summary
         }
@@ -207,64 +586,47 @@ class DataValidator:
         Returns:
             ValidationResult with errors and warnings
         """
-        self.errors = []
-        self.warnings = []
+        self.errors = create_error_store()
+        self.warnings = create_warning_store()
         
         required_fields = ['entry_no', 'entry_date']
+        findings: List[Finding] = []
+        
+        # Skip completely empty rows
+        if len(data.columns) > 0:
+            empty_rows = np.logical_and.reduce([blank_mask(data[column]) for column in data.columns])
+        else:
+            empty_rows = np.ones(len(data), dtype=bool)
+        active = ~empty_rows
+        
+        # Validate required fields
+        findings.extend(self._required_field_findings(data, required_fields, active))
         
-        for idx, row in data.iterrows():
-            row_num = idx + 1
+        # Validate entry_date is valid date (between 1900 and 2100)
+        if 'entry_date' in data.columns:
+            values = data['entry_date'].to_numpy(dtype=object)
+            years, invalid = date_years(data['entry_date'])
+            out_of_range = active & ~invalid & ((years < 1900) | (years > 2100))
+            invalid &= active
             
-            # Skip completely empty rows
-            if all(pd.isna(row[field]) or (isinstance(row[field], str) and row[field].strip() == '') for field in data.columns):
-                continue
+            # Each distinct out-of-range date is parsed once for its message
+            parsed_dates: Dict[Any, Any] = {}
             
-            # Validate required fields
-            for field in required_fields:
-                if field not in data.columns:
-                    self.errors.append(ValidationError(
-                        row_number=row_num,
-                        field_name=field,
-                        error_type='required_field',
-                        error_message=f"Required field '{field}' not found in data"
-                    ))
-                    continue
-                
-                if pd.isna(row[field]) or (isinstance(row[field], str) and row[field].strip() == ''):
-                    self.errors.append(ValidationError(
-                        row_number=row_num,
-                        field_name=field,
-                        error_type='required_field',
-                        error_message=f"Required field '{field}' is null or empty",
-                        actual_value=row[field]
-                    ))
+            def parsed_date(value: Any) -> Any:
+                if value not in parsed_dates:
+                    parsed_dates[value] = pd.to_datetime(value)
+                return parsed_dates[value]
             
-            # Validate entry_date is valid date
-            if 'entry_date' in data.columns and not pd.isna(row['entry_date']):
-                try:
-                    if isinstance(row['entry_date'], str):
-                        date_obj = pd.to_datetime(row['entry_date'])
-                    else:
-                        date_obj = pd.to_datetime(row['entry_date'])
-                    
-                    # Check if date is reasonable (between 1900 and 2100)
-                    if date_obj.year < 1900 or date_obj.year > 2100:
-                        self.errors.append(ValidationError(
-                            row_number=row_num,
-                            field_name='entry_date',
-                            error_type='date',
-                            error_message=f"Date {date_obj} is outside reasonable range",
-                            actual_value=row['entry_date']
-                        ))
-                except (ValueError, TypeError, pd.errors.ParserError):
-                    self.errors.append(ValidationError(
-                        row_number=row_num,
-                        field_name='entry_date',
-                        error_type='date',
-                        error_message=f"Invalid date format: {row['entry_date']}",
-                        actual_value=row['entry_date']
-                    ))
+            findings.append(('entry_date', 'date', np.flatnonzero(out_of_range), lambda pos: dict(
+                error_message=f"Date {parsed_date(values[pos])} is outside reasonable range",
+                actual_value=values[pos]
+            )))
+            findings.append(('entry_date', 'date', np.flatnonzero(invalid), lambda pos: dict(
+                error_message=f"Invalid date format: {values[pos]}",
+                actual_value=values[pos]
+            )))
         
+        self._store_errors(data, findings + self._rule_findings(data, 'transactions'))
         return self._create_validation_result(data)
 
     def validate_transaction_lines(self, data: pd.DataFrame) -> ValidationResult:
@@ -284,98 +646,75 @@ class DataValidator:
         Returns:
             ValidationResult with errors and warnings
         """
-        self.errors = []
-        self.warnings = []
+        self.errors = create_error_store()
+        self.warnings = create_warning_store()
         
         required_fields = ['account_code', 'debit', 'credit', 'entry_no']
+        findings: List[Finding] = []
+        all_rows = np.ones(len(data), dtype=bool)
+        
+        # Validate required fields
+        findings.extend(self._required_field_findings(data, required_fields, all_rows))
+        
+        # Validate account_code exists
+        if 'account_code' in data.columns and self._valid_account_codes:
+            codes = stripped_text(data['account_code'])
+            unknown = data['account_code'].notna().to_numpy() & ~codes.isin(self._valid_account_codes).to_numpy()
+            code_values = codes.to_numpy(dtype=object)
+            findings.append(('account_code', 'account_code', np.flatnonzero(unknown), lambda pos: dict(
+                error_message=f"Account code '{code_values[pos]}' not found in valid codes",
+                actual_value=code_values[pos]
+            )))
         
-        for idx, row in data.iterrows():
-            row_num = idx + 1
+        # Validate debit and credit are numeric
+        amounts: Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+        for field in ['debit', 'credit']:
+            if field not in data.columns:
+                continue
             
-            # Validate required fields
-            for field in required_fields:
-                if field not in data.columns:
-                    self.errors.append(ValidationError(
-                        row_number=row_num,
-                        field_name=field,
-                        error_type='required_field',
-                        error_message=f"Required field '{field}' not found in data"
-                    ))
-                    continue
-                
-                if pd.isna(row[field]) or (isinstance(row[field], str) and row[field].strip() == ''):
-                    self.errors.append(ValidationError(
-                        row_number=row_num,
-                        field_name=field,
-                        error_type='required_field',
-                        error_message=f"Required field '{field}' is null or empty",
-                        actual_value=row[field]
-                    ))
+            raw_values = data[field].to_numpy(dtype=object)
+            numbers, failed = self._coerce_amount(data, field)
+            nulls = data[field].isna().to_numpy()
+            amounts[field] = (numbers, failed, nulls)
             
-            # Validate account_code exists
-            if 'account_code' in data.columns and not pd.isna(row['account_code']):
-                account_code = str(row['account_code']).strip()
-                if self._valid_account_codes and account_code not in self._valid_account_codes:
-                    self.errors.append(ValidationError(
-                        row_number=row_num,
-                        field_name='account_code',
-                        error_type='account_code',
-                        error_message=f"Account code '{account_code}' not found in valid codes",
-                        actual_value=account_code
-                    ))
+            negative = ~nulls & ~failed & (numbers < 0)
+            findings.append((field, 'range', np.flatnonzero(negative), lambda pos, field=field, numbers=numbers: dict(
+                error_message=f"{field.capitalize()} cannot be negative: {float(numbers[pos])}",
+                actual_value=float(numbers[pos]),
+                expected_value='>= 0'
+            )))
+            findings.append((field, 'data_type', np.flatnonzero(failed), lambda pos, field=field, raw_values=raw_values: dict(
+                error_message=f"{field.capitalize()} must be numeric, got {type(raw_values[pos]).__name__}",
+                actual_value=raw_values[pos],
+                expected_value='numeric'
+            )))
+        
+        # Validate business rule: debit XOR credit (exactly one must be non-zero)
+        # Rows with a non-numeric amount are already reported above
+        if 'debit' in amounts and 'credit' in amounts:
+            debit, debit_failed, debit_nulls = amounts['debit']
+            credit, credit_failed, credit_nulls = amounts['credit']
+            debit = np.where(debit_nulls, 0.0, debit)
+            credit = np.where(credit_nulls, 0.0, credit)
+            checked = ~debit_failed & ~credit_failed
             
-            # Validate debit and credit are numeric
-            for field in ['debit', 'credit']:
-                if field in data.columns and not pd.isna(row[field]):
-                    try:
-                        value = float(row[field])
-                        if value < 0:
-                            self.errors.append(ValidationError(
-                                row_number=row_num,
-                                field_name=field,
-                                error_type='range',
-                                error_message=f"{field.capitalize()} cannot be negative: {value}",
-                                actual_value=value,
-                                expected_value='>= 0'
-                            ))
-                    except (ValueError, TypeError):
-                        self.errors.append(ValidationError(
-                            row_number=row_num,
-                            field_name=field,
-                            error_type='data_type',
-                            error_message=f"{field.capitalize()} must be numeric, got {type(row[field]).__name__}",
-                            actual_value=row[field],
-                            expected_value='numeric'
-                        ))
+            def amounts_text(pos: int) -> str:
+                debit_text = _format_amount(debit[pos], debit_nulls[pos])
+                credit_text = _format_amount(credit[pos], credit_nulls[pos])
+                return f"debit={debit_text}, credit={credit_text}"
             
-            # Validate business rule: debit XOR credit (exactly one must be non-zero)
-            if 'debit' in data.columns and 'credit' in data.columns:
-                try:
-                    debit = float(row['debit']) if not pd.isna(row['debit']) else 0
-                    credit = float(row['credit']) if not pd.isna(row['credit']) else 0
-                    
-                    # Both zero
-                    if debit == 0 and credit == 0:
-                        self.errors.append(ValidationError(
-                            row_number=row_num,
-                            field_name='debit/credit',
-                            error_type='business_rule',
-                            error_message="Transaction line must have either debit or credit (not both zero)",
-                            actual_value=f"debit={debit}, credit={credit}"
-                        ))
-                    
-                    # Both non-zero
-                    if debit > 0 and credit > 0:
-                        self.errors.append(ValidationError(
-                            row_number=row_num,
-                            field_name='debit/credit',
-                            error_type='business_rule',
-                            error_message="Transaction line cannot have both debit and credit",
-                            actual_value=f"debit={debit}, credit={credit}"
-                        ))
-                except (ValueError, TypeError):
-                    pass  # Already caught in numeric validation above
+            both_zero = checked & (debit == 0) & (credit == 0)
+            both_set = checked & (debit > 0) & (credit > 0)
+            findings.append(('debit/credit', 'business_rule', np.flatnonzero(both_zero), lambda pos: dict(
+                error_message="Transaction line must have either debit or credit (not both zero)",
+                actual_value=amounts_text(pos)
+            )))
+            findings.append(('debit/credit', 'business_rule', np.flatnonzero(both_set), lambda pos: dict(
+                error_message="Transaction line cannot have both debit and credit",
+                actual_value=amounts_text(pos)
+            )))
         
+        self._store_errors(data, findings + self._rule_findings(data, 'transaction_lines'))
         return self._create_validation_result(data)
 
     def validate_account_codes(self, codes: List[str], valid_codes: Set[str]) -> ValidationResult:
@@ -389,8 +728,8 @@ class DataValidator:
         Returns:
             ValidationResult with unmapped codes
         """
-        self.errors = []
-        self.warnings = []
+        self.errors = create_error_store()
+        self.warnings = create_warning_store()
         
         unmapped_codes = []
         for code in codes:
@@ -436,54 +775,49 @@ class DataValidator:
         Returns:
             ValidationResult with referential integrity errors
         """
-        self.errors = []
-        self.warnings = []
+        self.errors = create_error_store()
+        self.warnings = create_warning_store()
         
         # Get valid transaction entry_nos
-        valid_entry_nos = set(transactions['entry_no'].unique()) if 'entry_no' in transactions.columns else set()
+        valid_entry_nos = pd.Series(
+            transactions['entry_no'].unique() if 'entry_no' in transactions.columns else [],
+            dtype=object
+        )
+        findings: List[Finding] = []
         
         # Check each line references a valid transaction
-        for idx, row in lines.iterrows():
-            row_num = idx + 1
-            
-            if 'entry_no' not in lines.columns:
-                self.errors.append(ValidationError(
-                    row_number=row_num,
-                    field_name='entry_no',
-                    error_type='referential_integrity',
-                    error_message="entry_no field not found in transaction lines"
-                ))
-                continue
+        if 'entry_no' not in lines.columns:
+            findings.append(('entry_no', 'referential_integrity', np.arange(len(lines)), lambda pos: dict(
+                error_message="entry_no field not found in transaction lines"
+            )))
+            line_entry_nos = pd.Series([], dtype=object)
+        else:
+            entry_nos = lines['entry_no'].to_numpy(dtype=object)
+            nulls = lines['entry_no'].isna().to_numpy()
+            unknown = ~nulls & ~lines['entry_no'].isin(valid_entry_nos).to_numpy()
+            line_entry_nos = lines['entry_no'].dropna()
             
-            entry_no = row['entry_no']
-            if pd.isna(entry_no):
-                self.errors.append(ValidationError(
-                    row_number=row_num,
-                    field_name='entry_no',
-                    error_type='referential_integrity',
-                    error_message="entry_no is null",
-                    actual_value=entry_no
-                ))
-            elif entry_no not in valid_entry_nos:
-                self.errors.append(ValidationError(
-                    row_number=row_num,
-                    field_name='entry_no',
-                    error_type='referential_integrity',
-                    error_message=f"entry_no '{entry_no}' does not reference a valid transaction",
-                    actual_value=entry_no
-                ))
+            findings.append(('entry_no', 'referential_integrity', np.flatnonzero(nulls), lambda pos: dict(
+                error_message="entry_no is null",
+                actual_value=entry_nos[pos]
+            )))
+            findings.append(('entry_no', 'referential_integrity', np.flatnonzero(unknown), lambda pos: dict(
+                error_message=f"entry_no '{entry_nos[pos]}' does not reference a valid transaction",
+                actual_value=entry_nos[pos]
+            )))
+        
+        self._store_errors(lines, findings)
         
         # Check each transaction has at least one line
-        transaction_line_counts = lines.groupby('entry_no').size() if 'entry_no' in lines.columns else pd.Series()
-        for entry_no in valid_entry_nos:
-            if entry_no not in transaction_line_counts.index:
-                self.warnings.append(ValidationWarning(
-                    row_number=0,
-                    field_name='entry_no',
-                    warning_type='referential_integrity',
-                    warning_message=f"Transaction {entry_no} has no associated lines",
-                    actual_value=entry_no
-                ))
+        without_lines = valid_entry_nos[~valid_entry_nos.isin(line_entry_nos) | valid_entry_nos.isna()]
+        for entry_no in without_lines:
+            self.warnings.append(ValidationWarning(
+                row_number=0,
+                field_name='entry_no',
+                warning_type='referential_integrity',
+                warning_message=f"Transaction {entry_no} has no associated lines",
+                actual_value=entry_no
+            ))
         
         return self._create_validation_result(lines)
 
@@ -497,8 +831,8 @@ class DataValidator:
         Returns:
             ValidationResult with dimension validation errors
         """
-        self.errors = []
-        self.warnings = []
+        self.errors = create_error_store()
+        self.warnings = create_warning_store()
         
         dimension_fields = {
             'project_code': self._valid_project_codes,
@@ -507,34 +841,84 @@ class DataValidator:
             'sub_tree_code': self._valid_sub_tree_codes
         }
         
-        for idx, row in data.iterrows():
-            row_num = idx + 1
+        row_numbers = self._row_numbers(data)
+        
+        for field, valid_codes in dimension_fields.items():
+            if field not in data.columns or valid_codes is None:
+                continue
             
-            for field, valid_codes in dimension_fields.items():
-                if field not in data.columns or valid_codes is None:
-                    continue
-                
-                if pd.isna(row[field]):
-                    # Dimensions are optional, so null is OK
-                    continue
-                
-                code = str(row[field]).strip()
-                if code and code not in valid_codes:
-                    self.warnings.append(ValidationWarning(
-                        row_number=row_num,
-                        field_name=field,
-                        warning_type='dimension_code',
-                        warning_message=f"Dimension code '{code}' not found in valid codes",
-                        actual_value=code
-                    ))
+            # Dimensions are optional, so null is OK
+            codes = stripped_text(data[field])
+            unknown = (data[field].notna().to_numpy() & (codes != '').to_numpy()
+                       & ~codes.isin(valid_codes).to_numpy())
+            code_values = codes.to_numpy(dtype=object)
+            self.warnings.add_block(field, 'dimension_code', np.flatnonzero(unknown), row_numbers,
+                                    lambda pos, code_values=code_values: dict(
+                warning_message=f"Dimension code '{code_values[pos]}' not found in valid codes",
+                actual_value=code_values[pos]
+            ))
         
         return self._create_validation_result(data)
 
+    def _required_field_findings(self, data: pd.DataFrame, required_fields: List[str],
+                                 rows: np.ndarray) -> List[Finding]:
+        """Build required-field findings for the selected rows"""
+        findings = []
+        
+        for field in required_fields:
+            if field not in data.columns:
+                findings.append((field, 'required_field', np.flatnonzero(rows), lambda pos, field=field: dict(
+                    error_message=f"Required field '{field}' not found in data"
+                )))
+                continue
+            
+            values = data[field].to_numpy(dtype=object)
+            blank = rows & blank_mask(data[field])
+            findings.append((field, 'required_field', np.flatnonzero(blank), lambda pos, field=field, values=values: dict(
+                error_message=f"Required field '{field}' is null or empty",
+                actual_value=values[pos]
+            )))
+        
+        return findings
+
+    def _coerce_amount(self, data: pd.DataFrame, field: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Convert an amount column to floats.
+        
+        Columns stored as minor units by the dtype plan are converted back
+        to amounts using their scale.
+        
+        Returns:
+            Tuple of (float values, mask of non-null values that are not numeric)
+        """
+        scale = data.attrs.get(MINOR_UNIT_SCALES_ATTR, {}).get(field)
+        if scale is not None:
+            numbers = from_minor_units(data[field], scale).to_numpy()
+            return numbers, np.zeros(len(data), dtype=bool)
+        return coerce_float(data[field])
+
+    @staticmethod
+    def _row_numbers(data: pd.DataFrame) -> np.ndarray:
+        """Row numbers reported for each position (index label + 1)"""
+        if pd.api.types.is_integer_dtype(data.index.dtype):
+            return np.asarray(data.index, dtype=np.int64) + 1
+        return np.asarray(data.index, dtype=object) + 1
+
+    def _store_errors(self, data: pd.DataFrame, findings: List[Finding]) -> None:
+        """
+        Add the rows flagged by each rule to the error store.
+        
+        The store orders errors by row and then by rule order, matching a
+        row-by-row pass over the rules.
+        """
+        row_numbers = self._row_numbers(data)
+        for field_name, error_type, positions, build in findings:
+            self.errors.add_block(field_name, error_type, positions, row_numbers, build)
+
     def _create_validation_result(self, data: pd.DataFrame) -> ValidationResult:
         """Create a ValidationResult from current errors and warnings"""
         total_records = len(data)
-        invalid_record_numbers = set(e.row_number for e in self.errors)
-        invalid_records = len(invalid_record_numbers)
+        invalid_records = self.errors.unique_row_count()
         valid_records = total_records - invalid_records
         
         return ValidationResult(
@@ -554,17 +938,11 @@ class DataValidator:
 
     def _count_error_types(self) -> Dict[str, int]:
         """Count errors by type"""
-        counts = {}
-        for error in self.errors:
-            counts[error.error_type] = counts.get(error.error_type, 0) + 1
-        return counts
+        return self.errors.counts_by_type()
 
     def _count_warning_types(self) -> Dict[str, int]:
         """Count warnings by type"""
-        counts = {}
-        for warning in self.warnings:
-            counts[warning.warning_type] = counts.get(warning.warning_type, 0) + 1
-        return counts
+        return self.warnings.counts_by_type()
 
     def generate_validation_report(self, result: ValidationResult, output_path: str) -> bool:
         """
@@ -647,6 +1025,41 @@ class DataValidator:
             return False
 
 
-def create_data_validator(validation_rules: Optional[List[ValidationRule]] = None) -> DataValidator:
-    """Factory function to create a DataValidator instance"""
-    return DataValidator(validation_rules)
+# Validator of the current worker process, configured once by the pool initializer
+_worker_validator: Optional[DataValidator] = None
+
+
+def _row_validator(valid_code_sets: Dict[str, Optional[Set[str]]],
+                   validation_rules: List[ValidationRule]) -> DataValidator:
+    """Validator of row-level rules with the given valid-code sets and custom rules"""
+    validator = DataValidator(validation_rules)
+    # Group rules are checked over the whole frame in the reduce step
+    validator._group_rules_enabled = False
+    validator._valid_account_codes = valid_code_sets['account']
+    validator._valid_project_codes = valid_code_sets['project']
+    validator._valid_classification_codes = valid_code_sets['classification']
+    validator._valid_work_analysis_codes = valid_code_sets['work_analysis']
+    validator._valid_sub_tree_codes = valid_code_sets['sub_tree']
+    return validator
+
+
+def _init_validation_worker(valid_code_sets: Dict[str, Optional[Set[str]]],
+                            validation_rules: List[ValidationRule]) -> None:
+    """Create the worker's validator with the valid-code sets and custom rules"""
+    global _worker_validator
+    _worker_validator = _row_validator(valid_code_sets, validation_rules)
+
+
+def _validate_chunk(method: str, chunk: pd.DataFrame) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Validate one chunk in a worker and return the flagged positions of its errors and warnings"""
+    result = getattr(_worker_validator, method)(chunk)
+    return result.errors.to_payload(details=False), result.warnings.to_payload(details=False)
+
+
+def create_data_validator(validation_rules: Optional[List[ValidationRule]] = None,
+                          rules_path: Optional[str] = None) -> DataValidator:
+    """Factory function to create a DataValidator instance (rules_path: JSON/YAML rule file)"""
+    rules = list(validation_rules or [])
+    if rules_path:
+        rules.extend(load_validation_rules(rules_path))
+    return DataValidator(rules)
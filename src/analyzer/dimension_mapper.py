@@ -5,14 +5,39 @@ Maps dimension codes (project, classification, work_analysis, sub_tree) to their
 Implements Requirements 7.1, 7.2, 7.3
 """
 
+import time
+import pickle
 import logging
-from typing import Dict, Optional, List, Any
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from collections.abc import Mapping as MappingABC
+from typing import Dict, Iterable, Mapping, Optional, List, Any, Tuple
 from dataclasses import dataclass
+import numpy as np
+import pandas as pd
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+# Supabase table of each dimension type
+DIMENSION_TABLES = {
+    'project': 'projects',
+    'classification': 'classifications',
+    'work_analysis': 'work_analysis',
+    'sub_tree': 'sub_tree',
+}
+
+# Rows per request (PostgREST returns at most 1000 rows by default)
+DEFAULT_PAGE_SIZE = 1000
+
+# Seconds a snapshot is reused without checking the tables
+DEFAULT_SNAPSHOT_TTL = 3600
+
+# Bump when the snapshot file layout changes
+SNAPSHOT_FORMAT_VERSION = 2
+
+
+@dataclass(slots=True)
 class DimensionMapping:
     """Represents a mapping for a dimension code"""
     dimension_type: str  # 'project', 'classification', 'work_analysis', 'sub_tree'
@@ -22,6 +47,133 @@ class DimensionMapping:
     is_active: bool = True
 
 
+class DimensionRegistry:
+    """
+    Codes and ids of one dimension type, held in arrays.
+    
+    Codes are interned into a hash index whose positions address the id
+    and name arrays, so a column of codes is mapped with one indexer call.
+    DimensionMapping objects are only built for callers asking for one.
+    """
+    
+    __slots__ = ('dimension_type', 'index', 'ids', 'names')
+    
+    def __init__(self, dimension_type: str, codes: Iterable[str] = (),
+                 ids: Iterable[str] = (), names: Iterable[str] = ()):
+        """
+        Initialize registry.
+        
+        Args:
+            dimension_type: Type of dimension
+            codes: Unique, stripped codes
+            ids: Id of every code
+            names: Name of every code
+        """
+        self.dimension_type = dimension_type
+        self.index = pd.Index(list(codes), dtype=object)
+        self.ids = np.asarray(list(ids), dtype=object)
+        self.names = np.asarray(list(names), dtype=object)
+    
+    @classmethod
+    def from_rows(cls, dimension_type: str, rows: List[Dict[str, Any]]) -> 'DimensionRegistry':
+        """
+        Build a registry from rows with id, code and name.
+        
+        Codes are stripped and blank codes skipped; for a repeated code the
+        last row wins.
+        """
+        frame = pd.DataFrame(
+            [(str(row.get('code', '')).strip(), row.get('id', ''), row.get('name', '')) for row in rows],
+            columns=['code', 'id', 'name'],
+            dtype=object
+        )
+        frame = frame[frame['code'] != ''].drop_duplicates('code', keep='last')
+        return cls(dimension_type, frame['code'], frame['id'], frame['name'])
+    
+    def __len__(self) -> int:
+        return len(self.index)
+    
+    def get_id(self, code: str) -> Optional[str]:
+        """Id of a stripped code (None if unknown)"""
+        position = self.index.get_indexer([code])[0]
+        return self.ids[position] if position >= 0 else None
+    
+    def get_mapping(self, code: str) -> Optional[DimensionMapping]:
+        """Full mapping of a stripped code (None if unknown)"""
+        position = self.index.get_indexer([code])[0]
+        if position < 0:
+            return None
+        return DimensionMapping(self.dimension_type, code, self.ids[position], self.names[position])
+    
+    def to_mappings(self) -> Dict[str, DimensionMapping]:
+        """All mappings by code"""
+        return {
+            code: DimensionMapping(self.dimension_type, code, id_, name)
+            for code, id_, name in zip(self.index, self.ids, self.names)
+        }
+    
+    def as_mapping(self) -> 'DimensionMappingView':
+        """Read-only code -> mapping view that looks codes up on access"""
+        return DimensionMappingView(self)
+    
+    def map_series(self, codes: pd.Series) -> Tuple[pd.Series, pd.Series]:
+        """
+        Map a column of codes to ids.
+        
+        Each distinct value is stripped and looked up once. Null and blank
+        codes map to None and are not reported as unmapped.
+        
+        Args:
+            codes: Series of dimension codes
+            
+        Returns:
+            Tuple of (ids: object Series with None where not mapped,
+            unmapped: bool Series marking non-blank codes without an id)
+        """
+        positions, uniques = pd.factorize(codes)
+        keys = pd.Index([str(value).strip() for value in uniques], dtype=object)
+        found = self.index.get_indexer(keys)
+        
+        # Position -1 (unknown code, null code) selects the trailing None / False
+        unique_ids = np.append(self.ids, None)[found]
+        unique_unmapped = (found < 0) & (keys != '')
+        ids = np.append(unique_ids, None)[positions]
+        unmapped = np.append(unique_unmapped, False)[positions]
+        return (
+            pd.Series(ids, index=codes.index, dtype=object),
+            pd.Series(unmapped, index=codes.index, dtype=bool)
+        )
+
+
+
+class DimensionMappingView(MappingABC):
+    """
+    Read-only code -> DimensionMapping view of a registry.
+    
+    Lookups go through the registry index and build one DimensionMapping
+    per access, so nothing is materialized for the whole dimension.
+    """
+    
+    __slots__ = ('registry',)
+    
+    def __init__(self, registry: DimensionRegistry):
+        self.registry = registry
+    
+    def __getitem__(self, code: str) -> DimensionMapping:
+        mapping = self.registry.get_mapping(code)
+        if mapping is None:
+            raise KeyError(code)
+        return mapping
+    
+    def __contains__(self, code: object) -> bool:
+        return self.registry.index.get_indexer([code])[0] >= 0
+    
+    def __iter__(self):
+        return iter(self.registry.index)
+    
+    def __len__(self) -> int:
+        return len(self.registry)
+
 class DimensionMapper:
     """
     Maps dimension codes to Supabase dimension IDs.
@@ -33,54 +185,113 @@ class DimensionMapper:
     - Sub-tree codes → sub_tree_id
     
     Features:
-    - In-memory caching for performance
+    - Array-backed registry per dimension type, mapped a column at a time
+    - Further dimension types registrable with register_dimension_type
     - Graceful handling of null values (optional dimensions)
     - Lazy loading from Supabase
+    - Concurrent, paginated loading of all dimensions
+    - Local snapshot per organization, reused while the tables are unchanged
     
     Implements Requirements 7.1, 7.2, 7.3
     """
     
-    def __init__(self, supabase_client=None):
+    def __init__(self, supabase_client=None, org_id: Optional[str] = None,
+                 snapshot_dir: Optional[str] = None,
+                 page_size: int = DEFAULT_PAGE_SIZE,
+                 snapshot_ttl: float = DEFAULT_SNAPSHOT_TTL):
         """
         Initialize the dimension mapper.
         
         Args:
             supabase_client: Supabase client for querying dimension tables
+            org_id: Organization whose dimensions are loaded (all rows if None)
+            snapshot_dir: Directory for the dimension snapshot (no snapshot if None)
+            page_size: Rows fetched per request
+            snapshot_ttl: Seconds a snapshot is reused without checking the tables
         """
         self.supabase_client = supabase_client
+        self.org_id = org_id
+        self.snapshot_dir = snapshot_dir
+        self.page_size = page_size
+        self.snapshot_ttl = snapshot_ttl
+        self.snapshot_used = False
         
-        # Cache for each dimension type
-        self.project_cache: Dict[str, DimensionMapping] = {}
-        self.classification_cache: Dict[str, DimensionMapping] = {}
-        self.work_analysis_cache: Dict[str, DimensionMapping] = {}
-        self.sub_tree_cache: Dict[str, DimensionMapping] = {}
+        # Supabase table and registry of each dimension type
+        self.dimension_tables: Dict[str, str] = {}
+        self.registries: Dict[str, DimensionRegistry] = {}
         
-        # Track which caches have been loaded
-        self.caches_loaded = {
-            'project': False,
-            'classification': False,
-            'work_analysis': False,
-            'sub_tree': False,
-        }
+        # Track which registries have been loaded
+        self.caches_loaded: Dict[str, bool] = {}
+        
+        for dimension_type, table in DIMENSION_TABLES.items():
+            self.register_dimension_type(dimension_type, table)
         
         logger.info("DimensionMapper initialized")
     
+    def register_dimension_type(self, dimension_type: str, table: str):
+        """
+        Register a dimension type loaded from a Supabase table.
+        
+        The table needs id, code and name columns (and org_id when the
+        mapper filters by organization).
+        
+        Args:
+            dimension_type: Name used in map_code and map_series
+            table: Supabase table holding the dimension
+        """
+        self.dimension_tables[dimension_type] = table
+        self.registries[dimension_type] = DimensionRegistry(dimension_type)
+        self.caches_loaded[dimension_type] = False
+    
+    # Code -> mapping views of the registries, kept for existing callers.
+    # Read-only, so writes meant for the old mutable dicts fail loudly
+    # instead of going to a copy; register mappings through the registries.
+    @property
+    def project_cache(self) -> Mapping[str, DimensionMapping]:
+        return self.registries['project'].as_mapping()
+    
+    @property
+    def classification_cache(self) -> Mapping[str, DimensionMapping]:
+        return self.registries['classification'].as_mapping()
+    
+    @property
+    def work_analysis_cache(self) -> Mapping[str, DimensionMapping]:
+        return self.registries['work_analysis'].as_mapping()
+    
+    @property
+    def sub_tree_cache(self) -> Mapping[str, DimensionMapping]:
+        return self.registries['sub_tree'].as_mapping()
+    
     def load_all_dimensions(self) -> bool:
         """
         Load all dimension mappings from Supabase.
         
+        The four dimension tables are loaded concurrently, page by page.
+        With a snapshot directory the mappings are saved after loading and
+        reused on the next run: within snapshot_ttl seconds without any
+        request, afterwards when the row count and latest updated_at of
+        every table are unchanged.
+        
         Returns:
             True if all dimensions loaded successfully, False otherwise
         """
         try:
-            success = True
-            success &= self.load_projects()
-            success &= self.load_classifications()
-            success &= self.load_work_analysis()
-            success &= self.load_sub_trees()
+            if self._load_snapshot():
+                logger.info("All dimensions loaded from snapshot")
+                return True
+            
+            # Markers are read before the rows: a change made while loading
+            # then leaves the snapshot stale instead of marking old rows fresh
+            checked_at = time.time()
+            markers = self._freshness_markers() if self._snapshot_path() and self.supabase_client else None
+            
+            with ThreadPoolExecutor(max_workers=len(self.dimension_tables)) as pool:
+                results = list(pool.map(self._load_dimension, list(self.dimension_tables)))
+            success = all(results)
             
             if success:
                 logger.info("All dimensions loaded successfully")
+                self._save_snapshot(markers, checked_at)
             else:
                 logger.warning("Some dimensions failed to load")
             
@@ -92,243 +303,267 @@ class DimensionMapper:
     
     def load_projects(self) -> bool:
         """Load project dimension mappings from Supabase."""
-        try:
-            if not self.supabase_client:
-                logger.warning("No Supabase client available for loading projects")
-                return False
-            
-            # Query projects table
-            response = self.supabase_client.table('projects').select('id, code, name').execute()
-            
-            if response.data:
-                for row in response.data:
-                    code = str(row.get('code', '')).strip()
-                    if code:
-                        mapping = DimensionMapping(
-                            dimension_type='project',
-                            code=code,
-                            id=row.get('id', ''),
-                            name=row.get('name', ''),
-                            is_active=True
-                        )
-                        self.project_cache[code] = mapping
-                
-                self.caches_loaded['project'] = True
-                logger.info(f"Loaded {len(self.project_cache)} project mappings")
-                return True
-            else:
-                logger.warning("No projects found in Supabase")
-                self.caches_loaded['project'] = True
-                return True
-                
-        except Exception as e:
-            logger.error(f"Error loading projects: {e}")
-            return False
+        return self._load_dimension('project')
     
     def load_classifications(self) -> bool:
         """Load classification dimension mappings from Supabase."""
-        try:
-            if not self.supabase_client:
-                logger.warning("No Supabase client available for loading classifications")
-                return False
-            
-            # Query classifications table
-            response = self.supabase_client.table('classifications').select('id, code, name').execute()
-            
-            if response.data:
-                for row in response.data:
-                    code = str(row.get('code', '')).strip()
-                    if code:
-                        mapping = DimensionMapping(
-                            dimension_type='classification',
-                            code=code,
-                            id=row.get('id', ''),
-                            name=row.get('name', ''),
-                            is_active=True
-                        )
-                        self.classification_cache[code] = mapping
-                
-                self.caches_loaded['classification'] = True
-                logger.info(f"Loaded {len(self.classification_cache)} classification mappings")
-                return True
-            else:
-                logger.warning("No classifications found in Supabase")
-                self.caches_loaded['classification'] = True
-                return True
-                
-        except Exception as e:
-            logger.error(f"Error loading classifications: {e}")
-            return False
+        return self._load_dimension('classification')
     
     def load_work_analysis(self) -> bool:
         """Load work analysis dimension mappings from Supabase."""
-        try:
-            if not self.supabase_client:
-                logger.warning("No Supabase client available for loading work_analysis")
-                return False
-            
-            # Query work_analysis table
-            response = self.supabase_client.table('work_analysis').select('id, code, name').execute()
-            
-            if response.data:
-                for row in response.data:
-                    code = str(row.get('code', '')).strip()
-                    if code:
-                        mapping = DimensionMapping(
-                            dimension_type='work_analysis',
-                            code=code,
-                            id=row.get('id', ''),
-                            name=row.get('name', ''),
-                            is_active=True
-                        )
-                        self.work_analysis_cache[code] = mapping
-                
-                self.caches_loaded['work_analysis'] = True
-                logger.info(f"Loaded {len(self.work_analysis_cache)} work_analysis mappings")
-                return True
-            else:
-                logger.warning("No work_analysis found in Supabase")
-                self.caches_loaded['work_analysis'] = True
-                return True
-                
-        except Exception as e:
-            logger.error(f"Error loading work_analysis: {e}")
-            return False
+        return self._load_dimension('work_analysis')
     
     def load_sub_trees(self) -> bool:
         """Load sub_tree dimension mappings from Supabase."""
+        return self._load_dimension('sub_tree')
+    
+    def _load_dimension(self, dimension_type: str) -> bool:
+        """
+        Load the mappings of one dimension type from Supabase.
+        
+        Args:
+            dimension_type: Type of dimension ('project', 'classification', 'work_analysis', 'sub_tree')
+            
+        Returns:
+            True if the dimension loaded successfully, False otherwise
+        """
+        table = self.dimension_tables[dimension_type]
         try:
             if not self.supabase_client:
-                logger.warning("No Supabase client available for loading sub_trees")
+                logger.warning(f"No Supabase client available for loading {table}")
                 return False
             
-            # Query sub_tree table
-            response = self.supabase_client.table('sub_tree').select('id, code, name').execute()
+            rows = self._fetch_rows(table, 'id, code, name')
             
-            if response.data:
-                for row in response.data:
-                    code = str(row.get('code', '')).strip()
-                    if code:
-                        mapping = DimensionMapping(
-                            dimension_type='sub_tree',
-                            code=code,
-                            id=row.get('id', ''),
-                            name=row.get('name', ''),
-                            is_active=True
-                        )
-                        self.sub_tree_cache[code] = mapping
-                
-                self.caches_loaded['sub_tree'] = True
-                logger.info(f"Loaded {len(self.sub_tree_cache)} sub_tree mappings")
-                return True
+            registry = DimensionRegistry.from_rows(dimension_type, rows)
+            self.registries[dimension_type] = registry
+            
+            self.caches_loaded[dimension_type] = True
+            if rows:
+                logger.info(f"Loaded {len(registry)} {dimension_type} mappings")
             else:
-                logger.warning("No sub_tree found in Supabase")
-                self.caches_loaded['sub_tree'] = True
-                return True
+                logger.warning(f"No {table} found in Supabase")
+            return True
                 
         except Exception as e:
-            logger.error(f"Error loading sub_trees: {e}")
+            logger.error(f"Error loading {table}: {e}")
             return False
     
-    def map_project_code(self, code: Optional[str]) -> Optional[str]:
+    def _query(self, table: str, columns: str, **options):
+        """Start a select on a table, restricted to the organization if one is set"""
+        query = self.supabase_client.table(table).select(columns, **options)
+        if self.org_id:
+            query = query.eq('org_id', self.org_id)
+        return query
+    
+    def _fetch_rows(self, table: str, columns: str) -> List[Dict[str, Any]]:
         """
-        Map a project code to project_id.
+        Fetch all rows of a table in pages of page_size rows.
+        
+        Pages are ordered by id so that consecutive ranges neither skip
+        nor repeat rows.
         
         Args:
-            code: Project code (can be None for optional dimensions)
+            table: Name of the table
+            columns: Columns to select
             
         Returns:
-            Project ID (UUID) or None if not found or code is None
+            List of row dictionaries
         """
-        if code is None or code == '' or str(code).strip() == '':
-            return None
-        
-        code = str(code).strip()
-        
-        if not self.caches_loaded['project']:
-            self.load_projects()
-        
-        mapping = self.project_cache.get(code)
-        if mapping:
-            return mapping.id
-        
-        logger.warning(f"Project code not found: {code}")
-        return None
+        rows: List[Dict[str, Any]] = []
+        start = 0
+        while True:
+            response = (
+                self._query(table, columns)
+                .order('id')
+                .range(start, start + self.page_size - 1)
+                .execute()
+            )
+            page = response.data or []
+            rows.extend(page)
+            if len(page) < self.page_size:
+                return rows
+            start += self.page_size
     
-    def map_classification_code(self, code: Optional[str]) -> Optional[str]:
+    def _freshness_marker(self, table: str) -> Dict[str, Any]:
         """
-        Map a classification code to classification_id.
+        Row count and latest updated_at of a table.
+        
+        Rows without updated_at sort last so they do not hide the latest
+        change. Tables without an updated_at column fall back to the count.
         
         Args:
-            code: Classification code (can be None for optional dimensions)
+            table: Name of the table
             
         Returns:
-            Classification ID (UUID) or None if not found or code is None
+            Dictionary with 'count' and 'max_updated_at'
         """
-        if code is None or code == '' or str(code).strip() == '':
+        try:
+            response = (
+                self._query(table, 'updated_at', count='exact')
+                .order('updated_at', desc=True, nullsfirst=False)
+                .limit(1)
+                .execute()
+            )
+        except Exception as e:
+            logger.info(f"No updated_at marker for {table}, checking the row count only: {e}")
+            response = self._query(table, 'id', count='exact').limit(1).execute()
+            return {'count': response.count, 'max_updated_at': None}
+        data = response.data or []
+        return {
+            'count': response.count,
+            'max_updated_at': data[0].get('updated_at') if data else None,
+        }
+    
+    def _freshness_markers(self) -> Dict[str, Dict[str, Any]]:
+        """Freshness markers of all dimension tables, queried concurrently"""
+        tables = list(self.dimension_tables.values())
+        with ThreadPoolExecutor(max_workers=len(tables)) as pool:
+            return dict(zip(tables, pool.map(self._freshness_marker, tables)))
+    
+    def _snapshot_path(self) -> Optional[Path]:
+        """Snapshot file of the organization (None without a snapshot directory)"""
+        if not self.snapshot_dir:
             return None
+        return Path(self.snapshot_dir) / f"dimensions_{self.org_id or 'all'}.pkl"
+    
+    def _load_snapshot(self) -> bool:
+        """
+        Fill the registries from the snapshot if it is still fresh.
         
-        code = str(code).strip()
-        
-        if not self.caches_loaded['classification']:
-            self.load_classifications()
-        
-        mapping = self.classification_cache.get(code)
-        if mapping:
-            return mapping.id
+        Returns:
+            True if the snapshot was used, False if the tables must be loaded
+        """
+        path = self._snapshot_path()
+        if path is None or not path.exists():
+            return False
+        try:
+            with open(path, 'rb') as f:
+                snapshot = pickle.load(f)
+            if snapshot.get('format_version') != SNAPSHOT_FORMAT_VERSION or snapshot.get('org_id') != self.org_id:
+                logger.info(f"Ignoring dimension snapshot with old format: {path}")
+                return False
+            if snapshot.get('tables') != self.dimension_tables:
+                logger.info(f"Dimension snapshot {path} covers other dimension types, reloading")
+                return False
+            
+            age = time.time() - snapshot['checked_at']
+            if age > self.snapshot_ttl:
+                if not self.supabase_client:
+                    logger.info(f"Using dimension snapshot {path} ({age:.0f}s old) without a Supabase client")
+                elif self._freshness_markers() != snapshot['markers']:
+                    logger.info(f"Dimension snapshot {path} is stale, reloading")
+                    return False
+                else:
+                    snapshot['checked_at'] = time.time()
+                    self._write_snapshot(path, snapshot)
+            
+            for dimension_type, registry in snapshot['registries'].items():
+                self.registries[dimension_type] = registry
+                self.caches_loaded[dimension_type] = True
+            self.snapshot_used = True
+            return True
+        except Exception as e:
+            logger.warning(f"Could not read dimension snapshot {path}: {e}")
+            return False
+    
+    def _save_snapshot(self, markers: Optional[Dict[str, Dict[str, Any]]], checked_at: float):
+        """
+        Save the loaded registries.
         
-        logger.warning(f"Classification code not found: {code}")
-        return None
+        Args:
+            markers: Freshness markers read before the rows were loaded
+            checked_at: Time the markers were read
+        """
+        path = self._snapshot_path()
+        if path is None or markers is None:
+            return
+        try:
+            snapshot = {
+                'format_version': SNAPSHOT_FORMAT_VERSION,
+                'org_id': self.org_id,
+                'checked_at': checked_at,
+                'tables': dict(self.dimension_tables),
+                'markers': markers,
+                'registries': dict(self.registries),
+            }
+            self._write_snapshot(path, snapshot)
+            logger.info(f"Dimension snapshot saved to {path}")
+        except Exception as e:
+            logger.warning(f"Could not save dimension snapshot {path}: {e}")
     
-    def map_work_analysis_code(self, code: Optional[str]) -> Optional[str]:
+    @staticmethod
+    def _write_snapshot(path: Path, snapshot: Dict[str, Any]):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_suffix('.tmp')
+        with open(temp_path, 'wb') as f:
+            pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+        temp_path.replace(path)
+    
+    def map_code(self, dimension_type: str, code: Optional[str]) -> Optional[str]:
         """
-        Map a work analysis code to work_analysis_id.
+        Map a dimension code to its Supabase id.
         
         Args:
-            code: Work analysis code (can be None for optional dimensions)
+            dimension_type: Registered dimension type
+            code: Dimension code (can be None for optional dimensions)
             
         Returns:
-            Work analysis ID (UUID) or None if not found or code is None
+            Dimension ID (UUID) or None if not found or code is None
         """
         if code is None or code == '' or str(code).strip() == '':
             return None
         
         code = str(code).strip()
         
-        if not self.caches_loaded['work_analysis']:
-            self.load_work_analysis()
-        
-        mapping = self.work_analysis_cache.get(code)
-        if mapping:
-            return mapping.id
+        registry = self._get_registry(dimension_type)
+        if registry is None:
+            return None
         
-        logger.warning(f"Work analysis code not found: {code}")
-        return None
+        dimension_id = registry.get_id(code)
+        if dimension_id is None:
+            logger.warning(f"{dimension_type} code not found: {code}")
+        return dimension_id
     
-    def map_sub_tree_code(self, code: Optional[str]) -> Optional[str]:
+    def map_series(self, dimension_type: str, codes: pd.Series) -> Tuple[pd.Series, pd.Series]:
         """
-        Map a sub_tree code to sub_tree_id.
+        Map a column of dimension codes to Supabase ids in one call.
         
         Args:
-            code: Sub-tree code (can be None for optional dimensions)
+            dimension_type: Registered dimension type
+            codes: Series of dimension codes (nulls and blanks are optional)
             
         Returns:
-            Sub-tree ID (UUID) or None if not found or code is None
+            Tuple of (ids: object Series with None where not mapped,
+            unmapped: bool Series marking non-blank codes without an id)
         """
-        if code is None or code == '' or str(code).strip() == '':
-            return None
+        registry = self._get_registry(dimension_type)
+        if registry is None:
+            raise ValueError(f"Unknown dimension type: {dimension_type}")
         
-        code = str(code).strip()
-        
-        if not self.caches_loaded['sub_tree']:
-            self.load_sub_trees()
-        
-        mapping = self.sub_tree_cache.get(code)
-        if mapping:
-            return mapping.id
-        
-        logger.warning(f"Sub-tree code not found: {code}")
-        return None
+        ids, unmapped = registry.map_series(codes)
+        if unmapped.any():
+            logger.warning(
+                f"{int(unmapped.sum())} {dimension_type} codes not found "
+                f"({codes[unmapped].nunique()} distinct)"
+            )
+        return ids, unmapped
+    
+    def map_project_code(self, code: Optional[str]) -> Optional[str]:
+        """Map a project code to project_id (None if not found or code is None)."""
+        return self.map_code('project', code)
+    
+    def map_classification_code(self, code: Optional[str]) -> Optional[str]:
+        """Map a classification code to classification_id (None if not found or code is None)."""
+        return self.map_code('classification', code)
+    
+    def map_work_analysis_code(self, code: Optional[str]) -> Optional[str]:
+        """Map a work analysis code to work_analysis_id (None if not found or code is None)."""
+        return self.map_code('work_analysis', code)
+    
+    def map_sub_tree_code(self, code: Optional[str]) -> Optional[str]:
+        """Map a sub_tree code to sub_tree_id (None if not found or code is None)."""
+        return self.map_code('sub_tree', code)
     
     def get_dimension_mapping(self, dimension_type: str, code: str) -> Optional[DimensionMapping]:
         """
@@ -341,50 +576,36 @@ class DimensionMapper:
         Returns:
             DimensionMapping object or None if not found
         """
-        cache = self._get_cache(dimension_type)
-        if cache is None:
+        registry = self.registries.get(dimension_type)
+        if registry is None:
+            logger.error(f"Unknown dimension type: {dimension_type}")
             return None
         
-        return cache.get(code)
-    
-    def _get_cache(self, dimension_type: str) -> Optional[Dict[str, DimensionMapping]]:
-        """Get the cache for a dimension type."""
-        if dimension_type == 'project':
-            return self.project_cache
-        elif dimension_type == 'classification':
-            return self.classification_cache
-        elif dimension_type == 'work_analysis':
-            return self.work_analysis_cache
-        elif dimension_type == 'sub_tree':
-            return self.sub_tree_cache
-        else:
+        return registry.get_mapping(code)
+    
+    def _get_registry(self, dimension_type: str) -> Optional[DimensionRegistry]:
+        """Get the registry of a dimension type, loading it on first use."""
+        if dimension_type not in self.registries:
             logger.error(f"Unknown dimension type: {dimension_type}")
             return None
+        if not self.caches_loaded[dimension_type]:
+            self._load_dimension(dimension_type)
+        return self.registries[dimension_type]
     
     def get_cache_stats(self) -> Dict[str, Any]:
         """Get statistics about loaded caches."""
-        return {
-            'project_count': len(self.project_cache),
-            'classification_count': len(self.classification_cache),
-            'work_analysis_count': len(self.work_analysis_cache),
-            'sub_tree_count': len(self.sub_tree_cache),
-            'total_dimensions': (
-                len(self.project_cache) +
-                len(self.classification_cache) +
-                len(self.work_analysis_cache) +
-                len(self.sub_tree_cache)
-            ),
-            'caches_loaded': self.caches_loaded,
+        stats: Dict[str, Any] = {
+            f'{dimension_type}_count': len(registry)
+            for dimension_type, registry in self.registries.items()
         }
+        stats['total_dimensions'] = sum(len(registry) for registry in self.registries.values())
+        stats['caches_loaded'] = self.caches_loaded
+        return stats
     
     def clear_caches(self):
         """Clear all cached dimension mappings."""
-        self.project_cache.clear()
-        self.classification_cache.clear()
-        self.work_analysis_cache.clear()
-        self.sub_tree_cache.clear()
-        
-        for key in self.caches_loaded:
-            self.caches_loaded[key] = False
+        for dimension_type in self.registries:
+            self.registries[dimension_type] = DimensionRegistry(dimension_type)
+            self.caches_loaded[dimension_type] = False
         
         logger.info("All dimension caches cleared")
@@ -0,0 +1,235 @@
+"""
+Dtype Plan for Excel Data Migration
+
+This module derives compact column dtypes from the approved column mapping:
+- Code and name columns (lookup/skip mappings) become 'category'
+- Integer ids become nullable 'Int64'
+- Amounts become int64 minor units ('Int64') parsed exactly from strings
+- Dates and free text are left as read so validation still sees raw values
+
+A MemoryReport records the DataFrame footprint after each stage so the
+savings of the plan (and of later stages) are visible.
+"""
+
+import re
+import logging
+from typing import Dict, List, Optional, Any
+from dataclasses import dataclass, field
+import pandas as pd
+
+from .money import DEFAULT_SCALE, to_minor_units
+
+logger = logging.getLogger(__name__)
+
+
+# Mapping types whose values are repeated reference codes or names
+CATEGORY_MAPPING_TYPES = {"lookup", "skip"}
+
+# Column name suffixes treated as codes/names when no mapping type is given
+CATEGORY_NAME_SUFFIXES = ("_code", "_name")
+
+INTEGER_DATA_TYPES = {"integer", "int", "bigint", "smallint"}
+AMOUNT_DATA_TYPES = {"numeric", "decimal", "money"}
+
+# Scale taken from notes such as "Debit Amount (15 and 4 precision)"
+PRECISION_NOTE_PATTERN = re.compile(r"(\d+)\s*(?:and|,)\s*(\d+)\s*precision", re.IGNORECASE)
+
+# Key in DataFrame.attrs listing amount columns stored as minor units and their scale
+MINOR_UNIT_SCALES_ATTR = "minor_unit_scales"
+
+
+@dataclass
+class ColumnDtypeRule:
+    """Target dtype for a single column"""
+    column: str
+    kind: str  # 'category', 'integer' or 'minor_units'
+    scale: Optional[int] = None
+
+
+@dataclass
+class StageMemory:
+    """Memory footprint of a DataFrame after a stage"""
+    stage: str
+    rows: int
+    total_bytes: int
+    column_bytes: Dict[str, int] = field(default_factory=dict)
+
+
+class MemoryReport:
+    """
+    Memory usage per processing stage.
+
+    Each call to record() measures the deep memory usage of the DataFrame,
+    so stages can be compared with savings().
+    """
+
+    def __init__(self):
+        """Initialize an empty memory report"""
+        self.stages: List[StageMemory] = []
+
+    def record(self, stage: str, data: pd.DataFrame) -> StageMemory:
+        """
+        Record the memory usage of a DataFrame after a stage.
+
+        Args:
+            stage: Stage name
+            data: DataFrame produced by the stage
+
+        Returns:
+            StageMemory entry that was recorded
+        """
+        usage = data.memory_usage(deep=True, index=False)
+        entry = StageMemory(
+            stage=stage,
+            rows=len(data),
+            total_bytes=int(usage.sum()),
+            column_bytes={str(column): int(size) for column, size in usage.items()}
+        )
+        self.stages.append(entry)
+        logger.info(f"Memory after {stage}: {entry.total_bytes / 1024 / 1024:.2f} MB ({entry.rows} rows)")
+        return entry
+
+    def get_stage(self, stage: str) -> Optional[StageMemory]:
+        """Return the most recent entry for a stage"""
+        for entry in reversed(self.stages):
+            if entry.stage == stage:
+                return entry
+        return None
+
+    def savings(self, from_stage: str, to_stage: str) -> int:
+        """
+        Bytes saved between two recorded stages.
+
+        Args:
+            from_stage: Earlier stage name
+            to_stage: Later stage name
+
+        Returns:
+            Bytes saved (negative if memory grew, 0 if a stage is missing)
+        """
+        before = self.get_stage(from_stage)
+        after = self.get_stage(to_stage)
+        if before is None or after is None:
+            return 0
+        return before.total_bytes - after.total_bytes
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert report to dictionary"""
+        stages = []
+        previous = None
+        for entry in self.stages:
+            stages.append({
+                "stage": entry.stage,
+                "rows": entry.rows,
+                "total_mb": round(entry.total_bytes / 1024 / 1024, 3),
+                "saved_mb": round((previous.total_bytes - entry.total_bytes) / 1024 / 1024, 3) if previous else 0.0,
+                "column_bytes": entry.column_bytes
+            })
+            previous = entry
+        return {"stages": stages}
+
+
+class DtypePlan:
+    """
+    Compact dtype plan derived from column mappings.
+
+    The plan is built once from the mapping configuration and applied to
+    every DataFrame read with those mappings.
+    """
+
+    def __init__(self, column_mappings: Dict[str, Any]):
+        """
+        Initialize dtype plan.
+
+        Args:
+            column_mappings: Dictionary of column mappings (ColumnMapping objects)
+        """
+        self.rules: Dict[str, ColumnDtypeRule] = {}
+        for mapping in column_mappings.values():
+            rule = self._rule_for_mapping(mapping)
+            if rule is not None:
+                self.rules[rule.column] = rule
+
+        logger.info(f"Dtype plan covers {len(self.rules)} columns")
+
+    @staticmethod
+    def _rule_for_mapping(mapping: Any) -> Optional[ColumnDtypeRule]:
+        """Derive the target dtype for a single column mapping"""
+        column = mapping.english_name
+        if not column:
+            return None
+
+        data_type = (mapping.data_type or "").lower()
+        mapping_type = (getattr(mapping, "mapping_type", None) or "").lower()
+
+        if data_type in AMOUNT_DATA_TYPES:
+            return ColumnDtypeRule(column, "minor_units", scale=_scale_from_notes(mapping.notes))
+        if data_type in INTEGER_DATA_TYPES:
+            return ColumnDtypeRule(column, "integer")
+        if mapping_type in CATEGORY_MAPPING_TYPES or column.endswith(CATEGORY_NAME_SUFFIXES):
+            return ColumnDtypeRule(column, "category")
+        return None
+
+    def apply(self, data: pd.DataFrame) -> Dict[str, int]:
+        """
+        Convert columns of a DataFrame to the planned dtypes in place.
+
+        Amount columns and their scale are listed in data.attrs under
+        'minor_unit_scales'.
+
+        Args:
+            data: DataFrame with English column names
+
+        Returns:
+            Dictionary of column name to number of non-null values that
+            could not be converted and became null
+        """
+        coerced_nulls: Dict[str, int] = {}
+        minor_unit_scales: Dict[str, int] = dict(data.attrs.get(MINOR_UNIT_SCALES_ATTR, {}))
+
+        for column, rule in self.rules.items():
+            if column not in data.columns:
+                continue
+
+            series = data[column]
+            if rule.kind == "category":
+                data[column] = series.astype("category")
+                continue
+
+            if rule.kind == "minor_units":
+                converted = to_minor_units(series, rule.scale)
+                minor_unit_scales[column] = rule.scale
+            else:
+                converted = pd.to_numeric(series, errors="coerce").astype("Int64")
+
+            lost = int((series.notna() & converted.isna()).sum())
+            if lost:
+                coerced_nulls[column] = lost
+                logger.warning(f"Column '{column}': {lost} values could not be converted to {rule.kind}")
+            data[column] = converted
+
+        data.attrs[MINOR_UNIT_SCALES_ATTR] = minor_unit_scales
+        return coerced_nulls
+
+
+def _scale_from_notes(notes: Optional[str]) -> int:
+    """Read the scale from a '(15 and 4 precision)' style note"""
+    if notes:
+        match = PRECISION_NOTE_PATTERN.search(notes)
+        if match:
+            return int(match.group(2))
+    return DEFAULT_SCALE
+
+
+# Factory function for easy creation
+def create_dtype_plan(column_mappings: Dict[str, Any]) -> DtypePlan:
+    """
+    Factory function to create dtype plan.
+
+    Args:
+        column_mappings: Dictionary of column mappings
+
+    Returns:
+        DtypePlan instance
+    """
+    return DtypePlan(column_mappings)
@@ -0,0 +1,299 @@
+"""
+Entry Partitioner for Excel Data Migration
+
+This module provides an external-memory partition stage:
+- Spill transaction lines to on-disk partitions by hash of (entry_no, entry_date)
+- Every line of an entry lands in the same partition, in input order
+- Parquet or Arrow IPC files (pyarrow), or pickled frames without pyarrow
+- Process partitions one at a time or in a process pool
+
+Each partition holds complete entries, so grouping, validation and
+migration can run per partition with memory bounded by the largest
+partition instead of the whole ledger.
+"""
+
+import json
+import pickle
+import shutil
+import logging
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+import numpy as np
+import pandas as pd
+
+from .transaction_grouper import parse_entry_dates
+
+logger = logging.getLogger(__name__)
+
+
+# Spill file formats and their file suffixes
+PARTITION_FORMATS = {"parquet": ".parquet", "ipc": ".arrow", "pickle": ".pkl"}
+
+DEFAULT_PARTITIONS = 16
+
+MANIFEST_FILE = "manifest.json"
+
+# Column holding the row index in Arrow IPC files (which cannot store an index)
+INDEX_COLUMN = "__line_index__"
+
+
+def _has_pyarrow() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def entry_partition_ids(lines_df: pd.DataFrame, partitions: int) -> np.ndarray:
+    """
+    Partition of every line, from a stable hash of (entry_no, entry_date).
+
+    Entry numbers are hashed as text and dates as parsed timestamps, so the
+    same entry maps to the same partition in every chunk and every run.
+
+    Args:
+        lines_df: Lines with entry_no and entry_date
+        partitions: Number of partitions
+
+    Returns:
+        int64 array of partition numbers
+    """
+    codes, uniques = pd.factorize(lines_df["entry_no"])
+    entry_text = np.array([str(value) for value in uniques] + [""], dtype=object)[codes]
+    dates = parse_entry_dates(lines_df["entry_date"]).to_numpy(dtype="datetime64[ns]").astype(np.int64)
+    hashes = pd.util.hash_pandas_object(
+        pd.DataFrame({"entry_no": entry_text, "entry_date": dates}), index=False
+    ).to_numpy(dtype=np.uint64)
+    return (hashes % np.uint64(partitions)).astype(np.int64)
+
+
+@dataclass
+class PartitionSet:
+    """Lines spilled to disk, one directory per partition"""
+    directory: str
+    file_format: str
+    partitions: int
+    row_counts: List[int]
+    columns: List[str]
+    attrs: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def total_rows(self) -> int:
+        return sum(self.row_counts)
+
+    def partition_dir(self, index: int) -> Path:
+        return Path(self.directory) / f"part-{index:05d}"
+
+    def read(self, index: int) -> pd.DataFrame:
+        """
+        Read all lines of one partition in input order.
+
+        Args:
+            index: Partition number
+
+        Returns:
+            DataFrame of the partition (empty with the spilled columns if none)
+        """
+        pieces = sorted(self.partition_dir(index).glob(f"*{PARTITION_FORMATS[self.file_format]}"))
+        if not pieces:
+            frame = pd.DataFrame(columns=self.columns)
+        else:
+            frame = pd.concat([_read_piece(path, self.file_format) for path in pieces])
+        frame.attrs = dict(self.attrs)
+        return frame
+
+    def __iter__(self) -> Iterator[pd.DataFrame]:
+        """Iterate over the non-empty partitions"""
+        for index, rows in enumerate(self.row_counts):
+            if rows:
+                yield self.read(index)
+
+    def save_manifest(self) -> None:
+        with open(Path(self.directory) / MANIFEST_FILE, "w") as f:
+            json.dump(asdict(self), f, indent=2, default=str)
+
+    def cleanup(self) -> None:
+        """Remove the spilled partitions"""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def open_partition_set(directory: str) -> PartitionSet:
+    """
+    Open partitions written by an earlier run.
+
+    Args:
+        directory: Directory passed to EntryPartitioner
+
+    Returns:
+        PartitionSet read from the manifest
+    """
+    with open(Path(directory) / MANIFEST_FILE) as f:
+        return PartitionSet(**json.load(f))
+
+
+class EntryPartitioner:
+    """
+    Spills transaction lines to hash partitions of complete entries.
+
+    Chunks are split by entry_partition_ids and each piece is written as
+    its own file, so memory use is bounded by the chunk size.
+    """
+
+    def __init__(self, spill_dir: Optional[str] = None,
+                 partitions: int = DEFAULT_PARTITIONS,
+                 file_format: Optional[str] = None):
+        """
+        Initialize partitioner.
+
+        Args:
+            spill_dir: Directory for the partitions (new temp dir if None)
+            partitions: Number of partitions
+            file_format: 'parquet', 'ipc' or 'pickle' (default: parquet if
+                pyarrow is installed, otherwise pickle)
+        """
+        if partitions <= 0:
+            raise ValueError(f"partitions must be positive: {partitions}")
+        file_format = file_format or ("parquet" if _has_pyarrow() else "pickle")
+        if file_format not in PARTITION_FORMATS:
+            raise ValueError(f"Unsupported partition format: {file_format}")
+        if file_format != "pickle" and not _has_pyarrow():
+            raise ImportError(f"{file_format} partitions require pyarrow (pip install pyarrow)")
+
+        self.spill_dir = spill_dir
+        self.partitions = partitions
+        self.file_format = file_format
+
+    def write(self, chunks: Iterable[pd.DataFrame]) -> PartitionSet:
+        """
+        Spill chunks of lines to partitions.
+
+        Args:
+            chunks: DataFrames of transaction lines (e.g. from
+                ExcelReader.iter_transaction_chunks)
+
+        Returns:
+            PartitionSet describing the written partitions
+        """
+        directory = Path(self.spill_dir or tempfile.mkdtemp(prefix="entry_partitions_"))
+        if directory.exists():
+            for old in directory.glob("part-*"):
+                shutil.rmtree(old)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        partition_set = PartitionSet(
+            directory=str(directory),
+            file_format=self.file_format,
+            partitions=self.partitions,
+            row_counts=[0] * self.partitions,
+            columns=[]
+        )
+        for chunk_number, chunk in enumerate(chunks):
+            if chunk.empty:
+                continue
+            if not partition_set.columns:
+                partition_set.columns = [str(column) for column in chunk.columns]
+                partition_set.attrs = dict(chunk.attrs)
+
+            ids = entry_partition_ids(chunk, self.partitions)
+            order = np.argsort(ids, kind="stable")
+            counts = np.bincount(ids, minlength=self.partitions)
+            ends = np.cumsum(counts)
+            for index in np.flatnonzero(counts):
+                rows = order[ends[index] - counts[index]:ends[index]]
+                partition_dir = partition_set.partition_dir(int(index))
+                partition_dir.mkdir(exist_ok=True)
+                path = partition_dir / f"chunk-{chunk_number:06d}{PARTITION_FORMATS[self.file_format]}"
+                _write_piece(chunk.iloc[rows], path, self.file_format)
+                partition_set.row_counts[index] += int(counts[index])
+
+        partition_set.save_manifest()
+        logger.info(
+            f"Spilled {partition_set.total_rows} lines to {self.partitions} {self.file_format} "
+            f"partitions in {directory} (largest: {max(partition_set.row_counts)} lines)"
+        )
+        return partition_set
+
+
+def _write_piece(frame: pd.DataFrame, path: Path, file_format: str) -> None:
+    """Write one piece of a partition"""
+    if file_format == "pickle":
+        with open(path, "wb") as f:
+            pickle.dump(frame, f, protocol=pickle.HIGHEST_PROTOCOL)
+    elif file_format == "parquet":
+        frame.to_parquet(path)
+    else:
+        frame.rename_axis(INDEX_COLUMN).reset_index().to_feather(path)
+
+
+def _read_piece(path: Path, file_format: str) -> pd.DataFrame:
+    """Read one piece of a partition"""
+    if file_format == "pickle":
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    if file_format == "parquet":
+        return pd.read_parquet(path)
+    return pd.read_feather(path).set_index(INDEX_COLUMN).rename_axis(None)
+
+
+def _run_on_partition(func: Callable[[pd.DataFrame], Any], partition_set: PartitionSet, index: int) -> Any:
+    """Read a partition and apply a function to it (runs in pool workers)"""
+    return func(partition_set.read(index))
+
+
+def process_partitions(partition_set: PartitionSet, func: Callable[[pd.DataFrame], Any],
+                       workers: Optional[int] = None) -> List[Any]:
+    """
+    Apply a function to every non-empty partition.
+
+    With more than one worker the partitions are processed in a process
+    pool; each worker reads its partition from disk, so func must be
+    picklable (a module-level function or a bound method of a picklable
+    object such as TransactionGrouper.group_lines_into_transactions).
+
+    Args:
+        partition_set: Partitions to process
+        func: Function taking the lines of one partition
+        workers: Number of worker processes (None or 1: in this process)
+
+    Returns:
+        Results in partition order
+    """
+    indexes = [index for index, rows in enumerate(partition_set.row_counts) if rows]
+    if not workers or workers <= 1 or len(indexes) <= 1:
+        return [_run_on_partition(func, partition_set, index) for index in indexes]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_run_on_partition, func, partition_set, index) for index in indexes]
+        return [future.result() for future in futures]
+
+
+def first_lines_by_entry(lines_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    First non-null value of every column per (entry_no, entry_date).
+
+    Same as lines_df.groupby(['entry_no', 'entry_date']).first(), used to
+    build transaction records one partition at a time.
+    """
+    return lines_df.groupby(["entry_no", "entry_date"]).first().reset_index()
+
+
+# Factory function for easy creation
+def create_entry_partitioner(spill_dir: Optional[str] = None,
+                             partitions: int = DEFAULT_PARTITIONS,
+                             file_format: Optional[str] = None) -> EntryPartitioner:
+    """
+    Factory function to create entry partitioner.
+
+    Args:
+        spill_dir: Directory for the partitions
+        partitions: Number of partitions
+        file_format: 'parquet', 'ipc' or 'pickle'
+
+    Returns:
+        EntryPartitioner instance
+    """
+    return EntryPartitioner(spill_dir, partitions, file_format)
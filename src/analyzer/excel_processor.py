@@ -2,6 +2,7 @@
 Excel Processor for Excel Data Migration
 
 This module provides data processing capabilities:
+- Normalize Arabic text and numerals (Arabic-Indic digits, tatweel, bidi marks)
 - Clean and normalize data (trim strings, standardize nulls)
 - Convert data types according to mapping
 - Handle Arabic text encoding properly
@@ -10,17 +11,48 @@ This module provides data processing capabilities:
 
 import re
 import logging
-from typing import Dict, List, Optional, Any, Tuple, Set
+from typing import Dict, List, Optional, Any, Tuple, Set, Pattern
 from dataclasses import dataclass, field
 from datetime import datetime
 import pandas as pd
 import numpy as np
 
+from .arabic_normalizer import ArabicNormalizer, VALUE_NORMALIZER, NUMERIC_NORMALIZER
+from .dtype_plan import MINOR_UNIT_SCALES_ATTR
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+# Data type families recognised by the processing rules
+INTEGER_TYPES = ('int', 'integer', 'bigint')
+FLOAT_TYPES = ('float', 'decimal', 'numeric')
+BOOLEAN_TYPES = ('bool', 'boolean')
+DATE_TYPES = ('date', 'timestamp')
+ARABIC_TEXT_TYPES = ('string', 'text', 'varchar')
+
+# String representations treated as null during cleaning
+NULL_TOKENS = ['nan', 'null', 'none', 'nil', 'na', '']
+
+# Lookup table for boolean representations
+BOOL_LOOKUP = {
+    'true': True, 'false': False,
+    'yes': True, 'no': False,
+    '1': True, '0': False,
+    't': True, 'f': False,
+    'y': True, 'n': False
+}
+
+# Arabic Unicode blocks (U+0600 to U+06FF plus supplements and presentation forms).
+# Not raw strings: the classes hold the characters themselves, which the regex
+# engine of Arrow-backed string columns accepts (it rejects \u escapes)
+ARABIC_TEXT_PATTERN = re.compile('[\u0600-\u06FF\u0750-\u077F\u08A0-\u08FF\uFB50-\uFDFF\uFE70-\uFEFF]')
+ARABIC_CORE_PATTERN = re.compile('[\u0600-\u06FF]')
+# Checked on object values: Arrow strings are valid UTF-8 and cannot hold surrogates
+SURROGATE_PATTERN = re.compile(r'[\ud800-\udfff]')
+
+
 @dataclass
 class ProcessingRule:
     """Rule for processing a specific column"""
@@ -55,26 +87,114 @@ class ValidationError:
     original_value: Any
 
 
+@dataclass
+class CompiledRule:
+    """Processing rule compiled into the vectorized operations applied to its column"""
+    rule: ProcessingRule
+    kind: str  # 'int', 'float', 'bool', 'date', 'string'
+    is_arabic_text: bool = False
+    pattern: Optional[Pattern] = None
+    normalizer: Optional[ArabicNormalizer] = None
+
+    @property
+    def is_numeric(self) -> bool:
+        return self.kind in ('int', 'float')
+
+
+def compile_rule(rule: ProcessingRule) -> CompiledRule:
+    """
+    Compile a processing rule once so columns can be processed without per-cell callbacks.
+    
+    Args:
+        rule: ProcessingRule to compile
+        
+    Returns:
+        CompiledRule with resolved type family and precompiled pattern
+    """
+    data_type_lower = rule.data_type.lower()
+    
+    if data_type_lower in INTEGER_TYPES:
+        kind = 'int'
+    elif data_type_lower in FLOAT_TYPES:
+        kind = 'float'
+    elif data_type_lower in BOOLEAN_TYPES:
+        kind = 'bool'
+    elif data_type_lower in DATE_TYPES:
+        kind = 'date'
+    else:
+        kind = 'string'
+    
+    return CompiledRule(
+        rule=rule,
+        kind=kind,
+        is_arabic_text=data_type_lower in ARABIC_TEXT_TYPES,
+        pattern=re.compile(rule.validation_pattern) if rule.validation_pattern else None,
+        normalizer=NUMERIC_NORMALIZER if kind in ('int', 'float') else VALUE_NORMALIZER
+    )
+
+
+def _truthiness(series: pd.Series) -> np.ndarray:
+    """Truth value of each element, False for nulls (works for every string storage)"""
+    values = np.array(series.to_numpy(dtype=object), dtype=object, copy=True)
+    values[series.isna().to_numpy()] = False
+    return values.astype(bool)
+
+
+def convert_series_to_boolean(series: pd.Series) -> pd.Series:
+    """
+    Convert a Series to nullable booleans using the boolean lookup table.
+    
+    Known representations (true/false, yes/no, 1/0, t/f, y/n) are looked up
+    case-insensitively; any other value falls back to its truthiness.
+    
+    Args:
+        series: Series to convert
+        
+    Returns:
+        Series with 'boolean' dtype (nulls preserved as pd.NA)
+    """
+    na_mask = series.isna().to_numpy()
+    keys = series.astype(str).str.lower().str.strip()
+    lookup = keys.map(BOOL_LOOKUP)
+    known = lookup.notna().to_numpy()
+    
+    looked_up = _truthiness(lookup)
+    fallback = _truthiness(series)
+    values = np.where(known, looked_up, fallback)
+    
+    return pd.Series(
+        pd.arrays.BooleanArray(values, na_mask),
+        index=series.index,
+        name=series.name
+    )
+
+
 class ExcelProcessor:
     """
     Enhanced Excel processor for data cleaning and normalization.
     
     This class processes Excel data by:
-    1. Cleaning and normalizing data (trim strings, standardize nulls)
-    2. Converting data types according to mapping
-    3. Handling Arabic text encoding properly
-    4. Validating required fields present
+    1. Normalizing Arabic text and numerals
+    2. Cleaning and normalizing data (trim strings, standardize nulls)
+    3. Converting data types according to mapping
+    4. Handling Arabic text encoding properly
+    5. Validating required fields present
     """
     
-    def __init__(self, column_mappings: Optional[Dict[str, Any]] = None):
+    def __init__(self, column_mappings: Optional[Dict[str, Any]] = None,
+                 normalize_arabic: bool = True):
         """
         Initialize Excel processor.
         
         Args:
             column_mappings: Dictionary of column mappings (from ExcelReader)
+            normalize_arabic: Run the Arabic text/numeral normalization stage (default: True)
         """
         self.column_mappings = column_mappings or {}
+        self.normalize_arabic = normalize_arabic
         self.processing_rules: Dict[str, ProcessingRule] = {}
+        self.compiled_rules: Dict[str, CompiledRule] = {}
+        self._arabic_columns: List[str] = []
         self._initialize_processing_rules()
     
     def _initialize_processing_rules(self):
@@ -117,8 +237,23 @@ class ExcelProcessor:
             
             self.processing_rules[english_name] = rule
         
+        self._compile_rules()
         logger.info(f"Initialized {len(self.processing_rules)} processing rules")
     
+    def _compile_rules(self):
+        """Compile processing rules once per mapping into vectorized column operations"""
+        self.compiled_rules = {
+            column: compile_rule(rule) for column, rule in self.processing_rules.items()
+        }
+        
+        # Text columns that receive Arabic handling, in mapping order
+        self._arabic_columns = []
+        for mapping in self.column_mappings.values():
+            english_name = getattr(mapping, 'english_name', '')
+            compiled = self.compiled_rules.get(english_name)
+            if compiled and compiled.is_arabic_text:
+                self._arabic_columns.append(english_name)
+    
     def process_data(self, data: pd.DataFrame) -> ProcessingResult:
         """
         Process Excel data with cleaning, normalization, and validation.
@@ -144,34 +279,40 @@ class ExcelProcessor:
             # Step 1: Create a copy to avoid modifying original data
             processed_data = data.copy()
             
-            # Step 2: Clean and normalize data
+            # Step 2: Normalize Arabic text and numerals
+            normalization_result = self._normalize_arabic_text(processed_data)
+            processed_data = normalization_result["data"]
+            result.warnings.extend(normalization_result["warnings"])
+            
+            # Step 3: Clean and normalize data
             cleaning_result = self._clean_and_normalize(processed_data)
             processed_data = cleaning_result["data"]
             result.warnings.extend(cleaning_result["warnings"])
             
-            # Step 3: Convert data types
+            # Step 4: Convert data types
             conversion_result = self._convert_data_types(processed_data)
             processed_data = conversion_result["data"]
             result.errors.extend(conversion_result["errors"])
             result.warnings.extend(conversion_result["warnings"])
             
-            # Step 4: Handle Arabic text encoding
+            # Step 5: Handle Arabic text encoding
             arabic_result = self._handle_arabic_text(processed_data)
             processed_data = arabic_result["data"]
             result.warnings.extend(arabic_result["warnings"])
             
-            # Step 5: Validate required fields
+            # Step 6: Validate required fields
             validation_result = self._validate_required_fields(processed_data)
             result.errors.extend(validation_result["errors"])
             result.warnings.extend(validation_result["warnings"])
             
-            # Step 6: Create validation report
+            # Step 7: Create validation report
             result.validation_report = self._create_validation_report(
                 processed_data, 
                 cleaning_result, 
                 conversion_result, 
                 arabic_result, 
-                validation_result
+                validation_result,
+                normalization_result
             )
             
             # Update result
@@ -190,6 +331,46 @@ class ExcelProcessor:
         
         return result
     
+    def _normalize_arabic_text(self, data: pd.DataFrame) -> Dict[str, Any]:
+        """
+        Normalize Arabic-Indic/Persian digits, tatweel, bidi marks and whitespace.
+        
+        Runs before type conversion so codes and amounts typed with Arabic
+        digits parse like their ASCII equivalents.
+        
+        Args:
+            data: DataFrame to normalize
+            
+        Returns:
+            Dictionary with normalized data, per-column change counts and warnings
+        """
+        result = {
+            "data": data,
+            "changed": {},
+            "warnings": []
+        }
+        
+        if not self.normalize_arabic:
+            return result
+        
+        try:
+            for column in data.columns:
+                compiled = self.compiled_rules.get(column)
+                if compiled is None or compiled.normalizer is None:
+                    continue
+                
+                changed = compiled.normalizer.normalize_frame(data, [column])
+                result["changed"].update(changed)
+            
+            if result["changed"]:
+                logger.info(f"Normalized Arabic text/numerals in {len(result['changed'])} columns")
+            
+        except Exception as e:
+            logger.error(f"Error during Arabic normalization: {str(e)}")
+            result["warnings"].append(f"Arabic normalization error: {str(e)}")
+        
+        return result
+    
     def _clean_and_normalize(self, data: pd.DataFrame) -> Dict[str, Any]:
         """
         Clean and normalize data.
@@ -205,12 +386,16 @@ class ExcelProcessor:
             "warnings": []
         }
         
+        # Amount columns already converted to minor units by the dtype plan
+        minor_unit_columns = set(data.attrs.get(MINOR_UNIT_SCALES_ATTR, {}))
+        
         try:
             for column in data.columns:
-                if column not in self.processing_rules:
+                if column not in self.processing_rules or column in minor_unit_columns:
                     continue
                 
-                rule = self.processing_rules[column]
+                compiled = self.compiled_rules[column]
+                rule = compiled.rule
                 
                 # Skip if column doesn't exist in data
                 if column not in data.columns:
@@ -219,9 +404,10 @@ class ExcelProcessor:
                 
                 # Create a copy of the column
                 cleaned_series = data[column].copy()
+                is_categorical = isinstance(cleaned_series.dtype, pd.CategoricalDtype)
                 
                 # Convert to string for cleaning (except for numeric types)
-                if rule.data_type.lower() not in ['int', 'integer', 'bigint', 'float', 'decimal', 'numeric']:
+                if not compiled.is_numeric:
                     cleaned_series = cleaned_series.astype(str)
                 
                 # Trim whitespace
@@ -231,9 +417,13 @@ class ExcelProcessor:
                 # Standardize null values
                 if rule.convert_null_to is not None:
                     # Convert various null representations to standard null
-                    null_patterns = ['nan', 'null', 'none', 'nil', 'na', '']
-                    mask = cleaned_series.str.lower().isin(null_patterns) if cleaned_series.dtype == 'object' else False
-                    cleaned_series = cleaned_series.where(~mask, rule.convert_null_to)
+                    if pd.api.types.is_object_dtype(cleaned_series.dtype) or pd.api.types.is_string_dtype(cleaned_series.dtype):
+                        mask = cleaned_series.str.lower().isin(NULL_TOKENS)
+                        cleaned_series = cleaned_series.where(~mask, rule.convert_null_to)
+                
+                # Keep columns compacted by the dtype plan categorical
+                if is_categorical:
+                    cleaned_series = cleaned_series.astype("category")
                 
                 # Update the column
                 data[column] = cleaned_series
@@ -265,12 +455,15 @@ class ExcelProcessor:
             "warnings": []
         }
         
+        minor_unit_columns = set(data.attrs.get(MINOR_UNIT_SCALES_ATTR, {}))
+        
         try:
             for column in data.columns:
-                if column not in self.processing_rules:
+                if column not in self.processing_rules or column in minor_unit_columns:
                     continue
                 
-                rule = self.processing_rules[column]
+                compiled = self.compiled_rules[column]
+                rule = compiled.rule
                 
                 # Skip if column doesn't exist in data
                 if column not in data.columns:
@@ -281,42 +474,23 @@ class ExcelProcessor:
                 series = data[column]
                 
                 try:
-                    # Convert based on data type
-                    data_type_lower = rule.data_type.lower()
-                    
-                    if data_type_lower in ['int', 'integer', 'bigint']:
-                        # Convert to integer
+                    # Convert based on compiled type family
+                    if compiled.kind == 'int':
                         data[column] = pd.to_numeric(series, errors='coerce').astype('Int64')
                         
-                    elif data_type_lower in ['float', 'decimal', 'numeric']:
-                        # Convert to float
+                    elif compiled.kind == 'float':
                         data[column] = pd.to_numeric(series, errors='coerce')
                         
-                    elif data_type_lower in ['bool', 'boolean']:
-                        # Convert to boolean
-                        # Handle various boolean representations
-                        bool_map = {
-                            'true': True, 'false': False,
-                            'yes': True, 'no': False,
-                            '1': True, '0': False,
-                            't': True, 'f': False,
-                            'y': True, 'n': False
-                        }
+                    elif compiled.kind == 'bool':
+                        data[column] = convert_series_to_boolean(series)
                         
-                        def convert_to_bool(val):
-                            if pd.isna(val):
-                                return pd.NA
-                            val_str = str(val).lower().strip()
-                            return bool_map.get(val_str, bool(val))
-                        
-                        data[column] = series.apply(convert_to_bool).astype('boolean')
-                        
-                    elif data_type_lower in ['date', 'timestamp']:
-                        # Convert to datetime
+                    elif compiled.kind == 'date':
                         data[column] = pd.to_datetime(series, errors='coerce', format='mixed')
                         
+                    elif isinstance(series.dtype, pd.CategoricalDtype):
+                        pass  # string categories from the dtype plan stay categorical
+                        
                     else:  # string types
-                        # Ensure string type
                         data[column] = series.astype(str)
                     
                     # Log conversion statistics
@@ -353,17 +527,8 @@ class ExcelProcessor:
         }
         
         try:
-            # Identify columns that might contain Arabic text
-            # Based on column names from the original mapping
-            arabic_columns = []
-            for mapping in self.column_mappings.values():
-                english_name = getattr(mapping, 'english_name', '')
-                if english_name and english_name in data.columns:
-                    # Check if this is a text column (not numeric/date)
-                    if english_name in self.processing_rules:
-                        rule = self.processing_rules[english_name]
-                        if rule.data_type.lower() in ['string', 'text', 'varchar']:
-                            arabic_columns.append(english_name)
+            # Text columns were resolved when the rules were compiled
+            arabic_columns = [column for column in self._arabic_columns if column in data.columns]
             
             if not arabic_columns:
                 return result
@@ -371,37 +536,27 @@ class ExcelProcessor:
             logger.info(f"Processing Arabic text in columns: {', '.join(arabic_columns)}")
             
             for column in arabic_columns:
-                # Ensure proper encoding
                 series = data[column]
+                na_mask = series.isna()
                 
-                # Convert to string and ensure proper encoding
-                def ensure_arabic_encoding(val):
-                    if pd.isna(val):
-                        return val
-                    
-                    val_str = str(val)
-                    
-                    # Check if string contains Arabic characters
-                    # Arabic Unicode range: U+0600 to U+06FF
-                    arabic_pattern = re.compile(r'[\u0600-\u06FF\u0750-\u077F\u08A0-\u08FF\uFB50-\uFDFF\uFE70-\uFEFF]')
-                    
-                    if arabic_pattern.search(val_str):
-                        # Ensure proper handling of Arabic text
-                        # Remove any problematic characters
-                        cleaned = val_str.encode('utf-8', errors='ignore').decode('utf-8')
-                        return cleaned
-                    else:
-                        return val_str
+                # Ensure string values, leaving nulls untouched
+                text = series.where(na_mask, series.astype(str))
+                has_arabic = text.str.contains(ARABIC_TEXT_PATTERN, na=False)
+                
+                # Drop characters that cannot be encoded as UTF-8 from Arabic values
+                needs_cleaning = has_arabic & text.astype(object).str.contains(SURROGATE_PATTERN, na=False)
+                if needs_cleaning.any():
+                    text = text.copy()
+                    text[needs_cleaning] = (
+                        text[needs_cleaning]
+                        .str.encode('utf-8', errors='ignore')
+                        .str.decode('utf-8')
+                    )
                 
-                data[column] = series.apply(ensure_arabic_encoding)
+                data[column] = text
                 
                 # Log Arabic text statistics
-                arabic_count = 0
-                for val in data[column]:
-                    if pd.notna(val) and isinstance(val, str):
-                        arabic_pattern = re.compile(r'[\u0600-\u06FF]')
-                        if arabic_pattern.search(val):
-                            arabic_count += 1
+                arabic_count = int(text.str.contains(ARABIC_CORE_PATTERN, na=False).sum())
                 
                 if arabic_count > 0:
                     result["warnings"].append(
@@ -436,7 +591,8 @@ class ExcelProcessor:
                 if column not in self.processing_rules:
                     continue
                 
-                rule = self.processing_rules[column]
+                compiled = self.compiled_rules[column]
+                rule = compiled.rule
                 
                 # Skip if column doesn't exist in data
                 if column not in data.columns:
@@ -471,15 +627,12 @@ class ExcelProcessor:
                             )
                 
                 # Validate against pattern if specified
-                if rule.validation_pattern:
-                    pattern = re.compile(rule.validation_pattern)
-                    
-                    def validate_pattern(val):
-                        if pd.isna(val):
-                            return True  # Null values handled above
-                        return bool(pattern.match(str(val)))
+                if compiled.pattern is not None:
+                    values = data[column]
                     
-                    invalid_mask = ~data[column].apply(validate_pattern)
+                    # Null values handled above
+                    matches = values.astype(str).str.match(compiled.pattern, na=False)
+                    invalid_mask = values.notna() & ~matches
                     invalid_count = invalid_mask.sum()
                     
                     if invalid_count > 0:
@@ -512,7 +665,8 @@ class ExcelProcessor:
                                  cleaning_result: Dict[str, Any],
                                  conversion_result: Dict[str, Any],
                                  arabic_result: Dict[str, Any],
-                                 validation_result: Dict[str, Any]) -> Dict[str, Any]:
+                                 validation_result: Dict[str, Any],
+                                 normalization_result: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Create comprehensive validation report.
         
@@ -522,6 +676,7 @@ class ExcelProcessor:
             conversion_result: Type conversion results
             arabic_result: Arabic text processing results
             validation_result: Validation results
+            normalization_result: Arabic normalization results (optional)
             
         Returns:
             Comprehensive validation report
@@ -536,8 +691,10 @@ class ExcelProcessor:
                 "conversion_warnings": len(conversion_result.get("warnings", [])),
                 "arabic_warnings": len(arabic_result.get("warnings", [])),
                 "validation_errors": len(validation_result.get("errors", [])),
-                "validation_warnings": len(validation_result.get("warnings", []))
+                "validation_warnings": len(validation_result.get("warnings", [])),
+                "normalized_values": sum((normalization_result or {}).get("changed", {}).values())
             },
+            "normalization": (normalization_result or {}).get("changed", {}),
             "column_statistics": {},
             "detailed_errors": validation_result.get("validation_errors", []),
             "warnings": {
@@ -624,14 +781,16 @@ class ExcelProcessor:
 
 
 # Factory function for easy creation
-def create_excel_processor(column_mappings: Optional[Dict[str, Any]] = None) -> ExcelProcessor:
+def create_excel_processor(column_mappings: Optional[Dict[str, Any]] = None,
+                           normalize_arabic: bool = True) -> ExcelProcessor:
     """
     Factory function to create Excel processor.
     
     Args:
         column_mappings: Dictionary of column mappings
+        normalize_arabic: Run the Arabic text/numeral normalization stage
         
     Returns:
         ExcelProcessor instance
     """
-    return ExcelProcessor(column_mappings)
\ No newline at end of file
+    return ExcelProcessor(column_mappings, normalize_arabic)
\ No newline at end of file
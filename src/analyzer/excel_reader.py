@@ -5,23 +5,30 @@ This module provides enhanced Excel reading capabilities:
 - Load column mapping from config/column_mapping_APPROVED.csv
 - Read "transactions " sheet with proper header handling (skip row 0)
 - Apply English column names automatically
+- Optionally apply the compact dtype plan derived from the mapping
 - Return DataFrame with standardized column names
+- Read the sheet in chunks of rows for streaming consumers
 """
 
 import os
 import json
 import logging
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, Iterator, List, Optional, Any, Tuple
 from dataclasses import dataclass, field
 from pathlib import Path
 from datetime import datetime
 import pandas as pd
 from openpyxl import load_workbook
 
+from .dtype_plan import DtypePlan, MemoryReport
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Default number of rows per chunk when reading the sheet in chunks
+DEFAULT_CHUNK_ROWS = 100_000
+
 
 @dataclass
 class ColumnMapping:
@@ -33,6 +40,7 @@ class ColumnMapping:
     data_type: str
     required: bool
     notes: Optional[str] = None
+    mapping_type: Optional[str] = None
 
 
 @dataclass
@@ -55,6 +63,7 @@ class ReadResult:
     structure: Optional[ExcelStructure] = None
     errors: List[str] = field(default_factory=list)
     warnings: List[str] = field(default_factory=list)
+    memory_report: Optional[MemoryReport] = None
 
 
 class ExcelReader:
@@ -66,13 +75,15 @@ class ExcelReader:
     """
     
     def __init__(self, excel_file_path: Optional[str] = None, 
-                 mapping_file_path: Optional[str] = None):
+                 mapping_file_path: Optional[str] = None,
+                 apply_dtype_plan: bool = False):
         """
         Initialize Excel reader.
         
         Args:
             excel_file_path: Path to Excel file (optional, can be loaded from environment)
             mapping_file_path: Path to column mapping CSV (default: config/column_mapping_APPROVED.csv)
+            apply_dtype_plan: Convert columns to compact dtypes right after reading
         """
         self.excel_file_path = excel_file_path or os.getenv("EXCEL_FILE_PATH")
         if not self.excel_file_path:
@@ -86,9 +97,13 @@ class ExcelReader:
         self.sheet_names = []
         self.column_mappings: Dict[str, ColumnMapping] = {}
         self.structure: Optional[ExcelStructure] = None
+        self.apply_dtype_plan = apply_dtype_plan
+        self.dtype_plan: Optional[DtypePlan] = None
         
         # Load column mappings
         self.load_column_mappings()
+        if self.apply_dtype_plan:
+            self.dtype_plan = DtypePlan(self.column_mappings)
     
     def load_column_mappings(self) -> bool:
         """
@@ -117,6 +132,7 @@ class ExcelReader:
                 data_type = str(row.get("Data_Type", "string")).strip() if pd.notna(row.get("Data_Type")) else "string"
                 required_str = str(row.get("Required", "No")).strip().lower() if pd.notna(row.get("Required")) else "no"
                 notes = str(row.get("Notes", "")).strip() if pd.notna(row.get("Notes")) else None
+                mapping_type = str(row.get("Mapping_Type", "")).strip().lower() if pd.notna(row.get("Mapping_Type")) else None
                 
                 mapping = ColumnMapping(
                     excel_column=excel_col,
@@ -125,7 +141,8 @@ class ExcelReader:
                     supabase_column=supabase_column,
                     data_type=data_type,
                     required=required_str == "yes",
-                    notes=notes if notes else None
+                    notes=notes if notes else None,
+                    mapping_type=mapping_type if mapping_type else None
                 )
                 
                 # Store mapping by Excel column name
@@ -227,6 +244,16 @@ class ExcelReader:
             
             # Step 5: Apply English column names
             df_english = self._apply_english_column_names(df_raw)
+            memory_report = MemoryReport()
+            memory_report.record("read", df_english)
+            
+            # Step 5b: Apply compact dtype plan
+            if self.dtype_plan is not None:
+                coerced_nulls = self.dtype_plan.apply(df_english)
+                memory_report.record("dtype_plan", df_english)
+                for column, count in coerced_nulls.items():
+                    result.warnings.append(f"Column '{column}': {count} values could not be converted by dtype plan")
+            result.memory_report = memory_report
             
             # Step 6: Create structure information
             self.structure = self._create_structure_info(df_english)
@@ -251,6 +278,62 @@ class ExcelReader:
         
         return result
     
+    def iter_transaction_chunks(self, chunk_size: int = DEFAULT_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+        """
+        Read the transactions sheet in chunks of rows.
+        
+        The workbook is opened in read-only mode, so only one chunk is in
+        memory at a time. Values are converted to strings as in
+        read_transactions_sheet, English column names and the dtype plan
+        are applied per chunk, and the index continues across chunks.
+        
+        Args:
+            chunk_size: Number of rows per chunk
+            
+        Yields:
+            DataFrame with English column names for each chunk
+        """
+        if chunk_size <= 0:
+            raise ValueError(f"chunk_size must be positive: {chunk_size}")
+        if not self.validate_file_exists():
+            raise FileNotFoundError(f"Excel file not found: {self.excel_file_path}")
+        
+        workbook = load_workbook(self.excel_file_path, read_only=True, data_only=True)
+        try:
+            if "transactions " not in workbook.sheetnames:
+                raise ValueError("Transactions sheet not found")
+            rows = workbook["transactions "].iter_rows(values_only=True)
+            header = next(rows, None) or ()
+            columns = [
+                str(name) if name is not None else f"Unnamed: {position}"
+                for position, name in enumerate(header)
+            ]
+            
+            start = 0
+            batch: List[Tuple[Any, ...]] = []
+            for row in rows:
+                if all(value is None for value in row):
+                    continue
+                batch.append(row)
+                if len(batch) == chunk_size:
+                    yield self._chunk_frame(columns, batch, start)
+                    start += len(batch)
+                    batch = []
+            if batch:
+                yield self._chunk_frame(columns, batch, start)
+        finally:
+            workbook.close()
+    
+    def _chunk_frame(self, columns: List[str], rows: List[Tuple[Any, ...]], start: int) -> pd.DataFrame:
+        """Build one chunk with string values, English names and the dtype plan"""
+        width = len(columns)
+        values = [[_cell_text(value) for value in row[:width]] + [None] * (width - len(row)) for row in rows]
+        df_raw = pd.DataFrame(values, columns=columns, index=pd.RangeIndex(start, start + len(rows)), dtype=object)
+        df_english = self._apply_english_column_names(df_raw)
+        if self.dtype_plan is not None:
+            self.dtype_plan.apply(df_english)
+        return df_english
+    
     def _apply_english_column_names(self, df_raw: pd.DataFrame) -> pd.DataFrame:
         """
         Apply English column names to DataFrame.
@@ -484,17 +567,28 @@ class ExcelReader:
         return f"ExcelReader(file='{self.excel_file_path}', mappings={len(self.column_mappings)})"
 
 
+def _cell_text(value: Any) -> Optional[str]:
+    """String form of a cell value, matching pd.read_excel(dtype=str)"""
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
 # Factory function for easy creation
 def create_excel_reader(excel_file_path: Optional[str] = None, 
-                       mapping_file_path: Optional[str] = None) -> ExcelReader:
+                       mapping_file_path: Optional[str] = None,
+                       apply_dtype_plan: bool = False) -> ExcelReader:
     """
     Factory function to create Excel reader.
     
     Args:
         excel_file_path: Path to Excel file
         mapping_file_path: Path to column mapping CSV
+        apply_dtype_plan: Convert columns to compact dtypes right after reading
         
     Returns:
         ExcelReader instance
     """
-    return ExcelReader(excel_file_path, mapping_file_path)
\ No newline at end of file
+    return ExcelReader(excel_file_path, mapping_file_path, apply_dtype_plan)
\ No newline at end of file
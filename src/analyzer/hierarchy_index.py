@@ -0,0 +1,376 @@
+"""
+Hierarchy Index for Excel Data Migration
+
+This module models the accounts and sub_tree hierarchies:
+- Parent pointers and depth per node, built once from table rows
+- Euler-tour (nested set) intervals: a subtree is one contiguous range
+- Binary-lifting ancestor table for level roll-ups in O(log depth)
+- Ancestor closure table (ancestor, descendant, distance) on demand
+- Vectorized subtree membership and roll-up sums for Series of keys
+
+Subtree membership is an interval comparison and subtree totals are a
+difference of prefix sums, so neither walks the tree per query.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Iterable, List, Optional
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class HierarchyIssues:
+    """Rows that did not fit into a tree"""
+    orphans: List[Any] = field(default_factory=list)  # parent key not found
+    cycles: List[Any] = field(default_factory=list)  # parent link cut to break a cycle
+    duplicates: List[Any] = field(default_factory=list)  # later rows with a repeated key
+
+    @property
+    def has_issues(self) -> bool:
+        return bool(self.orphans or self.cycles or self.duplicates)
+
+
+class HierarchyIndex:
+    """
+    Precomputed index over a parent/child hierarchy.
+
+    Nodes are numbered by position in the input. Preorder numbers (tin)
+    and the last preorder number in each subtree (tout) give the nested
+    set intervals: b is in the subtree of a when tin[a] <= tin[b] <= tout[a].
+    Nodes whose parent is missing become roots and are reported in issues.
+    """
+
+    def __init__(self, keys: Iterable[Any], parent_keys: Iterable[Any], name: str = "hierarchy"):
+        """
+        Build the index.
+
+        Args:
+            keys: Key of every node (e.g. account id or code)
+            parent_keys: Parent key of every node (None/NaN for roots)
+            name: Name used in log messages
+        """
+        self.name = name
+        self.issues = HierarchyIssues()
+
+        keys = pd.Series(list(keys), dtype=object)
+        parent_keys = pd.Series(list(parent_keys), dtype=object)
+        duplicated = keys.duplicated().to_numpy()
+        if duplicated.any():
+            self.issues.duplicates = keys[duplicated].tolist()
+            keys, parent_keys = keys[~duplicated], parent_keys[~duplicated]
+
+        self.keys = pd.Index(keys.to_numpy(), dtype=object)
+        self.size = len(self.keys)
+
+        parent = self.keys.get_indexer(pd.Index(parent_keys.to_numpy(), dtype=object))
+        has_parent = parent_keys.notna().to_numpy() & (parent_keys.astype(str).str.strip() != "").to_numpy()
+        orphaned = has_parent & (parent < 0)
+        if orphaned.any():
+            self.issues.orphans = self.keys[orphaned].tolist()
+        parent[~has_parent] = -1
+        parent[np.arange(self.size) == parent] = -1
+        self.parent = parent.astype(np.int64)
+
+        self._build_tour()
+        self._lifting: Optional[List[np.ndarray]] = None
+        self._closure: Optional[pd.DataFrame] = None
+
+        if self.issues.has_issues:
+            logger.warning(
+                f"{name}: {len(self.issues.orphans)} orphans, {len(self.issues.cycles)} cycles broken, "
+                f"{len(self.issues.duplicates)} duplicate keys"
+            )
+        logger.info(f"Built {name} index: {self.size} nodes, max depth {self.max_depth}")
+
+    @classmethod
+    def from_rows(cls, rows: Any, key_column: str = "id", parent_column: str = "parent_id",
+                  name: Optional[str] = None) -> "HierarchyIndex":
+        """
+        Build the index from table rows.
+
+        Args:
+            rows: List of row dictionaries or a DataFrame
+            key_column: Column with the node key
+            parent_column: Column with the parent key
+            name: Name used in log messages
+
+        Returns:
+            HierarchyIndex instance
+        """
+        frame = rows if isinstance(rows, pd.DataFrame) else pd.DataFrame(list(rows))
+        if frame.empty:
+            return cls([], [], name or key_column)
+        parents = frame[parent_column] if parent_column in frame.columns else [None] * len(frame)
+        return cls(frame[key_column], parents, name or key_column)
+
+    def _build_tour(self):
+        """Compute depth, preorder numbers and subtree ends without recursion"""
+        n = self.size
+        while True:
+            children_order = np.lexsort((np.arange(n), self.parent))
+            child_starts = np.searchsorted(self.parent[children_order], np.arange(-1, n))
+            child_ends = np.append(child_starts[1:], n)
+
+            depth = np.full(n, -1, dtype=np.int64)
+            tin = np.full(n, -1, dtype=np.int64)
+            tout = np.full(n, -1, dtype=np.int64)
+            order = np.empty(n, dtype=np.int64)
+
+            counter = 0
+            # Stack of (node, next child offset); roots are the children of -1
+            roots = children_order[child_starts[0]:child_ends[0]]
+            stack = [(int(root), 0) for root in roots[::-1]]
+            while stack:
+                node, offset = stack.pop()
+                if offset == 0:
+                    parent = self.parent[node]
+                    depth[node] = 0 if parent < 0 else depth[parent] + 1
+                    tin[node] = counter
+                    order[counter] = node
+                    counter += 1
+                start, end = child_starts[node + 1], child_ends[node + 1]
+                if start + offset < end:
+                    stack.append((node, offset + 1))
+                    stack.append((int(children_order[start + offset]), 0))
+                else:
+                    tout[node] = counter - 1
+
+            unreached = np.flatnonzero(tin < 0)
+            if len(unreached) == 0:
+                break
+            # Only cycles are unreachable from a root: cut one link per pass
+            cut = self._cycle_member(int(unreached[0]))
+            self.issues.cycles.append(self.keys[cut])
+            self.parent[cut] = -1
+
+        self.depth = depth
+        self.tin = tin
+        self.tout = tout
+        self.order = order
+        self.max_depth = int(depth.max()) if n else 0
+
+    def _cycle_member(self, node: int) -> int:
+        """Follow parent pointers from an unreachable node until a node repeats"""
+        seen = set()
+        while node not in seen:
+            seen.add(node)
+            node = int(self.parent[node])
+        return node
+
+    def positions(self, keys: Any) -> np.ndarray:
+        """
+        Node positions of keys.
+
+        Args:
+            keys: Key, list or Series of keys
+
+        Returns:
+            int64 array of positions (-1 for unknown keys)
+        """
+        if np.ndim(keys) == 0:
+            keys = [keys]
+        # Look up each distinct key once
+        codes, uniques = pd.factorize(pd.Series(keys, dtype=object))
+        found = self.keys.get_indexer(pd.Index(uniques, dtype=object)).astype(np.int64)
+        return np.append(found, -1)[codes]
+
+    def __contains__(self, key: Any) -> bool:
+        return self.positions(key)[0] >= 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def parent_of(self, key: Any) -> Optional[Any]:
+        """Parent key of a node (None for roots and unknown keys)"""
+        position = self.positions(key)[0]
+        if position < 0 or self.parent[position] < 0:
+            return None
+        return self.keys[self.parent[position]]
+
+    def depth_of(self, key: Any) -> int:
+        """Depth of a node (0 for roots, -1 for unknown keys)"""
+        position = self.positions(key)[0]
+        return int(self.depth[position]) if position >= 0 else -1
+
+    def is_descendant(self, key: Any, ancestor: Any) -> bool:
+        """
+        Whether a node lies in the subtree of another (a node is in its own subtree).
+
+        Args:
+            key: Node to test
+            ancestor: Root of the subtree
+        """
+        node, root = self.positions([key, ancestor])
+        if node < 0 or root < 0:
+            return False
+        return bool(self.tin[root] <= self.tin[node] <= self.tout[root])
+
+    def in_subtree(self, keys: pd.Series, ancestor: Any) -> pd.Series:
+        """
+        Mark the keys of a Series that lie in the subtree of a node.
+
+        Args:
+            keys: Series of node keys
+            ancestor: Root of the subtree
+
+        Returns:
+            bool Series aligned with keys (False for unknown keys)
+        """
+        root = self.positions(ancestor)[0]
+        nodes = self.positions(keys)
+        if root < 0:
+            inside = np.zeros(len(nodes), dtype=bool)
+        else:
+            node_tin = np.where(nodes >= 0, self.tin[nodes], -1)
+            inside = (nodes >= 0) & (node_tin >= self.tin[root]) & (node_tin <= self.tout[root])
+        return pd.Series(inside, index=keys.index)
+
+    def subtree(self, key: Any) -> List[Any]:
+        """Keys of a node and all its descendants, in preorder"""
+        position = self.positions(key)[0]
+        if position < 0:
+            return []
+        return self.keys[self.order[self.tin[position]:self.tout[position] + 1]].tolist()
+
+    def children(self, key: Any) -> List[Any]:
+        """Keys of the direct children of a node"""
+        position = self.positions(key)[0]
+        return self.keys[np.flatnonzero(self.parent == position)].tolist() if position >= 0 else []
+
+    def ancestors(self, key: Any) -> List[Any]:
+        """Keys from the parent of a node up to its root"""
+        position = self.positions(key)[0]
+        result = []
+        while position >= 0 and self.parent[position] >= 0:
+            position = self.parent[position]
+            result.append(self.keys[position])
+        return result
+
+    def _lifting_table(self) -> List[np.ndarray]:
+        """Ancestor 2**k levels up of every node (roots point to themselves)"""
+        if self._lifting is None:
+            up = np.where(self.parent >= 0, self.parent, np.arange(self.size))
+            table = [up]
+            for _ in range(max(self.max_depth, 1).bit_length() - 1):
+                table.append(table[-1][table[-1]])
+            self._lifting = table
+        return self._lifting
+
+    def ancestor_at_depth(self, keys: pd.Series, depth: int) -> pd.Series:
+        """
+        Ancestor of every key at a given depth (e.g. the level-1 account).
+
+        Keys at or above the depth map to themselves; unknown keys to None.
+
+        Args:
+            keys: Series of node keys
+            depth: Target depth (0 for roots)
+
+        Returns:
+            object Series of ancestor keys aligned with keys
+        """
+        if self.size == 0:
+            return pd.Series([None] * len(keys), index=keys.index, dtype=object)
+        nodes = self.positions(keys)
+        known = nodes >= 0
+        current = np.where(known, nodes, 0)
+        steps = np.where(known, np.maximum(self.depth[current] - depth, 0), 0)
+        for level, up in enumerate(self._lifting_table()):
+            jump = (steps >> level) & 1 == 1
+            current = np.where(jump, up[current], current)
+        values = np.append(np.asarray(self.keys, dtype=object), None)
+        return pd.Series(values[np.where(known, current, -1)], index=keys.index, dtype=object)
+
+    def closure(self) -> pd.DataFrame:
+        """
+        Ancestor closure table.
+
+        Returns:
+            DataFrame with ancestor, descendant and distance columns, one row
+            per pair including every node with itself at distance 0
+        """
+        if self._closure is None:
+            nodes = np.arange(self.size)
+            ancestors = [nodes]
+            descendants = [nodes]
+            distances = [np.zeros(self.size, dtype=np.int64)]
+            current, active = nodes, nodes
+            distance = 0
+            while True:
+                current = self.parent[current]
+                keep = current >= 0
+                current, active = current[keep], active[keep]
+                if len(current) == 0:
+                    break
+                distance += 1
+                ancestors.append(current)
+                descendants.append(active)
+                distances.append(np.full(len(current), distance, dtype=np.int64))
+            keys = np.asarray(self.keys, dtype=object)
+            self._closure = pd.DataFrame({
+                "ancestor": keys[np.concatenate(ancestors)],
+                "descendant": keys[np.concatenate(descendants)],
+                "distance": np.concatenate(distances),
+            })
+        return self._closure
+
+    def rollup(self, keys: pd.Series, values: Any) -> pd.Series:
+        """
+        Total of values per node including all of its descendants.
+
+        Values are summed per node, then every subtree total is read off
+        prefix sums in preorder. Integer values (minor units) stay exact.
+
+        Args:
+            keys: Series of node keys (e.g. account_id per line)
+            values: Values aligned with keys (unknown keys are ignored)
+
+        Returns:
+            Series of subtree totals indexed by node key
+        """
+        values = np.asarray(values)
+        nodes = self.positions(keys)
+        known = nodes >= 0
+        if len(nodes) and not known.all():
+            logger.warning(f"{self.name}: {int((~known).sum())} values with unknown keys left out of roll-up")
+
+        dtype = np.int64 if np.issubdtype(values.dtype, np.integer) else np.float64
+        own = np.zeros(self.size, dtype=dtype)
+        np.add.at(own, nodes[known], values[known].astype(dtype))
+
+        prefix = np.concatenate([np.zeros(1, dtype=dtype), np.cumsum(own[self.order])])
+        totals = prefix[self.tout + 1] - prefix[self.tin]
+        return pd.Series(totals, index=self.keys, name="total")
+
+    def to_frame(self) -> pd.DataFrame:
+        """Nodes with parent, depth and nested set interval"""
+        keys = np.asarray(self.keys, dtype=object)
+        return pd.DataFrame({
+            "key": keys,
+            "parent": np.append(keys, None)[self.parent],
+            "depth": self.depth,
+            "tin": self.tin,
+            "tout": self.tout,
+        })
+
+
+# Factory function for easy creation
+def create_hierarchy_index(rows: Any, key_column: str = "id",
+                           parent_column: str = "parent_id",
+                           name: Optional[str] = None) -> HierarchyIndex:
+    """
+    Factory function to create a hierarchy index.
+
+    Args:
+        rows: accounts or sub_tree rows (list of dicts or DataFrame)
+        key_column: Column with the node key
+        parent_column: Column with the parent key
+        name: Name used in log messages
+
+    Returns:
+        HierarchyIndex instance
+    """
+    return HierarchyIndex.from_rows(rows, key_column, parent_column, name)
@@ -0,0 +1,258 @@
+"""
+Money Representation for Excel Data Migration
+
+This module provides fixed-point amount handling:
+- Parse decimal strings into int64 minor units exactly (no float round-trip)
+- Convert float amounts into minor units with rounding to the scale
+- Convert minor units back to decimal amounts for display and export
+- Configurable scale (decimal places) per currency
+
+Sums and comparisons of minor units are exact integer operations, so
+balance checks need no float tolerance.
+"""
+
+import re
+import logging
+from typing import Dict, Optional, Any
+from decimal import Decimal, ROUND_HALF_UP
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+# Default number of decimal places for amounts (minor units per major unit = 10 ** scale)
+DEFAULT_SCALE = 2
+
+# Decimal places per ISO currency code (currencies not listed use DEFAULT_SCALE)
+CURRENCY_SCALES: Dict[str, int] = {
+    "EGP": 2,
+    "SAR": 2,
+    "AED": 2,
+    "USD": 2,
+    "EUR": 2,
+    "KWD": 3,
+    "BHD": 3,
+    "OMR": 3,
+    "JOD": 3,
+    "JPY": 0,
+}
+
+# Plain decimal strings: optional sign, digits, optional fraction
+DECIMAL_STRING_PATTERN = re.compile(r"[+-]?(\d+\.?\d*|\.\d+)")
+
+# Amounts beyond 18 digits do not fit in int64 minor units
+MAX_DIGITS = 18
+
+
+def get_currency_scale(currency: Optional[str] = None) -> int:
+    """
+    Get the number of decimal places used for a currency.
+
+    Args:
+        currency: ISO currency code (None for the default scale)
+
+    Returns:
+        Scale for the currency
+    """
+    if not currency:
+        return DEFAULT_SCALE
+    return CURRENCY_SCALES.get(currency.upper(), DEFAULT_SCALE)
+
+
+def register_currency_scale(currency: str, scale: int):
+    """
+    Register or override the scale of a currency.
+
+    Args:
+        currency: ISO currency code
+        scale: Number of decimal places
+    """
+    if scale < 0:
+        raise ValueError(f"Scale must be non-negative: {scale}")
+    CURRENCY_SCALES[currency.upper()] = scale
+
+
+def amount_to_minor_units(value: Any, scale: int = DEFAULT_SCALE) -> int:
+    """
+    Convert a single amount to minor units (half away from zero).
+
+    Args:
+        value: Amount as string, Decimal, int or float (None/empty is 0)
+        scale: Number of decimal places kept in the minor units
+
+    Returns:
+        Amount in minor units
+    """
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return 0
+    if isinstance(value, float):
+        if np.isnan(value):
+            return 0
+        value = repr(value)
+    amount = Decimal(str(value).replace(",", "").strip())
+    return int(amount.scaleb(scale).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def tolerance_to_minor_units(tolerance: float, scale: int = DEFAULT_SCALE) -> int:
+    """
+    Convert a tolerance in currency units to minor units.
+
+    Args:
+        tolerance: Tolerance in currency units (e.g. 0.01)
+        scale: Number of decimal places of the minor units
+
+    Returns:
+        Tolerance in minor units
+    """
+    return amount_to_minor_units(tolerance, scale)
+
+
+def rescale_minor_units(units: pd.Series, from_scale: int, to_scale: int) -> pd.Series:
+    """
+    Convert minor units to a larger scale (exact) or a smaller one (rounded).
+
+    Args:
+        units: Series of minor units
+        from_scale: Scale of the input
+        to_scale: Scale of the output
+
+    Returns:
+        Series of minor units at to_scale
+    """
+    if to_scale >= from_scale:
+        return units * (10 ** (to_scale - from_scale))
+    return _numeric_to_minor_units(from_minor_units(units, from_scale), to_scale)
+
+
+def format_minor_units(units: int, scale: int = DEFAULT_SCALE) -> str:
+    """
+    Format minor units as a decimal string with thousands separators.
+
+    Args:
+        units: Amount in minor units
+        scale: Number of decimal places of the minor units
+
+    Returns:
+        Formatted amount (e.g. '1,234.50')
+    """
+    return f"{Decimal(int(units)).scaleb(-scale):,.{scale}f}"
+
+
+def to_minor_units(values: pd.Series, scale: int = DEFAULT_SCALE) -> pd.Series:
+    """
+    Convert amounts to int64 minor units.
+
+    Decimal strings are split into integer and fractional digits and parsed
+    as integers, so '0.1' + '0.2' is exactly 30 minor units at scale 2.
+    Extra fractional digits are rounded half away from zero, on every path:
+    floats round like their decimal form. Values that cannot be parsed,
+    are not finite or exceed MAX_DIGITS digits become <NA>.
+
+    Args:
+        values: Series of amounts (strings, numbers or a mix)
+        scale: Number of decimal places kept in the minor units
+
+    Returns:
+        Series with nullable 'Int64' dtype
+    """
+    if pd.api.types.is_integer_dtype(values.dtype) or pd.api.types.is_float_dtype(values.dtype):
+        return _numeric_to_minor_units(values, scale)
+
+    result = pd.Series(pd.NA, index=values.index, dtype="Int64", name=values.name)
+    if values.empty:
+        return result
+
+    # Amount columns repeat values heavily: parse each distinct value once
+    codes, uniques = pd.factorize(values)
+    if len(uniques) < len(values) // 2:
+        parsed = to_minor_units(pd.Series(np.asarray(uniques, dtype=object)), scale)
+        taken = parsed.array.take(codes, allow_fill=True)
+        return pd.Series(taken, index=values.index, name=values.name)
+
+    text = values.astype(str).str.strip().str.replace(",", "", regex=False)
+    is_decimal = text.str.fullmatch(DECIMAL_STRING_PATTERN, na=False) & values.notna()
+
+    if is_decimal.any():
+        decimal_text = text[is_decimal]
+        negative = decimal_text.str.startswith("-")
+        parts = decimal_text.str.lstrip("+-").str.split(".", n=1, expand=True)
+        integer_part = parts[0].where(parts[0] != "", "0")
+        fraction_part = parts[1].fillna("") if parts.shape[1] > 1 else pd.Series("", index=parts.index)
+
+        kept = fraction_part.str.pad(scale + 1, side="right", fillchar="0")
+        digits = integer_part.str.lstrip("0") + kept.str[:scale]
+        round_up = kept.str[scale] >= "5"
+
+        fits = digits.str.len() <= MAX_DIGITS
+        units = pd.to_numeric(digits[fits].replace("", "0")).astype("int64")
+        units = units + round_up[fits].astype("int64")
+        units = units.where(~negative[fits], -units)
+
+        result.loc[units.index] = units
+        _warn_not_converted(int((~fits).sum()))
+
+    # Anything else that still parses as a number (e.g. scientific notation)
+    remaining = values.notna() & ~is_decimal
+    if remaining.any():
+        numeric = pd.to_numeric(text[remaining], errors="coerce")
+        converted = _numeric_to_minor_units(numeric, scale)
+        result.loc[converted.index] = converted
+
+    return result
+
+
+def _numeric_to_minor_units(values: pd.Series, scale: int) -> pd.Series:
+    """
+    Round numeric amounts to the scale (half away from zero) and return int64 minor units.
+
+    Floats are rounded like their shortest decimal form (repr), as the string
+    path and SQL round() do, so 0.125 becomes 13 cents rather than 12.
+    Non-finite amounts and amounts beyond MAX_DIGITS digits become <NA>.
+    """
+    limit = 10 ** MAX_DIGITS
+    if pd.api.types.is_integer_dtype(values.dtype):
+        integers = values.astype("Int64")
+        fits = (integers.abs() < limit // 10 ** scale).fillna(True)
+        _warn_not_converted(int((~fits).sum()))
+        return (integers.where(fits) * (10 ** scale)).rename(values.name)
+
+    numbers = values.astype("float64").to_numpy(dtype="float64", na_value=np.nan)
+    with np.errstate(invalid="ignore", over="ignore"):
+        scaled = numbers * (10 ** scale)
+        fits = np.isfinite(scaled) & (np.abs(scaled) < limit)
+    _warn_not_converted(int((~np.isnan(numbers) & ~fits).sum()))
+
+    units = np.where(fits, np.round(scaled), 0.0)
+    # Only amounts near a half-unit can round differently from their decimal form
+    with np.errstate(invalid="ignore"):
+        fraction = np.abs(scaled - np.trunc(scaled))
+        near_half = fits & (np.abs(fraction - 0.5) < 1e-6)
+    if near_half.any():
+        ties, inverse = np.unique(numbers[near_half], return_inverse=True)
+        rounded = np.array([amount_to_minor_units(float(tie), scale) for tie in ties], dtype=np.float64)
+        units[near_half] = rounded[inverse]
+
+    result = pd.array(units.astype(np.int64), dtype="Int64")
+    result[~fits] = pd.NA
+    return pd.Series(result, index=values.index, name=values.name)
+
+
+def _warn_not_converted(count: int):
+    if count:
+        logger.warning(f"{count} amounts exceed {MAX_DIGITS} digits or are not finite and were not converted")
+
+
+def from_minor_units(units: pd.Series, scale: int = DEFAULT_SCALE) -> pd.Series:
+    """
+    Convert int64 minor units back to float amounts.
+
+    Args:
+        units: Series of minor units
+        scale: Number of decimal places of the minor units
+
+    Returns:
+        Series of float amounts (nulls preserved as NaN)
+    """
+    amounts = units.astype("Float64").to_numpy(dtype="float64", na_value=np.nan) / (10 ** scale)
+    return pd.Series(amounts, index=units.index, name=units.name)
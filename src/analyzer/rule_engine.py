@@ -0,0 +1,703 @@
+"""
+Validation Rule Engine for Excel Data Migration
+
+This module compiles declarative validation rules into vectorized predicates:
+- Rules are read from a JSON or YAML file (config/validation_rules.json)
+- Rule types: required, data_type, range, pattern, allowed_values,
+  compare and exactly_one (cross-field), group (per entry) and custom
+- Each rule becomes a boolean mask over the whole frame
+- Column expressions (blank mask, parsed numbers, parsed dates, stripped
+  text, group keys) are computed once per frame and shared by all rules
+- Only the columns referenced by a rule are read
+
+Rule file format (JSON; YAML with the same keys is accepted):
+
+    {
+      "rules": [
+        {"name": "description_required", "type": "required", "field": "description",
+         "applies_to": "transactions", "if_present": true},
+        {"type": "range", "field": "debit", "min": 0, "max": 99999999999.9999},
+        {"type": "pattern", "field": "entry_no", "pattern": "\\\\d+"},
+        {"type": "allowed_values", "field": "account_code", "code_set": "account"},
+        {"type": "compare", "field": "debit", "operator": "!=", "other_field": "credit"},
+        {"type": "group", "check": "balanced", "group_by": "entry_no",
+         "fields": ["debit", "credit"], "tolerance": 0.01, "severity": "warning"}
+      ]
+    }
+"""
+
+import re
+import json
+import hashlib
+import logging
+import operator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+import numpy as np
+import pandas as pd
+
+from .money import from_minor_units
+from .dtype_plan import MINOR_UNIT_SCALES_ATTR
+
+logger = logging.getLogger(__name__)
+
+
+# Rule types and the finding type they report
+RULE_FINDING_TYPES = {
+    'required': 'required_field',
+    'data_type': 'data_type',
+    'range': 'range',
+    'pattern': 'pattern',
+    'allowed_values': 'allowed_values',
+    'compare': 'business_rule',
+    'exactly_one': 'business_rule',
+    'group': 'business_rule',
+    'custom': 'custom'
+}
+
+# Checks of group rules
+GROUP_CHECKS = ('balanced', 'unique', 'min_rows')
+
+COMPARE_OPERATORS = {
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '==': operator.eq,
+    '!=': operator.ne
+}
+
+NUMERIC_DATA_TYPES = {'int', 'integer', 'float', 'numeric', 'decimal'}
+DATE_DATA_TYPES = {'date', 'datetime'}
+
+# Keys of a rule file entry and the ValidationRule field they set
+RULE_FILE_KEYS = {
+    'name': 'name',
+    'field': 'field_name',
+    'type': 'rule_type',
+    'severity': 'severity',
+    'message': 'message',
+    'applies_to': 'applies_to',
+    'if_present': 'if_present',
+    'data_type': 'data_type',
+    'min': 'min_value',
+    'max': 'max_value',
+    'date_format': 'date_format',
+    'pattern': 'pattern',
+    'values': 'allowed_values',
+    'code_set': 'code_set',
+    'other_field': 'other_field',
+    'operator': 'operator',
+    'value': 'value',
+    'fields': 'fields',
+    'group_by': 'group_by',
+    'check': 'check',
+    'tolerance': 'tolerance',
+    'min_rows': 'min_rows'
+}
+
+
+def blank_mask(series: pd.Series) -> np.ndarray:
+    """Mask of null values and strings that are empty after stripping"""
+    mask = series.isna().to_numpy()
+    if (pd.api.types.is_object_dtype(series.dtype) or pd.api.types.is_string_dtype(series.dtype)
+            or isinstance(series.dtype, pd.CategoricalDtype)):
+        stripped = series.str.strip()
+        mask = mask | (stripped == '').to_numpy(dtype=bool, na_value=False)
+    return mask
+
+
+def stripped_text(series: pd.Series) -> pd.Series:
+    """String form of each value with surrounding whitespace removed"""
+    return series.astype(str).str.strip()
+
+
+def coerce_float(series: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convert values to floats the way float() would.
+
+    pd.to_numeric handles the bulk of the column; values it rejects are
+    retried with float() once per distinct value, so inputs such as '' or
+    '1,000' fail exactly as they would row by row.
+
+    Returns:
+        Tuple of (float values, mask of non-null values that are not numeric)
+    """
+    nulls = series.isna().to_numpy()
+    if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+        return series.to_numpy(dtype=float, na_value=np.nan), np.zeros(len(series), dtype=bool)
+
+    numbers = pd.to_numeric(series, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    failed = np.zeros(len(series), dtype=bool)
+
+    retry = np.flatnonzero(~nulls & np.isnan(numbers))
+    if len(retry):
+        codes, uniques = pd.factorize(series.iloc[retry])
+        parsed = []
+        for value in uniques:
+            try:
+                parsed.append(float(value))
+            except (ValueError, TypeError):
+                parsed.append(None)
+        unique_failed = np.array([value is None for value in parsed], dtype=bool)
+        unique_numbers = np.array([np.nan if value is None else value for value in parsed], dtype=float)
+        numbers = numbers.copy()
+        numbers[retry] = unique_numbers[codes]
+        failed[retry] = unique_failed[codes]
+
+    return numbers, failed
+
+
+def date_years(series: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Parse dates the way pd.to_datetime would parse each value on its own.
+
+    Each distinct value is parsed once. Values the vectorized parse rejects
+    are retried one at a time, so out-of-bounds dates keep their year and
+    unparseable values are flagged.
+
+    Returns:
+        Tuple of (year of each value or NaN, mask of values that failed to parse)
+    """
+    codes, uniques = pd.factorize(series)
+    unique_values = pd.Series(np.asarray(uniques, dtype=object))
+    parsed = pd.to_datetime(unique_values, errors='coerce', format='mixed')
+    # to_numpy() may return a read-only view; the retries below write into it
+    unique_years = np.array(parsed.dt.year.to_numpy(dtype=float, na_value=np.nan), copy=True)
+    unique_failed = np.zeros(len(uniques), dtype=bool)
+
+    for i in np.flatnonzero(parsed.isna().to_numpy()):
+        try:
+            date_obj = pd.to_datetime(unique_values.iloc[i])
+        except (ValueError, TypeError, pd.errors.ParserError):
+            unique_failed[i] = True
+            continue
+        if not pd.isna(date_obj):
+            unique_years[i] = date_obj.year
+
+    # Nulls have code -1 and are neither parsed nor flagged
+    valid = codes >= 0
+    years = np.full(len(series), np.nan)
+    failed = np.zeros(len(series), dtype=bool)
+    years[valid] = unique_years[codes[valid]]
+    failed[valid] = unique_failed[codes[valid]]
+    return years, failed
+
+
+def coerce_amount(data: pd.DataFrame, field: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convert an amount column to floats.
+
+    Columns stored as minor units by the dtype plan are converted back
+    to amounts using their scale.
+
+    Returns:
+        Tuple of (float values, mask of non-null values that are not numeric)
+    """
+    scale = data.attrs.get(MINOR_UNIT_SCALES_ATTR, {}).get(field)
+    if scale is not None:
+        numbers = from_minor_units(data[field], scale).to_numpy()
+        return numbers, np.zeros(len(data), dtype=bool)
+    return coerce_float(data[field])
+
+
+def read_rules_file(path: str) -> List[Dict[str, Any]]:
+    """
+    Read rule definitions from a JSON or YAML file.
+
+    Args:
+        path: Path to a .json, .yaml or .yml file
+
+    Returns:
+        List of rule dictionaries with ValidationRule field names
+    """
+    path = Path(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.suffix.lower() in ('.yaml', '.yml'):
+            try:
+                import yaml
+            except ImportError as e:
+                raise ImportError("YAML rule files require PyYAML (pip install pyyaml)") from e
+            content = yaml.safe_load(f)
+        else:
+            content = json.load(f)
+
+    entries = content.get('rules', []) if isinstance(content, dict) else content or []
+    rules = []
+    for number, entry in enumerate(entries, 1):
+        unknown = set(entry) - set(RULE_FILE_KEYS)
+        if unknown:
+            raise ValueError(f"Rule {number} in {path}: unknown keys {sorted(unknown)}")
+        rule = {RULE_FILE_KEYS[key]: value for key, value in entry.items()}
+        if rule.get('allowed_values') is not None:
+            rule['allowed_values'] = set(rule['allowed_values'])
+        rule.setdefault('name', f"{rule.get('rule_type')}_{rule.get('field_name') or number}")
+        rules.append(rule)
+
+    logger.info(f"Read {len(rules)} validation rules from {path}")
+    return rules
+
+
+class _Placeholders(dict):
+    """Message placeholders; unknown names are left as written"""
+
+    def __missing__(self, key: str) -> str:
+        return '{' + key + '}'
+
+
+class RuleContext:
+    """
+    Column expressions of one frame, shared by all rules.
+
+    Each expression is computed the first time a rule asks for it, so
+    several rules on the same column parse it only once.
+    """
+
+    def __init__(self, data: pd.DataFrame, code_sets: Optional[Dict[str, Optional[Set[str]]]] = None):
+        self.data = data
+        self.code_sets = code_sets or {}
+        self._cache: Dict[Tuple[str, ...], Any] = {}
+
+    def _memo(self, key: Tuple[str, ...], compute: Callable[[], Any]) -> Any:
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    def has(self, field: str) -> bool:
+        return field in self.data.columns
+
+    def values(self, field: str) -> np.ndarray:
+        return self._memo(('values', field), lambda: self.data[field].to_numpy(dtype=object))
+
+    def blank(self, field: str) -> np.ndarray:
+        return self._memo(('blank', field), lambda: blank_mask(self.data[field]))
+
+    def text(self, field: str) -> pd.Series:
+        return self._memo(('text', field), lambda: stripped_text(self.data[field]))
+
+    def numeric(self, field: str) -> Tuple[np.ndarray, np.ndarray]:
+        return self._memo(('numeric', field), lambda: coerce_amount(self.data, field))
+
+    def dates(self, field: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Parsed dates (datetime64, NaT when missing) and mask of values that failed"""
+        def compute():
+            codes, uniques = pd.factorize(self.data[field])
+            parsed = pd.to_datetime(pd.Series(np.asarray(uniques, dtype=object)),
+                                    errors='coerce', format='mixed').to_numpy()
+            dates = np.full(len(codes), np.datetime64('NaT'), dtype=parsed.dtype)
+            valid = codes >= 0
+            dates[valid] = parsed[codes[valid]]
+            failed = valid & np.isnat(dates) & ~self.blank(field)
+            return dates, failed
+        return self._memo(('dates', field), compute)
+
+    def groups(self, field: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Group code of each row (-1 for blank keys) and the group labels"""
+        def compute():
+            # Strip each distinct key once, then merge keys equal after stripping
+            raw_codes, raw_uniques = pd.factorize(self.data[field])
+            keys = stripped_text(pd.Series(np.asarray(raw_uniques, dtype=object)))
+            key_codes, labels = pd.factorize(keys)
+            codes = np.where(raw_codes >= 0, key_codes[raw_codes], -1)
+            codes = np.where(self.blank(field), -1, codes)
+            return codes, np.asarray(labels, dtype=object)
+        return self._memo(('groups', field), compute)
+
+
+@dataclass
+class CompiledRule:
+    """A rule compiled to a vectorized predicate"""
+    name: str
+    field_name: str
+    finding_type: str
+    severity: str
+    columns: Tuple[str, ...]
+    applies_to: Optional[str]
+    is_group: bool
+    # Returns the mask of violating rows and a builder of placeholders per row position
+    evaluate: Callable[[RuleContext], Optional[Tuple[np.ndarray, Callable[[int], Dict[str, Any]]]]]
+    message: str
+
+
+class CompiledRuleSet:
+    """
+    Rules compiled once and evaluated on any number of frames.
+
+    Findings are returned in the (field_name, type, positions, builder)
+    form used by DataValidator, in rule order.
+    """
+
+    def __init__(self, rules: List[CompiledRule], version: str):
+        self.rules = rules
+        self.version = version
+        self.columns: Set[str] = {column for rule in rules for column in rule.columns}
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def has_group_rules(self) -> bool:
+        return any(rule.is_group for rule in self.rules)
+
+    def evaluate(self, data: pd.DataFrame, applies_to: Optional[str] = None,
+                 code_sets: Optional[Dict[str, Optional[Set[str]]]] = None,
+                 include_row_rules: bool = True, include_group_rules: bool = True
+                 ) -> Tuple[List[Tuple], List[Tuple]]:
+        """
+        Evaluate the rules on a frame.
+
+        Args:
+            data: DataFrame to check
+            applies_to: Only rules for this record kind ('transactions' or
+                'transaction_lines'); rules without applies_to always run
+            code_sets: Valid-code sets for allowed_values rules with a code_set
+            include_row_rules: Evaluate rules that look at one row at a time
+            include_group_rules: Evaluate group rules (need the whole frame)
+
+        Returns:
+            Tuple of (error findings, warning findings)
+        """
+        # Rules only read the columns they reference
+        frame = data[[column for column in data.columns if column in self.columns]]
+        context = RuleContext(frame, code_sets)
+        errors, warnings = [], []
+
+        for rule in self.rules:
+            if applies_to and rule.applies_to and rule.applies_to != applies_to:
+                continue
+            if (rule.is_group and not include_group_rules) or (not rule.is_group and not include_row_rules):
+                continue
+
+            evaluated = rule.evaluate(context)
+            if evaluated is None:
+                continue
+            mask, placeholders = evaluated
+            key = 'error_message' if rule.severity == 'error' else 'warning_message'
+
+            def build(pos: int, rule=rule, placeholders=placeholders, key=key) -> Dict[str, Any]:
+                values = placeholders(pos)
+                fields = {key: rule.message.format_map(_Placeholders(values)),
+                          'actual_value': values.get('value')}
+                if key == 'error_message' and 'expected' in values:
+                    fields['expected_value'] = values['expected']
+                return fields
+
+            target = errors if rule.severity == 'error' else warnings
+            target.append((rule.field_name, rule.finding_type, np.flatnonzero(mask), build))
+
+        return errors, warnings
+
+
+def compile_rules(rules: List[Any]) -> CompiledRuleSet:
+    """
+    Compile ValidationRule objects into vectorized predicates.
+
+    Args:
+        rules: ValidationRule objects (or objects with the same attributes)
+
+    Returns:
+        CompiledRuleSet
+
+    Raises:
+        ValueError: If a rule is incomplete or of an unknown type
+    """
+    compiled = [_compile_rule(rule) for rule in rules]
+    definition = json.dumps([_rule_definition(rule) for rule in rules], sort_keys=True, default=str)
+    version = hashlib.sha256(definition.encode('utf-8')).hexdigest()[:16]
+    logger.info(f"Compiled {len(compiled)} validation rules (version {version})")
+    return CompiledRuleSet(compiled, version)
+
+
+def _rule_definition(rule: Any) -> Dict[str, Any]:
+    """Declarative fields of a rule, for the rule-set version"""
+    definition = {key: getattr(rule, key, None) for key in RULE_FILE_KEYS.values()}
+    for key in ('min_date', 'max_date', 'required'):
+        definition[key] = getattr(rule, key, None)
+    if definition['allowed_values'] is not None:
+        definition['allowed_values'] = sorted(map(str, definition['allowed_values']))
+    custom = getattr(rule, 'custom_validator', None)
+    definition['custom_validator'] = getattr(custom, '__qualname__', None) if custom else None
+    return definition
+
+
+def _compile_rule(rule: Any) -> CompiledRule:
+    """Compile a single rule"""
+    rule_type = (getattr(rule, 'rule_type', None) or '').lower()
+    if rule_type not in RULE_FINDING_TYPES:
+        raise ValueError(f"Unknown rule type '{rule_type}' in rule {getattr(rule, 'name', None)}")
+
+    field = getattr(rule, 'field_name', None)
+    name = getattr(rule, 'name', None) or f"{rule_type}_{field}"
+    severity = (getattr(rule, 'severity', None) or 'error').lower()
+    if severity not in ('error', 'warning'):
+        raise ValueError(f"Rule {name}: severity must be 'error' or 'warning'")
+
+    compiler = {
+        'required': _compile_required,
+        'data_type': _compile_data_type,
+        'range': _compile_range,
+        'pattern': _compile_pattern,
+        'allowed_values': _compile_allowed_values,
+        'compare': _compile_compare,
+        'exactly_one': _compile_exactly_one,
+        'group': _compile_group,
+        'custom': _compile_custom
+    }[rule_type]
+    evaluate, columns, default_message = compiler(rule, name)
+
+    return CompiledRule(
+        name=name,
+        field_name=field or '/'.join(getattr(rule, 'fields', None) or []) or getattr(rule, 'group_by', None) or '',
+        finding_type=RULE_FINDING_TYPES[rule_type],
+        severity=severity,
+        columns=tuple(columns),
+        applies_to=getattr(rule, 'applies_to', None),
+        is_group=rule_type == 'group',
+        evaluate=evaluate,
+        message=getattr(rule, 'message', None) or default_message
+    )
+
+
+def _require(value: Any, name: str, what: str) -> Any:
+    if value is None or value == [] or value == '':
+        raise ValueError(f"Rule {name}: {what} is required")
+    return value
+
+
+def _compile_required(rule: Any, name: str):
+    field = _require(rule.field_name, name, 'field')
+
+    def evaluate(ctx: RuleContext):
+        if not ctx.has(field):
+            if getattr(rule, 'if_present', False):
+                return None
+            return np.ones(len(ctx.data), dtype=bool), lambda pos: {'field': field, 'reason': 'not found in data'}
+        values = ctx.values(field)
+        return ctx.blank(field), lambda pos: {'field': field, 'value': values[pos], 'reason': 'is null or empty'}
+
+    return evaluate, [field], "Required field '{field}' {reason}"
+
+
+def _compile_data_type(rule: Any, name: str):
+    field = _require(rule.field_name, name, 'field')
+    data_type = (_require(rule.data_type, name, 'data_type') or '').lower()
+    if data_type not in NUMERIC_DATA_TYPES | DATE_DATA_TYPES:
+        raise ValueError(f"Rule {name}: unsupported data_type '{data_type}'")
+
+    def evaluate(ctx: RuleContext):
+        if not ctx.has(field):
+            return None
+        if data_type in DATE_DATA_TYPES:
+            _, failed = ctx.dates(field)
+        else:
+            numbers, failed = ctx.numeric(field)
+            if data_type in ('int', 'integer'):
+                with np.errstate(invalid='ignore'):
+                    failed = failed | (~np.isnan(numbers) & (numbers != np.round(numbers)))
+        values = ctx.values(field)
+        return failed, lambda pos: {'field': field, 'value': values[pos], 'expected': data_type}
+
+    return evaluate, [field], "{field} must be {expected}, got '{value}'"
+
+
+def _compile_range(rule: Any, name: str):
+    field = _require(rule.field_name, name, 'field')
+    is_date = (rule.data_type or '').lower() in DATE_DATA_TYPES or \
+        getattr(rule, 'min_date', None) is not None or getattr(rule, 'max_date', None) is not None
+
+    if is_date:
+        low = getattr(rule, 'min_date', None) or rule.min_value
+        high = getattr(rule, 'max_date', None) or rule.max_value
+        low = pd.Timestamp(low).to_datetime64() if low is not None else None
+        high = pd.Timestamp(high).to_datetime64() if high is not None else None
+    else:
+        low = float(rule.min_value) if rule.min_value is not None else None
+        high = float(rule.max_value) if rule.max_value is not None else None
+    if low is None and high is None:
+        raise ValueError(f"Rule {name}: min or max is required")
+    expected = f"[{'' if low is None else low}, {'' if high is None else high}]"
+
+    def evaluate(ctx: RuleContext):
+        if not ctx.has(field):
+            return None
+        if is_date:
+            values, failed = ctx.dates(field)
+            present = ~np.isnat(values)
+        else:
+            values, failed = ctx.numeric(field)
+            present = ~np.isnan(values)
+        outside = np.zeros(len(values), dtype=bool)
+        if low is not None:
+            outside[present] |= values[present] < low
+        if high is not None:
+            outside[present] |= values[present] > high
+        raw = ctx.values(field)
+        return outside & ~failed, lambda pos: {'field': field, 'value': raw[pos], 'expected': expected}
+
+    return evaluate, [field], "{field} {value} is outside range {expected}"
+
+
+def _compile_pattern(rule: Any, name: str):
+    field = _require(rule.field_name, name, 'field')
+    try:
+        pattern = re.compile(_require(rule.pattern, name, 'pattern'))
+    except re.error as e:
+        raise ValueError(f"Rule {name}: invalid pattern: {e}") from e
+
+    def evaluate(ctx: RuleContext):
+        if not ctx.has(field):
+            return None
+        text = ctx.text(field)
+        matches = text.str.fullmatch(pattern).to_numpy(dtype=bool, na_value=False)
+        values = ctx.values(field)
+        return ~ctx.blank(field) & ~matches, lambda pos: {'field': field, 'value': values[pos],
+                                                          'expected': pattern.pattern}
+
+    return evaluate, [field], "{field} '{value}' does not match pattern {expected}"
+
+
+def _compile_allowed_values(rule: Any, name: str):
+    field = _require(rule.field_name, name, 'field')
+    code_set = getattr(rule, 'code_set', None)
+    if rule.allowed_values is None and not code_set:
+        raise ValueError(f"Rule {name}: values or code_set is required")
+    allowed = {str(value).strip() for value in rule.allowed_values} if rule.allowed_values is not None else None
+
+    def evaluate(ctx: RuleContext):
+        if not ctx.has(field):
+            return None
+        valid = allowed if allowed is not None else ctx.code_sets.get(code_set)
+        if valid is None:
+            return None
+        text = ctx.text(field)
+        unknown = ~ctx.blank(field) & ~text.isin(valid).to_numpy()
+        values = text.to_numpy(dtype=object)
+        return unknown, lambda pos: {'field': field, 'value': values[pos]}
+
+    return evaluate, [field], "{field} '{value}' is not an allowed value"
+
+
+def _compile_compare(rule: Any, name: str):
+    field = _require(rule.field_name, name, 'field')
+    op_name = _require(getattr(rule, 'operator', None), name, 'operator')
+    if op_name not in COMPARE_OPERATORS:
+        raise ValueError(f"Rule {name}: unknown operator '{op_name}'")
+    compare = COMPARE_OPERATORS[op_name]
+    other_field = getattr(rule, 'other_field', None)
+    constant = getattr(rule, 'value', None)
+    if other_field is None and constant is None:
+        raise ValueError(f"Rule {name}: other_field or value is required")
+    other_label = other_field if other_field is not None else str(constant)
+
+    def evaluate(ctx: RuleContext):
+        if not ctx.has(field) or (other_field is not None and not ctx.has(other_field)):
+            return None
+        left, _ = ctx.numeric(field)
+        if other_field is not None:
+            right, _ = ctx.numeric(other_field)
+        else:
+            right = np.full(len(left), float(constant))
+        checked = ~np.isnan(left) & ~np.isnan(right)
+        violated = np.zeros(len(left), dtype=bool)
+        violated[checked] = ~compare(left[checked], right[checked])
+        return violated, lambda pos: {'field': field, 'value': f"{field}={left[pos]}, {other_label}={right[pos]}",
+                                      'expected': f"{field} {op_name} {other_label}"}
+
+    columns = [field] + ([other_field] if other_field is not None else [])
+    return evaluate, columns, "{field} must be {expected} ({value})"
+
+
+def _compile_exactly_one(rule: Any, name: str):
+    fields = list(_require(getattr(rule, 'fields', None), name, 'fields'))
+
+    def evaluate(ctx: RuleContext):
+        present = [field for field in fields if ctx.has(field)]
+        if not present:
+            return None
+        set_count = np.zeros(len(ctx.data), dtype=np.int64)
+        for field in present:
+            numbers, failed = ctx.numeric(field)
+            # A value counts as set when it is a non-zero number or non-numeric text
+            with np.errstate(invalid='ignore'):
+                is_set = ~ctx.blank(field) & (failed | (np.nan_to_num(numbers) != 0))
+            set_count += is_set
+        return set_count != 1, lambda pos: {
+            'fields': ', '.join(present),
+            'value': ', '.join(f"{field}={ctx.values(field)[pos]}" for field in present)
+        }
+
+    return evaluate, fields, "Exactly one of {fields} must be set ({value})"
+
+
+def _compile_group(rule: Any, name: str):
+    check = _require(getattr(rule, 'check', None), name, 'check')
+    group_by = _require(getattr(rule, 'group_by', None), name, 'group_by')
+    if check not in GROUP_CHECKS:
+        raise ValueError(f"Rule {name}: unknown group check '{check}'")
+
+    if check == 'balanced':
+        debit_field, credit_field = _require(getattr(rule, 'fields', None), name, 'fields')
+        tolerance = float(getattr(rule, 'tolerance', None) or 0.0)
+
+        def evaluate(ctx: RuleContext):
+            if not all(ctx.has(f) for f in (group_by, debit_field, credit_field)):
+                return None
+            codes, labels = ctx.groups(group_by)
+            grouped = codes >= 0
+            debit, _ = ctx.numeric(debit_field)
+            credit, _ = ctx.numeric(credit_field)
+            net = np.nan_to_num(debit) - np.nan_to_num(credit)
+            totals = np.bincount(codes[grouped], weights=net[grouped], minlength=len(labels))
+            unbalanced = np.abs(totals) > tolerance + 1e-9
+            flagged = np.zeros(len(codes), dtype=bool)
+            flagged[grouped] = unbalanced[codes[grouped]]
+            return flagged, lambda pos: {'group_by': group_by, 'group': labels[codes[pos]],
+                                         'value': round(float(totals[codes[pos]]), 6),
+                                         'expected': f"|{debit_field} - {credit_field}| <= {tolerance}"}
+
+        return evaluate, [group_by, debit_field, credit_field], "{group_by} {group} is not balanced (difference {value})"
+
+    if check == 'unique':
+        field = _require(rule.field_name, name, 'field')
+
+        def evaluate(ctx: RuleContext):
+            if not ctx.has(group_by) or not ctx.has(field):
+                return None
+            codes, labels = ctx.groups(group_by)
+            keys = pd.DataFrame({'group': codes, 'value': ctx.text(field).to_numpy(dtype=object)})
+            duplicated = (codes >= 0) & ~ctx.blank(field) & keys.duplicated().to_numpy()
+            values = ctx.values(field)
+            return duplicated, lambda pos: {'field': field, 'group_by': group_by,
+                                            'group': labels[codes[pos]], 'value': values[pos]}
+
+        return evaluate, [group_by, field], "Duplicate {field} '{value}' in {group_by} {group}"
+
+    min_rows = int(_require(getattr(rule, 'min_rows', None), name, 'min_rows'))
+
+    def evaluate(ctx: RuleContext):
+        if not ctx.has(group_by):
+            return None
+        codes, labels = ctx.groups(group_by)
+        grouped = codes >= 0
+        counts = np.bincount(codes[grouped], minlength=len(labels))
+        flagged = np.zeros(len(codes), dtype=bool)
+        flagged[grouped] = counts[codes[grouped]] < min_rows
+        return flagged, lambda pos: {'group_by': group_by, 'group': labels[codes[pos]],
+                                     'value': int(counts[codes[pos]]), 'expected': f">= {min_rows} rows"}
+
+    return evaluate, [group_by], "{group_by} {group} has {value} rows (minimum {expected})"
+
+
+def _compile_custom(rule: Any, name: str):
+    field = _require(rule.field_name, name, 'field')
+    validator = _require(getattr(rule, 'custom_validator', None), name, 'custom_validator')
+
+    def evaluate(ctx: RuleContext):
+        if not ctx.has(field):
+            return None
+        # The validator receives the column and returns a mask of valid values
+        valid = np.asarray(validator(ctx.data[field]), dtype=bool)
+        values = ctx.values(field)
+        return ~valid, lambda pos: {'field': field, 'value': values[pos], 'name': name}
+
+    return evaluate, [field], "{field} '{value}' failed rule {name}"
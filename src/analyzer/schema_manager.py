@@ -4,20 +4,47 @@ Schema Manager for Excel Data Migration
 This module provides schema management capabilities:
 - Load schema from Phase 0 output (reports/supabase_schema.json)
 - Lookup methods for tables, columns, and foreign keys
-- Data validation against schema before insert
+- Data validation against schema before insert, with a compiled validator
+  per table that checks whole columns at once
+- Load plans: tables ordered by their foreign keys into stages that can
+  be loaded concurrently
 """
 
+import re
 import json
 import logging
 from typing import Dict, List, Optional, Any, Set, Tuple
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
 from pathlib import Path
+import numpy as np
 import pandas as pd
 
+from .rule_engine import coerce_float, date_years
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Example values kept per column issue
+MAX_ISSUE_EXAMPLES = 5
+
+# Length limit in types such as varchar(50) or character varying(255)
+TYPE_LENGTH_PATTERN = re.compile(r"char(?:acter)?(?:\s+varying)?\s*\((\d+)\)|varchar\s*\((\d+)\)", re.IGNORECASE)
+
+# Parent tables of migrated tables, used in addition to the foreign keys in
+# the schema (the Phase 0 schema export does not always list them)
+MIGRATION_DEPENDENCIES: Dict[str, List[str]] = {
+    "accounts": ["fiscal_years"],
+    "transactions": ["fiscal_years"],
+    "transaction_lines": ["transactions", "accounts", "projects", "classifications", "work_analysis", "sub_tree"],
+    "opening_balances": ["accounts", "fiscal_years", "projects"],
+}
+
+UUID_PATTERN = r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"
+
+BOOLEAN_TEXT = {"true", "false", "t", "f", "yes", "no", "y", "n", "1", "0", "on", "off"}
+
 
 @dataclass
 class ColumnDefinition:
@@ -51,6 +78,16 @@ class TableSchema:
     description: Optional[str] = None
 
 
+@dataclass
+class ColumnIssue:
+    """Values of one column that failed a schema check"""
+    column: str
+    issue: str  # 'missing_required', 'type_mismatch' or 'too_long'
+    count: int
+    expected: Optional[str] = None
+    examples: List[Tuple[Any, Any]] = field(default_factory=list)  # (row index, value)
+
+
 @dataclass
 class SchemaValidationResult:
     """Result of schema validation"""
@@ -59,6 +96,261 @@ class SchemaValidationResult:
     warnings: List[str] = field(default_factory=list)
     validated_rows: int = 0
     invalid_rows: int = 0
+    column_issues: List[ColumnIssue] = field(default_factory=list)
+
+
+@dataclass
+class LoadPlan:
+    """
+    Order in which tables are loaded, derived from foreign keys.
+    
+    Tables in one stage only depend on tables in earlier stages, so a
+    stage can be loaded concurrently; dependencies lists the parents each
+    table has to wait for.
+    """
+    stages: List[List[str]] = field(default_factory=list)
+    dependencies: Dict[str, List[str]] = field(default_factory=dict)
+    dependents: Dict[str, List[str]] = field(default_factory=dict)
+    cycles: List[List[str]] = field(default_factory=list)
+    
+    @property
+    def tables(self) -> List[str]:
+        """All tables in load order"""
+        return [table for stage in self.stages for table in stage]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert plan to dictionary"""
+        return asdict(self)
+
+
+def type_kind(data_type: str) -> Optional[str]:
+    """
+    Kind of value check for a column type.
+    
+    Returns:
+        'integer', 'numeric', 'boolean', 'date', 'uuid', 'text' or None
+        for types that are not checked
+    """
+    type_lower = data_type.lower()
+    if "int" in type_lower:
+        return "integer"
+    if any(name in type_lower for name in ("float", "decimal", "numeric", "double", "real")):
+        return "numeric"
+    if "bool" in type_lower:
+        return "boolean"
+    if "date" in type_lower or "time" in type_lower:
+        return "date"
+    if "uuid" in type_lower:
+        return "uuid"
+    if any(name in type_lower for name in ("text", "char", "string")):
+        return "text"
+    return None
+
+
+def type_length_limit(data_type: str) -> Optional[int]:
+    """Maximum length of a character type such as varchar(50), if any"""
+    match = TYPE_LENGTH_PATTERN.search(data_type)
+    if not match:
+        return None
+    return int(match.group(1) or match.group(2))
+
+
+class CompiledTableValidator:
+    """
+    Validator for one table, compiled once from its TableSchema.
+    
+    Holds the required columns, the value check per column and the
+    length limits, and validates whole DataFrames column by column.
+    Mismatches are aggregated into one ColumnIssue per column and check.
+    """
+    
+    def __init__(self, table: TableSchema):
+        """
+        Compile validator.
+        
+        Args:
+            table: Schema of the table
+        """
+        self.table_name = table.table_name
+        self.required_columns = [
+            name for name, col_def in table.columns.items()
+            if not col_def.nullable and col_def.default_value is None
+        ]
+        self.type_checks: Dict[str, Tuple[str, str]] = {}
+        self.max_lengths: Dict[str, int] = {}
+        for name, col_def in table.columns.items():
+            kind = type_kind(col_def.data_type)
+            if kind is not None and kind != "text":
+                self.type_checks[name] = (kind, col_def.data_type)
+            limit = type_length_limit(col_def.data_type)
+            if limit is not None:
+                self.max_lengths[name] = limit
+    
+    def validate(self, data: pd.DataFrame) -> SchemaValidationResult:
+        """
+        Validate a DataFrame against the table schema.
+        
+        Rows with a missing required value or a value longer than the
+        column allows are invalid; type mismatches are reported as
+        warnings.
+        
+        Args:
+            data: DataFrame containing data to validate
+            
+        Returns:
+            SchemaValidationResult with counts and examples per column
+        """
+        result = SchemaValidationResult(is_valid=True)
+        if data.empty:
+            result.warnings.append("DataFrame is empty")
+            return result
+        
+        invalid = np.zeros(len(data), dtype=bool)
+        
+        for column in self.required_columns:
+            if column not in data.columns:
+                missing = np.ones(len(data), dtype=bool)
+            else:
+                missing = data[column].isna().to_numpy()
+            if missing.any():
+                invalid |= missing
+                issue = self._issue(data, column, "missing_required", missing)
+                result.column_issues.append(issue)
+                result.errors.append(f"Required column '{column}' is missing or null in {issue.count} rows")
+        
+        for column, limit in self.max_lengths.items():
+            if column not in data.columns:
+                continue
+            series = data[column]
+            present = series.notna().to_numpy()
+            lengths = series.astype(str).str.len().to_numpy(dtype=float, na_value=0)
+            too_long = present & (lengths > limit)
+            if too_long.any():
+                invalid |= too_long
+                issue = self._issue(data, column, "too_long", too_long, expected=f"at most {limit} characters")
+                result.column_issues.append(issue)
+                result.errors.append(f"Column '{column}': {issue.count} values longer than {limit} characters")
+        
+        for column, (kind, data_type) in self.type_checks.items():
+            if column not in data.columns:
+                continue
+            mismatched = _type_mismatches(data[column], kind)
+            if mismatched.any():
+                issue = self._issue(data, column, "type_mismatch", mismatched, expected=data_type)
+                result.column_issues.append(issue)
+                examples = ", ".join(repr(value) for _, value in issue.examples)
+                message = (f"Column '{column}': {issue.count} values may not match expected type "
+                           f"'{data_type}' (e.g. {examples})")
+                result.warnings.append(message)
+                logger.warning(f"{self.table_name}: {message}")
+        
+        result.invalid_rows = int(invalid.sum())
+        result.validated_rows = len(data) - result.invalid_rows
+        if result.invalid_rows > 0:
+            result.is_valid = False
+            result.errors.append(f"{result.invalid_rows} rows failed validation")
+            logger.error(f"{self.table_name}: {result.invalid_rows} rows failed validation")
+        
+        return result
+    
+    @staticmethod
+    def _issue(data: pd.DataFrame, column: str, issue: str, mask: np.ndarray,
+               expected: Optional[str] = None) -> ColumnIssue:
+        """Aggregate the rows of a mask into a ColumnIssue with examples"""
+        positions = np.flatnonzero(mask)[:MAX_ISSUE_EXAMPLES]
+        values = data[column].iloc[positions].tolist() if column in data.columns else [None] * len(positions)
+        return ColumnIssue(
+            column=column,
+            issue=issue,
+            count=int(mask.sum()),
+            expected=expected,
+            examples=list(zip(data.index[positions].tolist(), values))
+        )
+
+
+def _type_mismatches(series: pd.Series, kind: str) -> np.ndarray:
+    """Mask of non-null values that do not convert to a column kind"""
+    present = series.notna().to_numpy()
+    dtype = series.dtype
+    
+    if kind in ("integer", "numeric"):
+        if pd.api.types.is_bool_dtype(dtype):
+            return present
+        numbers, failed = coerce_float(series)
+        if kind == "integer":
+            with np.errstate(invalid="ignore"):
+                failed = failed | (present & np.isfinite(numbers) & (numbers != np.round(numbers)))
+        return present & failed
+    
+    if kind == "date":
+        if pd.api.types.is_datetime64_any_dtype(dtype):
+            return np.zeros(len(series), dtype=bool)
+        _, failed = date_years(series)
+        return present & failed
+    
+    # Text checks: each distinct value is checked once
+    if pd.api.types.is_bool_dtype(dtype):
+        return np.zeros(len(series), dtype=bool) if kind == "boolean" else present
+    codes, uniques = pd.factorize(series)
+    text = pd.Series(np.asarray(uniques, dtype=object)).astype(str).str.strip()
+    if kind == "boolean":
+        unique_ok = np.array([isinstance(v, (bool, np.bool_)) for v in uniques], dtype=bool)
+        unique_ok |= text.str.lower().isin(BOOLEAN_TEXT).to_numpy()
+    else:
+        unique_ok = text.str.fullmatch(UUID_PATTERN).to_numpy(dtype=bool, na_value=False)
+    return present & ~np.append(unique_ok, True)[codes]
+
+
+def strongly_connected_components(graph: Dict[str, Set[str]]) -> List[List[str]]:
+    """
+    Strongly connected components of a dependency graph (Tarjan's algorithm).
+    
+    Iterative, so deep foreign key chains do not hit the recursion limit.
+    
+    Args:
+        graph: Parents per table
+        
+    Returns:
+        Sorted member lists, one per component
+    """
+    index_of: Dict[str, int] = {}
+    lowlink: Dict[str, int] = {}
+    on_stack: Set[str] = set()
+    stack: List[str] = []
+    components: List[List[str]] = []
+    
+    for root in sorted(graph):
+        if root in index_of:
+            continue
+        work = [(root, iter(sorted(graph[root])))]
+        index_of[root] = lowlink[root] = len(index_of)
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, parents = work[-1]
+            parent = next(parents, None)
+            if parent is not None:
+                if parent not in index_of:
+                    index_of[parent] = lowlink[parent] = len(index_of)
+                    stack.append(parent)
+                    on_stack.add(parent)
+                    work.append((parent, iter(sorted(graph.get(parent, ())))))
+                elif parent in on_stack:
+                    lowlink[node] = min(lowlink[node], index_of[parent])
+                continue
+            work.pop()
+            if work:
+                lowlink[work[-1][0]] = min(lowlink[work[-1][0]], lowlink[node])
+            if lowlink[node] == index_of[node]:
+                members = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    members.append(member)
+                    if member == node:
+                        break
+                components.append(sorted(members))
+    return components
 
 
 class SchemaManager:
@@ -79,6 +371,7 @@ class SchemaManager:
         self.schema_file = Path(schema_file)
         self.schema: Dict[str, TableSchema] = {}
         self.loaded = False
+        self._compiled_validators: Dict[str, CompiledTableValidator] = {}
         
         # Load schema
         self.load_schema()
@@ -90,6 +383,7 @@ class SchemaManager:
         Returns:
             True if schema loaded successfully, False otherwise
         """
+        self._compiled_validators = {}
         try:
             if not self.schema_file.exists():
                 logger.warning(f"Schema file not found: {self.schema_file}")
@@ -232,112 +526,129 @@ class SchemaManager:
         
         return referencing_tables
     
-    def validate_data(self, table_name: str, data: pd.DataFrame) -> SchemaValidationResult:
+    def build_dependency_graph(self, tables: Optional[List[str]] = None,
+                               extra_dependencies: Optional[Dict[str, List[str]]] = None
+                               ) -> Dict[str, Set[str]]:
         """
-        Validate data against schema before insert.
+        Build the foreign key graph between tables.
+        
+        Parents come from get_foreign_keys and get_referencing_tables plus
+        extra_dependencies. Self references (e.g. accounts.parent_id) are
+        ignored since they do not order tables.
         
         Args:
-            table_name: Name of the table
-            data: DataFrame containing data to validate
+            tables: Tables to include (default: all tables in the schema)
+            extra_dependencies: Additional parents per table (default: MIGRATION_DEPENDENCIES)
             
         Returns:
-            SchemaValidationResult with validation results
+            Dictionary of table name to the set of its parent tables in the graph
         """
-        result = SchemaValidationResult(is_valid=True)
+        if tables is None:
+            tables = self.get_table_names()
+        if extra_dependencies is None:
+            extra_dependencies = MIGRATION_DEPENDENCIES
+        included = set(tables)
         
-        # Get table schema
-        table = self.get_table(table_name)
-        if not table:
-            result.is_valid = False
-            result.errors.append(f"Table '{table_name}' not found in schema")
-            return result
+        parents: Dict[str, Set[str]] = {table: set() for table in tables}
+        for table in tables:
+            for fk in self.get_foreign_keys(table):
+                parents[table].add(fk.referenced_table)
+            for child, _ in self.get_referencing_tables(table):
+                if child in included:
+                    parents[child].add(table)
+            parents[table].update(extra_dependencies.get(table, []))
         
-        # Check if DataFrame is empty
-        if data.empty:
-            result.warnings.append("DataFrame is empty")
-            return result
+        return {table: {p for p in table_parents if p in included and p != table}
+                for table, table_parents in parents.items()}
+    
+    def build_load_plan(self, tables: Optional[List[str]] = None,
+                        extra_dependencies: Optional[Dict[str, List[str]]] = None) -> LoadPlan:
+        """
+        Order tables into load stages by their foreign keys.
         
-        # Validate each row
-        for idx, row in data.iterrows():
-            row_valid = self._validate_row(table, row, idx)
-            if not row_valid:
-                result.invalid_rows += 1
-            else:
-                result.validated_rows += 1
+        Each stage holds the tables whose parents are all in earlier
+        stages (Kahn's algorithm by level). Tables on a foreign key cycle
+        (a strongly connected component, found with Tarjan's algorithm)
+        are loaded together in one stage, waiting only for their parents
+        outside the cycle; tables that merely depend on a cycle come in
+        later stages.
         
-        # Update overall validity
-        if result.invalid_rows > 0:
-            result.is_valid = False
-            result.errors.append(f"{result.invalid_rows} rows failed validation")
+        Args:
+            tables: Tables to load (default: all tables in the schema)
+            extra_dependencies: Additional parents per table (default: MIGRATION_DEPENDENCIES)
+            
+        Returns:
+            LoadPlan with stages, dependencies and any cycles
+        """
+        graph = self.build_dependency_graph(tables, extra_dependencies)
+        components = strongly_connected_components(graph)
+        component_of = {table: index for index, members in enumerate(components) for table in members}
+        remaining = {
+            index: {component_of[parent] for table in members for parent in graph[table]} - {index}
+            for index, members in enumerate(components)
+        }
+        plan = LoadPlan()
         
-        return result
+        while remaining:
+            ready = [index for index, parents in remaining.items() if not parents]
+            for index in ready:
+                if len(components[index]) > 1:
+                    plan.cycles.append(components[index])
+                    logger.warning(f"Foreign key cycle between tables: {', '.join(components[index])}")
+                del remaining[index]
+            plan.stages.append(sorted(table for index in ready for table in components[index]))
+            for parents in remaining.values():
+                parents.difference_update(ready)
+        plan.cycles.sort()
+        
+        # Edges inside a cycle are dropped: its tables load together
+        for table in plan.tables:
+            parents = sorted(p for p in graph[table] if component_of[p] != component_of[table])
+            plan.dependencies[table] = parents
+            plan.dependents.setdefault(table, [])
+            for parent in parents:
+                plan.dependents.setdefault(parent, []).append(table)
+        
+        logger.info(f"Load plan: {' -> '.join('[' + ', '.join(stage) + ']' for stage in plan.stages)}")
+        return plan
     
-    def _validate_row(self, table: TableSchema, row: pd.Series, row_index: int) -> bool:
+    def get_compiled_validator(self, table_name: str) -> Optional[CompiledTableValidator]:
         """
-        Validate a single row against table schema.
+        Get the compiled validator of a table, compiling it on first use.
         
         Args:
-            table: TableSchema
-            row: Row data as Series
-            row_index: Row index for error reporting
+            table_name: Name of the table
             
         Returns:
-            True if row is valid, False otherwise
+            CompiledTableValidator, or None if the table is not in the schema
         """
-        is_valid = True
-        
-        # Check required columns (non-nullable columns without defaults)
-        for col_name, col_def in table.columns.items():
-            if not col_def.nullable and col_def.default_value is None:
-                if col_name not in row or pd.isna(row[col_name]):
-                    logger.error(f"Row {row_index}: Required column '{col_name}' is missing or null")
-                    is_valid = False
-        
-        # Check data types (simplified validation)
-        for col_name, value in row.items():
-            if pd.isna(value):
-                continue  # Null values are handled by nullable check
-            
-            col_def = table.columns.get(col_name)
-            if col_def:
-                # Basic type checking
-                if not self._check_data_type(value, col_def.data_type):
-                    logger.warning(
-                        f"Row {row_index}: Column '{col_name}' value '{value}' "
-                        f"may not match expected type '{col_def.data_type}'"
-                    )
-                    # Don't fail validation for type warnings
-        
-        return is_valid
+        validator = self._compiled_validators.get(table_name)
+        if validator is None:
+            table = self.get_table(table_name)
+            if table is None:
+                return None
+            validator = CompiledTableValidator(table)
+            self._compiled_validators[table_name] = validator
+        return validator
     
-    def _check_data_type(self, value: Any, expected_type: str) -> bool:
+    def validate_data(self, table_name: str, data: pd.DataFrame) -> SchemaValidationResult:
         """
-        Check if value matches expected data type.
+        Validate data against schema before insert.
         
         Args:
-            value: Value to check
-            expected_type: Expected data type string
+            table_name: Name of the table
+            data: DataFrame containing data to validate
             
         Returns:
-            True if value matches type, False otherwise
-        """
-        # Simplified type checking
-        type_lower = expected_type.lower()
-        
-        if "int" in type_lower:
-            return isinstance(value, (int, float)) and not isinstance(value, bool)
-        elif "float" in type_lower or "decimal" in type_lower or "numeric" in type_lower:
-            return isinstance(value, (int, float))
-        elif "bool" in type_lower or "boolean" in type_lower:
-            return isinstance(value, bool)
-        elif "date" in type_lower or "time" in type_lower:
-            # Check if it's a date-like object
-            return isinstance(value, (str, pd.Timestamp, datetime))
-        elif "text" in type_lower or "varchar" in type_lower or "string" in type_lower:
-            return isinstance(value, str)
-        else:
-            # Unknown type, assume valid
-            return True
+            SchemaValidationResult with validation results
+        """
+        validator = self.get_compiled_validator(table_name)
+        if validator is None:
+            result = SchemaValidationResult(is_valid=False)
+            result.errors.append(f"Table '{table_name}' not found in schema")
+            return result
+        
+        return validator.validate(data)
     
     def get_required_columns(self, table_name: str) -> List[str]:
         """
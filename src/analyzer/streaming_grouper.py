@@ -0,0 +1,364 @@
+"""
+Streaming Transaction Grouper for Excel Data Migration
+
+This module groups transaction lines chunk by chunk:
+- Consume DataFrame chunks (e.g. from ExcelReader.iter_transaction_chunks)
+- Carry the incomplete trailing entry across chunk boundaries
+- Emit transaction headers and annotated lines for complete entries only
+- Detect out-of-order input and fall back to an external sort on disk
+
+Grouping memory is bounded by the chunk size plus the largest journal
+entry instead of the whole file.
+
+Entries are expected in order of entry number and date: numeric entry
+numbers compare as numbers, other entry numbers as text.
+"""
+
+import pickle
+import logging
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+from .transaction_grouper import TransactionGrouper, GroupingResult, parse_entry_dates
+
+logger = logging.getLogger(__name__)
+
+
+# Strategies for input that is not ordered by entry
+UNSORTED_STRATEGIES = ("sort", "raise")
+
+# Rows per block when spilling sorted runs (one block per run is in memory while merging)
+DEFAULT_MERGE_BLOCK_ROWS = 10_000
+
+# Sort key columns added to spilled lines: entry number, entry text, entry date, input position
+ORDER_COLUMNS = ["_order_number", "_order_text", "_order_date", "_order_seq"]
+
+
+class UnsortedInputError(ValueError):
+    """Raised when lines are not ordered by entry and no fallback is allowed"""
+
+
+EntryKey = Tuple[float, str, int]
+
+
+@dataclass
+class StreamingSummary:
+    """Totals of one streaming grouping run"""
+    sorted_input: bool = True
+    chunks: int = 0
+    batches: int = 0
+    line_count: int = 0
+    transaction_count: int = 0
+    balanced_count: int = 0
+    unbalanced_count: int = 0
+    largest_entry_lines: int = 0
+    peak_buffer_rows: int = 0
+    spilled_runs: int = 0
+
+
+def entry_order_keys(lines_df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Order key of every line: (entry number, entry text, entry date).
+
+    Args:
+        lines_df: Lines with entry_no and entry_date (dates already parsed)
+
+    Returns:
+        Tuple of (numbers, texts, dates as int64, valid mask); lines without
+        entry_no or a valid date are not valid and have no position
+    """
+    codes, uniques = pd.factorize(lines_df["entry_no"])
+    unique_text = np.array([str(value) for value in uniques] + [""], dtype=object)
+    unique_numbers = pd.to_numeric(pd.Series(unique_text[:-1], dtype=object), errors="coerce").to_numpy(dtype=float)
+    unique_numbers = np.append(np.where(np.isnan(unique_numbers), np.inf, unique_numbers), np.inf)
+
+    dates = parse_entry_dates(lines_df["entry_date"])
+    valid = (codes >= 0) & dates.notna().to_numpy()
+    date_values = dates.to_numpy(dtype="datetime64[ns]").astype(np.int64)
+    return unique_numbers[codes], unique_text[codes], date_values, valid
+
+
+def _keys_less(left: Tuple[np.ndarray, ...], right: Tuple[np.ndarray, ...]) -> np.ndarray:
+    """Element-wise lexicographic left < right over key component arrays"""
+    less = np.zeros(np.broadcast(*left, *right).shape, dtype=bool)
+    equal = np.ones_like(less)
+    for left_part, right_part in zip(left, right):
+        less |= equal & (left_part < right_part).astype(bool)
+        equal &= (left_part == right_part).astype(bool)
+    return less
+
+
+def _first_disorder(keys: Tuple[np.ndarray, ...], previous: Optional[EntryKey]) -> int:
+    """Position of the first key lower than the key before it (-1 if ordered)"""
+    if len(keys[0]) == 0:
+        return -1
+    if previous is not None and _keys_less(tuple(k[:1] for k in keys), previous)[0]:
+        return 0
+    backwards = np.flatnonzero(_keys_less(tuple(k[1:] for k in keys), tuple(k[:-1] for k in keys)))
+    return int(backwards[0]) + 1 if len(backwards) else -1
+
+
+class StreamingTransactionGrouper:
+    """
+    Groups transaction lines from a stream of chunks.
+
+    Complete entries are grouped with the wrapped TransactionGrouper, so
+    headers, balance checks and transaction ids match the in-memory
+    grouping; only the order of headers follows the input.
+    """
+
+    def __init__(self, grouper: Optional[TransactionGrouper] = None,
+                 spill_dir: Optional[str] = None,
+                 merge_block_rows: int = DEFAULT_MERGE_BLOCK_ROWS):
+        """
+        Initialize streaming grouper.
+
+        Args:
+            grouper: TransactionGrouper used for complete entries (default settings if None)
+            spill_dir: Directory for temporary spill files (system temp dir if None)
+            merge_block_rows: Rows per spilled block read back while merging
+        """
+        self.grouper = grouper or TransactionGrouper()
+        self.spill_dir = spill_dir
+        self.merge_block_rows = merge_block_rows
+        self.summary = StreamingSummary()
+
+    def iter_batches(self, chunks: Iterable[pd.DataFrame], on_unsorted: str = "sort") -> Iterator[GroupingResult]:
+        """
+        Group lines chunk by chunk.
+
+        With on_unsorted='raise' batches are emitted while reading and an
+        UnsortedInputError is raised at the first out-of-order line. With
+        'sort' the chunks are first spilled to disk as sorted runs; ordered
+        input is then streamed back as is, unordered input is merged.
+
+        Args:
+            chunks: DataFrames of transaction lines in file order
+            on_unsorted: 'sort' or 'raise'
+
+        Yields:
+            GroupingResult for the complete entries of each batch
+        """
+        if on_unsorted not in UNSORTED_STRATEGIES:
+            raise ValueError(f"on_unsorted must be one of {UNSORTED_STRATEGIES}: {on_unsorted}")
+
+        self.summary = StreamingSummary()
+        if on_unsorted == "raise":
+            yield from self._stream(chunks)
+            return
+
+        with tempfile.TemporaryDirectory(prefix="grouper_spill_", dir=self.spill_dir) as spill_path:
+            runs, unkeyed_path, ordered = self._spill_runs(chunks, Path(spill_path))
+            chunk_count = self.summary.chunks
+            if ordered:
+                sorted_chunks = (
+                    _concat_lines(blocks).drop(columns=ORDER_COLUMNS)
+                    for blocks in (list(_read_blocks(path)) for path in runs + [unkeyed_path]) if blocks
+                )
+            else:
+                logger.warning("Lines are not ordered by entry; merging sorted runs from disk")
+                sorted_chunks = self._merge_runs(runs, unkeyed_path)
+            yield from self._stream(sorted_chunks)
+            self.summary.chunks = chunk_count
+            self.summary.sorted_input = ordered
+            self.summary.spilled_runs = len(runs)
+
+    def group_chunks(self, chunks: Iterable[pd.DataFrame], on_unsorted: str = "sort") -> GroupingResult:
+        """
+        Group a stream of chunks and combine the batches into one result.
+
+        Convenience for callers that need the whole result in memory.
+        """
+        batches = list(self.iter_batches(chunks, on_unsorted))
+        result = GroupingResult(success=all(batch.success for batch in batches))
+        if batches:
+            headers = [b.transactions_df for b in batches if not b.transactions_df.empty]
+            result.transactions_df = pd.concat(headers or [batches[0].transactions_df], ignore_index=True)
+            result.lines_df = pd.concat([b.lines_df for b in batches])
+        for batch in batches:
+            result.balance_errors.extend(batch.balance_errors)
+            result.errors.extend(batch.errors)
+        result.transaction_count = self.summary.transaction_count
+        result.line_count = self.summary.line_count
+        result.balanced_count = self.summary.balanced_count
+        result.unbalanced_count = self.summary.unbalanced_count
+        if result.unbalanced_count:
+            result.warnings.append(
+                f"Found {result.unbalanced_count} unbalanced transactions (tolerance={self.grouper.tolerance})"
+            )
+        return result
+
+    def _stream(self, chunks: Iterable[pd.DataFrame]) -> Iterator[GroupingResult]:
+        """Single pass over ordered chunks, carrying the trailing entry"""
+        carry: Optional[pd.DataFrame] = None
+        last_key: Optional[EntryKey] = None
+        position = 0
+
+        for chunk in chunks:
+            self.summary.chunks += 1
+            if chunk.empty:
+                continue
+            chunk = chunk.copy()
+            chunk["entry_date"] = parse_entry_dates(chunk["entry_date"])
+            frame = chunk if carry is None else _concat_lines([carry, chunk])
+            self.summary.peak_buffer_rows = max(self.summary.peak_buffer_rows, len(frame))
+
+            numbers, texts, dates, valid = entry_order_keys(frame)
+            keys = (numbers[valid], texts[valid], dates[valid])
+            disorder = _first_disorder(keys, last_key)
+            if disorder >= 0:
+                row = int(np.flatnonzero(valid)[disorder]) - (0 if carry is None else len(carry))
+                raise UnsortedInputError(
+                    f"Entry {keys[1][disorder]} at line {position + row + 1} is out of order"
+                )
+            position += len(chunk)
+            if not valid.any():
+                carry = None
+                yield from self._emit(frame)
+                continue
+
+            # The last entry of the chunk may continue in the next chunk
+            last_key = (keys[0][-1], keys[1][-1], keys[2][-1])
+            tail = valid & (numbers == last_key[0]) & (texts == last_key[1]).astype(bool) & (dates == last_key[2])
+            carry = frame[tail]
+            yield from self._emit(frame[~tail])
+
+        if carry is not None:
+            yield from self._emit(carry)
+
+    def _emit(self, lines_df: pd.DataFrame) -> Iterator[GroupingResult]:
+        """Group complete entries and update the summary"""
+        if lines_df.empty:
+            return
+        batch = self.grouper.group_lines_into_transactions(lines_df)
+        self.summary.batches += 1
+        self.summary.line_count += batch.line_count
+        self.summary.transaction_count += batch.transaction_count
+        self.summary.balanced_count += batch.balanced_count
+        self.summary.unbalanced_count += batch.unbalanced_count
+        if batch.transactions_df is not None and not batch.transactions_df.empty:
+            self.summary.largest_entry_lines = max(
+                self.summary.largest_entry_lines, int(batch.transactions_df["line_count"].max())
+            )
+        yield batch
+
+    def _spill_runs(self, chunks: Iterable[pd.DataFrame], spill_path: Path) -> Tuple[List[Path], Path, bool]:
+        """
+        Write every chunk to disk as a sorted run and check the input order.
+
+        Lines without a valid entry key go to a separate file; they belong
+        to no transaction and are emitted last.
+
+        Returns:
+            Tuple of (run paths, path of unkeyed lines, whether input was ordered)
+        """
+        runs: List[Path] = []
+        unkeyed_path = spill_path / "unkeyed.pkl"
+        ordered = True
+        last_key: Optional[EntryKey] = None
+        position = 0
+
+        with open(unkeyed_path, "wb") as unkeyed_file:
+            for chunk in chunks:
+                self.summary.chunks += 1
+                if chunk.empty:
+                    continue
+                chunk = chunk.copy()
+                chunk["entry_date"] = parse_entry_dates(chunk["entry_date"])
+                numbers, texts, dates, valid = entry_order_keys(chunk)
+                chunk["_order_number"] = numbers
+                chunk["_order_text"] = texts
+                chunk["_order_date"] = dates
+                chunk["_order_seq"] = np.arange(position, position + len(chunk), dtype=np.int64)
+                position += len(chunk)
+
+                if ordered and valid.any():
+                    keys = (numbers[valid], texts[valid], dates[valid])
+                    if _first_disorder(keys, last_key) >= 0:
+                        ordered = False
+                    last_key = (keys[0][-1], keys[1][-1], keys[2][-1])
+
+                run_path = spill_path / f"run_{len(runs):05d}.pkl"
+                _write_blocks(run_path, chunk[valid].sort_values(ORDER_COLUMNS, kind="stable"), self.merge_block_rows)
+                runs.append(run_path)
+                if not valid.all():
+                    pickle.dump(chunk[~valid], unkeyed_file, protocol=pickle.HIGHEST_PROTOCOL)
+
+        return runs, unkeyed_path, ordered
+
+    def _merge_runs(self, runs: List[Path], unkeyed_path: Path) -> Iterator[pd.DataFrame]:
+        """
+        K-way merge of sorted runs, one block per run in memory.
+
+        Each round emits every buffered line up to the smallest of the
+        buffers' last keys, so the output is globally ordered.
+        """
+        readers = [_read_blocks(run) for run in runs]
+        buffers: List[Optional[pd.DataFrame]] = [next(reader, None) for reader in readers]
+
+        while any(buffer is not None for buffer in buffers):
+            active = [i for i, buffer in enumerate(buffers) if buffer is not None]
+            bound = min(tuple(buffers[i][ORDER_COLUMNS].iloc[-1]) for i in active)
+
+            taken = []
+            for i in active:
+                buffer = buffers[i]
+                upto = ~_keys_less(tuple(np.array([value], dtype=object) for value in bound),
+                                   tuple(buffer[column].to_numpy() for column in ORDER_COLUMNS))
+                count = int(upto.sum())
+                taken.append(buffer.iloc[:count])
+                buffers[i] = buffer.iloc[count:] if count < len(buffer) else next(readers[i], None)
+
+            merged = _concat_lines(taken).sort_values(ORDER_COLUMNS, kind="stable")
+            yield merged.drop(columns=ORDER_COLUMNS)
+
+        for block in _read_blocks(unkeyed_path):
+            yield block.drop(columns=ORDER_COLUMNS)
+
+
+def _concat_lines(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenate line frames keeping the attrs (minor-unit scales) of the first"""
+    combined = pd.concat(frames)
+    combined.attrs = dict(frames[0].attrs)
+    return combined
+
+
+def _write_blocks(path: Path, data: pd.DataFrame, block_rows: int) -> None:
+    """Write a DataFrame as consecutive pickled blocks"""
+    with open(path, "wb") as f:
+        for start in range(0, max(len(data), 1), block_rows):
+            block = data.iloc[start:start + block_rows]
+            block.attrs = dict(data.attrs)
+            pickle.dump(block, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _read_blocks(path: Path) -> Iterator[pd.DataFrame]:
+    """Read the blocks written by _write_blocks, skipping empty ones"""
+    with open(path, "rb") as f:
+        while True:
+            try:
+                block = pickle.load(f)
+            except EOFError:
+                return
+            if not block.empty:
+                yield block
+
+
+# Factory function for easy creation
+def create_streaming_grouper(grouper: Optional[TransactionGrouper] = None,
+                             spill_dir: Optional[str] = None) -> StreamingTransactionGrouper:
+    """
+    Factory function to create streaming transaction grouper.
+
+    Args:
+        grouper: TransactionGrouper used for complete entries
+        spill_dir: Directory for temporary spill files
+
+    Returns:
+        StreamingTransactionGrouper instance
+    """
+    return StreamingTransactionGrouper(grouper, spill_dir)
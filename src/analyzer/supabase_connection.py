@@ -6,6 +6,7 @@ This module provides enhanced connection management for Supabase with:
 - Connection testing with retry logic
 - Schema caching for performance
 - Query builders for common operations
+- Paginated reads, keyed lookups, row counts and RPC calls
 - Transaction management for batch operations
 """
 
@@ -13,7 +14,7 @@ import os
 import json
 import logging
 import time
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, Iterator, List, Optional, Any, Union
 from dataclasses import dataclass, asdict
 from datetime import datetime
 import pandas as pd
@@ -26,6 +27,10 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+# Rows per page of paginated reads (PostgREST returns at most 1000 rows by default)
+DEFAULT_PAGE_SIZE = 1000
+
+
 @dataclass
 class ConnectionConfig:
     """Configuration for Supabase connection"""
@@ -290,6 +295,125 @@ class SupabaseConnectionManager:
             logger.error(f"Query execution failed: {str(e)}")
             raise
     
+    def iter_pages(
+        self,
+        table: str,
+        columns: str = "*",
+        filters: Optional[Dict[str, Any]] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        order: str = "id"
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Read a table page by page.
+        
+        Pages are ordered so that consecutive ranges neither skip nor
+        repeat rows; only one page is held in memory at a time.
+        
+        Args:
+            table: Table name
+            columns: Columns to select
+            filters: Equality filters (column → value)
+            page_size: Rows per request
+            order: Column giving a stable order
+            
+        Yields:
+            Lists of row dictionaries
+        """
+        if not self.client or not self.is_connected:
+            self.connect()
+        
+        start = 0
+        while True:
+            query = self.client.table(table).select(columns)
+            for key, value in (filters or {}).items():
+                query = query.eq(key, value)
+            page = query.order(order).range(start, start + page_size - 1).execute().data or []
+            if page:
+                yield page
+            if len(page) < page_size:
+                return
+            start += page_size
+    
+    def count_rows(self, table: str, filters: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Count rows of a table without reading them.
+        
+        Args:
+            table: Table name
+            filters: Equality filters (column → value)
+        
+        Returns:
+            Number of matching rows
+        """
+        if not self.client or not self.is_connected:
+            self.connect()
+        
+        query = self.client.table(table).select("id", count="exact")
+        for key, value in (filters or {}).items():
+            query = query.eq(key, value)
+        return query.limit(1).execute().count or 0
+    
+    def select_in(
+        self,
+        table: str,
+        column: str,
+        values: List[Any],
+        columns: str = "*",
+        filters: Optional[Dict[str, Any]] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        order: str = "id"
+    ) -> List[Dict[str, Any]]:
+        """
+        Read the rows whose column is one of values.
+        
+        Callers keep values short enough for one request URL (see
+        chunk_by_url_length in account_code_mapper). Matching rows are read
+        page by page until a short page comes back, so the server's row
+        limit per response cannot truncate the result.
+        
+        Args:
+            table: Table name
+            column: Column matched with in.(...)
+            values: Values to match
+            columns: Columns to select
+            filters: Further equality filters (column → value)
+            page_size: Rows per request (at most the server's row limit)
+            order: Column giving a stable order
+            
+        Returns:
+            List of row dictionaries
+        """
+        if not self.client or not self.is_connected:
+            self.connect()
+        
+        rows: List[Dict[str, Any]] = []
+        start = 0
+        while True:
+            query = self.client.table(table).select(columns)
+            for key, value in (filters or {}).items():
+                query = query.eq(key, value)
+            page = query.in_(column, values).order(order).range(start, start + page_size - 1).execute().data or []
+            rows.extend(page)
+            if len(page) < page_size:
+                return rows
+            start += page_size
+    
+    def call_rpc(self, function: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        Call a database function.
+        
+        Args:
+            function: Function name
+            params: Named function arguments
+            
+        Returns:
+            Rows returned by the function
+        """
+        if not self.client or not self.is_connected:
+            self.connect()
+        
+        return self.client.rpc(function, params or {}).execute().data
+    
     def execute_batch(self, table: str, operations: List[Dict[str, Any]]) -> List[Any]:
         """
         Execute batch operations within a transaction.
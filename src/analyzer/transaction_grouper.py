@@ -4,7 +4,7 @@ Transaction Grouper for Excel Data Migration
 This module provides transaction grouping capabilities:
 - Group Excel lines by (entry_no, entry_date) to identify unique transactions
 - Generate transaction headers with aggregated data
-- Validate transaction balance (debit == credit)
+- Validate transaction balance (debit == credit) on exact int64 minor units
 - Handle unbalanced transactions with configurable strategies
 """
 
@@ -15,10 +15,22 @@ from datetime import datetime
 import pandas as pd
 import numpy as np
 
+from .money import (
+    get_currency_scale,
+    tolerance_to_minor_units,
+    to_minor_units,
+    from_minor_units,
+    rescale_minor_units
+)
+from .dtype_plan import MINOR_UNIT_SCALES_ATTR
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# transaction_lines amounts are numeric(15,4): lines and balances are kept at least at this scale
+SOURCE_AMOUNT_SCALE = 4
+
 
 @dataclass
 class TransactionHeader:
@@ -70,17 +82,56 @@ class TransactionGrouper:
     2. Generates transaction headers with aggregated data
     3. Validates transaction balance (debit == credit)
     4. Handles unbalanced transactions
+    
+    Amounts are summed as int64 minor units, so totals are exact and the
+    balance check compares integers.
     """
     
-    def __init__(self, tolerance: float = 0.01):
+    def __init__(self, tolerance: float = 0.01,
+                 currency: Optional[str] = None,
+                 scale: Optional[int] = None,
+                 exact_balance: bool = False):
         """
         Initialize transaction grouper.
         
         Args:
             tolerance: Balance tolerance in currency units (default: 0.01)
+            currency: ISO currency code used to pick the scale (default scale if None)
+            scale: Decimal places of the minor units (overrides currency)
+            exact_balance: Require debit == credit exactly (ignores tolerance)
+        """
+        self.scale = scale if scale is not None else get_currency_scale(currency)
+        self.exact_balance = exact_balance
+        self.tolerance = 0.0 if exact_balance else tolerance
+        logger.info(
+            f"Initialized TransactionGrouper with tolerance={self.tolerance}, scale={self.scale}, "
+            f"exact_balance={exact_balance}"
+        )
+    
+    def _resolve_scale(self, lines_df: pd.DataFrame) -> int:
+        """
+        Scale used for a DataFrame: the grouper scale, widened to the source
+        column precision and to the scale of amount columns already stored
+        as minor units so no digits are lost.
+        """
+        column_scales = lines_df.attrs.get(MINOR_UNIT_SCALES_ATTR, {})
+        return max([self.scale, SOURCE_AMOUNT_SCALE]
+                   + [column_scales[c] for c in ('debit', 'credit') if c in column_scales])
+    
+    def _amount_units(self, lines_df: pd.DataFrame, column: str, scale: int) -> pd.Series:
+        """
+        Get an amount column as int64 minor units at the given scale.
+        
+        Columns already stored as minor units (listed in the DataFrame
+        attrs by the dtype plan) are rescaled; others are parsed exactly.
+        Unparseable and missing amounts count as zero.
         """
-        self.tolerance = tolerance
-        logger.info(f"Initialized TransactionGrouper with tolerance={tolerance}")
+        column_scale = lines_df.attrs.get(MINOR_UNIT_SCALES_ATTR, {}).get(column)
+        if column_scale is None:
+            units = to_minor_units(lines_df[column], scale)
+        else:
+            units = rescale_minor_units(lines_df[column].astype("Int64"), column_scale, scale)
+        return units.fillna(0).astype("int64")
     
     def group_lines_into_transactions(self, lines_df: pd.DataFrame) -> GroupingResult:
         """
@@ -111,78 +162,69 @@ class TransactionGrouper:
             # Create a copy to avoid modifying original
             lines_copy = lines_df.copy()
             
-            # Ensure numeric types for debit and credit
-            lines_copy['debit'] = pd.to_numeric(lines_copy['debit'], errors='coerce').fillna(0)
-            lines_copy['credit'] = pd.to_numeric(lines_copy['credit'], errors='coerce').fillna(0)
+            # Exact minor units for the totals
+            scale = self._resolve_scale(lines_copy)
+            tolerance_units = tolerance_to_minor_units(self.tolerance, scale)
+            debit_units = self._amount_units(lines_copy, 'debit', scale)
+            credit_units = self._amount_units(lines_copy, 'credit', scale)
+            
+            # Line amounts from the same minor units as the totals, so lines and headers agree
+            lines_copy.attrs.pop(MINOR_UNIT_SCALES_ATTR, None)
+            lines_copy['debit'] = from_minor_units(debit_units, scale)
+            lines_copy['credit'] = from_minor_units(credit_units, scale)
             
             # Ensure entry_date is datetime
-            lines_copy['entry_date'] = pd.to_datetime(lines_copy['entry_date'], errors='coerce')
+            lines_copy['entry_date'] = parse_entry_dates(lines_copy['entry_date'])
+            
+            # Group by entry_no and entry_date in one aggregation pass
+            lines_copy['_debit_units'] = debit_units
+            lines_copy['_credit_units'] = credit_units
+            grouped = lines_copy.groupby(['entry_no', 'entry_date'], sort=True)
+            totals = grouped.agg(
+                total_debit_units=('_debit_units', 'sum'),
+                total_credit_units=('_credit_units', 'sum'),
+                line_count=('_debit_units', 'size')
+            )
             
-            # Group by entry_no and entry_date
-            grouped = lines_copy.groupby(['entry_no', 'entry_date'], as_index=False)
+            # Exact integer balance check
+            diff_units = (totals['total_debit_units'] - totals['total_credit_units']).abs()
+            is_balanced = diff_units <= tolerance_units
+            
+            transactions_df = pd.DataFrame({
+                'reference_number': _level_text(totals.index, 0),
+                'transaction_date': totals.index.get_level_values('entry_date'),
+                'fiscal_year': self._first_values(lines_copy, grouped, totals.index, 'fiscal_year'),
+                'month': self._first_values(lines_copy, grouped, totals.index, 'month'),
+                'total_debit': totals['total_debit_units'].to_numpy() / 10 ** scale,
+                'total_credit': totals['total_credit_units'].to_numpy() / 10 ** scale,
+                'line_count': totals['line_count'].to_numpy(),
+                'is_balanced': is_balanced.to_numpy(),
+                'balance_difference': diff_units.to_numpy() / 10 ** scale,
+                'notes': self._joined_notes(lines_copy, totals.index)
+            })
+            
+            # Errors only for unbalanced transactions
+            unbalanced = transactions_df[~transactions_df['is_balanced']]
+            balance_errors = [
+                BalanceValidationError(
+                    entry_no=entry_no,
+                    entry_date=entry_date,
+                    total_debit=total_debit,
+                    total_credit=total_credit,
+                    difference=difference,
+                    line_count=int(line_count)
+                )
+                for entry_no, entry_date, total_debit, total_credit, difference, line_count in zip(
+                    unbalanced['reference_number'], unbalanced['transaction_date'],
+                    unbalanced['total_debit'], unbalanced['total_credit'],
+                    unbalanced['balance_difference'], unbalanced['line_count']
+                )
+            ]
             
-            # Create transaction headers
-            transactions_data = []
-            balance_errors = []
+            lines_copy = lines_copy.drop(columns=['_debit_units', '_credit_units'])
             
-            for (entry_no, entry_date), group in grouped:
-                # Calculate aggregates
-                total_debit = group['debit'].sum()
-                total_credit = group['credit'].sum()
-                line_count = len(group)
-                
-                # Calculate balance difference
-                balance_diff = abs(total_debit - total_credit)
-                is_balanced = balance_diff <= self.tolerance
-                
-                # Get fiscal year and month from first line
-                fiscal_year = group['fiscal_year'].iloc[0] if 'fiscal_year' in group.columns else None
-                month = group['month'].iloc[0] if 'month' in group.columns else None
-                
-                # Aggregate notes
-                notes = None
-                if 'notes' in group.columns:
-                    notes_list = group['notes'].dropna().unique().tolist()
-                    if notes_list:
-                        notes = '; '.join(str(n) for n in notes_list)
-                
-                # Create transaction header
-                transaction = {
-                    'reference_number': str(entry_no),
-                    'transaction_date': entry_date,
-                    'fiscal_year': fiscal_year,
-                    'month': month,
-                    'total_debit': total_debit,
-                    'total_credit': total_credit,
-                    'line_count': line_count,
-                    'is_balanced': is_balanced,
-                    'balance_difference': balance_diff,
-                    'notes': notes
-                }
-                
-                transactions_data.append(transaction)
-                
-                # Track unbalanced transactions
-                if not is_balanced:
-                    balance_errors.append(BalanceValidationError(
-                        entry_no=str(entry_no),
-                        entry_date=entry_date,
-                        total_debit=total_debit,
-                        total_credit=total_credit,
-                        difference=balance_diff,
-                        line_count=line_count
-                    ))
-            
-            # Create transactions DataFrame
-            transactions_df = pd.DataFrame(transactions_data)
-            
-            # Add transaction_id to lines (for FK reference)
-            # Create a mapping of (entry_no, entry_date) to transaction_id
-            lines_copy['transaction_id'] = lines_copy.apply(
-                lambda row: f"{row['entry_no']}_{row['entry_date'].strftime('%Y%m%d')}" 
-                if pd.notna(row['entry_date']) else None,
-                axis=1
-            )
+            # Add transaction_id to lines (for FK reference): "<entry_no>_<YYYYMMDD>"
+            lines_copy['transaction_id'] = build_transaction_ids(lines_copy['entry_no'], lines_copy['entry_date'])
             
             # Update result
             result.success = True
@@ -209,6 +251,42 @@ class TransactionGrouper:
         
         return result
     
+    @staticmethod
+    def _first_values(lines_df: pd.DataFrame, grouped: Any, keys: pd.MultiIndex, column: str) -> List[Any]:
+        """Value of a column on the first line of each group (None if the column is missing)"""
+        if column not in lines_df.columns:
+            return [None] * len(keys)
+        first = lines_df.loc[grouped.cumcount().to_numpy() == 0, ['entry_no', 'entry_date', column]]
+        first = first.dropna(subset=['entry_no', 'entry_date']).set_index(['entry_no', 'entry_date'])[column]
+        return first.reindex(keys).tolist()
+    
+    @staticmethod
+    def _joined_notes(lines_df: pd.DataFrame, keys: pd.MultiIndex) -> List[Optional[str]]:
+        """Distinct notes of each group in order of appearance, joined with '; '"""
+        joined: List[Optional[str]] = [None] * len(keys)
+        if 'notes' not in lines_df.columns:
+            return joined
+        notes = lines_df.loc[lines_df['notes'].notna(), ['entry_no', 'entry_date', 'notes']]
+        notes = notes.dropna(subset=['entry_no', 'entry_date']).drop_duplicates()
+        if notes.empty:
+            return joined
+        
+        # Group position of each note, keeping the order of appearance within a group
+        group_ids = keys.get_indexer(pd.MultiIndex.from_frame(notes[['entry_no', 'entry_date']]))
+        order = np.argsort(group_ids, kind='stable')
+        group_ids = group_ids[order]
+        codes, uniques = pd.factorize(notes['notes'])
+        text = np.array([str(n) for n in uniques], dtype=object)[codes[order]]
+        
+        # Concatenate each group's notes in a single reduceat pass
+        starts = np.ones(len(group_ids), dtype=bool)
+        starts[1:] = group_ids[1:] != group_ids[:-1]
+        pieces = np.where(starts, text, '; ' + text)
+        start_positions = np.flatnonzero(starts)
+        for group_id, value in zip(group_ids[start_positions], np.add.reduceat(pieces, start_positions)):
+            joined[group_id] = value
+        return joined
+    
     def validate_transaction_balance(self, grouped_result: GroupingResult) -> Dict[str, Any]:
         """
         Validate transaction balance for all transactions.
@@ -255,7 +333,8 @@ class TransactionGrouper:
             validation_result["summary"] = {
                 "status": "BALANCED" if validation_result["unbalanced_transactions"] == 0 else "UNBALANCED",
                 "balance_rate": f"{balance_rate:.1f}%",
-                "tolerance": self.tolerance
+                "tolerance": self.tolerance,
+                "exact_balance": self.exact_balance
             }
             
             logger.info(f"Balance validation: {validation_result['balanced_transactions']}/{validation_result['total_transactions']} balanced")
@@ -311,55 +390,10 @@ class TransactionGrouper:
                 
                 logger.info(f"Auto-balancing {grouped_result.unbalanced_count} transactions")
                 
-                # Add balancing entries for unbalanced transactions
-                balancing_lines = []
-                
-                for error in grouped_result.balance_errors:
-                    if error.difference > self.tolerance:
-                        # Create balancing line with all required columns
-                        if error.total_debit > error.total_credit:
-                            # Add credit to balance
-                            balancing_line = {
-                                'entry_no': error.entry_no,
-                                'entry_date': error.entry_date,
-                                'fiscal_year': None,  # Will be filled from existing lines
-                                'month': None,  # Will be filled from existing lines
-                                'account_code': 'SUSPENSE',
-                                'account_id': suspense_account_id,
-                                'debit': 0.0,
-                                'credit': error.difference,
-                                'notes': f'Auto-balancing entry for transaction {error.entry_no}'
-                            }
-                        else:
-                            # Add debit to balance
-                            balancing_line = {
-                                'entry_no': error.entry_no,
-                                'entry_date': error.entry_date,
-                                'fiscal_year': None,  # Will be filled from existing lines
-                                'month': None,  # Will be filled from existing lines
-                                'account_code': 'SUSPENSE',
-                                'account_id': suspense_account_id,
-                                'debit': error.difference,
-                                'credit': 0.0,
-                                'notes': f'Auto-balancing entry for transaction {error.entry_no}'
-                            }
-                        
-                        balancing_lines.append(balancing_line)
+                # One balancing line per unbalanced transaction, on the lighter side
+                balancing_df = self._balancing_lines(grouped_result, suspense_account_id)
                 
-                # Add balancing lines to lines_df
-                if balancing_lines:
-                    balancing_df = pd.DataFrame(balancing_lines)
-                    
-                    # Fill in fiscal_year and month from existing lines
-                    for idx, row in balancing_df.iterrows():
-                        entry_no = row['entry_no']
-                        matching_lines = grouped_result.lines_df[grouped_result.lines_df['entry_no'] == entry_no]
-                        if not matching_lines.empty:
-                            if 'fiscal_year' in matching_lines.columns:
-                                balancing_df.at[idx, 'fiscal_year'] = matching_lines.iloc[0]['fiscal_year']
-                            if 'month' in matching_lines.columns:
-                                balancing_df.at[idx, 'month'] = matching_lines.iloc[0]['month']
-                    
+                if not balancing_df.empty:
                     # Ensure all columns from lines_df exist in balancing_df
                     for col in grouped_result.lines_df.columns:
                         if col not in balancing_df.columns:
@@ -391,6 +425,43 @@ class TransactionGrouper:
         
         return grouped_result
     
+    @staticmethod
+    def _balancing_lines(grouped_result: GroupingResult, suspense_account_id: str) -> pd.DataFrame:
+        """
+        Build the suspense-account lines that balance every unbalanced transaction.
+        
+        fiscal_year and month are copied from the first line of each entry
+        with a single merge.
+        """
+        transactions_df = grouped_result.transactions_df
+        unbalanced = transactions_df[~transactions_df['is_balanced'] & (transactions_df['balance_difference'] > 0)]
+        
+        entry_no = unbalanced['reference_number'].astype(object).to_numpy()
+        difference = unbalanced['balance_difference'].to_numpy(dtype=float)
+        credit_side = (unbalanced['total_debit'] > unbalanced['total_credit']).to_numpy()
+        
+        balancing_df = pd.DataFrame({
+            'entry_no': entry_no,
+            'entry_date': unbalanced['transaction_date'].to_numpy(),
+            'account_code': 'SUSPENSE',
+            'account_id': suspense_account_id,
+            'debit': np.where(credit_side, 0.0, difference),
+            'credit': np.where(credit_side, difference, 0.0),
+            'notes': 'Auto-balancing entry for transaction ' + entry_no.astype(str).astype(object)
+        })
+        
+        # Fill in fiscal_year and month from the first existing line of each entry
+        lines_df = grouped_result.lines_df
+        attributes = [column for column in ('fiscal_year', 'month') if column in lines_df.columns]
+        if attributes:
+            codes, uniques = pd.factorize(lines_df['entry_no'])
+            first_lines = lines_df[attributes].assign(
+                entry_no=np.array([str(value) for value in uniques] + [None], dtype=object)[codes]
+            ).drop_duplicates('entry_no').dropna(subset=['entry_no'])
+            balancing_df = balancing_df.merge(first_lines, on='entry_no', how='left')
+        
+        return balancing_df
+    
     def export_balance_report(self, grouped_result: GroupingResult, output_path: str) -> bool:
         """
         Export balance validation report to CSV.
@@ -470,15 +541,70 @@ class TransactionGrouper:
             return False
 
 
+def _level_text(index: pd.MultiIndex, level: int) -> np.ndarray:
+    """String form of one level of a MultiIndex, converting each distinct value once"""
+    labels = np.array([str(value) for value in index.levels[level]], dtype=object)
+    return labels[index.codes[level]]
+
+
+def parse_entry_dates(values: pd.Series) -> pd.Series:
+    """
+    Convert entry dates to datetime64 (invalid dates become NaT).
+    
+    Each distinct value is parsed once, in order of first appearance, so
+    the result matches pd.to_datetime(values, errors='coerce').
+    """
+    if pd.api.types.is_datetime64_any_dtype(values.dtype):
+        return values
+    codes, uniques = pd.factorize(values)
+    parsed = pd.to_datetime(pd.Series(np.asarray(uniques, dtype=object)), errors='coerce')
+    if not pd.api.types.is_datetime64_any_dtype(parsed.dtype):
+        return pd.to_datetime(values, errors='coerce')
+    parsed_values = np.append(parsed.to_numpy(), np.datetime64('NaT'))
+    return pd.Series(parsed_values[codes], index=values.index, name=values.name)
+
+
+def build_transaction_ids(entry_no: pd.Series, entry_date: pd.Series) -> pd.Series:
+    """
+    Build transaction ids "<entry_no>_<YYYYMMDD>" for every line.
+    
+    Each distinct entry number is converted to text once; lines without a
+    valid date get None.
+    
+    Args:
+        entry_no: Entry numbers
+        entry_date: Entry dates (datetime64)
+        
+    Returns:
+        Series of transaction ids (object dtype)
+    """
+    codes, uniques = pd.factorize(entry_no)
+    entry_text = np.array([str(value) for value in uniques] + ['nan'], dtype=object)[codes]
+    
+    dates = parse_entry_dates(entry_date)
+    valid = dates.notna().to_numpy()
+    day_numbers = (dates.dt.year * 10000 + dates.dt.month * 100 + dates.dt.day).to_numpy(dtype=float, na_value=np.nan)
+    
+    ids = np.full(len(entry_no), None, dtype=object)
+    ids[valid] = entry_text[valid] + '_' + day_numbers[valid].astype(np.int64).astype(str).astype(object)
+    return pd.Series(ids, index=entry_no.index, dtype=object)
+
+
 # Factory function for easy creation
-def create_transaction_grouper(tolerance: float = 0.01) -> TransactionGrouper:
+def create_transaction_grouper(tolerance: float = 0.01,
+                               currency: Optional[str] = None,
+                               scale: Optional[int] = None,
+                               exact_balance: bool = False) -> TransactionGrouper:
     """
     Factory function to create transaction grouper.
     
     Args:
         tolerance: Balance tolerance in currency units
+        currency: ISO currency code used to pick the scale
+        scale: Decimal places of the minor units (overrides currency)
+        exact_balance: Require debit == credit exactly
         
     Returns:
         TransactionGrouper instance
     """
-    return TransactionGrouper(tolerance)
+    return TransactionGrouper(tolerance, currency, scale, exact_balance)
@@ -0,0 +1,275 @@
+"""
+Validation Cache for Excel Data Migration
+
+This module supports incremental re-validation between runs:
+- A content fingerprint per row (hash of the mapped values)
+- The findings of the last run, stored with the row fingerprints
+- Cache entries keyed by rule-set version, columns and valid-code sets
+- A diff of rows and findings since the last run
+
+Rows whose fingerprint was seen in the last run reuse its findings;
+only new or edited rows, and rows referencing codes whose validity
+changed, have to be validated again.
+"""
+
+import json
+import pickle
+import logging
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+# Bump when the cache file layout changes
+CACHE_FORMAT_VERSION = 1
+
+
+def row_fingerprints(data: pd.DataFrame) -> np.ndarray:
+    """
+    Hash the values of every row.
+
+    The hash covers the values and column order, not the index, so a row
+    keeps its fingerprint when rows above it are inserted or deleted.
+
+    Args:
+        data: DataFrame with mapped column names
+
+    Returns:
+        uint64 array with one fingerprint per row
+    """
+    if len(data.columns) == 0:
+        return np.zeros(len(data), dtype=np.uint64)
+    return pd.util.hash_pandas_object(data, index=False).to_numpy(dtype=np.uint64)
+
+
+def match_rows(previous: np.ndarray, current: np.ndarray) -> np.ndarray:
+    """
+    Find a row of the previous run with the same fingerprint for every current row.
+
+    Args:
+        previous: Fingerprints of the previous run
+        current: Fingerprints of the current run
+
+    Returns:
+        Previous row position per current row (-1 for rows not seen before)
+    """
+    source = np.full(len(current), -1, dtype=np.int64)
+    if len(previous) == 0 or len(current) == 0:
+        return source
+
+    unique, first_position = np.unique(previous, return_index=True)
+    index = np.minimum(np.searchsorted(unique, current), len(unique) - 1)
+    matched = unique[index] == current
+    source[matched] = first_position[index[matched]]
+    return source
+
+
+def changed_codes(previous: Optional[Set[str]], current: Optional[Set[str]]) -> Optional[Set[str]]:
+    """
+    Codes whose validity differs between two valid-code sets.
+
+    Returns:
+        Set of added and removed codes, or None when the check was switched
+        on or off (every row using the column is affected)
+    """
+    if previous is None and current is None:
+        return set()
+    if previous is None or current is None:
+        return None
+    return set(previous) ^ set(current)
+
+
+def take_payload(payload: Dict[str, Any], source: np.ndarray) -> Dict[str, Any]:
+    """
+    Select the findings of reused rows from a stored FindingStore payload.
+
+    Args:
+        payload: Payload of the previous run (see FindingStore.to_payload)
+        source: Previous row position per current row (-1 for rows not reused)
+
+    Returns:
+        Payload with positions of the current frame
+    """
+    reused = np.flatnonzero(source >= 0)
+    previous_positions = source[reused]
+
+    blocks = []
+    for field_name, finding_type, positions, columns in payload["blocks"]:
+        positions = np.asarray(positions, dtype=np.int64)
+        if len(positions) == 0 or len(reused) == 0:
+            continue
+        index = np.minimum(np.searchsorted(positions, previous_positions), len(positions) - 1)
+        hit = positions[index] == previous_positions
+        if not hit.any():
+            continue
+        taken = index[hit]
+        blocks.append((
+            field_name,
+            finding_type,
+            reused[hit],
+            {key: [values[i] for i in taken] for key, values in columns.items()}
+        ))
+    # Individual findings carry fixed row numbers and are never reused
+    return {"blocks": blocks, "appended": []}
+
+
+def _finding_counts(payload: Dict[str, Any], fingerprints: np.ndarray) -> pd.Series:
+    """Number of findings per (row fingerprint, field, type) in a payload"""
+    frames = [
+        pd.DataFrame({
+            "fingerprint": fingerprints[np.asarray(positions, dtype=np.int64)],
+            "field_name": field_name,
+            "type": finding_type
+        })
+        for field_name, finding_type, positions, _ in payload["blocks"]
+        if len(positions)
+    ]
+    if not frames:
+        frames = [pd.DataFrame({"fingerprint": np.array([], dtype=np.uint64), "field_name": [], "type": []})]
+    return pd.concat(frames, ignore_index=True).groupby(["fingerprint", "field_name", "type"]).size()
+
+
+def diff_findings(current: Dict[str, Any], current_fingerprints: np.ndarray,
+                  previous: Dict[str, Any], previous_fingerprints: np.ndarray
+                  ) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """
+    Compare the findings of two runs by row content.
+
+    A finding is identified by the fingerprint of its row, its field and
+    its type, so moved rows do not count as changes.
+
+    Returns:
+        Tuple of (new findings per type, resolved findings per type)
+    """
+    delta = _finding_counts(current, current_fingerprints).sub(
+        _finding_counts(previous, previous_fingerprints), fill_value=0
+    )
+    new = delta[delta > 0].groupby(level="type").sum()
+    resolved = -delta[delta < 0].groupby(level="type").sum()
+    return ({str(k): int(v) for k, v in new.items()},
+            {str(k): int(v) for k, v in resolved.items()})
+
+
+@dataclass
+class ValidationDiff:
+    """Changes since the last validation run"""
+    previous_run: Optional[str]
+    full_revalidation: bool
+    reason: Optional[str]
+    total_rows: int
+    reused_rows: int
+    revalidated_rows: int
+    new_rows: int
+    reference_affected_rows: int
+    removed_rows: int
+    new_findings: Dict[str, int] = field(default_factory=dict)
+    resolved_findings: Dict[str, int] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert diff to dictionary"""
+        return asdict(self)
+
+
+@dataclass
+class CachedRun:
+    """Fingerprints and findings of one validation run"""
+    key: Dict[str, Any]
+    valid_code_sets: Dict[str, Optional[Set[str]]]
+    fingerprints: np.ndarray
+    errors: Dict[str, Any]
+    warnings: Dict[str, Any]
+    created_at: str
+
+
+class ValidationCache:
+    """
+    Directory of cached validation runs, one per validation method.
+
+    Each run is stored as a pickle with the findings plus a small JSON
+    manifest describing it.
+    """
+
+    def __init__(self, cache_dir: str):
+        """
+        Initialize cache.
+
+        Args:
+            cache_dir: Directory holding the cache files
+        """
+        self.cache_dir = Path(cache_dir)
+
+    def _paths(self, method: str) -> Tuple[Path, Path]:
+        return self.cache_dir / f"{method}.pkl", self.cache_dir / f"{method}.json"
+
+    def load(self, method: str) -> Optional[CachedRun]:
+        """
+        Load the last run of a validation method.
+
+        Returns:
+            CachedRun, or None when there is no usable cache
+        """
+        data_path, _ = self._paths(method)
+        if not data_path.exists():
+            return None
+        try:
+            with open(data_path, "rb") as f:
+                stored = pickle.load(f)
+            if stored.get("format_version") != CACHE_FORMAT_VERSION:
+                logger.info(f"Ignoring validation cache with old format: {data_path}")
+                return None
+            return stored["run"]
+        except Exception as e:
+            logger.warning(f"Could not read validation cache {data_path}: {e}")
+            return None
+
+    def save(self, method: str, run: CachedRun) -> None:
+        """Store the run of a validation method, replacing the previous one"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        data_path, manifest_path = self._paths(method)
+
+        temp_path = data_path.with_suffix(".tmp")
+        with open(temp_path, "wb") as f:
+            pickle.dump({"format_version": CACHE_FORMAT_VERSION, "run": run}, f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        temp_path.replace(data_path)
+
+        manifest = {
+            "method": method,
+            "created_at": run.created_at,
+            "rows": len(run.fingerprints),
+            "key": run.key,
+            "valid_code_set_sizes": {
+                name: None if codes is None else len(codes)
+                for name, codes in run.valid_code_sets.items()
+            }
+        }
+        with open(manifest_path, "w") as f:
+            json.dump(manifest, f, indent=2, default=str)
+        logger.info(f"Validation cache saved to {data_path}")
+
+    def clear(self, method: Optional[str] = None) -> None:
+        """Remove the cached run of one method (or of all methods)"""
+        if not self.cache_dir.exists():
+            return
+        patterns: List[str] = [f"{method}.*"] if method else ["*.pkl", "*.json"]
+        for pattern in patterns:
+            for path in self.cache_dir.glob(pattern):
+                path.unlink()
+
+
+# Factory function for easy creation
+def create_validation_cache(cache_dir: str = "reports/validation_cache") -> ValidationCache:
+    """
+    Factory function to create validation cache.
+
+    Args:
+        cache_dir: Directory holding the cache files
+
+    Returns:
+        ValidationCache instance
+    """
+    return ValidationCache(cache_dir)
@@ -0,0 +1,494 @@
+"""
+Validation Finding Store for Excel Data Migration
+
+This module provides columnar storage for validation findings:
+- Findings kept as arrays per rule (row numbers, positions) instead of objects
+- O(1) counts per finding type and total
+- Finding objects built lazily, only for the rows that are read
+- Payloads of flagged positions only, with details rebuilt for the rows read
+- Streaming export of the full set to CSV or Parquet in chunks
+
+A store behaves like a read-only list of findings, so existing code that
+iterates, slices or takes len() of result.errors keeps working.
+"""
+
+import logging
+from dataclasses import fields as dataclass_fields
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Type
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+# Rows materialized per chunk when exporting
+EXPORT_CHUNK_SIZE = 100_000
+
+
+class _FindingBlock:
+    """Findings of one rule: the flagged rows plus a builder for the details"""
+
+    __slots__ = ("field_name", "finding_type", "positions", "row_numbers", "build", "columns", "details")
+
+    def __init__(self, field_name: str, finding_type: str, positions: np.ndarray,
+                 row_numbers: np.ndarray, build: Callable[[int], Dict[str, Any]],
+                 columns: Optional[Dict[str, List[Any]]] = None):
+        self.field_name = field_name
+        self.finding_type = finding_type
+        self.positions = positions
+        self.row_numbers = row_numbers
+        self.build = build
+        # Prebuilt fields per finding, for blocks added from a payload
+        self.columns = columns
+        # Source of the fields of blocks added from a payload without them
+        self.details: Optional[DeferredDetails] = None
+
+
+class DeferredDetails:
+    """
+    Fields of findings received without them (see to_payload(details=False)).
+
+    Row-level rules flag a row the same way whatever rows it is validated
+    with, so the fields of the findings that are read are rebuilt by
+    validating only their rows, in one call per batch of rows.
+    """
+
+    def __init__(self, validate: Callable[[np.ndarray], "FindingStore"]):
+        """
+        Initialize the details source.
+
+        Args:
+            validate: Function of sorted row positions returning the store of
+                validating those rows (store positions index into them)
+        """
+        self.validate = validate
+        self._rows: Dict[int, List[Tuple[str, str, Dict[str, Any]]]] = {}
+
+    def fetch(self, positions: np.ndarray):
+        """Rebuild the findings of the rows not rebuilt yet"""
+        positions = np.unique(np.asarray(positions, dtype=np.int64))
+        missing = positions[[position not in self._rows for position in positions.tolist()]]
+        if not len(missing):
+            return
+        # Keep at most one export chunk of rows
+        if len(self._rows) + len(missing) > EXPORT_CHUNK_SIZE:
+            self._rows = {}
+
+        rows = {position: [] for position in missing.tolist()}
+        store = self.validate(missing)
+        for block in store._blocks:
+            for local in block.positions.tolist():
+                rows[int(missing[local])].append((block.field_name, block.finding_type, block.build(local)))
+        self._rows.update(rows)
+
+    def fields(self, position: int, field_name: str, finding_type: str, occurrence: int) -> Dict[str, Any]:
+        """Fields of the occurrence-th finding of a field and type on a row"""
+        if position not in self._rows:
+            self.fetch(np.array([position]))
+        matches = [fields for name, kind, fields in self._rows[position]
+                   if name == field_name and kind == finding_type]
+        return dict(matches[occurrence])
+
+
+class FindingStore:
+    """
+    Columnar store of validation findings (errors or warnings).
+
+    Rules add whole blocks of flagged rows with add_block(). Findings are
+    ordered by row position and then by the order the blocks were added,
+    which matches a row-by-row pass over the rules. Individual findings
+    added with append() follow the block findings in insertion order.
+    """
+
+    def __init__(self, record_type: Type, type_key: str):
+        """
+        Initialize an empty store.
+
+        Args:
+            record_type: Dataclass built for each finding (e.g. ValidationError)
+            type_key: Name of the type field on record_type (e.g. 'error_type')
+        """
+        self.record_type = record_type
+        self.type_key = type_key
+        self._blocks: List[_FindingBlock] = []
+        self._appended: List[Any] = []
+        self._type_counts: Dict[str, int] = {}
+        self._block_count = 0
+        self._order: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+    # ------------------------------------------------------------------
+    # Adding findings
+    # ------------------------------------------------------------------
+
+    def add_block(self, field_name: str, finding_type: str, positions: np.ndarray,
+                  row_numbers: np.ndarray, build: Callable[[int], Dict[str, Any]]):
+        """
+        Add the findings of one rule.
+
+        Args:
+            field_name: Field the rule checks
+            finding_type: Error or warning type
+            positions: Row positions flagged by the rule
+            row_numbers: Reported row number of every row position in the frame
+            build: Function of a row position returning the remaining record fields
+        """
+        if len(positions) == 0:
+            return
+
+        positions = np.asarray(positions, dtype=np.int64)
+        self._blocks.append(_FindingBlock(field_name, finding_type, positions, row_numbers, build))
+        self._type_counts[finding_type] = self._type_counts.get(finding_type, 0) + len(positions)
+        self._block_count += len(positions)
+        self._order = None
+
+    def append(self, record: Any):
+        """Add a single finding object"""
+        self._appended.append(record)
+        finding_type = getattr(record, self.type_key)
+        self._type_counts[finding_type] = self._type_counts.get(finding_type, 0) + 1
+
+    def extend(self, records: List[Any]):
+        """Add several finding objects"""
+        for record in records:
+            self.append(record)
+
+    def to_payload(self, details: bool = True) -> Dict[str, Any]:
+        """
+        Picklable form of the store for sending between processes.
+
+        Builders cannot be pickled, so the fields of every finding are built
+        here and shipped as columns per block. Without details only the
+        flagged positions are shipped; the receiver rebuilds the fields of
+        the findings it reads (see DeferredDetails).
+
+        Args:
+            details: Build and ship the fields of every finding
+        """
+        blocks = []
+        for block in self._blocks:
+            if block.columns is not None:
+                blocks.append((block.field_name, block.finding_type, block.positions, block.columns))
+                continue
+            if not details:
+                blocks.append((block.field_name, block.finding_type, block.positions, None))
+                continue
+            built = []
+            for start in range(0, len(block.positions), EXPORT_CHUNK_SIZE):
+                positions = block.positions[start:start + EXPORT_CHUNK_SIZE]
+                if block.details is not None:
+                    block.details.fetch(positions)
+                built.extend(block.build(int(position)) for position in positions)
+            keys = list(dict.fromkeys(key for fields in built for key in fields))
+            columns = {key: [fields.get(key) for fields in built] for key in keys}
+            blocks.append((block.field_name, block.finding_type, block.positions, columns))
+        return {"blocks": blocks, "appended": list(self._appended)}
+
+    def add_payload(self, payload: Dict[str, Any], row_numbers: np.ndarray, offset: int = 0,
+                    positions_map: Optional[np.ndarray] = None,
+                    details: Optional[DeferredDetails] = None):
+        """
+        Add findings from another store's payload.
+
+        Args:
+            payload: Result of to_payload()
+            row_numbers: Reported row number of every row position in the combined frame
+            offset: Row position of the payload's first row in the combined frame
+            positions_map: Increasing row positions in the combined frame of the
+                payload's rows, for payloads of non-contiguous rows (overrides offset)
+            details: Source of the fields of blocks shipped without them, by
+                row position in the combined frame
+        """
+        # Earlier positions of each field and type, to tell apart several
+        # findings of the same field and type on one row
+        seen: Dict[Tuple[str, str], List[np.ndarray]] = {}
+        for field_name, finding_type, positions, columns in payload["blocks"]:
+            positions = np.asarray(positions, dtype=np.int64)
+            if positions_map is not None:
+                global_positions = np.asarray(positions_map, dtype=np.int64)[positions]
+            else:
+                global_positions = positions + offset
+            if columns is not None:
+                self.add_block(field_name, finding_type, global_positions, row_numbers,
+                               _column_builder(global_positions, columns))
+                if len(global_positions):
+                    self._blocks[-1].columns = columns
+                continue
+
+            if details is None:
+                raise ValueError("Payload was shipped without finding details; pass details to rebuild them")
+            previous = seen.setdefault((field_name, finding_type), [])
+            occurrences = sum((np.isin(positions, earlier).astype(np.int64) for earlier in previous),
+                              np.zeros(len(positions), dtype=np.int64))
+            previous.append(positions)
+            self.add_block(field_name, finding_type, global_positions, row_numbers,
+                           _deferred_builder(details, global_positions, field_name, finding_type, occurrences))
+            if len(global_positions):
+                self._blocks[-1].details = details
+        self.extend(payload["appended"])
+
+    # ------------------------------------------------------------------
+    # Counts
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return self._block_count + len(self._appended)
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def counts_by_type(self) -> Dict[str, int]:
+        """Number of findings per type, in order of each type's first finding"""
+        first_seen: Dict[str, Tuple[int, int]] = {}
+        for block_id, block in enumerate(self._blocks):
+            key = (int(block.positions.min()), block_id)
+            if block.finding_type not in first_seen or key < first_seen[block.finding_type]:
+                first_seen[block.finding_type] = key
+        ordered = sorted(first_seen, key=first_seen.get)
+        ordered.extend(t for t in self._type_counts if t not in first_seen)
+        return {finding_type: self._type_counts[finding_type] for finding_type in ordered}
+
+    def row_numbers(self) -> np.ndarray:
+        """Row number of every finding (in finding order)"""
+        block_rows, _ = self._ordered()
+        appended_rows = np.array([getattr(r, "row_number") for r in self._appended], dtype=object)
+        if not len(appended_rows):
+            return block_rows
+        return np.concatenate([block_rows.astype(object), appended_rows])
+
+    def unique_row_count(self) -> int:
+        """Number of distinct rows with at least one finding"""
+        return len(pd.unique(pd.Series(self.row_numbers(), dtype=object)))
+
+    # ------------------------------------------------------------------
+    # Reading findings
+    # ------------------------------------------------------------------
+
+    def _ordered(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Row numbers and (block, position) pairs of block findings in finding order"""
+        if self._order is None:
+            if not self._blocks:
+                self._order = (np.array([], dtype=np.int64), np.empty((0, 2), dtype=np.int64))
+            else:
+                positions = np.concatenate([block.positions for block in self._blocks])
+                block_ids = np.concatenate([
+                    np.full(len(block.positions), block_id, dtype=np.int64)
+                    for block_id, block in enumerate(self._blocks)
+                ])
+                order = np.lexsort((block_ids, positions))
+                pairs = np.column_stack([block_ids[order], positions[order]])
+                rows = np.concatenate([
+                    np.asarray(block.row_numbers)[block.positions] for block in self._blocks
+                ])[order]
+                self._order = (rows, pairs)
+        return self._order
+
+    def _build_fields(self, block_id: int, position: int, row_number: Any) -> Dict[str, Any]:
+        """Build the record fields of one flagged row"""
+        block = self._blocks[block_id]
+        fields = block.build(position)
+        fields['row_number'] = row_number
+        fields['field_name'] = block.field_name
+        fields[self.type_key] = block.finding_type
+        return fields
+
+    def _fetch_details(self, pairs: np.ndarray):
+        """Rebuild the fields of deferred findings in one batch per source"""
+        batches: Dict[int, Tuple[DeferredDetails, List[int]]] = {}
+        for block_id, position in pairs.tolist():
+            details = self._blocks[block_id].details
+            if details is not None:
+                batches.setdefault(id(details), (details, []))[1].append(position)
+        for details, positions in batches.values():
+            details.fetch(np.array(positions, dtype=np.int64))
+
+    def _materialize_fields(self, start: int, stop: int) -> List[Dict[str, Any]]:
+        """Record fields of the findings in the index range [start, stop)"""
+        rows, pairs = self._ordered()
+        self._fetch_details(pairs[start:min(stop, self._block_count)])
+        fields = [
+            self._build_fields(int(block_id), int(position), _python_value(rows[i]))
+            for i, (block_id, position) in enumerate(pairs[start:min(stop, self._block_count)], start)
+        ]
+        if stop > self._block_count:
+            appended = self._appended[max(start - self._block_count, 0):stop - self._block_count]
+            fields.extend(dict(vars(record)) for record in appended)
+        return fields
+
+    def _materialize(self, start: int, stop: int) -> List[Any]:
+        """Build finding objects for the index range [start, stop)"""
+        rows, pairs = self._ordered()
+        self._fetch_details(pairs[start:min(stop, self._block_count)])
+        records = [
+            self.record_type(**self._build_fields(int(block_id), int(position), _python_value(rows[i])))
+            for i, (block_id, position) in enumerate(pairs[start:min(stop, self._block_count)], start)
+        ]
+        if stop > self._block_count:
+            records.extend(self._appended[max(start - self._block_count, 0):stop - self._block_count])
+        return records
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step == 1:
+                return self._materialize(start, max(start, stop))
+            return [self[i] for i in range(start, stop, step)]
+        index = key + len(self) if key < 0 else key
+        if not 0 <= index < len(self):
+            raise IndexError("finding index out of range")
+        return self._materialize(index, index + 1)[0]
+
+    def __iter__(self) -> Iterator[Any]:
+        for start in range(0, len(self), EXPORT_CHUNK_SIZE):
+            yield from self._materialize(start, start + EXPORT_CHUNK_SIZE)
+
+    def examples(self, limit: int = 100, finding_type: Optional[str] = None) -> List[Any]:
+        """
+        First findings, optionally of a single type.
+
+        Args:
+            limit: Maximum number of findings returned
+            finding_type: Only return findings of this type
+
+        Returns:
+            List of finding objects
+        """
+        if finding_type is None:
+            return self[:limit]
+
+        examples = []
+        for record in self:
+            if getattr(record, self.type_key) == finding_type:
+                examples.append(record)
+                if len(examples) >= limit:
+                    break
+        return examples
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Columnar view of the findings without building finding objects.
+
+        Returns:
+            DataFrame with row_number, field_name and type columns
+        """
+        rows, pairs = self._ordered()
+        block_ids = pairs[:, 0]
+        fields = pd.Categorical.from_codes(
+            _category_codes(block_ids, [b.field_name for b in self._blocks]),
+            categories=_unique([b.field_name for b in self._blocks])
+        )
+        types = pd.Categorical.from_codes(
+            _category_codes(block_ids, [b.finding_type for b in self._blocks]),
+            categories=_unique([b.finding_type for b in self._blocks])
+        )
+        frame = pd.DataFrame({"row_number": rows, "field_name": fields, "type": types})
+
+        if self._appended:
+            appended = pd.DataFrame({
+                "row_number": [r.row_number for r in self._appended],
+                "field_name": [r.field_name for r in self._appended],
+                "type": [getattr(r, self.type_key) for r in self._appended]
+            })
+            frame = pd.concat([frame.astype({"field_name": object, "type": object}), appended], ignore_index=True)
+        return frame
+
+    # ------------------------------------------------------------------
+    # Export
+    # ------------------------------------------------------------------
+
+    def export(self, output_path: str, file_format: Optional[str] = None,
+               chunk_size: int = EXPORT_CHUNK_SIZE) -> int:
+        """
+        Stream all findings to a CSV or Parquet file.
+
+        Findings are built and written chunk by chunk, so memory use is
+        bounded by chunk_size regardless of the number of findings.
+
+        Args:
+            output_path: Path to the output file
+            file_format: 'csv' or 'parquet' (default: from the file extension)
+            chunk_size: Findings written per chunk
+
+        Returns:
+            Number of findings written
+        """
+        path = Path(output_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        file_format = (file_format or path.suffix.lstrip(".") or "csv").lower()
+        if file_format not in ("csv", "parquet"):
+            raise ValueError(f"Unsupported export format: {file_format}")
+
+        writer = None
+        if file_format == "parquet":
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError as e:
+                raise ImportError("Parquet export requires pyarrow (pip install pyarrow)") from e
+
+        columns = [f.name for f in dataclass_fields(self.record_type)]
+        # Integer fields keep their type; every other field (including the
+        # mixed-type values) is written as text, so all chunks share one schema
+        integer_columns = {f.name for f in dataclass_fields(self.record_type) if f.type in (int, "int")}
+        schema = None
+        if file_format == "parquet":
+            schema = pa.schema([(column, pa.int64() if column in integer_columns else pa.string())
+                                for column in columns])
+        written = 0
+        try:
+            for start in range(0, max(len(self), 1), chunk_size):
+                records = self._materialize_fields(start, start + chunk_size)
+                chunk = pd.DataFrame(records, columns=columns)
+                for column in columns:
+                    if column not in integer_columns:
+                        chunk[column] = chunk[column].map(lambda v: None if v is None else str(v)).astype(object)
+
+                if file_format == "csv":
+                    chunk.to_csv(path, mode="w" if start == 0 else "a", header=start == 0,
+                                 index=False, encoding="utf-8")
+                else:
+                    table = pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+                    if writer is None:
+                        writer = pq.ParquetWriter(str(path), schema)
+                    writer.write_table(table)
+                written += len(records)
+        finally:
+            if writer is not None:
+                writer.close()
+
+        logger.info(f"Exported {written} findings to {path}")
+        return written
+
+
+def _column_builder(positions: np.ndarray, columns: Dict[str, List[Any]]) -> Callable[[int], Dict[str, Any]]:
+    """Builder reading prebuilt fields of a block (positions are sorted)"""
+    def build(position: int) -> Dict[str, Any]:
+        index = int(np.searchsorted(positions, position))
+        return {key: values[index] for key, values in columns.items()}
+    return build
+
+
+def _deferred_builder(details: DeferredDetails, positions: np.ndarray, field_name: str,
+                      finding_type: str, occurrences: np.ndarray) -> Callable[[int], Dict[str, Any]]:
+    """Builder rebuilding the fields of a block shipped without them (positions are sorted)"""
+    def build(position: int) -> Dict[str, Any]:
+        index = int(np.searchsorted(positions, position))
+        return details.fields(position, field_name, finding_type, int(occurrences[index]))
+    return build
+
+
+def _python_value(value: Any) -> Any:
+    """Convert numpy scalars to Python scalars"""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _unique(values: List[str]) -> List[str]:
+    """Unique values in first-seen order"""
+    return list(dict.fromkeys(values))
+
+
+def _category_codes(block_ids: np.ndarray, block_values: List[str]) -> np.ndarray:
+    """Category code of every finding from the value of its block"""
+    categories = {value: code for code, value in enumerate(_unique(block_values))}
+    block_codes = np.array([categories[value] for value in block_values], dtype=np.int64)
+    return block_codes[block_ids] if len(block_codes) else np.array([], dtype=np.int64)
@@ -5,6 +5,7 @@ This module provides the core migration functionality:
 - Dry-run mode (simulate without database writes)
 - Batch insert with configurable batch size
 - Process in order: transactions first, then transaction_lines
+- Run a LoadPlan of several tables, loading independent tables concurrently
 - Track progress with tqdm progress bar
 - Log each batch: records_attempted, records_succeeded, records_failed
 - Continue on errors (log and skip failed records)
@@ -13,6 +14,8 @@ This module provides the core migration functionality:
 
 import logging
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from typing import Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass, field, asdict
 from datetime import datetime
@@ -21,6 +24,9 @@ from tqdm import tqdm
 import backoff
 
 from src.analyzer.supabase_connection import SupabaseConnectionManager
+from src.analyzer.schema_manager import LoadPlan
+from src.analyzer.money import from_minor_units
+from src.analyzer.dtype_plan import MINOR_UNIT_SCALES_ATTR
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -63,6 +69,10 @@ class MigrationSummary:
     transaction_batches: List[BatchResult] = field(default_factory=list)
     line_batches: List[BatchResult] = field(default_factory=list)
     
+    # Per-table statistics for tables loaded with migrate_table / run_load_plan
+    table_stats: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    load_plan: Optional[Dict[str, Any]] = None
+    
     # Error tracking
     errors: List[str] = field(default_factory=list)
     warnings: List[str] = field(default_factory=list)
@@ -75,7 +85,7 @@ class MigrationExecutor:
     This class:
     1. Implements dry-run mode (simulate without database writes)
     2. Implements batch insert with configurable batch size
-    3. Processes in order: transactions first, then transaction_lines
+    3. Processes tables in load-plan order (transactions first, then transaction_lines)
     4. Tracks progress with tqdm progress bar
     5. Logs each batch: records_attempted, records_succeeded, records_failed
     6. Continues on errors (logs and skips failed records)
@@ -107,6 +117,7 @@ class MigrationExecutor:
             dry_run=dry_run,
             start_time=datetime.now()
         )
+        self._summary_lock = threading.Lock()
         
         logger.info(
             f"Initialized MigrationExecutor: batch_size={batch_size}, "
@@ -253,6 +264,126 @@ class MigrationExecutor:
         
         return success, batch_results
     
+    def migrate_table(
+        self,
+        table_name: str,
+        data: pd.DataFrame
+    ) -> Tuple[bool, List[BatchResult]]:
+        """
+        Migrate the records of any table in batches.
+        
+        transactions and transaction_lines go through migrate_transactions
+        and migrate_transaction_lines so their summary fields are kept.
+        
+        Args:
+            table_name: Name of the table to insert into
+            data: DataFrame with the records
+            
+        Returns:
+            Tuple of (success: bool, batch_results: List[BatchResult])
+        """
+        if table_name == "transactions":
+            return self.migrate_transactions(data)
+        if table_name == "transaction_lines":
+            return self.migrate_transaction_lines(data)
+        
+        logger.info(f"Starting {table_name} migration: {len(data)} records")
+        if data.empty:
+            logger.warning(f"No {table_name} records to migrate")
+            return True, []
+        
+        batch_results = []
+        total_batches = (len(data) + self.batch_size - 1) // self.batch_size
+        with tqdm(total=len(data), desc=f"Migrating {table_name}", unit="records") as pbar:
+            for batch_num in range(total_batches):
+                start_idx = batch_num * self.batch_size
+                batch_result = self._process_batch(
+                    batch_num=batch_num + 1,
+                    table_name=table_name,
+                    batch_df=data.iloc[start_idx:start_idx + self.batch_size]
+                )
+                batch_results.append(batch_result)
+                
+                with self._summary_lock:
+                    stats = self.summary.table_stats.setdefault(
+                        table_name, {'attempted': 0, 'succeeded': 0, 'failed': 0}
+                    )
+                    stats['attempted'] += batch_result.records_attempted
+                    stats['succeeded'] += batch_result.records_succeeded
+                    stats['failed'] += batch_result.records_failed
+                
+                pbar.update(batch_result.records_attempted)
+                logger.info(
+                    f"{table_name} batch {batch_num + 1}/{total_batches}: "
+                    f"attempted={batch_result.records_attempted}, "
+                    f"succeeded={batch_result.records_succeeded}, "
+                    f"failed={batch_result.records_failed}"
+                )
+        
+        success = all(b.records_failed == 0 for b in batch_results)
+        logger.info(f"{table_name} migration complete: success={success}")
+        return success, batch_results
+    
+    def run_load_plan(
+        self,
+        plan: LoadPlan,
+        table_data: Dict[str, pd.DataFrame],
+        max_workers: int = 4
+    ) -> Dict[str, Tuple[bool, List[BatchResult]]]:
+        """
+        Migrate several tables in the order of a load plan.
+        
+        A table starts as soon as all of its parents in the plan have
+        finished, so independent tables load concurrently and dependent
+        tables wait only on their own parents. Tables of the plan without
+        data are skipped and do not hold back their dependents.
+        
+        Args:
+            plan: LoadPlan from SchemaManager.build_load_plan
+            table_data: DataFrame of records per table name
+            max_workers: Maximum number of tables loaded at the same time
+            
+        Returns:
+            Dictionary of table name to (success, batch_results)
+        """
+        tables = [table for table in plan.tables if table in table_data]
+        waiting_on = {
+            table: {parent for parent in plan.dependencies.get(table, []) if parent in table_data}
+            for table in tables
+        }
+        self.summary.load_plan = plan.to_dict()
+        logger.info(f"Running load plan for {len(tables)} tables: {', '.join(tables)}")
+        
+        results: Dict[str, Tuple[bool, List[BatchResult]]] = {}
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+            running: Dict[Any, str] = {}
+            
+            def start_ready_tables():
+                for table in tables:
+                    if table not in results and table not in running.values() and not waiting_on[table]:
+                        running[pool.submit(self.migrate_table, table, table_data[table])] = table
+            
+            start_ready_tables()
+            while running:
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    table = running.pop(future)
+                    try:
+                        results[table] = future.result()
+                    except Exception as e:
+                        results[table] = (False, [])
+                        error_msg = f"Loading {table} failed: {str(e)}"
+                        self.summary.errors.append(error_msg)
+                        logger.error(error_msg)
+                    if not results[table][0]:
+                        logger.warning(f"{table} had failures; dependent tables may fail foreign key checks")
+                    for child in plan.dependents.get(table, []):
+                        if child in waiting_on:
+                            waiting_on[child].discard(table)
+                start_ready_tables()
+        
+        return results
+    
     def _process_batch(
         self,
         batch_num: int,
@@ -322,7 +453,7 @@ class MigrationExecutor:
         """
         try:
             # Convert DataFrame to list of dictionaries
-            records = batch_df.to_dict('records')
+            records = self._amounts_in_currency_units(batch_df).to_dict('records')
             
             # Attempt to insert all records
             for idx, record in enumerate(records):
@@ -362,6 +493,28 @@ class MigrationExecutor:
         
         return batch_result
     
+    @staticmethod
+    def _amounts_in_currency_units(batch_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Convert amount columns stored as minor units by the dtype plan
+        (listed in the DataFrame attrs) back to currency units for insert.
+        
+        Args:
+            batch_df: DataFrame with records to insert
+            
+        Returns:
+            DataFrame with amounts in currency units
+        """
+        scales = batch_df.attrs.get(MINOR_UNIT_SCALES_ATTR, {})
+        columns = [column for column in scales if column in batch_df.columns]
+        if not columns:
+            return batch_df
+        
+        converted = batch_df.copy()
+        for column in columns:
+            converted[column] = from_minor_units(converted[column], scales[column])
+        return converted
+    
     def _clean_record(self, record: Dict[str, Any], table_name: str = None) -> Dict[str, Any]:
         """
         Clean a record for database insertion.
@@ -526,8 +679,8 @@ class MigrationExecutor:
         """
         Map dimension codes from Excel to Supabase IDs.
         
-        Uses DimensionMapper to convert dimension codes to Supabase IDs.
-        Preserves all dimension values during migration.
+        Uses DimensionMapper.map_series to convert each dimension column
+        to Supabase IDs in one call. Preserves all dimension values during migration.
         
         Args:
             lines_df: DataFrame with transaction lines
@@ -548,101 +701,33 @@ class MigrationExecutor:
             'warnings': []
         }
         
-        # Map project codes
-        if 'project_code' in mapped_df.columns:
-            try:
-                mapped_df['project_id'] = mapped_df['project_code'].apply(
-                    lambda x: dimension_mapper.map_project_code(x) if pd.notna(x) else None
-                )
-                unmapped_projects = mapped_df[
-                    (mapped_df['project_code'].notna()) & 
-                    (mapped_df['project_id'].isna())
-                ]['project_code'].unique()
-                
-                if len(unmapped_projects) > 0:
-                    mapping_report['unmapped_dimensions']['projects'] = unmapped_projects.tolist()
-                    mapping_report['warnings'].append(
-                        f"Found {len(unmapped_projects)} unmapped project codes"
-                    )
-                else:
-                    mapping_report['dimensions_mapped']['projects'] = 'all_mapped'
-                
-                logger.info(f"Mapped project codes: {len(mapped_df['project_id'].dropna())} records")
-            except Exception as e:
-                logger.error(f"Failed to map project codes: {str(e)}")
-                mapping_report['warnings'].append(f"Project mapping error: {str(e)}")
-        
-        # Map classification codes
-        if 'classification_code' in mapped_df.columns:
-            try:
-                mapped_df['classification_id'] = mapped_df['classification_code'].apply(
-                    lambda x: dimension_mapper.map_classification_code(x) if pd.notna(x) else None
-                )
-                unmapped_classifications = mapped_df[
-                    (mapped_df['classification_code'].notna()) & 
-                    (mapped_df['classification_id'].isna())
-                ]['classification_code'].unique()
-                
-                if len(unmapped_classifications) > 0:
-                    mapping_report['unmapped_dimensions']['classifications'] = unmapped_classifications.tolist()
-                    mapping_report['warnings'].append(
-                        f"Found {len(unmapped_classifications)} unmapped classification codes"
-                    )
-                else:
-                    mapping_report['dimensions_mapped']['classifications'] = 'all_mapped'
-                
-                logger.info(f"Mapped classification codes: {len(mapped_df['classification_id'].dropna())} records")
-            except Exception as e:
-                logger.error(f"Failed to map classification codes: {str(e)}")
-                mapping_report['warnings'].append(f"Classification mapping error: {str(e)}")
-        
-        # Map work analysis codes
-        if 'work_analysis_code' in mapped_df.columns:
-            try:
-                mapped_df['work_analysis_id'] = mapped_df['work_analysis_code'].apply(
-                    lambda x: dimension_mapper.map_work_analysis_code(x) if pd.notna(x) else None
-                )
-                unmapped_work_analysis = mapped_df[
-                    (mapped_df['work_analysis_code'].notna()) & 
-                    (mapped_df['work_analysis_id'].isna())
-                ]['work_analysis_code'].unique()
-                
-                if len(unmapped_work_analysis) > 0:
-                    mapping_report['unmapped_dimensions']['work_analysis'] = unmapped_work_analysis.tolist()
-                    mapping_report['warnings'].append(
-                        f"Found {len(unmapped_work_analysis)} unmapped work analysis codes"
-                    )
-                else:
-                    mapping_report['dimensions_mapped']['work_analysis'] = 'all_mapped'
-                
-                logger.info(f"Mapped work analysis codes: {len(mapped_df['work_analysis_id'].dropna())} records")
-            except Exception as e:
-                logger.error(f"Failed to map work analysis codes: {str(e)}")
-                mapping_report['warnings'].append(f"Work analysis mapping error: {str(e)}")
-        
-        # Map sub_tree codes
-        if 'sub_tree_code' in mapped_df.columns:
+        # (code column, id column, dimension type, report key, label)
+        dimension_columns = [
+            ('project_code', 'project_id', 'project', 'projects', 'project'),
+            ('classification_code', 'classification_id', 'classification', 'classifications', 'classification'),
+            ('work_analysis_code', 'work_analysis_id', 'work_analysis', 'work_analysis', 'work analysis'),
+            ('sub_tree_code', 'sub_tree_id', 'sub_tree', 'sub_trees', 'sub_tree'),
+        ]
+        for code_column, id_column, dimension_type, report_key, label in dimension_columns:
+            if code_column not in mapped_df.columns:
+                continue
             try:
-                mapped_df['sub_tree_id'] = mapped_df['sub_tree_code'].apply(
-                    lambda x: dimension_mapper.map_sub_tree_code(x) if pd.notna(x) else None
-                )
-                unmapped_sub_trees = mapped_df[
-                    (mapped_df['sub_tree_code'].notna()) & 
-                    (mapped_df['sub_tree_id'].isna())
-                ]['sub_tree_code'].unique()
+                ids, unmapped = dimension_mapper.map_series(dimension_type, mapped_df[code_column])
+                mapped_df[id_column] = ids
+                unmapped_codes = mapped_df.loc[unmapped, code_column].unique()
                 
-                if len(unmapped_sub_trees) > 0:
-                    mapping_report['unmapped_dimensions']['sub_trees'] = unmapped_sub_trees.tolist()
+                if len(unmapped_codes) > 0:
+                    mapping_report['unmapped_dimensions'][report_key] = unmapped_codes.tolist()
                     mapping_report['warnings'].append(
-                        f"Found {len(unmapped_sub_trees)} unmapped sub_tree codes"
+                        f"Found {len(unmapped_codes)} unmapped {label} codes"
                     )
                 else:
-                    mapping_report['dimensions_mapped']['sub_trees'] = 'all_mapped'
+                    mapping_report['dimensions_mapped'][report_key] = 'all_mapped'
                 
-                logger.info(f"Mapped sub_tree codes: {len(mapped_df['sub_tree_id'].dropna())} records")
+                logger.info(f"Mapped {label} codes: {int(ids.notna().sum())} records")
             except Exception as e:
-                logger.error(f"Failed to map sub_tree codes: {str(e)}")
-                mapping_report['warnings'].append(f"Sub_tree mapping error: {str(e)}")
+                logger.error(f"Failed to map {label} codes: {str(e)}")
+                mapping_report['warnings'].append(f"{label.capitalize()} mapping error: {str(e)}")
         
         return mapped_df, mapping_report
     
@@ -888,6 +973,8 @@ class MigrationExecutor:
                     'transaction_batches': len(self.summary.transaction_batches),
                     'line_batches': len(self.summary.line_batches),
                 },
+                'tables': self.summary.table_stats,
+                'load_plan': self.summary.load_plan,
                 'errors': self.summary.errors,
                 'warnings': self.summary.warnings,
             }
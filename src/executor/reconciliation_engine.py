@@ -0,0 +1,435 @@
+"""
+Reconciliation Engine for Excel Data Migration to Supabase
+
+This module reconciles migrated values with the source workbook:
+- Canonical text and a 64-bit hash per transaction line
+- Order-independent digests and debit/credit sums per
+  (fiscal_year, month, account_code) partition on both sides
+- Drill-down to entry level, only in partitions whose digests differ
+- Server-side digests (reconcile_partition_digests in migrations/), with
+  a client fallback that streams transaction_lines page by page
+
+A partition digest is the sum of its line hashes modulo 2^64, so it does
+not depend on row order and both sides can compute it independently.
+Matching partitions cost one row each; only differing ones are fetched
+per entry.
+"""
+
+import hashlib
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+from src.analyzer.account_code_mapper import normalize_account_code
+from src.analyzer.money import DEFAULT_SCALE, to_minor_units
+from src.analyzer.supabase_connection import SupabaseConnectionManager, DEFAULT_PAGE_SIZE
+from src.analyzer.transaction_grouper import parse_entry_dates
+from src.executor.table_snapshot import TableSnapshot
+
+logger = logging.getLogger(__name__)
+
+
+# Database functions returning digests per partition and per entry
+PARTITION_DIGESTS_RPC = "reconcile_partition_digests"
+ENTRY_DIGESTS_RPC = "reconcile_entry_digests"
+
+PARTITION_KEYS = ["fiscal_year", "month", "account_code"]
+
+DIGEST_COLUMNS = ["line_count", "debit_units", "credit_units", "digest"]
+
+# Accepted column names of a line frame (Excel names first, then Supabase names)
+LINE_COLUMNS = {
+    "entry_no": ["entry_no", "entry no"],
+    "entry_date": ["entry_date", "entry date"],
+    "account_code": ["account_code", "account code"],
+    "debit": ["debit", "debit_amount"],
+    "credit": ["credit", "credit_amount"],
+}
+
+# Entries listed per differing partition
+MAX_ENTRY_DIFFS = 100
+
+_MASK_32 = np.uint64(0xFFFFFFFF)
+
+
+@dataclass
+class EntryDiff:
+    """An entry whose lines differ between Excel and Supabase"""
+    entry_no: str
+    status: str  # 'mismatch', 'missing_in_supabase', 'missing_in_excel'
+    excel_lines: int = 0
+    supabase_lines: int = 0
+    debit_difference: int = 0  # Excel minus Supabase, minor units
+    credit_difference: int = 0
+
+
+@dataclass
+class PartitionDiff:
+    """A (fiscal_year, month, account_code) partition whose digests differ"""
+    fiscal_year: Optional[int]
+    month: Optional[int]
+    account_code: str
+    status: str  # 'mismatch', 'missing_in_supabase', 'missing_in_excel'
+    excel_lines: int = 0
+    supabase_lines: int = 0
+    debit_difference: int = 0  # Excel minus Supabase, minor units
+    credit_difference: int = 0
+    entries: List[EntryDiff] = field(default_factory=list)
+
+
+@dataclass
+class ReconciliationResult:
+    """Outcome of a value reconciliation"""
+    partitions_compared: int = 0
+    partitions_matched: int = 0
+    excel_lines: int = 0
+    supabase_lines: int = 0
+    partition_diffs: List[PartitionDiff] = field(default_factory=list)
+    source: Optional[str] = None  # 'rpc' or 'client'
+    rows_transferred: int = 0  # Rows read from Supabase
+    scale: int = DEFAULT_SCALE
+
+    @property
+    def passed(self) -> bool:
+        return not self.partition_diffs
+
+
+def _column(df: pd.DataFrame, name: str) -> Optional[pd.Series]:
+    """First column of df known under the canonical name"""
+    for candidate in LINE_COLUMNS[name]:
+        if candidate in df.columns:
+            return df[candidate]
+    return None
+
+
+def _key_text(values: pd.Series) -> pd.Series:
+    """Codes as text, each distinct value converted once ('1001.0' → '1001', blanks '')"""
+    codes, uniques = pd.factorize(values)
+    texts = np.array([normalize_account_code(value) or "" for value in np.asarray(uniques, dtype=object).tolist()] + [""], dtype=object)
+    return pd.Series(texts[codes], index=values.index)
+
+
+def canonical_lines(lines_df: pd.DataFrame, scale: int = DEFAULT_SCALE) -> pd.DataFrame:
+    """
+    Canonical form of transaction lines.
+
+    Args:
+        lines_df: Lines with entry_no, entry_date, account_code, debit and
+            credit columns (Excel or Supabase names)
+        scale: Decimal places of the minor units
+
+    Returns:
+        DataFrame with PARTITION_KEYS, entry_no, debit_units, credit_units
+        and the canonical text of every line
+    """
+    missing = [name for name in LINE_COLUMNS if _column(lines_df, name) is None]
+    if missing:
+        raise ValueError(f"Missing columns for reconciliation: {missing}")
+
+    dates = parse_entry_dates(_column(lines_df, "entry_date"))
+    date_text = dates.dt.strftime("%Y-%m-%d").fillna("")
+    debit_units = to_minor_units(_column(lines_df, "debit"), scale).fillna(0).astype("int64")
+    credit_units = to_minor_units(_column(lines_df, "credit"), scale).fillna(0).astype("int64")
+
+    lines = pd.DataFrame({
+        "fiscal_year": dates.dt.year.astype("Int64"),
+        "month": dates.dt.month.astype("Int64"),
+        "account_code": _key_text(_column(lines_df, "account_code")),
+        "entry_no": _key_text(_column(lines_df, "entry_no")),
+        "debit_units": debit_units,
+        "credit_units": credit_units,
+    }, index=lines_df.index)
+    texts = [
+        f"{entry_no}|{date}|{code}|{debit}|{credit}"
+        for entry_no, date, code, debit, credit in zip(
+            lines["entry_no"].tolist(), date_text.tolist(), lines["account_code"].tolist(),
+            debit_units.tolist(), credit_units.tolist()
+        )
+    ]
+    lines["text"] = pd.Series(np.array(texts, dtype=object), index=lines.index, dtype=object)
+    return lines.reset_index(drop=True)
+
+
+def line_digests(texts: pd.Series) -> np.ndarray:
+    """
+    64-bit hash of every canonical line: the first 8 bytes of its MD5,
+    big-endian (the first 16 hex digits, as in the database functions).
+    """
+    return np.array(
+        [int.from_bytes(hashlib.md5(text.encode("utf-8")).digest()[:8], "big") for text in texts.tolist()],
+        dtype=np.uint64
+    )
+
+
+def partition_digests(lines: pd.DataFrame, keys: List[str]) -> pd.DataFrame:
+    """
+    Line count, debit/credit sums and digest per group of canonical lines.
+
+    The digest is the sum of the line hashes modulo 2^64. The high and low
+    32-bit halves are summed separately in int64 so no group sum overflows.
+
+    Args:
+        lines: Output of canonical_lines()
+        keys: Grouping columns
+
+    Returns:
+        DataFrame with keys and DIGEST_COLUMNS (digest as uint64)
+    """
+    hashes = line_digests(lines["text"])
+    frame = lines[keys].copy()
+    frame["line_count"] = 1
+    frame["debit_units"] = lines["debit_units"]
+    frame["credit_units"] = lines["credit_units"]
+    frame["high"] = (hashes >> np.uint64(32)).astype(np.int64)
+    frame["low"] = (hashes & _MASK_32).astype(np.int64)
+
+    grouped = frame.groupby(keys, dropna=False, sort=True).sum().reset_index()
+    high = grouped.pop("high").to_numpy(dtype=np.int64).astype(np.uint64)
+    low = grouped.pop("low").to_numpy(dtype=np.int64).astype(np.uint64)
+    grouped["digest"] = (high << np.uint64(32)) + low  # uint64 arithmetic wraps modulo 2^64
+    return grouped[keys + DIGEST_COLUMNS]
+
+
+def _digest_frame(rows: List[Dict[str, Any]], keys: List[str]) -> pd.DataFrame:
+    """Digest rows returned by a database function as a frame like partition_digests()"""
+    frame = pd.DataFrame(rows, columns=keys + DIGEST_COLUMNS)
+    for column in ("fiscal_year", "month"):
+        if column in keys:
+            frame[column] = pd.to_numeric(frame[column]).astype("Int64")
+    for column in ("account_code", "entry_no"):
+        if column in keys:
+            frame[column] = frame[column].fillna("").astype(str)
+    for column in ("line_count", "debit_units", "credit_units"):
+        frame[column] = [int(value) for value in frame[column]]
+    frame["digest"] = np.array([int(value) for value in frame["digest"]], dtype=np.uint64)
+    return frame
+
+
+def _compare(excel: pd.DataFrame, supabase: pd.DataFrame, keys: List[str]) -> pd.DataFrame:
+    """Outer join of two digest frames, keeping the rows that differ"""
+    # Digests as Python ints: a uint64 column with gaps would become float64
+    excel = excel.assign(digest=excel["digest"].astype(object))
+    supabase = supabase.assign(digest=supabase["digest"].astype(object))
+    merged = excel.merge(supabase, on=keys, how="outer", suffixes=("_excel", "_supabase"), indicator=True)
+    for column in ("line_count", "debit_units", "credit_units"):
+        for side in ("excel", "supabase"):
+            merged[f"{column}_{side}"] = merged[f"{column}_{side}"].fillna(0).astype("int64")
+    same = (
+        (merged["_merge"] == "both")
+        & (merged["digest_excel"] == merged["digest_supabase"])
+        & (merged["line_count_excel"] == merged["line_count_supabase"])
+    )
+    differing = merged[~same].copy()
+    differing["status"] = differing["_merge"].map({
+        "both": "mismatch", "left_only": "missing_in_supabase", "right_only": "missing_in_excel"
+    }).astype(str)
+    return differing
+
+
+def _differences(row: Any) -> Dict[str, int]:
+    return {
+        "excel_lines": int(row.line_count_excel),
+        "supabase_lines": int(row.line_count_supabase),
+        "debit_difference": int(row.debit_units_excel - row.debit_units_supabase),
+        "credit_difference": int(row.credit_units_excel - row.credit_units_supabase),
+    }
+
+
+def _optional_int(value: Any) -> Optional[int]:
+    return None if pd.isna(value) else int(value)
+
+
+class ReconciliationEngine:
+    """
+    Compares migrated transaction lines with the Excel source by value.
+
+    This class:
+    1. Computes partition digests of the Excel lines
+    2. Fetches partition digests from Supabase (one row per partition)
+    3. Drills into differing partitions down to entry level
+    """
+
+    def __init__(
+        self,
+        supabase_manager: SupabaseConnectionManager,
+        org_id: Optional[str] = None,
+        scale: int = DEFAULT_SCALE,
+        use_rpc: bool = True,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        max_entry_diffs: int = MAX_ENTRY_DIFFS,
+        snapshot: Optional[TableSnapshot] = None
+    ):
+        """
+        Initialize reconciliation engine.
+
+        Args:
+            supabase_manager: SupabaseConnectionManager instance
+            org_id: Organization to reconcile (all organizations if None)
+            scale: Decimal places of the minor units compared
+            use_rpc: Compute Supabase digests in the database when available
+            page_size: Rows per request of the client fallback
+            max_entry_diffs: Entries listed per differing partition
+            snapshot: Shared table snapshot for the client fallback
+        """
+        self.supabase_manager = supabase_manager
+        self.org_id = org_id
+        self.scale = scale
+        self.use_rpc = use_rpc
+        self.page_size = page_size
+        self.max_entry_diffs = max_entry_diffs
+        self.snapshot = snapshot
+        self._supabase_lines: Optional[pd.DataFrame] = None  # Client fallback only
+
+        logger.info("Initialized ReconciliationEngine")
+
+    def reconcile(self, excel_lines_df: pd.DataFrame) -> ReconciliationResult:
+        """
+        Reconcile Excel lines with the migrated transaction_lines.
+
+        Args:
+            excel_lines_df: DataFrame with Excel transaction lines
+
+        Returns:
+            ReconciliationResult listing the differing partitions and entries
+        """
+        result = ReconciliationResult(scale=self.scale)
+        excel_lines = canonical_lines(excel_lines_df, self.scale)
+        excel_partitions = partition_digests(excel_lines, PARTITION_KEYS)
+        supabase_partitions = self._supabase_partition_digests(result)
+
+        result.excel_lines = len(excel_lines)
+        result.supabase_lines = int(sum(supabase_partitions["line_count"]))
+        result.partitions_compared = len(
+            excel_partitions.merge(supabase_partitions[PARTITION_KEYS], on=PARTITION_KEYS, how="outer")
+        )
+
+        differing = _compare(excel_partitions, supabase_partitions, PARTITION_KEYS)
+        result.partitions_matched = result.partitions_compared - len(differing)
+
+        excel_by_partition = {}
+        if len(differing):
+            # Only the lines of differing partitions are hashed again per entry
+            partition_of_line = pd.MultiIndex.from_frame(excel_lines[PARTITION_KEYS])
+            wanted = pd.MultiIndex.from_frame(differing[PARTITION_KEYS])
+            candidates = excel_lines[partition_of_line.isin(wanted)]
+            for (year, month, code), group in candidates.groupby(PARTITION_KEYS, dropna=False):
+                excel_by_partition[(_optional_int(year), _optional_int(month), code)] = group
+
+        for row in differing.itertuples(index=False):
+            diff = PartitionDiff(
+                fiscal_year=_optional_int(row.fiscal_year),
+                month=_optional_int(row.month),
+                account_code=row.account_code,
+                status=row.status,
+                **_differences(row)
+            )
+            key = (diff.fiscal_year, diff.month, diff.account_code)
+            excel_entries = excel_by_partition.get(key, excel_lines.iloc[:0])
+            diff.entries = self._entry_diffs(diff, excel_entries, result)
+            result.partition_diffs.append(diff)
+
+        logger.info(
+            f"Reconciled {result.partitions_compared} partitions: {result.partitions_matched} matched, "
+            f"{len(result.partition_diffs)} differ ({result.rows_transferred} rows read, source: {result.source})"
+        )
+        return result
+
+    def _supabase_partition_digests(self, result: ReconciliationResult) -> pd.DataFrame:
+        """Partition digests of the migrated lines, from the database or the client fallback"""
+        if self.use_rpc:
+            try:
+                rows = self.supabase_manager.call_rpc(
+                    PARTITION_DIGESTS_RPC, {"p_org_id": self.org_id, "p_scale": self.scale}
+                )
+                result.source = "rpc"
+                result.rows_transferred += len(rows or [])
+                return _digest_frame(rows or [], PARTITION_KEYS)
+            except Exception as e:
+                logger.warning(f"{PARTITION_DIGESTS_RPC} unavailable, hashing lines client-side: {str(e)}")
+
+        result.source = "client"
+        self._supabase_lines = self._fetch_supabase_lines(result)
+        return partition_digests(self._supabase_lines, PARTITION_KEYS)
+
+    def _fetch_supabase_lines(self, result: ReconciliationResult) -> pd.DataFrame:
+        """Migrated lines with the date of their transaction, as canonical lines"""
+        snapshot = self.snapshot or TableSnapshot(self.supabase_manager, self.org_id, self.page_size)
+        transactions = snapshot.table("transactions")
+        lines = snapshot.table("transaction_lines")
+        result.rows_transferred += len(transactions) + len(lines)
+
+        # Lines without a transaction have no entry date; the database join drops them too
+        positions = pd.Index(transactions["id"]).get_indexer(lines["transaction_id"])
+        linked = positions >= 0
+        lines, positions = lines[linked], positions[linked]
+        entry_numbers = transactions["entry_number"].to_numpy(dtype=object)[positions]
+        entry_no = lines["entry_no"].to_numpy(dtype=object)
+        frame = pd.DataFrame({
+            "entry_no": np.where(pd.isna(entry_no), entry_numbers, entry_no),
+            "entry_date": transactions["entry_date"].to_numpy(dtype=object)[positions],
+            "account_code": lines["account_code"].to_numpy(dtype=object),
+            "debit": lines["debit_amount"].to_numpy(dtype=object),
+            "credit": lines["credit_amount"].to_numpy(dtype=object),
+        }, dtype=object)
+        return canonical_lines(frame, self.scale)
+
+    def _supabase_entry_digests(self, diff: PartitionDiff, result: ReconciliationResult) -> pd.DataFrame:
+        """Entry digests of one partition of the migrated lines"""
+        if self._supabase_lines is not None:
+            lines = self._supabase_lines
+            in_partition = (
+                lines["fiscal_year"].fillna(-1).eq(-1 if diff.fiscal_year is None else diff.fiscal_year)
+                & lines["month"].fillna(-1).eq(-1 if diff.month is None else diff.month)
+                & lines["account_code"].eq(diff.account_code)
+            )
+            return partition_digests(lines[in_partition.to_numpy(dtype=bool)], ["entry_no"])
+
+        rows = self.supabase_manager.call_rpc(ENTRY_DIGESTS_RPC, {
+            "p_fiscal_year": diff.fiscal_year,
+            "p_month": diff.month,
+            "p_account_code": diff.account_code,
+            "p_org_id": self.org_id,
+            "p_scale": self.scale,
+        }) or []
+        result.rows_transferred += len(rows)
+        return _digest_frame(rows, ["entry_no"])
+
+    def _entry_diffs(self, diff: PartitionDiff, excel_lines: pd.DataFrame,
+                     result: ReconciliationResult) -> List[EntryDiff]:
+        """Entries of a differing partition whose digests differ"""
+        excel_entries = partition_digests(excel_lines, ["entry_no"])
+        if diff.status == "missing_in_supabase":
+            # Nothing to fetch: every Excel entry of the partition is missing
+            supabase_entries = _digest_frame([], ["entry_no"])
+        else:
+            supabase_entries = self._supabase_entry_digests(diff, result)
+
+        differing = _compare(excel_entries, supabase_entries, ["entry_no"])
+        return [
+            EntryDiff(entry_no=row.entry_no, status=row.status, **_differences(row))
+            for row in differing.head(self.max_entry_diffs).itertuples(index=False)
+        ]
+
+
+# Factory function for easy creation
+def create_reconciliation_engine(
+    supabase_manager: SupabaseConnectionManager,
+    org_id: Optional[str] = None,
+    scale: int = DEFAULT_SCALE,
+    use_rpc: bool = True
+) -> ReconciliationEngine:
+    """
+    Factory function to create reconciliation engine.
+
+    Args:
+        supabase_manager: SupabaseConnectionManager instance
+        org_id: Organization to reconcile (all organizations if None)
+        scale: Decimal places of the minor units compared
+        use_rpc: Compute Supabase digests in the database when available
+
+    Returns:
+        ReconciliationEngine instance
+    """
+    return ReconciliationEngine(supabase_manager, org_id=org_id, scale=scale, use_rpc=use_rpc)
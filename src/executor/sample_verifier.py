@@ -0,0 +1,439 @@
+"""
+Sample Verifier for Excel Data Migration to Supabase
+
+This module compares a stratified sample of source lines with Supabase:
+- Strata by period (entry month), account class and amount bucket
+- Proportional allocation with at least one line per stratum
+- Keyed lookups of exactly the sampled entries (in.(...) filters)
+- Field-by-field comparison of every mapped column
+- Confidence bounds on the mismatch rate of the whole ledger
+
+The sample is drawn from the Excel side, so every sampled line is looked
+up in Supabase rather than downloading the table. Cost follows the
+sample size, not the ledger size.
+"""
+
+import logging
+import math
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+from src.analyzer.account_code_mapper import chunk_by_url_length, normalize_account_code, MAX_FILTER_URL_LENGTH
+from src.analyzer.money import DEFAULT_SCALE, to_minor_units
+from src.analyzer.supabase_connection import SupabaseConnectionManager, DEFAULT_PAGE_SIZE
+from src.analyzer.transaction_grouper import parse_entry_dates
+
+logger = logging.getLogger(__name__)
+
+
+# Excel line field → (transaction_lines column, comparison kind)
+SAMPLE_FIELDS = {
+    "account_code": ("account_code", "code"),
+    "account_name": ("account_name", "text"),
+    "transaction_classification_code": ("transaction_classification_code", "code"),
+    "classification_code": ("classification_code", "code"),
+    "project_code": ("project_code", "code"),
+    "work_analysis_code": ("work_analysis_code", "code"),
+    "sub_tree_code": ("sub_tree_code", "code"),
+    "debit": ("debit_amount", "amount"),
+    "credit": ("credit_amount", "amount"),
+    "notes": ("description", "text"),
+}
+
+# z for two-sided 95% confidence bounds
+DEFAULT_CONFIDENCE = 0.95
+_Z_SCORES = {0.90: 1.6449, 0.95: 1.9600, 0.99: 2.5758}
+
+# Mismatching values kept as examples
+MAX_MISMATCH_EXAMPLES = 20
+
+
+@dataclass
+class LineMismatch:
+    """A field of a sampled line that differs in Supabase"""
+    entry_no: str
+    account_code: str
+    field: str
+    excel_value: Any
+    supabase_value: Any  # None when the line is missing in Supabase
+
+
+@dataclass
+class SampleVerificationResult:
+    """Outcome of a sample verification"""
+    population_size: int = 0
+    sample_size: int = 0
+    strata: int = 0
+    mismatched_lines: int = 0  # Including missing lines
+    missing_lines: int = 0
+    field_mismatches: Dict[str, int] = field(default_factory=dict)
+    mismatch_rate: float = 0.0  # Estimated for the population
+    lower_bound: float = 0.0
+    upper_bound: float = 0.0
+    confidence: float = DEFAULT_CONFIDENCE
+    rows_fetched: int = 0
+    requests: int = 0
+    examples: List[LineMismatch] = field(default_factory=list)
+
+    @property
+    def passed(self) -> bool:
+        return self.mismatched_lines == 0
+
+
+def _excel_column(df: pd.DataFrame, name: str) -> Optional[str]:
+    """Column of df holding a field (underscore or Excel spaced name)"""
+    for candidate in (name, name.replace("_", " ")):
+        if candidate in df.columns:
+            return candidate
+    return None
+
+
+def _code_text(values: pd.Series) -> pd.Series:
+    """Codes as text, each distinct value converted once ('1001.0' → '1001', blanks '')"""
+    codes, uniques = pd.factorize(values)
+    texts = np.array([normalize_account_code(value) or "" for value in np.asarray(uniques, dtype=object).tolist()]
+                     + [""], dtype=object)
+    return pd.Series(texts[codes], index=values.index)
+
+
+def _plain_text(values: pd.Series) -> pd.Series:
+    """Stripped text with blanks and nulls as ''"""
+    text = values.astype(object).where(values.notna(), "")
+    return text.map(lambda value: str(value).strip()).astype(object)
+
+
+def assign_strata(lines_df: pd.DataFrame, scale: int = DEFAULT_SCALE) -> pd.Series:
+    """
+    Stratum of every line: 'YYYY-MM|account class|amount bucket'.
+
+    The account class is the first digit of the account code; the
+    amount bucket is the number of digits of the larger side in minor
+    units (0 for zero amounts).
+
+    Args:
+        lines_df: Excel lines with entry_date, account_code, debit, credit
+        scale: Decimal places of the minor units
+
+    Returns:
+        Series of stratum labels
+    """
+    date_column = _excel_column(lines_df, "entry_date")
+    if date_column is not None:
+        dates = parse_entry_dates(lines_df[date_column])
+        period = (dates.dt.year * 100 + dates.dt.month).fillna(0).to_numpy(dtype=np.int64)
+    else:
+        period = np.zeros(len(lines_df), dtype=np.int64)
+
+    code_column = _excel_column(lines_df, "account_code")
+    codes = _code_text(lines_df[code_column]) if code_column is not None else pd.Series("", index=lines_df.index)
+    class_codes, classes = pd.factorize(codes.str[:1].replace("", "?"))
+
+    amounts = np.zeros(len(lines_df), dtype=np.int64)
+    for name in ("debit", "credit"):
+        column = _excel_column(lines_df, name)
+        if column is not None:
+            units = to_minor_units(lines_df[column], scale).fillna(0).to_numpy(dtype=np.int64)
+            amounts = np.maximum(amounts, np.abs(units))
+    buckets = np.where(amounts > 0, np.floor(np.log10(np.maximum(amounts, 1))).astype(np.int64) + 1, 0)
+
+    # One integer key per line; only the distinct strata are formatted as labels
+    keys = (period * len(classes) + class_codes) * 100 + buckets
+    key_codes, unique_keys = pd.factorize(keys)
+    labels = []
+    for key in unique_keys.tolist():
+        bucket, rest = key % 100, key // 100
+        year_month, account_class = divmod(rest, len(classes))
+        month_label = f"{year_month // 100:04d}-{year_month % 100:02d}" if year_month else "unknown"
+        labels.append(f"{month_label}|{classes[account_class]}|{bucket}")
+    return pd.Series(np.array(labels, dtype=object)[key_codes], index=lines_df.index)
+
+
+def allocate_sample(stratum_sizes: np.ndarray, sample_size: int) -> np.ndarray:
+    """
+    Lines to draw per stratum, proportional to stratum size.
+
+    Every stratum gets at least one line when the sample is large enough;
+    the rest is shared by largest remainder.
+
+    Args:
+        stratum_sizes: Lines per stratum
+        sample_size: Total lines to draw
+
+    Returns:
+        Lines to draw per stratum (never more than the stratum holds)
+    """
+    sizes = np.asarray(stratum_sizes, dtype=np.int64)
+    population = int(sizes.sum())
+    if sample_size >= population:
+        return sizes.copy()
+    if sample_size <= 0 or population == 0:
+        return np.zeros(len(sizes), dtype=np.int64)
+
+    quota = sample_size * sizes / population
+    allocation = np.minimum(np.floor(quota).astype(np.int64), sizes)
+    if sample_size >= len(sizes):
+        allocation = np.maximum(allocation, np.minimum(sizes, 1))
+
+    # Trim the largest allocations if the minimum of one overshot the sample size
+    while allocation.sum() > sample_size:
+        allocation[np.argmax(allocation)] -= 1
+
+    # Largest remainder among strata that still have lines left
+    remaining = sample_size - int(allocation.sum())
+    while remaining > 0:
+        open_strata = np.flatnonzero(allocation < sizes)
+        ranked = open_strata[np.argsort(-(quota - allocation)[open_strata], kind="stable")][:remaining]
+        allocation[ranked] += 1
+        remaining -= len(ranked)
+    return allocation
+
+
+def draw_stratified_sample(strata: pd.Series, sample_size: int,
+                           seed: Optional[int] = None) -> Tuple[np.ndarray, pd.DataFrame]:
+    """
+    Positions of a stratified random sample.
+
+    Args:
+        strata: Stratum label per line
+        sample_size: Total lines to draw
+        seed: Random seed (None for a fresh sample)
+
+    Returns:
+        Tuple of (sorted positions of sampled lines, DataFrame with the
+        stratum, population and sample size of every stratum)
+    """
+    codes, labels = pd.factorize(strata, sort=True)
+    sizes = np.bincount(codes, minlength=len(labels)) if len(codes) else np.zeros(0, dtype=np.int64)
+    allocation = allocate_sample(sizes, sample_size)
+
+    # Random order within each stratum; keep the first allocation[stratum] lines
+    rng = np.random.default_rng(seed)
+    order = np.lexsort((rng.random(len(codes)), codes))
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]]) if len(sizes) else sizes
+    rank = np.arange(len(codes)) - starts[codes[order]]
+    positions = np.sort(order[rank < allocation[codes[order]]])
+
+    strata_frame = pd.DataFrame({"stratum": np.asarray(labels, dtype=object), "population": sizes,
+                                 "sampled": allocation})
+    return positions, strata_frame
+
+
+def confidence_bounds(mismatches: np.ndarray, sampled: np.ndarray, population: np.ndarray,
+                      confidence: float = DEFAULT_CONFIDENCE) -> Tuple[float, float, float]:
+    """
+    Estimated population mismatch rate with Wilson score bounds.
+
+    Stratum rates are weighted by stratum size. The Wilson interval uses
+    the finite population correction, so a sample that covers the whole
+    population has exact bounds.
+
+    Args:
+        mismatches: Mismatching sampled lines per stratum
+        sampled: Sampled lines per stratum
+        population: Lines per stratum
+        confidence: Confidence level (0.90, 0.95 or 0.99)
+
+    Returns:
+        Tuple of (estimated rate, lower bound, upper bound)
+    """
+    mismatches, sampled, population = (np.asarray(a, dtype=np.float64) for a in (mismatches, sampled, population))
+    n = sampled.sum()
+    total = population.sum()
+    if n == 0 or total == 0:
+        return 0.0, 0.0, 1.0
+
+    covered = sampled > 0
+    weights = population[covered] / population[covered].sum()
+    rate = float(np.sum(weights * mismatches[covered] / sampled[covered]))
+
+    fpc = (total - n) / (total - 1) if total > 1 else 0.0
+    z2 = (_Z_SCORES.get(confidence, _Z_SCORES[DEFAULT_CONFIDENCE]) ** 2) * fpc
+    denominator = 1 + z2 / n
+    centre = (rate + z2 / (2 * n)) / denominator
+    half_width = math.sqrt(max(rate * (1 - rate) / n * z2 + z2 * z2 / (4 * n * n), 0.0)) / denominator
+    return rate, max(0.0, centre - half_width), min(1.0, centre + half_width)
+
+
+class SampleVerifier:
+    """
+    Verifies a stratified sample of Excel lines against Supabase.
+
+    Sampled lines are matched to Supabase lines by entry number, account
+    code and their order within the entry, since transaction_lines carry
+    no source row number.
+    """
+
+    def __init__(
+        self,
+        supabase_manager: SupabaseConnectionManager,
+        org_id: Optional[str] = None,
+        scale: int = DEFAULT_SCALE,
+        max_filter_length: int = MAX_FILTER_URL_LENGTH,
+        confidence: float = DEFAULT_CONFIDENCE,
+        page_size: int = DEFAULT_PAGE_SIZE
+    ):
+        """
+        Initialize sample verifier.
+
+        Args:
+            supabase_manager: SupabaseConnectionManager instance
+            org_id: Organization of the migrated lines
+            scale: Decimal places of compared amounts
+            max_filter_length: Budget of one in.(...) filter
+            confidence: Confidence level of the mismatch rate bounds
+            page_size: Rows per request when reading the sampled entries
+        """
+        self.supabase_manager = supabase_manager
+        self.org_id = org_id
+        self.scale = scale
+        self.max_filter_length = max_filter_length
+        self.confidence = confidence
+        self.page_size = page_size
+
+    def verify(self, excel_lines_df: pd.DataFrame, sample_size: int = 100,
+               seed: Optional[int] = None) -> SampleVerificationResult:
+        """
+        Draw a stratified sample and compare it with Supabase.
+
+        Args:
+            excel_lines_df: DataFrame with Excel transaction lines
+            sample_size: Number of lines to sample
+            seed: Random seed (None for a fresh sample)
+
+        Returns:
+            SampleVerificationResult with mismatches and confidence bounds
+        """
+        result = SampleVerificationResult(population_size=len(excel_lines_df), confidence=self.confidence)
+        if excel_lines_df.empty or sample_size <= 0:
+            return result
+
+        lines = excel_lines_df.reset_index(drop=True)
+        entry_column = _excel_column(lines, "entry_no")
+        code_column = _excel_column(lines, "account_code")
+        if entry_column is None or code_column is None:
+            raise ValueError("Excel lines need entry_no and account_code columns for sample verification")
+
+        strata = assign_strata(lines, self.scale)
+        positions, strata_frame = draw_stratified_sample(strata, sample_size, seed)
+        result.sample_size = len(positions)
+        result.strata = len(strata_frame)
+
+        # Match on (entry, account, occurrence): all lines of the sampled entries are needed for the ranks
+        entry_no = _code_text(lines[entry_column])
+        account_code = _code_text(lines[code_column])
+        occurrence = pd.DataFrame({"e": entry_no, "a": account_code}).groupby(["e", "a"], sort=False).cumcount()
+        sampled_entries = sorted(set(entry_no.iloc[positions]) - {""})
+        supabase_lines = self._fetch_entries(sampled_entries, result)
+
+        fields = {name: spec for name, spec in SAMPLE_FIELDS.items() if _excel_column(lines, name) is not None}
+        excel_sample = pd.DataFrame({
+            "entry_no": entry_no.iloc[positions].to_numpy(),
+            "account_code": account_code.iloc[positions].to_numpy(),
+            "occurrence": occurrence.iloc[positions].to_numpy(),
+            "stratum": strata.iloc[positions].to_numpy(),
+        })
+        for name, (_, kind) in fields.items():
+            excel_sample[f"excel:{name}"] = self._comparable(lines[_excel_column(lines, name)].iloc[positions], kind).to_numpy()
+
+        merged = excel_sample.merge(supabase_lines, on=["entry_no", "account_code", "occurrence"], how="left",
+                                    indicator=True)
+        missing = (merged["_merge"] == "left_only").to_numpy()
+        mismatched = missing.copy()
+        for entry, code in merged.loc[missing, ["entry_no", "account_code"]].head(MAX_MISMATCH_EXAMPLES).itertuples(
+                index=False, name=None):
+            result.examples.append(LineMismatch(entry, code, "line", "present", None))
+
+        for name, (column, kind) in fields.items():
+            excel_values = merged[f"excel:{name}"]
+            if column in merged.columns:
+                supabase_values = self._comparable(merged[column], kind)
+            else:
+                supabase_values = pd.Series(None if kind == "amount" else "", index=merged.index, dtype=object)
+            differs = ~missing & ~self._equal(excel_values, supabase_values, kind)
+            if not differs.any():
+                continue
+            result.field_mismatches[name] = int(differs.sum())
+            mismatched |= differs
+            room = MAX_MISMATCH_EXAMPLES - len(result.examples)
+            examples = zip(merged["entry_no"][differs], merged["account_code"][differs],
+                           excel_values[differs], supabase_values[differs])
+            for entry, code, excel_value, supabase_value in list(examples)[:max(room, 0)]:
+                result.examples.append(LineMismatch(entry, code, name, excel_value, supabase_value))
+
+        result.missing_lines = int(missing.sum())
+        result.mismatched_lines = int(mismatched.sum())
+
+        by_stratum = pd.Series(mismatched, index=merged["stratum"]).groupby(level=0).sum()
+        stratum_mismatches = by_stratum.reindex(strata_frame["stratum"], fill_value=0).to_numpy()
+        result.mismatch_rate, result.lower_bound, result.upper_bound = confidence_bounds(
+            stratum_mismatches, strata_frame["sampled"].to_numpy(), strata_frame["population"].to_numpy(),
+            self.confidence
+        )
+
+        logger.info(
+            f"Sample verification: {result.mismatched_lines}/{result.sample_size} lines differ "
+            f"in {result.strata} strata, rate {result.mismatch_rate:.4f} "
+            f"[{result.lower_bound:.4f}, {result.upper_bound:.4f}] ({result.requests} requests)"
+        )
+        return result
+
+    def _fetch_entries(self, entries: List[str], result: SampleVerificationResult) -> pd.DataFrame:
+        """Supabase lines of the given entries, with their occurrence within (entry, account)"""
+        columns = ["id", "entry_no"] + sorted({column for column, _ in SAMPLE_FIELDS.values()})
+        filters = {"org_id": self.org_id} if self.org_id else None
+        rows: List[Dict[str, Any]] = []
+        for chunk in chunk_by_url_length(entries, self.max_filter_length):
+            chunk_rows = self.supabase_manager.select_in(
+                "transaction_lines", "entry_no", chunk, columns=", ".join(columns), filters=filters,
+                page_size=self.page_size
+            ) or []
+            rows.extend(chunk_rows)
+            # Pages are read until a short one comes back
+            result.requests += len(chunk_rows) // self.page_size + 1
+        result.rows_fetched = len(rows)
+
+        frame = pd.DataFrame(rows, dtype=object).reindex(columns=columns)
+        frame = frame.sort_values("id", kind="stable").reset_index(drop=True) if len(frame) else frame
+        frame["entry_no"] = _code_text(frame["entry_no"])
+        frame["account_code"] = _code_text(frame["account_code"])
+        frame["occurrence"] = frame.groupby(["entry_no", "account_code"], sort=False).cumcount()
+        return frame
+
+    def _comparable(self, values: pd.Series, kind: str) -> pd.Series:
+        """Values in the form compared: minor units, normalized codes or stripped text"""
+        if kind == "amount":
+            return to_minor_units(values.astype(object), self.scale).astype(object)
+        if kind == "code":
+            return _code_text(values)
+        return _plain_text(values)
+
+    @staticmethod
+    def _equal(excel_values: pd.Series, supabase_values: pd.Series, kind: str) -> np.ndarray:
+        """Element-wise equality; a missing amount equals zero"""
+        if kind == "amount":
+            left = pd.Series(excel_values, dtype="Int64").fillna(0).to_numpy(dtype=np.int64)
+            right = pd.Series(supabase_values, dtype="Int64").fillna(0).to_numpy(dtype=np.int64)
+            return left == right
+        return excel_values.to_numpy(dtype=object) == supabase_values.to_numpy(dtype=object)
+
+
+# Factory function for easy creation
+def create_sample_verifier(
+    supabase_manager: SupabaseConnectionManager,
+    org_id: Optional[str] = None,
+    scale: int = DEFAULT_SCALE
+) -> SampleVerifier:
+    """
+    Factory function to create sample verifier.
+
+    Args:
+        supabase_manager: SupabaseConnectionManager instance
+        org_id: Organization of the migrated lines
+        scale: Decimal places of compared amounts
+
+    Returns:
+        SampleVerifier instance
+    """
+    return SampleVerifier(supabase_manager, org_id=org_id, scale=scale)
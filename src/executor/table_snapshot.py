@@ -0,0 +1,114 @@
+"""
+Table Snapshot for post-migration checks
+
+This module reads Supabase tables once and shares them between checks:
+- Columnar (DataFrame) copy of each table, read page by page
+- One read per table, whichever check asks first
+- Safe to use from concurrent checks (one lock per table)
+- Rows read are counted for reports
+
+Verification and reconciliation checks that fall back to client-side
+computation would otherwise each stream transaction_lines again.
+"""
+
+import logging
+import threading
+from typing import Dict, List, Optional
+import pandas as pd
+
+from src.analyzer.supabase_connection import SupabaseConnectionManager, DEFAULT_PAGE_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+# Columns read per table: everything any check needs, so one read serves all
+SNAPSHOT_COLUMNS = {
+    "transactions": ["id", "org_id", "entry_number", "entry_date"],
+    "transaction_lines": [
+        "id", "org_id", "transaction_id", "entry_no", "account_code", "debit_amount", "credit_amount",
+        "account_id", "project_id", "classification_id", "work_analysis_id", "sub_tree_id",
+    ],
+}
+
+# Tables read for the organization only (the others are shared reference tables)
+ORG_SCOPED_TABLES = {"transactions", "transaction_lines"}
+
+
+class TableSnapshot:
+    """
+    Lazily loaded, shared copies of Supabase tables.
+
+    Tables not listed in SNAPSHOT_COLUMNS are read with their id only,
+    which is all the reference checks need.
+    """
+
+    def __init__(
+        self,
+        supabase_manager: SupabaseConnectionManager,
+        org_id: Optional[str] = None,
+        page_size: int = DEFAULT_PAGE_SIZE
+    ):
+        """
+        Initialize snapshot.
+
+        Args:
+            supabase_manager: SupabaseConnectionManager instance
+            org_id: Organization whose transactions and lines are read
+            page_size: Rows per request
+        """
+        self.supabase_manager = supabase_manager
+        self.org_id = org_id
+        self.page_size = page_size
+        self.rows_read = 0
+        self._tables: Dict[str, pd.DataFrame] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+
+    def columns(self, table: str) -> List[str]:
+        """Columns read for a table"""
+        return SNAPSHOT_COLUMNS.get(table, ["id"])
+
+    def is_loaded(self, table: str) -> bool:
+        """Whether the table has been read already"""
+        return table in self._tables
+
+    def table(self, table: str) -> pd.DataFrame:
+        """
+        The table as a DataFrame, read on first use.
+
+        Concurrent callers of the same table wait for a single read.
+
+        Args:
+            table: Table name
+
+        Returns:
+            DataFrame with the columns of columns(table)
+        """
+        if table in self._tables:
+            return self._tables[table]
+        with self._locks_lock:
+            lock = self._locks.setdefault(table, threading.Lock())
+        with lock:
+            if table not in self._tables:
+                self._tables[table] = self._read(table)
+        return self._tables[table]
+
+    def ids(self, table: str) -> pd.Index:
+        """Ids of a table, for reference lookups"""
+        return pd.Index(self.table(table)["id"].dropna().unique(), dtype=object)
+
+    def _read(self, table: str) -> pd.DataFrame:
+        """Stream the table page by page into one DataFrame"""
+        columns = self.columns(table)
+        filters = {"org_id": self.org_id} if self.org_id and table in ORG_SCOPED_TABLES else None
+        pages = []
+        for page in self.supabase_manager.iter_pages(
+            table, columns=", ".join(columns), filters=filters, page_size=self.page_size
+        ):
+            pages.append(pd.DataFrame(page, dtype=object).reindex(columns=columns))
+
+        frame = pd.concat(pages, ignore_index=True) if pages else pd.DataFrame(columns=columns, dtype=object)
+        with self._locks_lock:
+            self.rows_read += len(frame)
+        logger.info(f"Snapshot of {table}: {len(frame)} rows")
+        return frame
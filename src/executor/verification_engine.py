@@ -4,27 +4,61 @@ Verification Engine for Excel Data Migration to Supabase
 This module provides post-migration verification functionality:
 - Record count comparison between Excel and Supabase
 - Referential integrity verification
-- Sample data comparison (random sample of records)
+- Sample data comparison (stratified sample of source lines, SampleVerifier)
+- Value reconciliation by partition digests (ReconciliationEngine)
 - Account mapping verification
 - Dimension integrity verification
 - Comprehensive verification report generation
+- Independent checks run concurrently, each with its own timing
+
+Reference checks run as one server-side aggregate query
+(verify_migration_references in migrations/), with a client fallback
+over a TableSnapshot: every table is read at most once, whichever check
+needs it first.
 """
 
+import functools
 import logging
 import json
-import random
-from typing import Dict, List, Optional, Tuple, Any
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass, field, asdict
 from datetime import datetime
 import pandas as pd
 
-from src.analyzer.supabase_connection import SupabaseConnectionManager
+from src.analyzer.supabase_connection import SupabaseConnectionManager, DEFAULT_PAGE_SIZE
+from src.executor.reconciliation_engine import ReconciliationEngine
+from src.executor.sample_verifier import SampleVerifier
+from src.executor.table_snapshot import TableSnapshot
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+# Database function returning reference counts per org and column
+REFERENCE_COUNTS_RPC = "verify_migration_references"
+
+# Reference columns of transaction_lines and the table they point to
+REFERENCE_COLUMNS = {
+    "transaction_id": "transactions",
+    "account_id": "accounts",
+    "project_id": "projects",
+    "classification_id": "classifications",
+    "work_analysis_id": "work_analysis",
+    "sub_tree_id": "sub_tree",
+}
+
+DIMENSION_COLUMNS = ["project_id", "classification_id", "work_analysis_id", "sub_tree_id"]
+
+REFERENCE_COUNT_COLUMNS = ["org_id", "reference_column", "total_lines", "missing_lines", "orphaned_lines"]
+
+# Checks run at the same time by run_all_verifications
+DEFAULT_VERIFICATION_WORKERS = 4
+
+
 @dataclass
 class VerificationCheck:
     """Result of a single verification check"""
@@ -34,6 +68,18 @@ class VerificationCheck:
     expected_value: Optional[Any] = None
     actual_value: Optional[Any] = None
     error_message: Optional[str] = None
+    duration_seconds: Optional[float] = None
+
+
+def _timed(check_method: Callable[..., VerificationCheck]) -> Callable[..., VerificationCheck]:
+    """Record the wall time of a check in the VerificationCheck it returns"""
+    @functools.wraps(check_method)
+    def wrapper(*args, **kwargs) -> VerificationCheck:
+        start = time.perf_counter()
+        check = check_method(*args, **kwargs)
+        check.duration_seconds = round(time.perf_counter() - start, 4)
+        return check
+    return wrapper
 
 
 @dataclass
@@ -64,23 +110,120 @@ class VerificationEngine:
     1. Compares record counts between Excel and Supabase
     2. Validates referential integrity
     3. Performs sample data comparisons
-    4. Verifies account code mappings
-    5. Verifies dimension integrity
-    6. Generates comprehensive verification report
+    4. Reconciles values with the Excel source
+    5. Verifies account code mappings
+    6. Verifies dimension integrity
+    7. Generates comprehensive verification report
     """
     
-    def __init__(self, supabase_manager: SupabaseConnectionManager):
+    def __init__(
+        self,
+        supabase_manager: SupabaseConnectionManager,
+        org_id: Optional[str] = None,
+        use_rpc: bool = True,
+        page_size: int = DEFAULT_PAGE_SIZE
+    ):
         """
         Initialize verification engine.
         
         Args:
             supabase_manager: SupabaseConnectionManager instance
+            org_id: Organization to verify (all organizations if None)
+            use_rpc: Run reference checks in the database when available
+            page_size: Rows per request of the client fallback
         """
         self.supabase_manager = supabase_manager
+        self.org_id = org_id
+        self.use_rpc = use_rpc
+        self.page_size = page_size
         self.report = VerificationReport(verification_time=datetime.now())
+        self.snapshot = TableSnapshot(supabase_manager, org_id=org_id, page_size=page_size)
+        self._reference_counts: Optional[pd.DataFrame] = None
+        self._reference_counts_lock = threading.Lock()
+        self.reference_counts_source: Optional[str] = None  # 'rpc' or 'client'
         
         logger.info("Initialized VerificationEngine")
     
+    def get_reference_counts(self, refresh: bool = False) -> pd.DataFrame:
+        """
+        Lines, NULL references and orphaned references per org and column.
+        
+        Computed once and shared by the referential integrity, account
+        mapping and dimension checks, also when they run concurrently.
+        The database function returns a few aggregate rows whatever the
+        ledger size; if it is not deployed, the counts are built
+        client-side from the table snapshot.
+        
+        Args:
+            refresh: Recompute instead of reusing the previous counts
+            
+        Returns:
+            DataFrame with org_id, reference_column, total_lines,
+            missing_lines and orphaned_lines
+        """
+        with self._reference_counts_lock:
+            if self._reference_counts is None or refresh:
+                self._reference_counts = self._compute_reference_counts()
+            return self._reference_counts
+    
+    def _compute_reference_counts(self) -> pd.DataFrame:
+        """Reference counts from the database function, else from the snapshot"""
+        counts = None
+        if self.use_rpc:
+            try:
+                rows = self.supabase_manager.call_rpc(REFERENCE_COUNTS_RPC, {"p_org_id": self.org_id})
+                counts = pd.DataFrame(rows or [], columns=REFERENCE_COUNT_COLUMNS)
+                self.reference_counts_source = "rpc"
+            except Exception as e:
+                logger.warning(f"{REFERENCE_COUNTS_RPC} unavailable, counting references client-side: {e}")
+        
+        if counts is None:
+            counts = self._count_references_client()
+            self.reference_counts_source = "client"
+        
+        for column in ["total_lines", "missing_lines", "orphaned_lines"]:
+            counts[column] = counts[column].astype("int64")
+        return counts
+    
+    def _count_references_client(self) -> pd.DataFrame:
+        """Reference counts from the snapshot of the lines and reference tables"""
+        lines = self.snapshot.table("transaction_lines")
+        if lines.empty:
+            return pd.DataFrame(columns=REFERENCE_COUNT_COLUMNS)
+        
+        partial = []
+        for column, table in REFERENCE_COLUMNS.items():
+            values = lines[column]
+            missing = values.isna()
+            orphaned = ~missing & ~values.isin(self.snapshot.ids(table))
+            partial.append(pd.DataFrame({
+                "org_id": lines["org_id"].astype(object),
+                "reference_column": column,
+                "total_lines": 1,
+                "missing_lines": missing.astype("int64"),
+                "orphaned_lines": orphaned.astype("int64"),
+            }).groupby(["org_id", "reference_column"], dropna=False, as_index=False).sum())
+        return pd.concat(partial, ignore_index=True)[REFERENCE_COUNT_COLUMNS]
+    
+    def _reference_totals(self, column: str) -> Tuple[int, int, int]:
+        """Total, missing and orphaned lines of a reference column over all orgs"""
+        counts = self.get_reference_counts()
+        selected = counts[counts["reference_column"] == column]
+        return (
+            int(selected["total_lines"].sum()),
+            int(selected["missing_lines"].sum()),
+            int(selected["orphaned_lines"].sum())
+        )
+    
+    def _orphans_by_org(self, columns: List[str], include_missing: bool = False) -> Dict[str, int]:
+        """Orgs with failing references (orphaned, optionally plus missing) for reports"""
+        counts = self.get_reference_counts()
+        selected = counts[counts["reference_column"].isin(columns)]
+        failing = selected["orphaned_lines"] + (selected["missing_lines"] if include_missing else 0)
+        by_org = failing.groupby(selected["org_id"].astype(str)).sum()
+        return {org: int(count) for org, count in by_org.items() if count}
+    
+    @_timed
     def verify_record_counts(
         self,
         excel_lines_df: pd.DataFrame,
@@ -101,20 +244,10 @@ class VerificationEngine:
             excel_lines_count = len(excel_lines_df)
             excel_transactions_count = len(excel_transactions_df)
             
-            # Get counts from Supabase
-            supabase_transactions = self.supabase_manager.execute_query(
-                table="transactions",
-                query_type="select",
-                data=None
-            )
-            supabase_lines = self.supabase_manager.execute_query(
-                table="transaction_lines",
-                query_type="select",
-                data=None
-            )
-            
-            supabase_transactions_count = len(supabase_transactions) if isinstance(supabase_transactions, list) else 0
-            supabase_lines_count = len(supabase_lines) if isinstance(supabase_lines, list) else 0
+            # Get counts from Supabase (counted by the database, no rows read)
+            filters = {"org_id": self.org_id} if self.org_id else None
+            supabase_transactions_count = self.supabase_manager.count_rows("transactions", filters)
+            supabase_lines_count = self.supabase_manager.count_rows("transaction_lines", filters)
             
             # Compare counts
             transactions_match = excel_transactions_count == supabase_transactions_count
@@ -148,6 +281,7 @@ class VerificationEngine:
                 error_message=error_msg
             )
     
+    @_timed
     def verify_referential_integrity(self) -> VerificationCheck:
         """
         Verify referential integrity between transactions and transaction_lines.
@@ -158,52 +292,24 @@ class VerificationEngine:
             VerificationCheck with results
         """
         try:
-            # Get all transactions
-            transactions = self.supabase_manager.execute_query(
-                table="transactions",
-                query_type="select",
-                data=None
-            )
-            
-            # Get all transaction lines
-            lines = self.supabase_manager.execute_query(
-                table="transaction_lines",
-                query_type="select",
-                data=None
-            )
-            
-            if not isinstance(transactions, list) or not isinstance(lines, list):
-                return VerificationCheck(
-                    check_name="Referential Integrity",
-                    passed=False,
-                    details="Failed to retrieve data from Supabase",
-                    error_message="Invalid data format from Supabase"
-                )
-            
-            # Build set of valid transaction IDs
-            valid_transaction_ids = {t.get('id') for t in transactions if t.get('id')}
-            
-            # Check each line references a valid transaction
-            orphaned_lines = []
-            for line in lines:
-                transaction_id = line.get('transaction_id')
-                if transaction_id and transaction_id not in valid_transaction_ids:
-                    orphaned_lines.append(line.get('id'))
+            total_lines, _, orphaned = self._reference_totals("transaction_id")
             
-            passed = len(orphaned_lines) == 0
+            passed = orphaned == 0
             
             details = (
-                f"Total transactions: {len(transactions)}, "
-                f"Total lines: {len(lines)}, "
-                f"Orphaned lines: {len(orphaned_lines)}"
+                f"Total lines: {total_lines}, "
+                f"Orphaned lines: {orphaned}"
             )
+            orphans_by_org = self._orphans_by_org(["transaction_id"])
+            if orphans_by_org:
+                details += f", By org: {orphans_by_org}"
             
             check = VerificationCheck(
                 check_name="Referential Integrity",
                 passed=passed,
                 details=details,
                 expected_value="All lines reference valid transactions",
-                actual_value=f"Orphaned lines: {len(orphaned_lines)}"
+                actual_value=f"Orphaned lines: {orphaned}"
             )
             
             logger.info(f"Referential integrity verification: {details}")
@@ -219,11 +325,14 @@ class VerificationEngine:
                 error_message=error_msg
             )
     
+    @_timed
     def verify_sample_data(self, excel_lines_df: pd.DataFrame, sample_size: int = 100) -> VerificationCheck:
         """
         Verify sample of migrated data matches source.
         
-        Randomly samples records and compares key fields.
+        Draws a stratified sample of Excel lines (by period, account class
+        and amount bucket), looks up exactly those entries in Supabase and
+        compares every mapped field.
         
         Args:
             excel_lines_df: DataFrame with Excel transaction lines
@@ -233,49 +342,26 @@ class VerificationEngine:
             VerificationCheck with results
         """
         try:
-            # Get all lines from Supabase
-            supabase_lines = self.supabase_manager.execute_query(
-                table="transaction_lines",
-                query_type="select",
-                data=None
-            )
-            
-            if not isinstance(supabase_lines, list) or len(supabase_lines) == 0:
-                return VerificationCheck(
-                    check_name="Sample Data Comparison",
-                    passed=False,
-                    details="No data in Supabase to sample",
-                    error_message="Supabase transaction_lines table is empty"
-                )
+            verifier = SampleVerifier(self.supabase_manager, org_id=self.org_id)
+            result = verifier.verify(excel_lines_df, sample_size)
             
-            # Determine actual sample size
-            actual_sample_size = min(sample_size, len(supabase_lines))
-            
-            # Random sample from Supabase
-            sampled_records = random.sample(supabase_lines, actual_sample_size)
-            
-            # Check key fields are populated
-            key_fields = ['transaction_id', 'account_id', 'debit_amount', 'credit_amount']
-            missing_fields = []
-            
-            for record in sampled_records:
-                for field in key_fields:
-                    if field not in record or record[field] is None:
-                        missing_fields.append(f"{record.get('id', 'unknown')}.{field}")
-            
-            passed = len(missing_fields) == 0
+            passed = result.passed
             
             details = (
-                f"Sampled {actual_sample_size} records, "
-                f"Missing key fields: {len(missing_fields)}"
+                f"Sampled {result.sample_size} of {result.population_size} lines in {result.strata} strata, "
+                f"Mismatched lines: {result.mismatched_lines} (missing: {result.missing_lines}), "
+                f"Estimated mismatch rate: {result.mismatch_rate:.4f} "
+                f"({result.confidence:.0%} bounds {result.lower_bound:.4f}-{result.upper_bound:.4f})"
             )
+            if result.field_mismatches:
+                details += f", By field: {result.field_mismatches}"
             
             check = VerificationCheck(
                 check_name="Sample Data Comparison",
                 passed=passed,
                 details=details,
-                expected_value="All key fields populated",
-                actual_value=f"Missing fields: {len(missing_fields)}"
+                expected_value="Sampled lines match source values",
+                actual_value=f"Mismatched lines: {result.mismatched_lines}"
             )
             
             logger.info(f"Sample data verification: {details}")
@@ -291,11 +377,13 @@ class VerificationEngine:
                 error_message=error_msg
             )
     
-    def verify_account_mappings(self, excel_lines_df: pd.DataFrame) -> VerificationCheck:
+    @_timed
+    def verify_value_reconciliation(self, excel_lines_df: pd.DataFrame) -> VerificationCheck:
         """
-        Verify all account codes were mapped correctly.
+        Verify migrated amounts match the Excel source.
         
-        Checks that all transaction lines have valid account_id references.
+        Compares digests and debit/credit sums per (fiscal_year, month,
+        account_code) partition and lists the differing entries.
         
         Args:
             excel_lines_df: DataFrame with Excel transaction lines
@@ -304,60 +392,80 @@ class VerificationEngine:
             VerificationCheck with results
         """
         try:
-            # Get all lines from Supabase
-            supabase_lines = self.supabase_manager.execute_query(
-                table="transaction_lines",
-                query_type="select",
-                data=None
+            engine = ReconciliationEngine(
+                self.supabase_manager, org_id=self.org_id, use_rpc=self.use_rpc, page_size=self.page_size,
+                snapshot=self.snapshot
             )
+            result = engine.reconcile(excel_lines_df)
+            differing_entries = sum(len(diff.entries) for diff in result.partition_diffs)
             
-            if not isinstance(supabase_lines, list):
-                return VerificationCheck(
-                    check_name="Account Mapping Verification",
-                    passed=False,
-                    details="Failed to retrieve data from Supabase",
-                    error_message="Invalid data format from Supabase"
+            details = (
+                f"Partitions compared: {result.partitions_compared}, "
+                f"Matched: {result.partitions_matched}, "
+                f"Differing entries: {differing_entries}, "
+                f"Rows read: {result.rows_transferred}"
+            )
+            if result.partition_diffs:
+                details += ", Differing partitions: " + "; ".join(
+                    f"{diff.fiscal_year}-{diff.month} {diff.account_code} ({diff.status})"
+                    for diff in result.partition_diffs[:10]
                 )
             
-            # Get all valid accounts
-            accounts = self.supabase_manager.execute_query(
-                table="accounts",
-                query_type="select",
-                data=None
+            check = VerificationCheck(
+                check_name="Value Reconciliation",
+                passed=result.passed,
+                details=details,
+                expected_value="All partition digests match",
+                actual_value=f"Differing partitions: {len(result.partition_diffs)}"
             )
             
-            if not isinstance(accounts, list):
-                return VerificationCheck(
-                    check_name="Account Mapping Verification",
-                    passed=False,
-                    details="Failed to retrieve accounts from Supabase",
-                    error_message="Invalid accounts data format from Supabase"
-                )
-            
-            # Build set of valid account IDs
-            valid_account_ids = {a.get('id') for a in accounts if a.get('id')}
+            logger.info(f"Value reconciliation: {details}")
+            return check
+        
+        except Exception as e:
+            error_msg = f"Failed to reconcile values: {str(e)}"
+            logger.error(error_msg)
+            return VerificationCheck(
+                check_name="Value Reconciliation",
+                passed=False,
+                details="",
+                error_message=error_msg
+            )
+    
+    @_timed
+    def verify_account_mappings(self, excel_lines_df: pd.DataFrame) -> VerificationCheck:
+        """
+        Verify all account codes were mapped correctly.
+        
+        Checks that all transaction lines have valid account_id references.
+        
+        Args:
+            excel_lines_df: DataFrame with Excel transaction lines
             
-            # Check each line has valid account_id
-            unmapped_lines = []
-            for line in supabase_lines:
-                account_id = line.get('account_id')
-                if not account_id or account_id not in valid_account_ids:
-                    unmapped_lines.append(line.get('id'))
+        Returns:
+            VerificationCheck with results
+        """
+        try:
+            total_lines, missing, orphaned = self._reference_totals("account_id")
+            unmapped = missing + orphaned
             
-            passed = len(unmapped_lines) == 0
+            passed = unmapped == 0
             
             details = (
-                f"Total lines: {len(supabase_lines)}, "
-                f"Valid accounts: {len(valid_account_ids)}, "
-                f"Unmapped lines: {len(unmapped_lines)}"
+                f"Total lines: {total_lines}, "
+                f"Lines without account: {missing}, "
+                f"Lines with unknown account: {orphaned}"
             )
+            unmapped_by_org = self._orphans_by_org(["account_id"], include_missing=True)
+            if unmapped_by_org:
+                details += f", By org: {unmapped_by_org}"
             
             check = VerificationCheck(
                 check_name="Account Mapping Verification",
                 passed=passed,
                 details=details,
                 expected_value="All lines have valid account_id",
-                actual_value=f"Unmapped lines: {len(unmapped_lines)}"
+                actual_value=f"Unmapped lines: {unmapped}"
             )
             
             logger.info(f"Account mapping verification: {details}")
@@ -373,6 +481,7 @@ class VerificationEngine:
                 error_message=error_msg
             )
     
+    @_timed
     def verify_dimension_integrity(self) -> VerificationCheck:
         """
         Verify dimension integrity in migrated data.
@@ -383,75 +492,22 @@ class VerificationEngine:
             VerificationCheck with results
         """
         try:
-            # Get all lines from Supabase
-            supabase_lines = self.supabase_manager.execute_query(
-                table="transaction_lines",
-                query_type="select",
-                data=None
-            )
-            
-            if not isinstance(supabase_lines, list):
-                return VerificationCheck(
-                    check_name="Dimension Integrity",
-                    passed=False,
-                    details="Failed to retrieve data from Supabase",
-                    error_message="Invalid data format from Supabase"
-                )
-            
-            # Get dimension tables
-            projects = self.supabase_manager.execute_query(
-                table="projects",
-                query_type="select",
-                data=None
-            )
-            classifications = self.supabase_manager.execute_query(
-                table="classifications",
-                query_type="select",
-                data=None
-            )
-            work_analysis = self.supabase_manager.execute_query(
-                table="work_analysis",
-                query_type="select",
-                data=None
-            )
-            sub_trees = self.supabase_manager.execute_query(
-                table="sub_tree",
-                query_type="select",
-                data=None
-            )
-            
-            # Build sets of valid IDs
-            valid_project_ids = {p.get('id') for p in projects if isinstance(projects, list) and p.get('id')}
-            valid_classification_ids = {c.get('id') for c in classifications if isinstance(classifications, list) and c.get('id')}
-            valid_work_analysis_ids = {w.get('id') for w in work_analysis if isinstance(work_analysis, list) and w.get('id')}
-            valid_sub_tree_ids = {s.get('id') for s in sub_trees if isinstance(sub_trees, list) and s.get('id')}
-            
-            # Check dimension references
-            invalid_dimensions = 0
-            
-            for line in supabase_lines:
-                # Check project_id if present
-                if line.get('project_id') and line.get('project_id') not in valid_project_ids:
-                    invalid_dimensions += 1
-                
-                # Check classification_id if present
-                if line.get('classification_id') and line.get('classification_id') not in valid_classification_ids:
-                    invalid_dimensions += 1
-                
-                # Check work_analysis_id if present
-                if line.get('work_analysis_id') and line.get('work_analysis_id') not in valid_work_analysis_ids:
-                    invalid_dimensions += 1
-                
-                # Check sub_tree_id if present
-                if line.get('sub_tree_id') and line.get('sub_tree_id') not in valid_sub_tree_ids:
-                    invalid_dimensions += 1
+            total_lines, _, _ = self._reference_totals("transaction_id")
+            invalid_by_column = {}
+            for column in DIMENSION_COLUMNS:
+                _, _, orphaned = self._reference_totals(column)
+                if orphaned:
+                    invalid_by_column[column] = orphaned
+            invalid_dimensions = sum(invalid_by_column.values())
             
             passed = invalid_dimensions == 0
             
             details = (
-                f"Total lines: {len(supabase_lines)}, "
+                f"Total lines: {total_lines}, "
                 f"Invalid dimension references: {invalid_dimensions}"
             )
+            if invalid_by_column:
+                details += f", By column: {invalid_by_column}"
             
             check = VerificationCheck(
                 check_name="Dimension Integrity",
@@ -478,37 +534,53 @@ class VerificationEngine:
         self,
         excel_lines_df: pd.DataFrame,
         excel_transactions_df: pd.DataFrame,
-        sample_size: int = 100
+        sample_size: int = 100,
+        max_workers: int = DEFAULT_VERIFICATION_WORKERS
     ) -> VerificationReport:
         """
         Run all verification checks.
         
+        Checks are independent and run concurrently; the tables and
+        reference counts they need are fetched once and shared. Results
+        are reported in a fixed order.
+        
         Args:
             excel_lines_df: DataFrame with Excel transaction lines
             excel_transactions_df: DataFrame with Excel transactions
             sample_size: Number of records to sample for data comparison
+            max_workers: Checks run at the same time (1 runs them in turn)
             
         Returns:
             VerificationReport with all check results
         """
         logger.info("Starting comprehensive verification...")
+        start = time.perf_counter()
         
-        # Run all checks
-        checks = [
-            self.verify_record_counts(excel_lines_df, excel_transactions_df),
-            self.verify_referential_integrity(),
-            self.verify_sample_data(excel_lines_df, sample_size),
-            self.verify_account_mappings(excel_lines_df),
-            self.verify_dimension_integrity()
+        checks_to_run = [
+            (self.verify_record_counts, (excel_lines_df, excel_transactions_df)),
+            (self.verify_referential_integrity, ()),
+            (self.verify_sample_data, (excel_lines_df, sample_size)),
+            (self.verify_value_reconciliation, (excel_lines_df,)),
+            (self.verify_account_mappings, (excel_lines_df,)),
+            (self.verify_dimension_integrity, ())
         ]
         
+        # Run all checks
+        if max_workers > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                futures = [pool.submit(check, *args) for check, args in checks_to_run]
+                checks = [future.result() for future in futures]
+        else:
+            checks = [check(*args) for check, args in checks_to_run]
+        
         # Add checks to report
         for check in checks:
             self.report.add_check(check)
         
         # Generate summary
         self.report.summary = (
-            f"Verification completed: {self.report.passed_checks}/{self.report.total_checks} checks passed"
+            f"Verification completed: {self.report.passed_checks}/{self.report.total_checks} checks passed "
+            f"in {time.perf_counter() - start:.2f}s ({self.snapshot.rows_read} rows read)"
         )
         
         logger.info(self.report.summary)
@@ -539,7 +611,8 @@ class VerificationEngine:
                         'details': check.details,
                         'expected_value': str(check.expected_value) if check.expected_value else None,
                         'actual_value': str(check.actual_value) if check.actual_value else None,
-                        'error_message': check.error_message
+                        'error_message': check.error_message,
+                        'duration_seconds': check.duration_seconds
                     }
                     for check in self.report.checks
                 ]
@@ -22,6 +22,12 @@ from .risk_assessment_generator import (
     generate_risk_assessment,
 )
 
+from .trial_balance_engine import (
+    TrialBalanceEngine,
+    TrialBalanceDiff,
+    create_trial_balance_engine,
+)
+
 __all__ = [
     "ReportGenerator",
     "generate_schema_analysis_report",
@@ -36,4 +42,7 @@ __all__ = [
     "generate_risk_assessment_document",
     "RiskAssessmentGenerator",
     "generate_risk_assessment",
+    "TrialBalanceEngine",
+    "TrialBalanceDiff",
+    "create_trial_balance_engine",
 ]
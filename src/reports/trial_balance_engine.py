@@ -0,0 +1,447 @@
+"""Offline trial balance and GL summary over migrated transaction lines.
+
+Computes from the lines DataFrame what get_gl_account_summary_filtered
+(sql/create_approval_aware_gl_summary.sql) computes in the database:
+- GL summary per account: opening, period debits/credits, closing
+- Trial balance per account or rolled up to a level of the account tree
+- Per-dimension balances (account × project, classification, ...)
+- Differences against the rows returned by the database function
+
+Amounts are summed as int64 minor units and converted back only for
+output, so totals match the database's numeric sums exactly.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Dict, List, Mapping, Optional, Union
+import numpy as np
+import pandas as pd
+
+from src.analyzer.account_code_mapper import normalize_account_code
+from src.analyzer.hierarchy_index import HierarchyIndex
+from src.analyzer.money import DEFAULT_SCALE, from_minor_units, to_minor_units
+from src.analyzer.supabase_connection import DEFAULT_PAGE_SIZE
+from src.analyzer.transaction_grouper import parse_entry_dates
+
+logger = logging.getLogger(__name__)
+
+
+# Database function computing the GL summary
+GL_SUMMARY_RPC = "get_gl_account_summary_filtered"
+
+# Amount columns of the GL summary (as returned by the database function)
+GL_AMOUNT_COLUMNS = [
+    "opening_balance", "opening_debit", "opening_credit",
+    "period_debits", "period_credits", "period_net",
+    "closing_balance", "closing_debit", "closing_credit",
+]
+
+# Columns compared with the database function
+GL_COMPARED_COLUMNS = ["opening_balance", "period_debits", "period_credits", "closing_balance", "transaction_count"]
+
+# Dimension code columns of the lines
+DIMENSION_COLUMNS = ["project_code", "classification_code", "work_analysis_code", "sub_tree_code"]
+
+# Accepted column names of the lines (Excel names first, then Supabase names)
+LINE_COLUMNS = {
+    "entry_no": ["entry_no", "entry no", "entry_number"],
+    "entry_date": ["entry_date", "entry date"],
+    "account_code": ["account_code", "account code"],
+    "debit": ["debit", "debit_amount"],
+    "credit": ["credit", "credit_amount"],
+}
+
+DateLike = Optional[Union[str, date, pd.Timestamp]]
+
+
+@dataclass
+class TrialBalanceDiff:
+    """GL summary differences between the lines and the database function"""
+    accounts_compared: int = 0
+    differences: pd.DataFrame = field(default_factory=pd.DataFrame)  # one row per differing account
+    local_totals: Dict[str, float] = field(default_factory=dict)
+    rpc_totals: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def passed(self) -> bool:
+        return self.differences.empty
+
+
+def _column(df: pd.DataFrame, name: str) -> Optional[str]:
+    for candidate in LINE_COLUMNS.get(name, [name, name.replace("_", " ")]):
+        if candidate in df.columns:
+            return candidate
+    return None
+
+
+def _code_text(values: pd.Series) -> np.ndarray:
+    """Codes as text, each distinct value converted once (blanks '')"""
+    codes, uniques = pd.factorize(values)
+    texts = [normalize_account_code(value) or "" for value in np.asarray(uniques, dtype=object).tolist()]
+    return np.array(texts + [""], dtype=object)[codes]
+
+
+def _sum_by(groups: np.ndarray, size: int, values: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Exact int64 sums of values per group over the masked lines"""
+    totals = np.zeros(size, dtype=np.int64)
+    np.add.at(totals, groups[mask], values[mask])
+    return totals
+
+
+def _pair_codes(first, second) -> np.ndarray:
+    """Group number of each (first, second) pair, from combined integer codes"""
+    first_codes, first_uniques = pd.factorize(first)
+    second_codes, second_uniques = pd.factorize(second)
+    combined = first_codes.astype(np.int64) * (len(second_uniques) + 1) + second_codes
+    return pd.factorize(combined)[0]
+
+
+class TrialBalanceEngine:
+    """
+    GL summary, trial balance and dimension balances from transaction lines.
+
+    Accounts come from the optional chart of accounts (code, name and
+    parent_code, or id and parent_id) plus every account code used by
+    the lines. An account_code_map translates source codes (e.g. legacy
+    Excel codes) to chart codes first.
+    """
+
+    def __init__(
+        self,
+        lines_df: pd.DataFrame,
+        accounts: Optional[pd.DataFrame] = None,
+        scale: int = DEFAULT_SCALE,
+        account_code_map: Optional[Mapping[str, str]] = None
+    ):
+        """
+        Initialize trial balance engine.
+
+        Args:
+            lines_df: Transaction lines with entry_no, entry_date,
+                account_code, debit and credit (Excel or Supabase names)
+                and optional dimension code columns
+            accounts: Chart of accounts (optional)
+            scale: Decimal places of the minor units
+            account_code_map: Source code → chart code (optional)
+        """
+        missing = [name for name in LINE_COLUMNS if _column(lines_df, name) is None]
+        if missing:
+            raise ValueError(f"Missing columns for trial balance: {missing}")
+        self.scale = scale
+
+        codes = _code_text(lines_df[_column(lines_df, "account_code")])
+        if account_code_map:
+            mapped = pd.Series(codes).map(account_code_map)
+            codes = mapped.where(mapped.notna(), pd.Series(codes)).to_numpy(dtype=object)
+
+        dates = parse_entry_dates(lines_df[_column(lines_df, "entry_date")]).reset_index(drop=True)
+        entry_no = _code_text(lines_df[_column(lines_df, "entry_no")])
+        self.lines = pd.DataFrame({
+            "account_code": codes,
+            "entry_date": dates,
+            # A transaction is one (entry_no, entry_date), as in the migration
+            "transaction": _pair_codes(entry_no, dates),
+            "debit_units": to_minor_units(lines_df[_column(lines_df, "debit")], scale).fillna(0)
+                           .to_numpy(dtype=np.int64),
+            "credit_units": to_minor_units(lines_df[_column(lines_df, "credit")], scale).fillna(0)
+                            .to_numpy(dtype=np.int64),
+        })
+        for dimension in DIMENSION_COLUMNS:
+            column = _column(lines_df, dimension)
+            if column is not None:
+                self.lines[dimension] = _code_text(lines_df[column])
+
+        self.accounts = self._chart(accounts)
+        # Codes missing from the chart are added as root accounts; lines without a code are left out
+        used = pd.Index(self.lines["account_code"].unique()).drop("", errors="ignore")
+        unknown = used.difference(pd.Index(self.accounts["code"]))
+        if accounts is not None and not accounts.empty and len(unknown):
+            logger.warning(f"{len(unknown)} account codes of the lines are not in the chart of accounts")
+        extra = pd.DataFrame({"code": unknown.to_numpy(dtype=object), "name": None, "parent_code": None,
+                              "account_id": None})
+        self.accounts = pd.concat([self.accounts, extra], ignore_index=True).sort_values(
+            "code", kind="stable").reset_index(drop=True)
+
+        self.account_index = pd.Index(self.accounts["code"])
+        self.positions = self.account_index.get_indexer(self.lines["account_code"])
+        self.hierarchy = HierarchyIndex.from_rows(
+            self.accounts, key_column="code", parent_column="parent_code", name="accounts"
+        )
+
+        logger.info(f"Trial balance engine: {len(self.lines)} lines, {len(self.accounts)} accounts")
+
+    @staticmethod
+    def _chart(accounts: Optional[pd.DataFrame]) -> pd.DataFrame:
+        """Chart of accounts as code, name, parent_code and account_id"""
+        if accounts is None or accounts.empty:
+            return pd.DataFrame(columns=["code", "name", "parent_code", "account_id"], dtype=object)
+
+        chart = pd.DataFrame({"code": _code_text(accounts["code"])}, index=accounts.index)
+        name_column = next((c for c in ("name_ar", "name", "account_name") if c in accounts.columns), None)
+        chart["name"] = accounts[name_column].astype(object) if name_column else None
+        chart["account_id"] = accounts["id"].astype(object) if "id" in accounts.columns else None
+        if "parent_code" in accounts.columns:
+            chart["parent_code"] = _code_text(accounts["parent_code"])
+        elif "parent_id" in accounts.columns and "id" in accounts.columns:
+            code_by_id = pd.Series(chart["code"].to_numpy(), index=accounts["id"].to_numpy())
+            chart["parent_code"] = accounts["parent_id"].map(code_by_id).fillna("").to_numpy(dtype=object)
+        else:
+            chart["parent_code"] = ""
+        chart["parent_code"] = chart["parent_code"].replace("", None)
+        return chart[chart["code"] != ""].drop_duplicates("code").reset_index(drop=True)
+
+    def _period_masks(self, date_from: DateLike, date_to: DateLike):
+        """Lines before the period (opening) and inside it, like the database function"""
+        dates = self.lines["entry_date"]
+        if date_from is not None:
+            opening = (dates < pd.Timestamp(date_from)).to_numpy()
+            in_period = (dates >= pd.Timestamp(date_from)).to_numpy()
+        else:
+            opening = np.zeros(len(dates), dtype=bool)
+            in_period = np.ones(len(dates), dtype=bool)
+        if date_to is not None:
+            in_period = in_period & (dates <= pd.Timestamp(date_to)).to_numpy()
+        known = self.positions >= 0
+        return opening & known, in_period & known
+
+    def gl_summary_units(self, date_from: DateLike = None, date_to: DateLike = None) -> pd.DataFrame:
+        """
+        GL summary per account in minor units.
+
+        Args:
+            date_from: First day of the period (None for no opening balance)
+            date_to: Last day of the period (None for open-ended)
+
+        Returns:
+            DataFrame with account_id, account_code, account_name,
+            GL_AMOUNT_COLUMNS (int64 minor units) and transaction_count
+        """
+        size = len(self.accounts)
+        opening_mask, period_mask = self._period_masks(date_from, date_to)
+        debit = self.lines["debit_units"].to_numpy()
+        credit = self.lines["credit_units"].to_numpy()
+
+        opening = _sum_by(self.positions, size, debit - credit, opening_mask)
+        period_debits = _sum_by(self.positions, size, debit, period_mask)
+        period_credits = _sum_by(self.positions, size, credit, period_mask)
+        period_net = period_debits - period_credits
+        closing = opening + period_net
+
+        pairs = pd.DataFrame({"account": self.positions[period_mask],
+                              "transaction": self.lines["transaction"].to_numpy()[period_mask]}).drop_duplicates()
+        transaction_count = np.bincount(pairs["account"].to_numpy(dtype=np.int64), minlength=size)
+
+        return pd.DataFrame({
+            "account_id": self.accounts["account_id"].to_numpy(dtype=object),
+            "account_code": self.accounts["code"].to_numpy(dtype=object),
+            "account_name": self.accounts["name"].to_numpy(dtype=object),
+            "opening_balance": opening,
+            "opening_debit": np.maximum(opening, 0),
+            "opening_credit": np.maximum(-opening, 0),
+            "period_debits": period_debits,
+            "period_credits": period_credits,
+            "period_net": period_net,
+            "closing_balance": closing,
+            "closing_debit": np.maximum(closing, 0),
+            "closing_credit": np.maximum(-closing, 0),
+            "transaction_count": transaction_count.astype(np.int64),
+        })
+
+    def gl_summary(self, date_from: DateLike = None, date_to: DateLike = None) -> pd.DataFrame:
+        """GL summary per account with amounts (see gl_summary_units)"""
+        return self._to_amounts(self.gl_summary_units(date_from, date_to))
+
+    def trial_balance(self, date_from: DateLike = None, date_to: DateLike = None,
+                      level: Optional[int] = None) -> pd.DataFrame:
+        """
+        Trial balance per account, or rolled up to a level of the account tree.
+
+        Without a level every account is listed with its own amounts and
+        rollup_balance, the closing balance of its whole subtree. With a
+        level, accounts are summed into their ancestor at that depth
+        (accounts above the level and accounts outside the tree stay as
+        they are).
+
+        Args:
+            date_from: First day of the period
+            date_to: Last day of the period
+            level: Depth to roll up to (0 for root accounts)
+
+        Returns:
+            DataFrame with amounts per account
+        """
+        summary = self.gl_summary_units(date_from, date_to)
+        if level is None:
+            summary["depth"] = self.hierarchy.depth[self.hierarchy.positions(summary["account_code"])]
+            summary["rollup_balance"] = self.hierarchy.rollup(
+                summary["account_code"], summary["closing_balance"].to_numpy()
+            ).reindex(summary["account_code"]).to_numpy()
+            return self._to_amounts(summary, extra=["rollup_balance"])
+
+        ancestors = self.hierarchy.ancestor_at_depth(summary["account_code"], level)
+        summary["account_code"] = ancestors.where(ancestors.notna(), summary["account_code"])
+        sums = ["opening_balance", "period_debits", "period_credits", "period_net", "closing_balance",
+                "transaction_count"]
+        rolled = summary.groupby("account_code", sort=True)[sums].sum().reset_index()
+        rolled["opening_debit"] = np.maximum(rolled["opening_balance"], 0)
+        rolled["opening_credit"] = np.maximum(-rolled["opening_balance"], 0)
+        rolled["closing_debit"] = np.maximum(rolled["closing_balance"], 0)
+        rolled["closing_credit"] = np.maximum(-rolled["closing_balance"], 0)
+        chart = self.accounts.set_index("code")
+        rolled["account_id"] = rolled["account_code"].map(chart["account_id"])
+        rolled["account_name"] = rolled["account_code"].map(chart["name"])
+        # transaction_count of a rolled-up row counts a transaction once per account it touches
+        return self._to_amounts(rolled[summary.columns])
+
+    def dimension_balances(self, dimension: str, date_from: DateLike = None, date_to: DateLike = None,
+                           level: Optional[int] = None) -> pd.DataFrame:
+        """
+        Net period balance (debit - credit) per account and dimension code.
+
+        Args:
+            dimension: One of DIMENSION_COLUMNS present in the lines
+            date_from: First day of the period
+            date_to: Last day of the period
+            level: Roll accounts up to this depth of the account tree
+
+        Returns:
+            Pivot table: account codes as index, dimension codes as
+            columns ('' for lines without one)
+        """
+        if dimension not in self.lines.columns:
+            raise ValueError(f"Lines have no {dimension} column")
+
+        _, period_mask = self._period_masks(date_from, date_to)
+        accounts = self.lines["account_code"]
+        if level is not None:
+            ancestors = self.hierarchy.ancestor_at_depth(accounts, level)
+            accounts = ancestors.where(ancestors.notna(), accounts)
+
+        row_codes, rows = pd.factorize(accounts[period_mask], sort=True)
+        column_codes, columns = pd.factorize(self.lines[dimension][period_mask], sort=True)
+        net = (self.lines["debit_units"] - self.lines["credit_units"]).to_numpy()[period_mask]
+        grid = np.zeros((len(rows), len(columns)), dtype=np.int64)
+        np.add.at(grid, (row_codes, column_codes), net)
+
+        amounts = grid / (10 ** self.scale)
+        return pd.DataFrame(amounts, index=pd.Index(rows, name="account_code"),
+                            columns=pd.Index(columns, name=dimension))
+
+    def diff_against_rpc(self, rpc_rows: List[Dict[str, Any]], date_from: DateLike = None,
+                         date_to: DateLike = None, tolerance_units: int = 0) -> TrialBalanceDiff:
+        """
+        Compare the GL summary with rows of get_gl_account_summary_filtered.
+
+        Accounts are matched by code; an account missing on one side
+        counts as all zeros.
+
+        Args:
+            rpc_rows: Rows returned by the database function
+            date_from: Period start used for the database call
+            date_to: Period end used for the database call
+            tolerance_units: Allowed difference in minor units
+
+        Returns:
+            TrialBalanceDiff listing the accounts that differ
+        """
+        local = self.gl_summary_units(date_from, date_to)
+        remote = pd.DataFrame(rpc_rows or [], columns=["account_code"] + GL_COMPARED_COLUMNS)
+        remote["account_code"] = _code_text(remote["account_code"])
+        for column in GL_COMPARED_COLUMNS:
+            if column == "transaction_count":
+                remote[column] = pd.to_numeric(remote[column]).fillna(0).astype(np.int64)
+            else:
+                remote[column] = to_minor_units(remote[column].astype(object), self.scale).fillna(0).astype(np.int64)
+        remote = remote.groupby("account_code", as_index=False)[GL_COMPARED_COLUMNS].sum()
+
+        merged = local[["account_code"] + GL_COMPARED_COLUMNS].merge(
+            remote, on="account_code", how="outer", suffixes=("_local", "_rpc")
+        )
+        differs = np.zeros(len(merged), dtype=bool)
+        for column in GL_COMPARED_COLUMNS:
+            for side in ("local", "rpc"):
+                merged[f"{column}_{side}"] = merged[f"{column}_{side}"].fillna(0).astype(np.int64)
+            difference = merged[f"{column}_local"] - merged[f"{column}_rpc"]
+            merged[f"{column}_difference"] = difference
+            allowed = 0 if column == "transaction_count" else tolerance_units
+            differs |= (difference.abs() > allowed).to_numpy()
+
+        differences = merged[differs].reset_index(drop=True)
+        for column in GL_COMPARED_COLUMNS[:-1]:
+            for suffix in ("local", "rpc", "difference"):
+                differences[f"{column}_{suffix}"] = from_minor_units(differences[f"{column}_{suffix}"], self.scale)
+
+        result = TrialBalanceDiff(
+            accounts_compared=len(merged),
+            differences=differences,
+            local_totals=self._totals(local),
+            rpc_totals=self._totals(remote),
+        )
+        logger.info(f"Trial balance diff: {len(differences)} of {len(merged)} accounts differ")
+        return result
+
+    def reconcile_with_supabase(self, supabase_manager: Any, org_id: Optional[str] = None,
+                                date_from: DateLike = None, date_to: DateLike = None,
+                                posted_only: bool = False, tolerance_units: int = 0,
+                                page_size: int = DEFAULT_PAGE_SIZE) -> TrialBalanceDiff:
+        """
+        Read get_gl_account_summary_filtered page by page and diff it with the lines.
+
+        The function numbers its rows by account code, so p_limit/p_offset
+        pages neither skip nor repeat accounts; pages are read until a short
+        one comes back, so the server's row limit cannot truncate the chart.
+
+        Args:
+            supabase_manager: SupabaseConnectionManager instance
+            org_id: Organization of the migrated lines
+            date_from: First day of the period
+            date_to: Last day of the period
+            posted_only: Passed to the database function as p_posted_only
+            tolerance_units: Allowed difference in minor units
+            page_size: Accounts per call (at most the server's row limit)
+
+        Returns:
+            TrialBalanceDiff listing the accounts that differ
+        """
+        params = {
+            "p_date_from": pd.Timestamp(date_from).date().isoformat() if date_from is not None else None,
+            "p_date_to": pd.Timestamp(date_to).date().isoformat() if date_to is not None else None,
+            "p_org_id": org_id,
+            "p_posted_only": posted_only,
+            "p_limit": page_size,
+        }
+        rows: List[Dict[str, Any]] = []
+        offset = 0
+        while True:
+            page = supabase_manager.call_rpc(GL_SUMMARY_RPC, {**params, "p_offset": offset}) or []
+            rows.extend(page)
+            if len(page) < page_size:
+                break
+            offset += page_size
+        return self.diff_against_rpc(rows, date_from, date_to, tolerance_units)
+
+    def _totals(self, summary: pd.DataFrame) -> Dict[str, float]:
+        """Debit and credit totals of a summary in minor units, as amounts"""
+        units = {
+            "period_debits": int(summary["period_debits"].sum()),
+            "period_credits": int(summary["period_credits"].sum()),
+            "closing_debit": int(np.maximum(summary["closing_balance"], 0).sum()),
+            "closing_credit": int(np.maximum(-summary["closing_balance"], 0).sum()),
+        }
+        return {name: value / (10 ** self.scale) for name, value in units.items()}
+
+    def _to_amounts(self, summary: pd.DataFrame, extra: Optional[List[str]] = None) -> pd.DataFrame:
+        """Convert the minor unit columns of a summary to amounts"""
+        summary = summary.copy()
+        for column in GL_AMOUNT_COLUMNS + (extra or []):
+            summary[column] = from_minor_units(summary[column].astype(np.int64), self.scale)
+        return summary
+
+
+# Factory function for easy creation
+def create_trial_balance_engine(lines_df: pd.DataFrame, accounts: Optional[pd.DataFrame] = None,
+                                scale: int = DEFAULT_SCALE,
+                                account_code_map: Optional[Mapping[str, str]] = None) -> TrialBalanceEngine:
+    """Create a trial balance engine over transaction lines."""
+    return TrialBalanceEngine(lines_df, accounts, scale, account_code_map)
@@ -0,0 +1,71 @@
+"""
+Unit tests for AccountCodeIndex
+
+Tests mapping suggestions for unmapped account codes:
+- Longest common prefix against legacy and new codes
+- Parent-code inference
+- Similarity of normalized Arabic names
+"""
+
+import pandas as pd
+
+from src.analyzer.account_code_index import AccountCodeIndex
+from src.analyzer.account_code_mapper import AccountMapping, AccountCodeMapper
+
+
+def _mapping(legacy, code, name):
+    return AccountMapping(legacy, legacy, code, name, f"uuid-{code}", 0.95, account_id_resolved=True)
+
+
+MAPPINGS = [
+    _mapping("1101", "110101", "الصندوق"),
+    _mapping("1102", "110102", "البنك الأهلي"),
+    _mapping("1200", "120000", "العملاء"),
+    _mapping("2101", "210101", "الموردون"),
+]
+
+
+class TestCodeSuggestions:
+    """Test ranked candidates for unmapped codes"""
+
+    def test_longest_prefix_ranked_first(self):
+        """Test that the legacy code with the longest shared prefix wins"""
+        index = AccountCodeIndex.from_mappings(MAPPINGS)
+
+        suggestions = index.suggest("1103")
+
+        assert [s.candidate_code for s in suggestions[:2]] == ["110101", "110102"]
+        assert suggestions[0].reasons[0] == "prefix:legacy:3"
+        assert all(s.candidate_code != "210101" for s in suggestions)
+
+    def test_parent_inference(self):
+        """Test that a zero-padded parent code is suggested"""
+        index = AccountCodeIndex.from_mappings(MAPPINGS)
+
+        suggestions = index.suggest("1250")
+
+        assert suggestions[0].candidate_code == "120000"
+        assert "parent:1200" in suggestions[0].reasons
+
+    def test_name_similarity(self):
+        """Test that an alef/teh marbuta variant of a name is matched"""
+        extra = pd.DataFrame({"code": ["310001"], "name": ["مصروفات إدارية"], "account_id": ["uuid-310001"]})
+        index = AccountCodeIndex.from_mappings(MAPPINGS, extra)
+
+        suggestions = index.suggest("9999", name="مصروفات اداريه")
+
+        assert suggestions[0].candidate_code == "310001"
+        assert suggestions[0].reasons[-1].startswith("name:")
+
+    def test_mapper_suggests_unmapped_codes(self, tmp_path):
+        """Test suggestions for the codes found unmapped by the mapper"""
+        mapper = AccountCodeMapper(mapping_file=str(tmp_path / "missing.csv"))
+        mapper.excel_to_mapping = {m.excel_code: m for m in MAPPINGS}
+        mapper.excel_to_account_id = {m.excel_code: m.account_id for m in MAPPINGS}
+        mapper.verify_all_codes_mapped(["1101", "2102", "1103"])
+
+        suggestions = mapper.suggest_mappings(limit=1)
+
+        assert {code: s[0].candidate_code for code, s in suggestions.items()} == {
+            "2102": "210101", "1103": "110101"
+        }
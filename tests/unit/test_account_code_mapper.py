@@ -0,0 +1,180 @@
+"""
+Unit tests for AccountCodeMapper
+
+Tests account id resolution:
+- Bulk lookup of current codes in URL-sized chunks
+- Disk cache of resolved ids per organization, rechecked after its TTL
+- Vectorized mapping of an account code column
+"""
+
+from types import SimpleNamespace
+
+import pytest
+import pandas as pd
+
+from src.analyzer.account_code_mapper import AccountCodeMapper, chunk_by_url_length
+
+
+class FakeAccountsQuery:
+    """Chainable stand-in for a select on accounts"""
+
+    def __init__(self, client, columns, count=None):
+        self.client = client
+        self.columns = columns
+        self.count = count
+        self.filters = {}
+        self.values = None
+        self.nulls_first = False
+
+    def eq(self, column, value):
+        self.filters[column] = value
+        return self
+
+    def in_(self, column, values):
+        self.client.requests.append(list(values))
+        self.values = set(values)
+        return self
+
+    def order(self, column, desc=False, nullsfirst=None):
+        # PostgreSQL puts NULLs first in descending order unless told otherwise
+        self.nulls_first = desc if nullsfirst is None else nullsfirst
+        return self
+
+    def limit(self, rows):
+        return self
+
+    def execute(self):
+        rows = [row for row in self.client.accounts if row["org_id"] == self.filters.get("org_id")]
+        if self.columns == "updated_at":
+            stamped = sorted([row for row in rows if row["updated_at"] is not None],
+                             key=lambda row: row["updated_at"], reverse=True)
+            unstamped = [row for row in rows if row["updated_at"] is None]
+            latest = (unstamped + stamped if self.nulls_first else stamped + unstamped)[:1]
+            return SimpleNamespace(data=latest, count=len(rows))
+        return SimpleNamespace(data=[row for row in rows if row["code"] in self.values])
+
+
+class FakeClient:
+    def __init__(self, accounts):
+        self.accounts = accounts
+        self.requests = []
+
+    def table(self, name):
+        return SimpleNamespace(select=lambda columns, count=None: FakeAccountsQuery(self, columns, count))
+
+
+@pytest.fixture
+def mapping_file(tmp_path):
+    path = tmp_path / "account_mapping.csv"
+    path.write_text(
+        "old_code,old_name,new_code,new_name,notes\n"
+        + "".join(f"{1000 + i},old {i},{5000 + i},new {i},\n" for i in range(40))
+        + "9999,gone,8888,missing,\n",
+        encoding="utf-8"
+    )
+    return str(path)
+
+
+@pytest.fixture
+def client():
+    accounts = [{"id": f"uuid-{5000 + i}", "code": str(5000 + i), "org_id": "org-1", "updated_at": "2024-01-01"}
+                for i in range(40)]
+    accounts.append({"id": "uuid-other", "code": "8888", "org_id": "org-2", "updated_at": "2024-01-01"})
+    return FakeClient(accounts)
+
+
+class TestAccountIdResolution:
+    """Test bulk resolution of current codes"""
+
+    def test_chunks_fit_url_budget(self):
+        """Test that chunks respect the encoded length"""
+        chunks = chunk_by_url_length([str(1000 + i) for i in range(100)], max_length=80)
+
+        assert sum(len(chunk) for chunk in chunks) == 100
+        assert all(len(chunk) * 11 <= 80 for chunk in chunks)
+
+    def test_resolve_in_bulk(self, client, mapping_file, tmp_path):
+        """Test that placeholders become UUIDs in a few chunked requests"""
+        mapper = AccountCodeMapper(client, mapping_file, str(tmp_path / "none.json"),
+                                   org_id="org-1", max_filter_length=200)
+
+        assert mapper.load_mappings() is True
+
+        assert mapper.map_excel_code_to_account_id("1003") == "uuid-5003"
+        assert mapper.get_mapping("1003").account_id_resolved is True
+        assert mapper.unresolved_codes == ["8888"]
+        assert "9999" not in mapper.excel_to_account_id
+        assert 1 < len(client.requests) < 10
+        assert sorted(code for request in client.requests for code in request) == \
+            sorted([str(5000 + i) for i in range(40)] + ["8888"])
+
+    def test_cache_reused_per_org(self, client, mapping_file, tmp_path):
+        """Test that a second run resolves cached codes without requests"""
+        cache_dir = str(tmp_path / "cache")
+        AccountCodeMapper(client, mapping_file, "none.json", org_id="org-1", cache_dir=cache_dir).load_mappings()
+        client.requests.clear()
+
+        mapper = AccountCodeMapper(client, mapping_file, "none.json", org_id="org-1", cache_dir=cache_dir)
+        mapper.load_mappings()
+        offline = AccountCodeMapper(None, mapping_file, "none.json", org_id="org-1", cache_dir=cache_dir)
+        offline.load_mappings()
+
+        assert client.requests == [["8888"]]
+        assert mapper.map_excel_code_to_account_id("1039") == "uuid-5039"
+        assert offline.map_excel_code_to_account_id("1039") == "uuid-5039"
+        assert (tmp_path / "cache" / "account_ids_org-1.json").exists()
+
+    def test_expired_cache_rechecks_accounts(self, client, mapping_file, tmp_path):
+        """Test that an account deleted and re-created since the cache was saved gets its new id"""
+        cache_dir = str(tmp_path / "cache")
+        AccountCodeMapper(client, mapping_file, "none.json", org_id="org-1", cache_dir=cache_dir).load_mappings()
+
+        unchanged = AccountCodeMapper(client, mapping_file, "none.json", org_id="org-1",
+                                      cache_dir=cache_dir, cache_ttl=-1)
+        unchanged.load_mappings()
+        client.accounts[3] = {"id": "uuid-new", "code": "5003", "org_id": "org-1", "updated_at": "2024-02-01"}
+        changed = AccountCodeMapper(client, mapping_file, "none.json", org_id="org-1",
+                                    cache_dir=cache_dir, cache_ttl=-1)
+        changed.load_mappings()
+
+        assert unchanged.map_excel_code_to_account_id("1003") == "uuid-5003"
+        assert changed.map_excel_code_to_account_id("1003") == "uuid-new"
+
+    def test_account_without_updated_at_does_not_hide_changes(self, client, mapping_file, tmp_path):
+        """Test that a NULL updated_at does not mask a re-created account"""
+        cache_dir = str(tmp_path / "cache")
+        client.accounts[0]["updated_at"] = None
+        AccountCodeMapper(client, mapping_file, "none.json", org_id="org-1", cache_dir=cache_dir).load_mappings()
+
+        client.accounts[3] = {"id": "uuid-new", "code": "5003", "org_id": "org-1", "updated_at": "2024-02-01"}
+        changed = AccountCodeMapper(client, mapping_file, "none.json", org_id="org-1",
+                                    cache_dir=cache_dir, cache_ttl=-1)
+        changed.load_mappings()
+
+        assert changed.map_excel_code_to_account_id("1003") == "uuid-new"
+
+    def test_org_required(self, client, mapping_file):
+        """Test that codes are not resolved across organizations"""
+        mapper = AccountCodeMapper(client, mapping_file, "none.json")
+
+        assert mapper.load_mappings() is True
+        assert mapper.get_mapping("1003").account_id_resolved is False
+        assert client.requests == []
+        with pytest.raises(ValueError):
+            mapper.resolve_account_ids()
+
+
+class TestAccountMapSeries:
+    """Test vectorized mapping"""
+
+    def test_map_series(self, client, mapping_file):
+        """Test ids, unmapped mask and unmapped codes for a column"""
+        mapper = AccountCodeMapper(client, mapping_file, "none.json", org_id="org-1")
+        mapper.load_mappings()
+        codes = pd.Series([1000.0, "1001", " 1001 ", None, "7777", "9999"], index=list("abcdef"))
+
+        ids, unmapped = mapper.map_series(codes)
+
+        assert ids.tolist() == ["uuid-5000", "uuid-5001", "uuid-5001", None, None, None]
+        assert unmapped.tolist() == [False, False, False, False, True, True]
+        assert mapper.unmapped_codes == ["7777", "9999"]
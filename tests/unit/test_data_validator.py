@@ -195,6 +195,23 @@ class TestDataValidatorDateValidation:
         
         assert any(e.error_type == 'date' for e in result.errors)
     
+    def test_out_of_bounds_date_is_out_of_range(self):
+        """Test that a date the vectorized parse rejects is still range-checked"""
+        validator = DataValidator()
+        
+        data = pd.DataFrame({
+            'fiscal_year': [2024, 2024],
+            'month': [1, 2],
+            'entry_no': [1, 2],
+            'entry_date': ['0001-01-01', '2024-01-02']
+        })
+        
+        result = validator.validate_transactions(data)
+        
+        messages = [e.error_message for e in result.errors if e.field_name == 'entry_date']
+        assert len(messages) == 1
+        assert 'outside reasonable range' in messages[0]
+    
     def test_validate_valid_dates(self):
         """Test that valid dates pass"""
         validator = DataValidator()
@@ -389,6 +406,50 @@ class TestDataValidatorDimensionCodes:
         assert not any(w.field_name == 'project_code' and w.row_number == 1 for w in result.warnings)
 
 
+class TestDataValidatorRowOrder:
+    """Test that mask-based rules report rows like a row-by-row pass"""
+    
+    def test_errors_ordered_by_row_then_rule(self):
+        """Test error order and row numbers across rules"""
+        validator = DataValidator()
+        validator.set_valid_account_codes({'1001'})
+        
+        data = pd.DataFrame({
+            'account_code': ['9999', '1001', None],
+            'debit': ['abc', -5, 0],
+            'credit': [0, 0, None],
+            'entry_no': [1, 1, 1]
+        }, index=[10, 11, 12])
+        
+        result = validator.validate_transaction_lines(data)
+        
+        assert [(e.row_number, e.error_type) for e in result.errors] == [
+            (11, 'account_code'),
+            (11, 'data_type'),
+            (12, 'range'),
+            (13, 'required_field'),
+            (13, 'required_field'),
+            (13, 'business_rule'),
+        ]
+        assert result.errors[-1].actual_value == "debit=0.0, credit=0"
+    
+    def test_out_of_bounds_date_reported_as_range(self):
+        """Test that dates outside 1900-2100 keep their year"""
+        validator = DataValidator()
+        
+        data = pd.DataFrame({
+            'entry_no': [1, 2, 3],
+            'entry_date': ['1500-01-01', 'not a date', '2024-01-01']
+        })
+        
+        result = validator.validate_transactions(data)
+        
+        assert [(e.row_number, e.error_message.split()[0]) for e in result.errors] == [
+            (1, 'Date'),
+            (2, 'Invalid')
+        ]
+
+
 class TestDataValidatorReportGeneration:
     """Test validation report generation"""
     
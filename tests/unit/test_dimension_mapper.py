@@ -0,0 +1,255 @@
+"""
+Unit tests for DimensionMapper
+
+Tests dimension loading:
+- Paginated loading of all dimension tables
+- Organization filter
+- Snapshot reuse and invalidation by freshness markers
+- Vectorized mapping and registered dimension types
+"""
+
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+import pandas as pd
+
+from src.analyzer.dimension_mapper import DimensionMapper, DimensionRegistry
+
+
+class FakeQuery:
+    """Chainable stand-in for a PostgREST select"""
+
+    def __init__(self, client, table, columns, count=None):
+        self.client = client
+        self.table = table
+        self.columns = columns
+        self.count = count
+        self.filters = {}
+        self.bounds = None
+        self.limit_rows = None
+        self.nulls_first = False
+
+    def eq(self, column, value):
+        self.filters[column] = value
+        return self
+
+    def order(self, column, desc=False, nullsfirst=None):
+        # PostgreSQL puts NULLs first in descending order unless told otherwise
+        self.nulls_first = desc if nullsfirst is None else nullsfirst
+        return self
+
+    def range(self, start, end):
+        self.bounds = (start, end)
+        return self
+
+    def limit(self, rows):
+        self.limit_rows = rows
+        return self
+
+    def execute(self):
+        self.client.requests.append((self.table, self.columns, self.bounds))
+        rows = [row for row in self.client.rows[self.table]
+                if all(row.get(column) == value for column, value in self.filters.items())]
+        total = len(rows)
+        if self.columns == "updated_at":
+            if any("updated_at" not in row for row in rows):
+                raise Exception(f"column {self.table}.updated_at does not exist")
+            stamped = sorted([row for row in rows if row["updated_at"] is not None],
+                             key=lambda row: row["updated_at"], reverse=True)
+            unstamped = [row for row in rows if row["updated_at"] is None]
+            rows = unstamped + stamped if self.nulls_first else stamped + unstamped
+        if self.bounds:
+            rows = rows[self.bounds[0]:self.bounds[1] + 1]
+        if self.limit_rows:
+            rows = rows[:self.limit_rows]
+        return SimpleNamespace(data=rows, count=total if self.count else None)
+
+
+class FakeClient:
+    """Supabase client serving in-memory tables"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.requests = []
+
+    def table(self, name):
+        return SimpleNamespace(select=lambda columns, count=None: FakeQuery(self, name, columns, count))
+
+
+@pytest.fixture
+def client():
+    def rows(prefix, count):
+        return [
+            {"id": f"{prefix}-{i}", "code": f"{prefix[0].upper()}{i}", "name": f"{prefix} {i}",
+             "org_id": "org-1" if i % 5 else "org-2", "updated_at": f"2024-01-{i % 28 + 1:02d}"}
+            for i in range(count)
+        ]
+    return FakeClient({
+        "projects": rows("project", 7),
+        "classifications": rows("classification", 3),
+        "work_analysis": rows("work", 0),
+        "sub_tree": rows("sub", 12),
+    })
+
+
+class TestDimensionLoading:
+    """Test concurrent paginated loading"""
+
+    def test_all_pages_loaded_for_org(self, client):
+        """Test that every page is fetched and other organizations are skipped"""
+        mapper = DimensionMapper(client, org_id="org-1", page_size=3)
+
+        assert mapper.load_all_dimensions() is True
+
+        assert len(mapper.project_cache) == 5
+        assert len(mapper.sub_tree_cache) == 9
+        with pytest.raises(TypeError):
+            mapper.project_cache["PX"] = None
+        assert mapper.map_sub_tree_code("S11") == "sub-11"
+        assert mapper.map_sub_tree_code("S10") is None
+        assert all(mapper.caches_loaded.values())
+        project_pages = [bounds for table, _, bounds in client.requests if table == "projects" and bounds]
+        assert project_pages == [(0, 2), (3, 5)]
+
+    def test_cache_views_look_codes_up_lazily(self, client, monkeypatch):
+        """Test that the legacy cache properties do not build every mapping"""
+        mapper = DimensionMapper(client, org_id="org-1", page_size=3)
+        mapper.load_all_dimensions()
+        monkeypatch.setattr(DimensionRegistry, "to_mappings", Mock(side_effect=AssertionError("materialized")))
+
+        cache = mapper.sub_tree_cache
+
+        assert "S11" in cache
+        assert "S10" not in cache
+        assert cache["S11"].id == "sub-11"
+        assert cache.get("S10") is None
+        assert sorted(cache)[:2] == ["S1", "S11"]
+        with pytest.raises(KeyError):
+            cache["S10"]
+
+
+class TestDimensionSnapshot:
+    """Test the local dimension snapshot"""
+
+    def test_warm_start_skips_network(self, client, tmp_path):
+        """Test that a fresh snapshot is used without any request"""
+        DimensionMapper(client, org_id="org-1", snapshot_dir=str(tmp_path)).load_all_dimensions()
+        client.requests.clear()
+
+        mapper = DimensionMapper(client, org_id="org-1", snapshot_dir=str(tmp_path))
+
+        assert mapper.load_all_dimensions() is True
+        assert mapper.snapshot_used is True
+        assert client.requests == []
+        assert mapper.map_project_code("P1") == "project-1"
+
+    def test_snapshot_keyed_by_org(self, client, tmp_path):
+        """Test that another organization does not reuse the snapshot"""
+        DimensionMapper(client, org_id="org-1", snapshot_dir=str(tmp_path)).load_all_dimensions()
+
+        mapper = DimensionMapper(client, org_id="org-2", snapshot_dir=str(tmp_path))
+        mapper.load_all_dimensions()
+
+        assert mapper.snapshot_used is False
+        assert mapper.map_project_code("P5") == "project-5"
+
+    def test_expired_snapshot_checks_markers(self, client, tmp_path):
+        """Test that an expired snapshot is reused only while markers are unchanged"""
+        DimensionMapper(client, org_id="org-1", snapshot_dir=str(tmp_path)).load_all_dimensions()
+
+        unchanged = DimensionMapper(client, org_id="org-1", snapshot_dir=str(tmp_path), snapshot_ttl=-1)
+        unchanged.load_all_dimensions()
+        assert unchanged.snapshot_used is True
+
+        client.rows["projects"].append(
+            {"id": "project-new", "code": "PNEW", "name": "new", "org_id": "org-1", "updated_at": "2024-02-01"}
+        )
+        changed = DimensionMapper(client, org_id="org-1", snapshot_dir=str(tmp_path), snapshot_ttl=-1)
+        changed.load_all_dimensions()
+
+        assert changed.snapshot_used is False
+        assert changed.map_project_code("PNEW") == "project-new"
+
+    def test_change_during_load_leaves_snapshot_stale(self, client, tmp_path, monkeypatch):
+        """Test that rows changed while loading are not saved under fresh markers"""
+        execute = FakeQuery.execute
+
+        def execute_then_change(query):
+            response = execute(query)
+            if query.table == "projects" and query.columns == "id, code, name" and len(client.rows["projects"]) == 7:
+                client.rows["projects"].append(
+                    {"id": "project-new", "code": "PNEW", "name": "new", "org_id": "org-1",
+                     "updated_at": "2024-02-01"}
+                )
+            return response
+
+        monkeypatch.setattr(FakeQuery, "execute", execute_then_change)
+        DimensionMapper(client, org_id="org-1", snapshot_dir=str(tmp_path)).load_all_dimensions()
+        monkeypatch.undo()
+
+        reloaded = DimensionMapper(client, org_id="org-1", snapshot_dir=str(tmp_path), snapshot_ttl=-1)
+        reloaded.load_all_dimensions()
+
+        assert reloaded.snapshot_used is False
+        assert reloaded.map_project_code("PNEW") == "project-new"
+
+    def test_marker_ignores_rows_without_updated_at(self, client, tmp_path):
+        """Test that a NULL updated_at does not hide a later change"""
+        client.rows["projects"].append(
+            {"id": "project-null", "code": "PNULL", "name": "null", "org_id": "org-1", "updated_at": None}
+        )
+        DimensionMapper(client, org_id="org-1", snapshot_dir=str(tmp_path)).load_all_dimensions()
+
+        client.rows["projects"][1]["updated_at"] = "2024-03-01"
+        client.rows["projects"][1]["name"] = "renamed"
+        changed = DimensionMapper(client, org_id="org-1", snapshot_dir=str(tmp_path), snapshot_ttl=-1)
+        changed.load_all_dimensions()
+
+        assert changed.snapshot_used is False
+        assert changed.registries["project"].get_mapping("P1").name == "renamed"
+
+    def test_table_without_updated_at_uses_count(self, client, tmp_path):
+        """Test that a dimension table without updated_at is checked by row count"""
+        for row in client.rows["sub_tree"]:
+            del row["updated_at"]
+        first = DimensionMapper(client, org_id="org-1", snapshot_dir=str(tmp_path))
+        assert first.load_all_dimensions() is True
+
+        unchanged = DimensionMapper(client, org_id="org-1", snapshot_dir=str(tmp_path), snapshot_ttl=-1)
+        assert unchanged.load_all_dimensions() is True
+        assert unchanged.snapshot_used is True
+
+        client.rows["sub_tree"].append({"id": "sub-new", "code": "SNEW", "name": "new", "org_id": "org-1"})
+        changed = DimensionMapper(client, org_id="org-1", snapshot_dir=str(tmp_path), snapshot_ttl=-1)
+        assert changed.load_all_dimensions() is True
+        assert changed.snapshot_used is False
+        assert changed.map_sub_tree_code("SNEW") == "sub-new"
+
+
+class TestDimensionRegistry:
+    """Test vectorized mapping and registered dimension types"""
+
+    def test_map_series(self, client):
+        """Test ids and unmapped mask for a column of codes"""
+        mapper = DimensionMapper(client, org_id="org-1")
+        codes = pd.Series([" P1", "P1", None, "", "P99", "P5", "P2"], index=list("abcdefg"))
+
+        ids, unmapped = mapper.map_series("project", codes)
+
+        assert ids.tolist() == ["project-1", "project-1", None, None, None, None, "project-2"]
+        assert unmapped.tolist() == [False, False, False, False, True, True, False]
+        assert list(ids.index) == list("abcdefg")
+        assert mapper.get_dimension_mapping("project", "P2").name == "project 2"
+
+    def test_register_dimension_type(self, client):
+        """Test that a new dimension type loads and maps like the built-in ones"""
+        client.rows["cost_centers"] = [{"id": "cc-1", "code": "CC1", "name": "Main"}]
+        mapper = DimensionMapper(client)
+        mapper.register_dimension_type("cost_center", "cost_centers")
+
+        assert mapper.load_all_dimensions() is True
+        assert mapper.map_code("cost_center", "CC1") == "cc-1"
+        assert mapper.get_cache_stats()["cost_center_count"] == 1
+        with pytest.raises(ValueError):
+            mapper.map_series("unknown", pd.Series(["x"]))
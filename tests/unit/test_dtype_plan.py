@@ -0,0 +1,130 @@
+"""
+Unit tests for DtypePlan and money conversion
+
+Tests compact dtype functionality:
+- Plan derived from column mappings
+- Exact minor-unit parsing of amounts
+- Memory report per stage
+"""
+
+import pytest
+import pandas as pd
+
+from src.analyzer.excel_reader import ColumnMapping
+from src.analyzer.dtype_plan import DtypePlan, MemoryReport, MINOR_UNIT_SCALES_ATTR
+from src.analyzer.money import to_minor_units, from_minor_units
+
+
+def _mapping(english_name, data_type, mapping_type="direct", notes=None):
+    return ColumnMapping(
+        excel_column=english_name,
+        english_name=english_name,
+        supabase_table="transaction_lines",
+        supabase_column=english_name,
+        data_type=data_type,
+        required=False,
+        notes=notes,
+        mapping_type=mapping_type
+    )
+
+
+@pytest.fixture
+def plan():
+    mappings = {
+        "entry_no": _mapping("entry_no", "string"),
+        "account_code": _mapping("account_code", "uuid", "lookup"),
+        "account_name": _mapping("account_name", "string", "skip"),
+        "line_no": _mapping("line_no", "integer"),
+        "debit": _mapping("debit", "numeric", notes="Debit Amount (15 and 4 precision)"),
+        "credit": _mapping("credit", "numeric"),
+    }
+    return DtypePlan(mappings)
+
+
+class TestMinorUnits:
+    """Test fixed-point amount parsing"""
+
+    def test_decimal_strings_parse_exactly(self):
+        """Test rounding, separators and invalid values"""
+        values = pd.Series(["0.1", "1,500.255", "-0.005", ".5", "abc", None, "1e3"])
+
+        result = to_minor_units(values, 2)
+
+        assert str(result.dtype) == "Int64"
+        assert result.iloc[:4].tolist() == [10, 150026, -1, 50]
+        assert result.iloc[4:6].isna().all()
+        assert result.iloc[6] == 100000
+
+    def test_float_rounding_matches_strings(self):
+        """Test that floats round half away from zero like their decimal strings"""
+        floats = pd.Series([0.125, 1.005, -0.125, 2.675, 12.34])
+
+        result = to_minor_units(floats, 2)
+
+        assert result.tolist() == to_minor_units(floats.astype(str), 2).tolist()
+        assert result.tolist() == [13, 101, -13, 268, 1234]
+
+    def test_unconvertible_amounts_become_na(self):
+        """Test that non-finite and oversized amounts become <NA> instead of raising"""
+        strings = to_minor_units(pd.Series(["inf", "1e17", "1e30", "-inf", "5"]), 2)
+        floats = to_minor_units(pd.Series([float("inf"), 1e30, float("nan"), 5.0]), 2)
+
+        assert strings.iloc[:4].isna().all() and strings.iloc[4] == 500
+        assert floats.iloc[:3].isna().all() and floats.iloc[3] == 500
+
+    def test_round_trip(self):
+        """Test conversion back to float amounts"""
+        units = to_minor_units(pd.Series(["0.1", "0.2"]), 4)
+
+        assert units.sum() == 3000
+        assert from_minor_units(units, 4).tolist() == [0.1, 0.2]
+
+
+class TestDtypePlan:
+    """Test plan derivation and application"""
+
+    def test_rules_from_mappings(self, plan):
+        """Test that mapping and data types select the target dtype"""
+        assert "entry_no" not in plan.rules
+        assert plan.rules["account_code"].kind == "category"
+        assert plan.rules["account_name"].kind == "category"
+        assert plan.rules["line_no"].kind == "integer"
+        assert plan.rules["debit"].scale == 4
+        assert plan.rules["credit"].scale == 2
+
+    def test_apply_converts_columns(self, plan):
+        """Test conversion, coerced null counts and minor-unit attrs"""
+        data = pd.DataFrame({
+            "entry_no": ["1", "2", "3"],
+            "account_code": ["1101", "1101", "2101"],
+            "account_name": ["Cash", "Cash", "Bank"],
+            "line_no": ["1", "2", "x"],
+            "debit": ["100.5", None, "bad"],
+            "credit": ["0", "12.345", None],
+        })
+
+        coerced = plan.apply(data)
+
+        assert isinstance(data["account_code"].dtype, pd.CategoricalDtype)
+        assert str(data["line_no"].dtype) == "Int64"
+        assert data["debit"].iloc[0] == 1005000
+        assert data["credit"].iloc[1] == 1235
+        assert coerced == {"line_no": 1, "debit": 1}
+        assert data.attrs[MINOR_UNIT_SCALES_ATTR] == {"debit": 4, "credit": 2}
+
+    def test_memory_report_shows_savings(self, plan):
+        """Test that the report records each stage and the bytes saved"""
+        data = pd.DataFrame({
+            "account_code": ["1101", "2101"] * 5000,
+            "debit": ["100.50", "0"] * 5000,
+        })
+        report = MemoryReport()
+
+        report.record("read", data)
+        plan.apply(data)
+        report.record("dtype_plan", data)
+
+        assert report.savings("read", "dtype_plan") > 0
+        stages = report.to_dict()["stages"]
+        assert [s["stage"] for s in stages] == ["read", "dtype_plan"]
+        assert stages[1]["saved_mb"] > 0
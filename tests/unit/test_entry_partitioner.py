@@ -0,0 +1,103 @@
+"""
+Unit tests for EntryPartitioner
+
+Tests external-memory partition functionality:
+- Stable partition of complete entries
+- Spilled partitions read back in input order
+- Per-partition grouping in a process pool
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+
+from src.analyzer.dtype_plan import MINOR_UNIT_SCALES_ATTR
+from src.analyzer.transaction_grouper import TransactionGrouper
+from src.analyzer.entry_partitioner import (
+    EntryPartitioner,
+    entry_partition_ids,
+    first_lines_by_entry,
+    open_partition_set,
+    process_partitions
+)
+
+
+@pytest.fixture
+def lines_df():
+    rng = np.random.default_rng(7)
+    rows = 600
+    data = pd.DataFrame({
+        "entry_no": rng.integers(1, 120, rows).astype(str),
+        "entry_date": rng.choice(["2024-01-01", "2024-02-15"], rows),
+        "debit": rng.choice([1000, 0, 555], rows),
+        "credit": rng.choice([0, 1000, 555], rows),
+        "notes": rng.choice(["a", "b", None], rows),
+    })
+    data.attrs[MINOR_UNIT_SCALES_ATTR] = {"debit": 2, "credit": 2}
+    return data
+
+
+def _chunks(data, size):
+    return [data.iloc[start:start + size] for start in range(0, len(data), size)]
+
+
+class TestEntryPartitionIds:
+    """Test partition assignment"""
+
+    def test_same_entry_same_partition(self):
+        """Test that text/number entry numbers and date formats agree"""
+        first = pd.DataFrame({"entry_no": ["5", "6"], "entry_date": ["2024-01-01", "2024-01-01"]})
+        second = pd.DataFrame({"entry_no": [5, 6], "entry_date": pd.to_datetime(["2024-01-01", "2024-01-01"])})
+
+        assert entry_partition_ids(first, 8).tolist() == entry_partition_ids(second, 8).tolist()
+        assert entry_partition_ids(first, 8).max() < 8
+
+
+class TestEntryPartitioner:
+    """Test spilling and reading partitions"""
+
+    def test_partitions_hold_complete_entries(self, lines_df, tmp_path):
+        """Test that every entry is in exactly one partition, in input order"""
+        partition_set = EntryPartitioner(str(tmp_path), partitions=4, file_format="pickle").write(
+            _chunks(lines_df, 128)
+        )
+
+        frames = list(partition_set)
+        assert partition_set.total_rows == len(lines_df)
+        keys = [set(zip(frame["entry_no"], frame["entry_date"])) for frame in frames]
+        assert sum(len(k) for k in keys) == len(set().union(*keys))
+        for frame in frames:
+            assert frame.index.is_monotonic_increasing
+            assert frame.attrs[MINOR_UNIT_SCALES_ATTR] == {"debit": 2, "credit": 2}
+        assert open_partition_set(str(tmp_path)).row_counts == partition_set.row_counts
+
+    def test_grouping_per_partition(self, lines_df, tmp_path):
+        """Test that partition results add up to the in-memory grouping"""
+        grouper = TransactionGrouper()
+        expected = grouper.group_lines_into_transactions(lines_df)
+        partition_set = EntryPartitioner(str(tmp_path), partitions=3, file_format="pickle").write(
+            _chunks(lines_df, 100)
+        )
+
+        results = process_partitions(partition_set, grouper.group_lines_into_transactions, workers=2)
+
+        headers = pd.concat([r.transactions_df for r in results], ignore_index=True)
+        headers = headers.sort_values(["reference_number", "transaction_date"]).reset_index(drop=True)
+        pd.testing.assert_frame_equal(headers, expected.transactions_df, check_dtype=False)
+        records = pd.concat(process_partitions(partition_set, first_lines_by_entry))
+        assert len(records) == len(lines_df.groupby(["entry_no", "entry_date"]).first())
+
+        partition_set.cleanup()
+        assert not tmp_path.exists()
+
+    def test_columnar_formats_need_pyarrow(self, tmp_path):
+        """Test the install hint when pyarrow is missing"""
+        try:
+            import pyarrow  # noqa: F401
+            pytest.skip("pyarrow is installed")
+        except ImportError:
+            pass
+
+        with pytest.raises(ImportError, match="pip install pyarrow"):
+            EntryPartitioner(str(tmp_path), file_format="parquet")
+        assert EntryPartitioner(str(tmp_path)).file_format == "pickle"
@@ -0,0 +1,135 @@
+"""
+Unit tests for ExcelProcessor class
+
+Tests processing functionality:
+- Rules compiled once per mapping
+- Vectorized boolean conversion
+- Arabic text handling
+- Pattern validation
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+
+from src.analyzer.excel_reader import ColumnMapping
+from src.analyzer.excel_processor import (
+    ExcelProcessor,
+    convert_series_to_boolean
+)
+
+
+def _mapping(english_name, data_type, required=False):
+    return ColumnMapping(
+        excel_column=english_name,
+        english_name=english_name,
+        supabase_table="transaction_lines",
+        supabase_column=english_name,
+        data_type=data_type,
+        required=required
+    )
+
+
+@pytest.fixture
+def processor():
+    mappings = {
+        "entry_no": _mapping("entry_no", "string", required=True),
+        "entry_date": _mapping("entry_date", "date", required=True),
+        "account_name": _mapping("account_name", "string"),
+        "debit": _mapping("debit", "numeric"),
+        "is_active": _mapping("is_active", "boolean"),
+    }
+    return ExcelProcessor(mappings)
+
+
+class TestExcelProcessorCompiledRules:
+    """Test rule compilation"""
+
+    def test_rules_compiled_per_mapping(self, processor):
+        """Test that every processing rule has a compiled counterpart"""
+        assert set(processor.compiled_rules) == set(processor.processing_rules)
+        assert processor.compiled_rules["debit"].kind == "float"
+        assert processor.compiled_rules["entry_date"].pattern is not None
+        assert processor.compiled_rules["account_name"].is_arabic_text
+
+    def test_convert_series_to_boolean(self):
+        """Test boolean lookup with truthiness fallback and nulls preserved"""
+        series = pd.Series(["Yes", " n ", "1", "F", "maybe", "", None])
+
+        result = convert_series_to_boolean(series)
+
+        assert str(result.dtype) == "boolean"
+        assert result.iloc[:6].tolist() == [True, False, True, False, True, False]
+        assert result.isna().iloc[6]
+
+
+class TestExcelProcessorProcessData:
+    """Test end-to-end processing"""
+
+    def test_process_data_converts_types(self, processor):
+        """Test numeric, boolean and date conversion"""
+        data = pd.DataFrame({
+            "entry_no": ["1", "2"],
+            "entry_date": ["2024-01-01", "2024-01-02"],
+            "account_name": ["نقدية", "Bank"],
+            "debit": ["100.5", "x"],
+            "is_active": ["yes", "no"],
+        })
+
+        result = processor.process_data(data)
+
+        processed = result.processed_data
+        assert processed["debit"].iloc[0] == 100.5
+        assert pd.isna(processed["debit"].iloc[1])
+        assert processed["is_active"].tolist() == [True, False]
+        assert pd.api.types.is_datetime64_any_dtype(processed["entry_date"])
+        assert any("Arabic text in 1 rows" in w for w in result.warnings)
+
+    def test_required_null_reported(self, processor):
+        """Test that nulls in required columns are reported as errors"""
+        data = pd.DataFrame({
+            "entry_no": ["1", "2"],
+            "entry_date": ["2024-01-01", "not a date"],
+            "account_name": ["A", "B"],
+            "debit": ["1", "2"],
+            "is_active": ["y", "n"],
+        })
+
+        result = processor.process_data(data)
+
+        assert not result.success
+        assert any("entry_date" in e for e in result.errors)
+
+
+class TestExcelProcessorArabicNormalization:
+    """Test the Arabic text and numeral normalization stage"""
+
+    def test_arabic_digits_parse_as_numbers(self, processor):
+        """Test that codes and amounts typed with Arabic digits parse"""
+        data = pd.DataFrame({
+            "entry_no": ["١٠١", "۲۰۲"],
+            "entry_date": ["٢٠٢٤-٠١-٠١", "2024-01-02"],
+            "account_name": ["حسـاب\u200f", "Bank"],
+            "debit": ["١٬٥٠٠٫٢٥", "3"],
+            "is_active": ["yes", "no"],
+        })
+
+        result = processor.process_data(data)
+
+        processed = result.processed_data
+        assert processed["entry_no"].tolist() == ["101", "202"]
+        assert processed["debit"].tolist() == [1500.25, 3.0]
+        assert processed["entry_date"].notna().all()
+        assert processed["account_name"].iloc[0] == "حساب"
+        assert result.validation_report["normalization"]["debit"] == 1
+
+    def test_normalization_can_be_disabled(self):
+        """Test that the normalization stage is optional"""
+        processor = ExcelProcessor(
+            {"debit": _mapping("debit", "numeric")},
+            normalize_arabic=False
+        )
+
+        result = processor.process_data(pd.DataFrame({"debit": ["١٢"]}))
+
+        assert pd.isna(result.processed_data["debit"].iloc[0])
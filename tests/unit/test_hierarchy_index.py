@@ -0,0 +1,104 @@
+"""
+Unit tests for HierarchyIndex
+
+Tests hierarchy queries:
+- Parent pointers, depth and nested set intervals
+- Subtree membership and level roll-ups
+- Closure table and subtree totals
+- Orphans and cycles
+"""
+
+import pytest
+import pandas as pd
+
+from src.analyzer.hierarchy_index import HierarchyIndex, create_hierarchy_index
+
+
+@pytest.fixture
+def accounts():
+    # 1 ─┬─ 11 ─┬─ 111
+    #    │      └─ 112
+    #    └─ 12
+    # 2 ─── 21
+    return create_hierarchy_index([
+        {"code": "111", "parent_code": "11"},
+        {"code": "1", "parent_code": None},
+        {"code": "11", "parent_code": "1"},
+        {"code": "12", "parent_code": "1"},
+        {"code": "2", "parent_code": ""},
+        {"code": "112", "parent_code": "11"},
+        {"code": "21", "parent_code": "2"},
+    ], key_column="code", parent_column="parent_code")
+
+
+class TestHierarchyStructure:
+    """Test the precomputed tree"""
+
+    def test_parents_and_depth(self, accounts):
+        """Test parent pointers and depth"""
+        assert accounts.parent_of("111") == "11"
+        assert accounts.parent_of("2") is None
+        assert accounts.depth_of("112") == 2
+        assert accounts.ancestors("111") == ["11", "1"]
+        assert sorted(accounts.children("1")) == ["11", "12"]
+
+    def test_subtree_intervals(self, accounts):
+        """Test that subtrees are contiguous preorder ranges"""
+        assert sorted(accounts.subtree("11")) == ["11", "111", "112"]
+        assert accounts.is_descendant("112", "1") is True
+        assert accounts.is_descendant("21", "1") is False
+        assert accounts.is_descendant("1", "1") is True
+
+        frame = accounts.to_frame().set_index("key")
+        assert frame.loc["11", "tout"] - frame.loc["11", "tin"] == 2
+
+
+class TestHierarchyQueries:
+    """Test vectorized queries"""
+
+    def test_in_subtree_and_level(self, accounts):
+        """Test membership and ancestor at a depth for a column of keys"""
+        keys = pd.Series(["111", "21", "12", "999", "1"], index=list("abcde"))
+
+        assert accounts.in_subtree(keys, "1").tolist() == [True, False, True, False, True]
+        assert accounts.ancestor_at_depth(keys, 1).tolist() == ["11", "21", "12", None, "1"]
+        assert accounts.ancestor_at_depth(keys, 0).tolist() == ["1", "2", "1", None, "1"]
+
+    def test_ancestor_at_depth_of_empty_index(self):
+        """Test that an index without nodes maps every key to None"""
+        index = HierarchyIndex([], [])
+
+        assert index.ancestor_at_depth(pd.Series(["1", "2"]), 1).tolist() == [None, None]
+
+    def test_closure_table(self, accounts):
+        """Test ancestor/descendant pairs with distances"""
+        closure = accounts.closure()
+
+        pairs = set(zip(closure["ancestor"], closure["descendant"], closure["distance"]))
+        assert ("1", "111", 2) in pairs
+        assert ("111", "111", 0) in pairs
+        assert len(closure) == 7 + 5 + 2
+
+    def test_rollup(self, accounts):
+        """Test exact subtree totals of integer amounts"""
+        totals = accounts.rollup(pd.Series(["111", "112", "12", "21", "1", "x"]), [100, 250, 5, 7, 1, 1000])
+
+        assert totals["11"] == 350
+        assert totals["1"] == 356
+        assert totals["2"] == 7
+        assert totals.dtype == "int64"
+
+
+class TestHierarchyIssues:
+    """Test rows that do not form a tree"""
+
+    def test_orphans_and_cycles_become_roots(self):
+        """Test that missing parents and cycles are reported and cut"""
+        index = HierarchyIndex(["a", "b", "c", "d", "a"], [None, "zz", "d", "c", None])
+
+        assert index.issues.orphans == ["b"]
+        assert len(index.issues.cycles) == 1
+        assert index.issues.duplicates == ["a"]
+        assert len(index.to_frame()) == 4
+        assert (index.tin >= 0).all()
+        assert sorted(index.subtree(index.issues.cycles[0])) == ["c", "d"]
@@ -25,6 +25,8 @@ from src.executor.migration_executor import (
     MigrationSummary,
     create_migration_executor
 )
+from src.analyzer.schema_manager import LoadPlan
+from src.analyzer.dtype_plan import MINOR_UNIT_SCALES_ATTR
 
 
 class TestMigrationExecutorInitialization:
@@ -311,6 +313,30 @@ class TestMigrationExecutorRecordCleaning:
         assert isinstance(cleaned['bool_field'], bool)
         assert isinstance(cleaned['str_field'], str)
 
+    def test_minor_unit_amounts_inserted_in_currency_units(self):
+        """Test that amounts converted by the dtype plan are inserted as currency amounts"""
+        mock_manager = Mock()
+        executor = MigrationExecutor(
+            supabase_manager=mock_manager,
+            batch_size=100,
+            dry_run=False
+        )
+
+        lines = pd.DataFrame({
+            'entry no': ['1', '1'],
+            'debit': pd.array([123456, pd.NA], dtype="Int64"),
+            'credit': pd.array([0, 123456], dtype="Int64"),
+        })
+        lines.attrs[MINOR_UNIT_SCALES_ATTR] = {'debit': 4, 'credit': 4}
+
+        executor.migrate_transaction_lines(lines)
+
+        inserted = [call.kwargs['data'] for call in mock_manager.execute_query.call_args_list]
+        assert inserted[0]['debit_amount'] == 12.3456
+        assert inserted[0]['credit_amount'] == 0
+        assert 'debit_amount' not in inserted[1]
+        assert inserted[1]['credit_amount'] == 12.3456
+
 
 class TestMigrationExecutorSummary:
     """Test migration summary functionality"""
@@ -692,5 +718,46 @@ class TestMigrationExecutorBackupAndRollback:
             assert 'Failed to verify restoration' in message
 
 
+class TestMigrationExecutorLoadPlan:
+    """Test loading several tables in load plan order"""
+    
+    def test_run_load_plan_waits_on_parents(self):
+        """Test that children start after their parents and other tables are tracked"""
+        plan = LoadPlan(
+            stages=[['accounts', 'projects'], ['transactions'], ['transaction_lines']],
+            dependencies={
+                'accounts': [], 'projects': [], 'transactions': ['projects'],
+                'transaction_lines': ['accounts', 'transactions']
+            },
+            dependents={
+                'accounts': ['transaction_lines'], 'projects': ['transactions'],
+                'transactions': ['transaction_lines'], 'transaction_lines': []
+            }
+        )
+        executor = MigrationExecutor(supabase_manager=Mock(), batch_size=2, dry_run=True)
+        finished = []
+        original = executor.migrate_table
+        
+        def record_order(table_name, data):
+            result = original(table_name, data)
+            finished.append(table_name)
+            return result
+        
+        executor.migrate_table = record_order
+        results = executor.run_load_plan(plan, {
+            'accounts': pd.DataFrame({'code': ['1', '2', '3']}),
+            'transactions': pd.DataFrame({'reference_number': ['T1']}),
+            'transaction_lines': pd.DataFrame({'account_id': ['1', '2']}),
+        })
+        
+        assert set(results) == {'accounts', 'transactions', 'transaction_lines'}
+        assert all(success for success, _ in results.values())
+        assert finished[-1] == 'transaction_lines'
+        assert executor.summary.table_stats['accounts'] == {'attempted': 3, 'succeeded': 3, 'failed': 0}
+        assert executor.summary.transactions_succeeded == 1
+        assert executor.summary.lines_succeeded == 2
+        assert executor.summary.load_plan['stages'][0] == ['accounts', 'projects']
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
@@ -0,0 +1,177 @@
+"""
+Unit tests for ReconciliationEngine
+
+Tests value reconciliation between Excel and Supabase:
+- Order-independent partition digests
+- Drill-down to differing entries only
+- Database digests and the client fallback
+"""
+
+from pathlib import Path
+from unittest.mock import Mock
+
+import pandas as pd
+
+from src.executor.reconciliation_engine import (
+    ReconciliationEngine, canonical_lines, partition_digests, PARTITION_KEYS,
+    PARTITION_DIGESTS_RPC, ENTRY_DIGESTS_RPC
+)
+from src.executor.verification_engine import VerificationEngine
+
+
+EXCEL_LINES = pd.DataFrame({
+    "entry_no": [1.0, 1.0, 2.0, 2.0, 3.0, 3.0],
+    "entry_date": ["2024-01-05", "2024-01-05", "2024-01-20", "2024-01-20", "2024-02-01", "2024-02-01"],
+    "account_code": [1101.0, 2101.0, 1101.0, 2101.0, 1101.0, 2101.0],
+    "debit": [100.10, 0, 50, 0, 70.5, 0],
+    "credit": [0, 100.10, 0, 50, 0, 70.5],
+})
+
+TRANSACTIONS = [
+    {"id": "t1", "entry_number": "1", "entry_date": "2024-01-05"},
+    {"id": "t2", "entry_number": "2", "entry_date": "2024-01-20"},
+    {"id": "t3", "entry_number": "3", "entry_date": "2024-02-01"},
+]
+
+SUPABASE_LINES = [
+    {"id": 1, "transaction_id": "t1", "entry_no": "1", "account_code": "1101", "debit_amount": "100.10", "credit_amount": "0"},
+    {"id": 2, "transaction_id": "t1", "entry_no": "1", "account_code": "2101", "debit_amount": "0", "credit_amount": "100.10"},
+    {"id": 3, "transaction_id": "t2", "entry_no": "2", "account_code": "1101", "debit_amount": "50", "credit_amount": "0"},
+    {"id": 4, "transaction_id": "t2", "entry_no": "2", "account_code": "2101", "debit_amount": "0", "credit_amount": "50"},
+    {"id": 5, "transaction_id": "t3", "entry_no": "3", "account_code": "1101", "debit_amount": "70.5", "credit_amount": "0"},
+    {"id": 6, "transaction_id": "t3", "entry_no": "3", "account_code": "2101", "debit_amount": "0", "credit_amount": "70.5"},
+]
+
+
+def _client_manager(lines):
+    tables = {"transactions": TRANSACTIONS, "transaction_lines": lines}
+
+    def iter_pages(table, columns="*", filters=None, page_size=1000, order="id"):
+        rows = tables[table]
+        for start in range(0, len(rows), page_size):
+            yield rows[start:start + page_size]
+
+    manager = Mock()
+    manager.call_rpc.side_effect = Exception("function reconcile_partition_digests does not exist")
+    manager.iter_pages.side_effect = iter_pages
+    return manager
+
+
+def _digest_rows(lines_df, keys):
+    """Rows as the database functions return them"""
+    frame = partition_digests(canonical_lines(lines_df), keys)
+    frame["digest"] = [str(int(value)) for value in frame["digest"]]
+    return frame.astype(object).where(frame.notna(), None).to_dict("records")
+
+
+class TestPartitionDigests:
+    """Test the digests computed per partition"""
+
+    def test_digest_independent_of_row_order(self):
+        """Test that shuffled lines give the same digests"""
+        original = partition_digests(canonical_lines(EXCEL_LINES), PARTITION_KEYS)
+        shuffled = partition_digests(canonical_lines(EXCEL_LINES.sample(frac=1, random_state=3)), PARTITION_KEYS)
+
+        pd.testing.assert_frame_equal(original, shuffled)
+        assert list(original["line_count"]) == [2, 2, 1, 1]
+        assert original.loc[0, "debit_units"] == 15010
+
+    def test_excel_and_supabase_forms_agree(self):
+        """Test that Excel floats and Supabase decimal strings canonicalize alike"""
+        supabase = pd.DataFrame(SUPABASE_LINES).assign(
+            entry_date=["2024-01-05", "2024-01-05", "2024-01-20", "2024-01-20", "2024-02-01", "2024-02-01"]
+        )
+
+        assert list(canonical_lines(supabase)["text"]) == list(canonical_lines(EXCEL_LINES)["text"])
+        assert canonical_lines(EXCEL_LINES)["text"].iloc[0] == "1|2024-01-05|1101|10010|0"
+
+    def test_tie_rounds_half_up_on_both_sides(self):
+        """Test that a half-cent tie gives the same minor units in Excel and the database"""
+        excel = pd.DataFrame({"entry_no": [1], "entry_date": ["2024-01-05"], "account_code": [1101],
+                              "debit": [0.125], "credit": [0.0]})
+        supabase = excel.assign(debit=["0.125"], credit=["0"])
+
+        assert canonical_lines(excel)["debit_units"].iloc[0] == 13
+        assert canonical_lines(supabase)["debit_units"].iloc[0] == 13
+
+        # float8 10 ^ p_scale would round the 12.5 tie to even (12)
+        sql_file = Path(__file__).parents[2] / "migrations" / "2026-10-19_reconciliation_digest_functions.sql"
+        sql = "\n".join(line for line in sql_file.read_text().splitlines() if not line.startswith("--"))
+        assert "10 ^ p_scale" not in sql
+        assert sql.count("power(10::numeric, p_scale))::bigint") == 2
+
+
+class TestReconciliation:
+    """Test reconciliation and drill-down"""
+
+    def test_matching_data_passes(self):
+        """Test that identical data passes from the client fallback"""
+        engine = ReconciliationEngine(_client_manager(SUPABASE_LINES), page_size=4)
+
+        result = engine.reconcile(EXCEL_LINES)
+
+        assert result.passed is True
+        assert result.source == "client"
+        assert result.partitions_compared == 4
+        assert result.rows_transferred == len(TRANSACTIONS) + len(SUPABASE_LINES)
+
+    def test_changed_amount_pinpoints_entry(self):
+        """Test that a changed amount is traced to its partition and entry"""
+        lines = [dict(row) for row in SUPABASE_LINES]
+        lines[2]["debit_amount"] = "50.01"
+        engine = ReconciliationEngine(_client_manager(lines))
+
+        result = engine.reconcile(EXCEL_LINES)
+
+        assert result.passed is False
+        assert len(result.partition_diffs) == 1
+        diff = result.partition_diffs[0]
+        assert (diff.fiscal_year, diff.month, diff.account_code, diff.status) == (2024, 1, "1101", "mismatch")
+        assert diff.debit_difference == -1
+        assert [(e.entry_no, e.status, e.debit_difference) for e in diff.entries] == [("2", "mismatch", -1)]
+
+    def test_missing_lines_reported(self):
+        """Test that a partition absent from Supabase is reported with its entries"""
+        engine = ReconciliationEngine(_client_manager(SUPABASE_LINES[:4]))
+
+        result = engine.reconcile(EXCEL_LINES)
+
+        assert {(d.month, d.account_code, d.status) for d in result.partition_diffs} == {
+            (2, "1101", "missing_in_supabase"), (2, "2101", "missing_in_supabase")
+        }
+        assert all(d.entries[0].entry_no == "3" for d in result.partition_diffs)
+
+    def test_rpc_drills_only_into_differing_partitions(self):
+        """Test that entry digests are requested for differing partitions only"""
+        supabase = EXCEL_LINES.copy()
+        supabase.loc[5, "credit"] = 70.0
+        entry_rows = _digest_rows(supabase[supabase["account_code"] == 2101.0].iloc[2:], ["entry_no"])
+
+        manager = Mock()
+        manager.call_rpc.side_effect = lambda function, params: (
+            _digest_rows(supabase, PARTITION_KEYS) if function == PARTITION_DIGESTS_RPC else entry_rows
+        )
+        engine = ReconciliationEngine(manager, org_id="o1")
+
+        result = engine.reconcile(EXCEL_LINES)
+
+        assert result.source == "rpc"
+        assert [(d.month, d.account_code) for d in result.partition_diffs] == [(2, "2101")]
+        assert result.partition_diffs[0].entries[0].credit_difference == 50
+        assert manager.call_rpc.call_count == 2
+        manager.call_rpc.assert_called_with(ENTRY_DIGESTS_RPC, {
+            "p_fiscal_year": 2024, "p_month": 2, "p_account_code": "2101", "p_org_id": "o1", "p_scale": 2
+        })
+        manager.iter_pages.assert_not_called()
+
+    def test_verification_check(self):
+        """Test the reconciliation check of the verification engine"""
+        lines = [dict(row) for row in SUPABASE_LINES]
+        lines[0]["account_code"] = "1102"
+        engine = VerificationEngine(_client_manager(lines))
+
+        check = engine.verify_value_reconciliation(EXCEL_LINES)
+
+        assert check.check_name == "Value Reconciliation"
+        assert check.passed is False
+        assert check.actual_value == "Differing partitions: 2"
@@ -0,0 +1,202 @@
+"""
+Unit tests for the declarative validation rule engine
+
+Tests rule compilation and evaluation:
+- Rule file loading (JSON)
+- Row rules: required, data type, range, pattern, allowed values
+- Cross-field and group (per entry) rules
+- Shared column expressions and skipped columns
+- Group rules in chunked and incremental validation
+"""
+
+import json
+
+import pytest
+import pandas as pd
+import numpy as np
+
+from src.analyzer.data_validator import (
+    DataValidator,
+    ValidationRule,
+    create_data_validator,
+    load_validation_rules
+)
+from src.analyzer.rule_engine import RuleContext, compile_rules, date_years
+from src.analyzer.validation_cache import ValidationCache
+
+
+@pytest.fixture
+def lines():
+    return pd.DataFrame({
+        'entry_no': ['1', '1', '2', '3', '3'],
+        'line_number': ['1', '1', '1', '1', '2'],
+        'account_code': ['1101', '2101', '1101', 'X', '1101'],
+        'debit': ['10', '0', '5', '7', '0'],
+        'credit': ['0', '10', '0', '0', '8'],
+        'unused': ['a', 'b', 'c', 'd', 'e']
+    })
+
+
+def _positions(findings):
+    return {name: list(positions) for name, _, positions, _ in findings}
+
+
+class TestRuleFile:
+    """Test loading rules from a file"""
+
+    def test_load_json_rules(self, tmp_path):
+        """Test that file keys map to ValidationRule fields"""
+        path = tmp_path / 'rules.json'
+        path.write_text(json.dumps({'rules': [
+            {'type': 'range', 'field': 'debit', 'min': 0, 'severity': 'warning'},
+            {'type': 'group', 'check': 'min_rows', 'group_by': 'entry_no', 'min_rows': 2}
+        ]}))
+
+        rules = load_validation_rules(str(path))
+
+        assert rules[0].rule_type == 'range'
+        assert rules[0].min_value == 0
+        assert rules[0].severity == 'warning'
+        assert rules[1].field_name is None
+        assert rules[1].name == 'group_2'
+
+    def test_unknown_key_rejected(self, tmp_path):
+        """Test that typos in the rule file are reported"""
+        path = tmp_path / 'rules.json'
+        path.write_text(json.dumps([{'type': 'required', 'feild': 'debit'}]))
+
+        with pytest.raises(ValueError):
+            load_validation_rules(str(path))
+
+    def test_shipped_rules_compile(self):
+        """Test that config/validation_rules.json is valid"""
+        validator = create_data_validator(rules_path='config/validation_rules.json')
+
+        assert len(validator.rule_set) > 0
+
+    def test_shipped_rules_accept_frame_without_optional_columns(self, lines):
+        """Test that the shipped rules block nothing DataValidator() accepts"""
+        frame = lines.drop(columns=['line_number']).iloc[[0, 1]].assign(entry_date='2024-01-01')
+        shipped = create_data_validator(rules_path='config/validation_rules.json').validate(frame)
+
+        assert DataValidator().validate(frame)['passed'] is True
+        assert shipped['passed'] is True
+        assert shipped['summary']['error_count'] == 0
+
+
+class TestRuleEvaluation:
+    """Test compiled predicates"""
+
+    def test_row_rules(self, lines):
+        """Test required, range, pattern and allowed value rules"""
+        rule_set = compile_rules([
+            ValidationRule('debit', 'range', min_value=0, max_value=9, name='debit_max'),
+            ValidationRule('entry_no', 'pattern', pattern=r'[12]', name='entry_pattern'),
+            ValidationRule('account_code', 'allowed_values', code_set='account', name='known_account'),
+            ValidationRule('memo', 'required', name='memo_required'),
+            ValidationRule('note', 'required', name='note_required', if_present=True)
+        ])
+
+        errors, _ = rule_set.evaluate(lines, code_sets={'account': {'1101', '2101'}})
+
+        assert _positions(errors) == {
+            'debit': [0],
+            'entry_no': [3, 4],
+            'account_code': [3],
+            'memo': [0, 1, 2, 3, 4]
+        }
+
+    def test_cross_field_and_group_rules(self, lines):
+        """Test compare, exactly_one and per-entry checks"""
+        rule_set = compile_rules([
+            ValidationRule(None, 'exactly_one', fields=['debit', 'credit']),
+            ValidationRule('debit', 'compare', operator='<=', value=7),
+            ValidationRule(None, 'group', check='balanced', group_by='entry_no',
+                           fields=['debit', 'credit'], severity='warning'),
+            ValidationRule('line_number', 'group', check='unique', group_by='entry_no'),
+            ValidationRule(None, 'group', check='min_rows', group_by='entry_no', min_rows=2)
+        ])
+
+        errors, warnings = rule_set.evaluate(lines)
+
+        assert [list(f[2]) for f in errors] == [[], [0], [1], [2]]
+        assert [list(f[2]) for f in warnings] == [[2, 3, 4]]
+        message = warnings[0][3](3)['warning_message']
+        assert message == "entry_no 3 is not balanced (difference -1.0)"
+
+    def test_columns_shared_and_skipped(self, lines):
+        """Test that expressions are computed once and unused columns are not read"""
+        rule_set = compile_rules([
+            ValidationRule('debit', 'data_type', data_type='float'),
+            ValidationRule('debit', 'range', min_value=0)
+        ])
+        context = RuleContext(lines)
+
+        context.numeric('debit')
+
+        assert context.numeric('debit') is context.numeric('debit')
+        assert rule_set.columns == {'debit'}
+
+    def test_date_years_keeps_retried_years(self, monkeypatch):
+        """Test that dates only the per-value parse accepts keep their year"""
+        to_datetime = pd.to_datetime
+
+        def nanosecond_bound(arg, *args, **kwargs):
+            # Builds limited to nanoseconds coerce out-of-bounds dates to NaT
+            if isinstance(arg, pd.Series):
+                arg = arg.where(arg != '0001-01-01', 'not a date')
+            return to_datetime(arg, *args, **kwargs)
+
+        monkeypatch.setattr(pd, 'to_datetime', nanosecond_bound)
+
+        years, failed = date_years(pd.Series(['0001-01-01', '2024-01-02', 'bad', None]))
+
+        assert years[:2].tolist() == [1.0, 2024.0]
+        assert failed.tolist() == [False, False, True, False]
+
+    def test_invalid_rule_rejected(self):
+        """Test that incomplete rules fail at compile time"""
+        with pytest.raises(ValueError):
+            compile_rules([ValidationRule('debit', 'range')])
+        with pytest.raises(ValueError):
+            compile_rules([ValidationRule('debit', 'regex')])
+
+
+class TestValidatorIntegration:
+    """Test custom rules inside DataValidator"""
+
+    @pytest.fixture
+    def rules(self):
+        return [
+            ValidationRule('account_code', 'pattern', pattern=r'\d+', applies_to='transaction_lines'),
+            ValidationRule(None, 'group', check='min_rows', group_by='entry_no', min_rows=2,
+                           severity='warning', applies_to='transaction_lines')
+        ]
+
+    def test_rules_added_to_builtin_checks(self, lines, rules):
+        """Test that rule findings appear next to the built-in ones"""
+        result = DataValidator(rules).validate_transaction_lines(lines)
+
+        assert result.summary['error_types'] == {'pattern': 1}
+        assert result.summary['warning_types'] == {'business_rule': 1}
+        assert 'pattern' not in DataValidator(rules).validate_transactions(lines).summary['error_types']
+
+    def test_group_rules_in_chunks(self, lines, rules):
+        """Test that group rules see whole entries when rows are chunked"""
+        serial = DataValidator(rules).validate_transaction_lines(lines)
+
+        chunked = DataValidator(rules).validate_in_chunks(lines, workers=2, chunk_size=2)
+
+        assert chunked.summary == serial.summary
+        assert chunked.warnings.to_frame().equals(serial.warnings.to_frame())
+
+    def test_group_rules_not_cached(self, lines, rules, tmp_path):
+        """Test that group rules are re-checked when another row of the entry changes"""
+        cache = ValidationCache(str(tmp_path))
+        DataValidator(rules).validate_incremental(lines, cache)
+        edited = pd.concat([lines, lines.iloc[[2]]], ignore_index=True)
+
+        result = DataValidator(rules).validate_incremental(edited, cache)
+
+        assert result.summary['since_last_run']['revalidated_rows'] == 0
+        assert 'business_rule' not in result.summary['warning_types']
@@ -0,0 +1,177 @@
+"""
+Unit tests for SampleVerifier
+
+Tests stratified sample verification:
+- Strata and proportional allocation
+- Keyed lookups of the sampled entries only
+- Field comparison and confidence bounds
+"""
+
+from unittest.mock import Mock
+
+import numpy as np
+import pandas as pd
+
+from src.analyzer.supabase_connection import SupabaseConnectionManager
+from src.executor.sample_verifier import (
+    SampleVerifier, allocate_sample, assign_strata, confidence_bounds, draw_stratified_sample
+)
+
+
+def _excel_lines(entries=50):
+    rows = []
+    for entry in range(1, entries + 1):
+        month = 1 + entry % 3
+        amount = float(entry * 10 if entry % 2 else entry * 1000)
+        rows.append((entry, f"2024-{month:02d}-10", 1101.0, amount, 0.0, "P1"))
+        rows.append((entry, f"2024-{month:02d}-10", 2101.0, 0.0, amount, "P1"))
+    return pd.DataFrame(rows, columns=["entry_no", "entry_date", "account_code", "debit", "credit", "project_code"])
+
+
+def _supabase_rows(lines):
+    return [
+        {"id": i, "entry_no": str(int(row.entry_no)), "account_code": str(int(row.account_code)),
+         "debit_amount": f"{row.debit:.2f}", "credit_amount": f"{row.credit:.2f}", "project_code": row.project_code}
+        for i, row in enumerate(lines.itertuples(index=False))
+    ]
+
+
+class _CappedQuery:
+    """Query builder of a server that returns at most max_rows rows per response"""
+
+    def __init__(self, rows, max_rows, ranges):
+        self.rows, self.max_rows, self.ranges = rows, max_rows, ranges
+
+    def select(self, columns):
+        return self
+
+    def eq(self, column, value):
+        self.rows = [row for row in self.rows if row[column] == value]
+        return self
+
+    def in_(self, column, values):
+        self.rows = [row for row in self.rows if row[column] in set(values)]
+        return self
+
+    def order(self, column):
+        self.rows = sorted(self.rows, key=lambda row: row[column])
+        return self
+
+    def range(self, start, end):
+        self.ranges.append((start, end))
+        self.rows = self.rows[start:min(end + 1, start + self.max_rows)]
+        return self
+
+    def execute(self):
+        return Mock(data=self.rows)
+
+
+def _manager(rows):
+    def select_in(table, column, values, columns="*", filters=None, page_size=1000):
+        return [row for row in rows if row[column] in set(values)]
+
+    manager = Mock()
+    manager.select_in.side_effect = select_in
+    return manager
+
+
+class TestStratification:
+    """Test strata and allocation"""
+
+    def test_strata_labels(self):
+        """Test period, account class and amount bucket of a line"""
+        strata = assign_strata(_excel_lines(2))
+
+        assert list(strata) == ["2024-02|1|4", "2024-02|2|4", "2024-03|1|6", "2024-03|2|6"]
+
+    def test_allocation_covers_every_stratum(self):
+        """Test that small strata get one line and the total is exact"""
+        allocation = allocate_sample(np.array([1000, 10, 1, 89]), 20)
+
+        assert allocation.sum() == 20
+        assert allocation.min() >= 1
+        assert allocation[0] == allocation.max()
+
+    def test_draw_respects_allocation(self):
+        """Test that drawn positions follow the per-stratum allocation"""
+        strata = pd.Series(["a"] * 90 + ["b"] * 10)
+
+        positions, frame = draw_stratified_sample(strata, 10, seed=1)
+
+        assert len(positions) == 10
+        assert (strata.iloc[positions] == "b").sum() == frame.set_index("stratum").loc["b", "sampled"]
+
+
+class TestConfidenceBounds:
+    """Test the mismatch rate estimate"""
+
+    def test_zero_mismatches_have_positive_upper_bound(self):
+        """Test that a clean sample still bounds the rate from above"""
+        rate, lower, upper = confidence_bounds(np.array([0]), np.array([100]), np.array([100000]))
+
+        assert rate == 0.0 and lower == 0.0
+        assert 0.02 < upper < 0.05
+
+    def test_full_census_is_exact(self):
+        """Test that sampling every line gives exact bounds"""
+        rate, lower, upper = confidence_bounds(np.array([3]), np.array([50]), np.array([50]))
+
+        assert rate == lower == upper == 0.06
+
+
+class TestSampleVerifier:
+    """Test keyed sample comparison"""
+
+    def test_select_in_reads_past_row_limit(self):
+        """Test that keyed lookups page past the server's row limit"""
+        rows = [{"id": i, "entry_no": str(i % 3)} for i in range(25)]
+        ranges = []
+        manager = SupabaseConnectionManager(url="http://localhost", key="key")
+        manager.client = Mock()
+        manager.client.table.side_effect = lambda table: _CappedQuery(rows, 10, ranges)
+        manager.is_connected = True
+
+        result = manager.select_in("transaction_lines", "entry_no", ["0", "1"], page_size=10)
+
+        assert [row["id"] for row in result] == [i for i in range(25) if i % 3 != 2]
+        assert ranges == [(0, 9), (10, 19)]
+
+    def test_requests_count_pages(self):
+        """Test that every page of a chunk counts as a request"""
+        lines = _excel_lines(5)
+
+        result = SampleVerifier(_manager(_supabase_rows(lines)), page_size=4).verify(
+            lines, sample_size=len(lines), seed=1
+        )
+
+        assert result.passed is True
+        assert result.requests == 3
+
+    def test_matching_sample_passes(self):
+        """Test that only sampled entries are fetched and all fields match"""
+        lines = _excel_lines()
+        manager = _manager(_supabase_rows(lines))
+
+        result = SampleVerifier(manager, org_id="o1").verify(lines, sample_size=10, seed=7)
+
+        assert result.passed is True
+        assert result.sample_size == 10
+        assert result.rows_fetched <= 20
+        assert manager.select_in.call_args.kwargs["filters"] == {"org_id": "o1"}
+        assert result.upper_bound > 0
+
+    def test_changed_value_detected(self):
+        """Test that a changed amount and a missing line are reported"""
+        lines = _excel_lines(5)
+        rows = _supabase_rows(lines)
+        rows[0]["debit_amount"] = "999.00"
+        rows[0]["project_code"] = "P2"
+        del rows[3]
+
+        result = SampleVerifier(_manager(rows)).verify(lines, sample_size=len(lines), seed=1)
+
+        assert result.mismatched_lines == 2
+        assert result.missing_lines == 1
+        assert result.field_mismatches == {"project_code": 1, "debit": 1}
+        assert result.mismatch_rate == result.lower_bound == result.upper_bound == 0.2
+        assert {(m.entry_no, m.field) for m in result.examples} == {("2", "line"), ("1", "debit"), ("1", "project_code")}
@@ -0,0 +1,173 @@
+"""
+Unit tests for SchemaManager
+
+Tests schema validation functionality:
+- Compiled validator cached per table
+- Required columns, type compatibility and length limits checked per column
+- Mismatches aggregated into counts with examples
+"""
+
+import json
+import pytest
+import pandas as pd
+
+from src.analyzer.schema_manager import SchemaManager, type_kind, type_length_limit
+
+
+@pytest.fixture
+def schema_manager(tmp_path):
+    schema = {
+        "tables": {
+            "transaction_lines": {
+                "columns": [
+                    {"name": "id", "data_type": "uuid", "nullable": False, "default_value": "gen_random_uuid()"},
+                    {"name": "transaction_id", "data_type": "uuid", "nullable": False},
+                    {"name": "line_no", "data_type": "integer", "nullable": False},
+                    {"name": "debit_amount", "data_type": "numeric(15,4)"},
+                    {"name": "entry_date", "data_type": "date"},
+                    {"name": "is_reversal", "data_type": "boolean"},
+                    {"name": "description", "data_type": "character varying(10)"},
+                ],
+                "primary_keys": ["id"],
+            }
+        }
+    }
+    path = tmp_path / "schema.json"
+    path.write_text(json.dumps(schema), encoding="utf-8")
+    return SchemaManager(str(path))
+
+
+class TestTypeParsing:
+    """Test column type classification"""
+
+    def test_kinds_and_length_limits(self):
+        """Test kinds and limits read from type names"""
+        assert [type_kind(t) for t in ("bigint", "numeric(15,4)", "timestamp with time zone", "uuid", "text")] == \
+            ["integer", "numeric", "date", "uuid", "text"]
+        assert type_length_limit("character varying(255)") == 255
+        assert type_length_limit("varchar(20)") == 20
+        assert type_length_limit("text") is None
+
+
+class TestValidateData:
+    """Test column-wise schema validation"""
+
+    def test_valid_frame(self, schema_manager):
+        """Test values that convert to the column types"""
+        data = pd.DataFrame({
+            "transaction_id": ["731a3a00-6fa6-4282-9bec-8b5a8678e127"] * 2,
+            "line_no": ["1", 2],
+            "debit_amount": ["100.50", None],
+            "entry_date": ["2024-01-31", None],
+            "is_reversal": ["false", True],
+            "description": ["short", None],
+        })
+
+        result = schema_manager.validate_data("transaction_lines", data)
+
+        assert result.is_valid
+        assert result.validated_rows == 2
+        assert result.column_issues == []
+
+    def test_issues_aggregated_per_column(self, schema_manager):
+        """Test counts and examples instead of per-cell messages"""
+        data = pd.DataFrame({
+            "transaction_id": ["731a3a00-6fa6-4282-9bec-8b5a8678e127", None, "not-a-uuid", None],
+            "line_no": ["1", "2.5", "x", "4"],
+            "entry_date": ["2024-01-31", "bad", "bad", None],
+            "description": ["fits", "far too long", None, "0123456789"],
+        }, index=[10, 11, 12, 13])
+
+        result = schema_manager.validate_data("transaction_lines", data)
+
+        issues = {(i.column, i.issue): i for i in result.column_issues}
+        assert issues[("transaction_id", "missing_required")].count == 2
+        assert issues[("transaction_id", "type_mismatch")].examples == [(12, "not-a-uuid")]
+        assert issues[("line_no", "type_mismatch")].count == 2
+        assert issues[("entry_date", "type_mismatch")].count == 2
+        assert issues[("description", "too_long")].examples == [(11, "far too long")]
+        assert result.invalid_rows == 2
+        assert result.validated_rows == 2
+        assert not result.is_valid
+        assert "2 rows failed validation" in result.errors
+
+    def test_missing_required_column(self, schema_manager):
+        """Test that a missing required column invalidates every row"""
+        result = schema_manager.validate_data("transaction_lines", pd.DataFrame({"line_no": [1, 2]}))
+
+        assert result.invalid_rows == 2
+        assert ("transaction_id", "missing_required") in {(i.column, i.issue) for i in result.column_issues}
+
+    def test_validator_compiled_once(self, schema_manager):
+        """Test the per-table validator cache and unknown tables"""
+        validator = schema_manager.get_compiled_validator("transaction_lines")
+
+        assert schema_manager.get_compiled_validator("transaction_lines") is validator
+        assert validator.required_columns == ["transaction_id", "line_no"]
+        assert validator.max_lengths == {"description": 10}
+        assert not schema_manager.validate_data("missing_table", pd.DataFrame({"a": [1]})).is_valid
+
+
+class TestLoadPlan:
+    """Test foreign key load planning"""
+
+    @pytest.fixture
+    def fk_manager(self, tmp_path):
+        def fk(column, table):
+            return {"column_name": column, "referenced_table": table, "referenced_column": "id"}
+        schema = {"tables": {
+            "accounts": {"foreign_keys": [fk("parent_id", "accounts")]},
+            "projects": {},
+            "transactions": {"foreign_keys": [fk("project_id", "projects")]},
+            "transaction_lines": {"foreign_keys": [fk("transaction_id", "transactions"), fk("account_id", "accounts")]},
+            "a": {"foreign_keys": [fk("b_id", "b")]},
+            "b": {"foreign_keys": [fk("a_id", "a"), fk("project_id", "projects")]},
+        }}
+        path = tmp_path / "schema.json"
+        path.write_text(json.dumps(schema), encoding="utf-8")
+        return SchemaManager(str(path))
+
+    def test_stages_follow_foreign_keys(self, fk_manager):
+        """Test levels, parents and children without self references"""
+        plan = fk_manager.build_load_plan(["transaction_lines", "transactions", "accounts", "projects"], {})
+
+        assert plan.stages == [["accounts", "projects"], ["transactions"], ["transaction_lines"]]
+        assert plan.dependencies["transaction_lines"] == ["accounts", "transactions"]
+        assert plan.dependents["projects"] == ["transactions"]
+        assert plan.cycles == []
+
+    def test_migration_dependencies_fill_gaps(self, tmp_path):
+        """Test the known dependencies when the schema lists no foreign keys"""
+        manager = SchemaManager(str(tmp_path / "missing.json"))
+
+        plan = manager.build_load_plan(["transaction_lines", "transactions"])
+
+        assert plan.stages == [["transactions"], ["transaction_lines"]]
+
+    def test_cycle_loaded_last(self, fk_manager):
+        """Test that a cycle becomes a final stage waiting on outside parents"""
+        plan = fk_manager.build_load_plan(["a", "b", "projects"], {})
+
+        assert plan.stages == [["projects"], ["a", "b"]]
+        assert plan.cycles == [["a", "b"]]
+        assert plan.dependencies == {"projects": [], "a": [], "b": ["projects"]}
+
+    def test_dependents_of_cycle_wait_for_it(self, tmp_path):
+        """Test that only cycle members share a stage and their dependents keep their edges"""
+        def fk(column, table):
+            return {"column_name": column, "referenced_table": table, "referenced_column": "id"}
+        path = tmp_path / "schema.json"
+        path.write_text(json.dumps({"tables": {
+            "accounts": {"foreign_keys": [fk("project_id", "projects")]},
+            "projects": {"foreign_keys": [fk("account_id", "accounts")]},
+            "transactions": {"foreign_keys": [fk("account_id", "accounts")]},
+            "transaction_lines": {"foreign_keys": [fk("transaction_id", "transactions")]},
+        }}), encoding="utf-8")
+
+        plan = SchemaManager(str(path)).build_load_plan(None, {})
+
+        assert plan.stages == [["accounts", "projects"], ["transactions"], ["transaction_lines"]]
+        assert plan.cycles == [["accounts", "projects"]]
+        assert plan.dependencies == {
+            "accounts": [], "projects": [], "transactions": ["accounts"], "transaction_lines": ["transactions"]
+        }
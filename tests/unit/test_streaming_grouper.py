@@ -0,0 +1,115 @@
+"""
+Unit tests for StreamingTransactionGrouper
+
+Tests chunked grouping functionality:
+- Entries carried across chunk boundaries
+- Out-of-order detection and the external sort fallback
+- Chunked reading of the transactions sheet
+"""
+
+import pytest
+import pandas as pd
+
+from src.analyzer.excel_reader import ExcelReader
+from src.analyzer.transaction_grouper import TransactionGrouper
+from src.analyzer.streaming_grouper import StreamingTransactionGrouper, UnsortedInputError
+
+
+@pytest.fixture
+def lines_df():
+    return pd.DataFrame({
+        "entry_no": ["1", "1", "2", "2", "2", "10", "10", None],
+        "entry_date": ["2024-01-01"] * 5 + ["2024-01-03"] * 3,
+        "debit": ["10", "0", "5", "2", "0", "7", "0", "1"],
+        "credit": ["0", "10", "0", "0", "7", "0", "6", "0"],
+        "notes": ["a", "b", None, "c", "c", None, "d", None],
+    })
+
+
+def _chunks(data, size):
+    return [data.iloc[start:start + size] for start in range(0, len(data), size)]
+
+
+def _sorted_headers(result):
+    return result.transactions_df.sort_values(["reference_number", "transaction_date"]).reset_index(drop=True)
+
+
+class TestStreamingGrouping:
+    """Test grouping of ordered chunks"""
+
+    def test_entries_split_across_chunks(self, lines_df):
+        """Test that streaming matches in-memory grouping for any chunk size"""
+        expected = TransactionGrouper().group_lines_into_transactions(lines_df)
+
+        for size in (1, 2, 3, 8):
+            grouper = StreamingTransactionGrouper()
+            result = grouper.group_chunks(_chunks(lines_df, size), on_unsorted="raise")
+
+            pd.testing.assert_frame_equal(_sorted_headers(result), expected.transactions_df, check_dtype=False)
+            assert result.lines_df.sort_index()["transaction_id"].tolist() == \
+                expected.lines_df["transaction_id"].tolist()
+            assert grouper.summary.transaction_count == 3
+            assert grouper.summary.unbalanced_count == 1
+            assert grouper.summary.largest_entry_lines == 3
+
+    def test_batches_hold_complete_entries(self, lines_df):
+        """Test that no entry is emitted in two batches"""
+        batches = list(StreamingTransactionGrouper().iter_batches(_chunks(lines_df, 2), on_unsorted="raise"))
+
+        references = [ref for batch in batches for ref in batch.transactions_df["reference_number"]]
+        assert sorted(references) == ["1", "10", "2"]
+        assert [batch.transactions_df["reference_number"].tolist() for batch in batches][:2] == [["1"], ["2"]]
+
+
+class TestUnsortedInput:
+    """Test out-of-order detection and fallback"""
+
+    def test_raise_on_out_of_order(self, lines_df):
+        """Test that a lower entry after a higher one is reported"""
+        shuffled = lines_df.iloc[[0, 1, 5, 2, 3, 4, 6, 7]]
+
+        with pytest.raises(UnsortedInputError, match="Entry 2 at line 4"):
+            list(StreamingTransactionGrouper().iter_batches(_chunks(shuffled, 3), on_unsorted="raise"))
+
+    def test_external_sort_fallback(self, lines_df, tmp_path):
+        """Test that unordered input is merged from disk into the same result"""
+        shuffled = lines_df.iloc[[7, 5, 2, 0, 6, 3, 1, 4]]
+        expected = TransactionGrouper().group_lines_into_transactions(lines_df)
+        grouper = StreamingTransactionGrouper(spill_dir=str(tmp_path), merge_block_rows=2)
+
+        result = grouper.group_chunks(_chunks(shuffled, 3))
+
+        pd.testing.assert_frame_equal(_sorted_headers(result), expected.transactions_df, check_dtype=False)
+        assert len(result.lines_df) == 8
+        assert grouper.summary.sorted_input is False
+        assert grouper.summary.spilled_runs == 3
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestChunkedReading:
+    """Test reading the transactions sheet in chunks"""
+
+    def test_chunks_match_full_read(self, tmp_path):
+        """Test values, names and index of chunks against a full read"""
+        path = tmp_path / "lines.xlsx"
+        pd.DataFrame({
+            "رقم القيد": [1, 2, 3.5, None, 5],
+            "البيان": ["a", None, "c", "d", 7],
+        }).to_excel(path, sheet_name="transactions ", index=False)
+        mapping_path = tmp_path / "mapping.csv"
+        mapping_path.write_text(
+            "Excel_Column,English_Name,Supabase_Table,Supabase_Column,Data_Type,Required\n"
+            "رقم القيد,entry_no,transactions,entry_number,string,Yes\n",
+            encoding="utf-8"
+        )
+        reader = ExcelReader(str(path), str(mapping_path))
+
+        chunks = list(reader.iter_transaction_chunks(chunk_size=2))
+        full = reader.read_transactions_sheet().data
+
+        assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+        combined = pd.concat(chunks)
+        assert list(combined.columns) == ["entry_no", "البيان"]
+        assert combined.index.tolist() == full.index.tolist()
+        assert combined.astype(object).where(combined.notna(), None).values.tolist() == \
+            full.astype(object).where(full.notna(), None).values.tolist()
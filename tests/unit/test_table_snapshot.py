@@ -0,0 +1,54 @@
+"""
+Unit tests for TableSnapshot
+
+Tests shared table reads:
+- One read per table, also from concurrent callers
+- Organization filter on transactions and lines only
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock
+
+from src.executor.table_snapshot import TableSnapshot, SNAPSHOT_COLUMNS
+
+
+def _manager(rows_by_table):
+    calls = []
+
+    def iter_pages(table, columns="*", filters=None, page_size=1000, order="id"):
+        calls.append((table, filters))
+        time.sleep(0.05)  # Give concurrent callers time to arrive
+        rows = rows_by_table[table]
+        for start in range(0, len(rows), page_size):
+            yield rows[start:start + page_size]
+
+    manager = Mock()
+    manager.iter_pages.side_effect = iter_pages
+    return manager, calls
+
+
+class TestTableSnapshot:
+    """Test lazily loaded shared tables"""
+
+    def test_concurrent_callers_share_one_read(self):
+        """Test that a table is read once for many concurrent callers"""
+        manager, calls = _manager({"transaction_lines": [{"id": i, "org_id": "o1"} for i in range(5)]})
+        snapshot = TableSnapshot(manager, org_id="o1", page_size=2)
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            frames = list(pool.map(lambda _: snapshot.table("transaction_lines"), range(8)))
+
+        assert calls == [("transaction_lines", {"org_id": "o1"})]
+        assert all(frame is frames[0] for frame in frames)
+        assert list(frames[0].columns) == SNAPSHOT_COLUMNS["transaction_lines"]
+        assert snapshot.rows_read == 5
+
+    def test_reference_tables_read_ids_unfiltered(self):
+        """Test that reference tables are read with ids and without the org filter"""
+        manager, calls = _manager({"accounts": [{"id": "a1"}, {"id": "a2"}, {"id": None}]})
+        snapshot = TableSnapshot(manager, org_id="o1")
+
+        assert set(snapshot.ids("accounts")) == {"a1", "a2"}
+        assert calls == [("accounts", None)]
+        assert manager.iter_pages.call_args.kwargs["columns"] == "id"
@@ -0,0 +1,172 @@
+"""
+Unit tests for TransactionGrouper class
+
+Tests grouping functionality:
+- Exact minor-unit totals
+- Tolerance and exact balance modes
+- Input already converted to minor units
+- Single-pass aggregation of headers and transaction ids
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+
+from src.analyzer.transaction_grouper import TransactionGrouper, build_transaction_ids
+from src.analyzer.dtype_plan import MINOR_UNIT_SCALES_ATTR
+
+
+@pytest.fixture
+def lines_df():
+    return pd.DataFrame({
+        "entry_no": ["1", "1", "1", "2", "2"],
+        "entry_date": ["2024-01-01"] * 5,
+        "debit": ["0.1", "0.2", "0", "5", "0"],
+        "credit": ["0", "0", "0.3", "0", "4.995"],
+    })
+
+
+class TestTransactionGrouperBalance:
+    """Test balance checks on minor units"""
+
+    def test_totals_are_exact(self, lines_df):
+        """Test that 0.1 + 0.2 balances 0.3 without float drift"""
+        result = TransactionGrouper(exact_balance=True, scale=4).group_lines_into_transactions(lines_df)
+
+        first = result.transactions_df.iloc[0]
+        assert first["total_debit"] == 0.3
+        assert first["balance_difference"] == 0
+        assert bool(first["is_balanced"])
+
+    def test_tolerance_mode(self, lines_df):
+        """Test that a half-unit difference is within the default tolerance"""
+        result = TransactionGrouper(scale=4).group_lines_into_transactions(lines_df)
+
+        assert result.unbalanced_count == 0
+
+    def test_exact_balance_mode(self, lines_df):
+        """Test that exact mode reports any non-zero difference"""
+        result = TransactionGrouper(exact_balance=True, scale=4).group_lines_into_transactions(lines_df)
+
+        assert result.unbalanced_count == 1
+        assert result.balance_errors[0].entry_no == "2"
+        assert result.balance_errors[0].difference == 0.005
+
+    def test_currency_scale(self):
+        """Test that the currency selects the scale"""
+        assert TransactionGrouper(currency="KWD").scale == 3
+        assert TransactionGrouper(currency="egp").scale == 2
+
+    def test_minor_unit_input(self, lines_df):
+        """Test input converted by the dtype plan"""
+        data = lines_df.copy()
+        data["debit"] = pd.array([1000, 2000, 0, 50000, 0], dtype="Int64")
+        data["credit"] = pd.array([0, 0, 3000, 0, 49950], dtype="Int64")
+        data.attrs[MINOR_UNIT_SCALES_ATTR] = {"debit": 4, "credit": 4}
+
+        result = TransactionGrouper(exact_balance=True).group_lines_into_transactions(data)
+
+        assert result.unbalanced_count == 1
+        assert result.lines_df["debit"].tolist() == [0.1, 0.2, 0.0, 5.0, 0.0]
+
+    def test_line_amounts_match_totals(self):
+        """Test that line amounts are parsed like the totals (thousands separators)"""
+        data = pd.DataFrame({
+            "entry_no": ["1", "1"],
+            "entry_date": ["2024-01-01"] * 2,
+            "debit": ["1,000", "0"],
+            "credit": ["0", "1,000.00"],
+        })
+
+        result = TransactionGrouper().group_lines_into_transactions(data)
+
+        assert result.transactions_df.iloc[0]["total_debit"] == 1000
+        assert result.lines_df["debit"].tolist() == [1000.0, 0.0]
+        assert result.lines_df["credit"].tolist() == [0.0, 1000.0]
+
+    def test_source_precision_kept(self):
+        """Test that numeric(15,4) amounts keep their digits at the default scale"""
+        data = pd.DataFrame({
+            "entry_no": ["1", "1", "2", "2"],
+            "entry_date": ["2024-01-01"] * 4,
+            "debit": [12.3456, 0.0, 0.004, 0.0],
+            "credit": [0.0, 12.3456, 0.0, 0.001],
+        })
+
+        result = TransactionGrouper(exact_balance=True).group_lines_into_transactions(data)
+
+        assert result.lines_df["debit"].tolist()[0] == 12.3456
+        assert result.transactions_df.iloc[0]["total_debit"] == 12.3456
+        assert result.unbalanced_count == 1
+        assert result.balance_errors[0].entry_no == "2"
+
+
+class TestTransactionGrouperAggregation:
+    """Test header aggregation"""
+
+    def test_headers_from_first_line_and_notes(self):
+        """Test first fiscal_year/month, distinct notes and sort order"""
+        data = pd.DataFrame({
+            "entry_no": ["2", "1", "2", "2", "1"],
+            "entry_date": ["2024-03-01", "2024-01-05", "2024-03-01", "2024-03-01", "2024-01-05"],
+            "debit": ["5", "1", "0", "0", "0"],
+            "credit": ["0", "0", "3", "2", "1"],
+            "fiscal_year": [np.nan, 2024, 2025, 2025, 2024],
+            "month": [3, 1, 4, 4, 1],
+            "notes": ["b", None, "a", "b", None],
+        })
+
+        result = TransactionGrouper().group_lines_into_transactions(data)
+
+        headers = result.transactions_df
+        assert headers["reference_number"].tolist() == ["1", "2"]
+        assert pd.isna(headers["fiscal_year"].iloc[1])
+        assert headers["month"].tolist() == [1, 3]
+        assert pd.isna(headers["notes"].iloc[0])
+        assert headers["notes"].iloc[1] == "b; a"
+        assert headers["line_count"].tolist() == [2, 3]
+        assert result.balance_errors == []
+
+    def test_transaction_ids(self):
+        """Test ids built without per-row formatting"""
+        ids = build_transaction_ids(
+            pd.Series(["7", 8, None]),
+            pd.Series(pd.to_datetime(["2024-02-09", None, "2023-12-31"]))
+        )
+
+        assert ids.tolist() == ["7_20240209", None, "nan_20231231"]
+
+    def test_errors_only_for_unbalanced(self, lines_df):
+        """Test that errors carry the unbalanced entry details"""
+        result = TransactionGrouper(exact_balance=True, scale=4).group_lines_into_transactions(lines_df)
+
+        error = result.balance_errors[0]
+        assert (error.entry_no, error.line_count, error.total_debit, error.total_credit) == ("2", 2, 5.0, 4.995)
+        assert result.lines_df["transaction_id"].tolist() == ["1_20240101"] * 3 + ["2_20240101"] * 2
+
+    def test_auto_balance_adds_suspense_lines(self):
+        """Test balancing lines built per unbalanced entry with first-line attributes"""
+        data = pd.DataFrame({
+            "entry_no": ["1", "1", "2", "2", "3", "3"],
+            "entry_date": ["2024-01-01"] * 4 + ["2024-02-01"] * 2,
+            "account_code": ["1101", "2101"] * 3,
+            "debit": ["10", "0", "5", "0", "0", "7"],
+            "credit": ["0", "10", "0", "3", "4", "0"],
+            "fiscal_year": [2024, 2024, 2025, 2025, 2026, 2026],
+            "month": [1, 1, 2, 2, 3, 3],
+            "notes": [None] * 6,
+        })
+        grouper = TransactionGrouper()
+
+        result = grouper.handle_unbalanced_transactions(
+            grouper.group_lines_into_transactions(data), "auto_balance", "suspense-id"
+        )
+
+        added = result.lines_df[result.lines_df["account_code"] == "SUSPENSE"]
+        assert added["entry_no"].tolist() == ["2", "3"]
+        assert added["debit"].tolist() == [0.0, 0.0]
+        assert added["credit"].tolist() == [2.0, 3.0]
+        assert added["fiscal_year"].tolist() == [2025, 2026]
+        assert added["month"].tolist() == [2, 3]
+        assert added["notes"].iloc[0] == "Auto-balancing entry for transaction 2"
+        assert result.unbalanced_count == 0
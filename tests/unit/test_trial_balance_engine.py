@@ -0,0 +1,137 @@
+"""
+Unit tests for TrialBalanceEngine
+
+Tests the offline GL summary and trial balance:
+- Opening, period and closing amounts per account
+- Roll-up over the account tree and dimension pivots
+- Differences against get_gl_account_summary_filtered rows
+"""
+
+from unittest.mock import Mock
+
+import pandas as pd
+import pytest
+
+from src.reports import TrialBalanceEngine
+
+
+ACCOUNTS = pd.DataFrame({
+    "code": ["1", "11", "1101", "1102", "2", "2101"],
+    "name": ["Assets", "Cash", "Box", "Bank", "Liabilities", "Suppliers"],
+    "parent_code": [None, "1", "11", "11", "2", "2"],
+})
+
+LINES = pd.DataFrame({
+    "entry_no": [1, 1, 2, 2, 3, 3],
+    "entry_date": ["2024-12-31", "2024-12-31", "2025-01-10", "2025-01-10", "2025-02-01", "2025-02-01"],
+    "account_code": [1101.0, 2101.0, 1102.0, 2101.0, 1101.0, 1102.0],
+    "debit": [100.10, 0, 0.2, 0, 30, 0],
+    "credit": [0, 100.10, 0, 0.2, 0, 30],
+    "project_code": ["P1", "P1", "P2", "P2", None, None],
+})
+
+
+@pytest.fixture
+def engine():
+    return TrialBalanceEngine(LINES, ACCOUNTS)
+
+
+class TestGLSummary:
+    """Test the GL summary per account"""
+
+    def test_opening_period_and_closing(self, engine):
+        """Test that lines before the period form the opening balance"""
+        summary = engine.gl_summary(date_from="2025-01-01").set_index("account_code")
+
+        assert summary.loc["1101", "opening_balance"] == pytest.approx(100.10)
+        assert summary.loc["1101", "period_debits"] == 30
+        assert summary.loc["1101", "closing_debit"] == pytest.approx(130.10)
+        assert summary.loc["2101", "closing_credit"] == pytest.approx(100.30)
+        assert summary.loc["1102", "transaction_count"] == 2
+        assert summary["closing_debit"].sum() == pytest.approx(summary["closing_credit"].sum())
+
+    def test_exact_minor_unit_sums(self):
+        """Test that many small amounts add up without float drift"""
+        lines = pd.DataFrame({"entry_no": range(10), "entry_date": "2025-01-01", "account_code": "1101",
+                              "debit": ["0.10"] * 10, "credit": "0"})
+
+        summary = TrialBalanceEngine(lines).gl_summary_units()
+
+        assert summary.loc[0, "closing_balance"] == 100
+
+
+class TestTrialBalance:
+    """Test roll-ups over the account tree"""
+
+    def test_rollup_balance(self, engine):
+        """Test that parent accounts carry the balance of their subtree"""
+        balance = engine.trial_balance().set_index("account_code")
+
+        assert balance.loc["11", "rollup_balance"] == pytest.approx(100.30)
+        assert balance.loc["1", "rollup_balance"] == pytest.approx(100.30)
+        assert balance.loc["1101", "depth"] == 2
+
+    def test_level_rollup_without_accounts(self):
+        """Test that level roll-ups of lines without account codes are empty"""
+        engine = TrialBalanceEngine(LINES.assign(account_code=""))
+
+        assert engine.trial_balance(level=1).empty
+        assert engine.dimension_balances("project_code", level=1).empty
+
+    def test_level_rollup(self, engine):
+        """Test summing accounts into their level-0 ancestors"""
+        balance = engine.trial_balance(level=0).set_index("account_code")
+
+        assert list(balance.index) == ["1", "2"]
+        assert balance.loc["1", "closing_debit"] == pytest.approx(100.30)
+        assert balance.loc["2", "closing_credit"] == pytest.approx(100.30)
+
+    def test_dimension_pivot(self, engine):
+        """Test net balance per account and project"""
+        pivot = engine.dimension_balances("project_code", level=1)
+
+        assert pivot.loc["11", "P1"] == pytest.approx(100.10)
+        assert pivot.loc["11", ""] == 0
+        assert pivot.loc["2101", "P2"] == pytest.approx(-0.2)
+
+
+class TestRpcDiff:
+    """Test comparison with the database function"""
+
+    def test_matching_rows_pass(self, engine):
+        """Test that the function's rows for the same data match"""
+        rows = engine.gl_summary().to_dict("records")
+        rows.append({"account_code": "3101", "opening_balance": 0, "period_debits": 0, "period_credits": 0,
+                     "closing_balance": 0, "transaction_count": 0})
+
+        assert engine.diff_against_rpc(rows).passed is True
+
+    def test_difference_reported(self, engine):
+        """Test that a differing account is listed with its differences"""
+        rows = engine.gl_summary().to_dict("records")
+        rows[2]["period_debits"] = 0.1
+        manager = Mock()
+        manager.call_rpc.return_value = rows
+
+        diff = engine.reconcile_with_supabase(manager, org_id="o1", date_to="2025-12-31")
+
+        assert diff.passed is False
+        assert list(diff.differences["account_code"]) == ["1101"]
+        assert diff.differences.loc[0, "period_debits_difference"] == pytest.approx(130.0)
+        assert manager.call_rpc.call_args.args[1]["p_date_to"] == "2025-12-31"
+
+    def test_rpc_read_page_by_page(self, engine):
+        """Test that every page of the function's rows is compared"""
+        rows = engine.gl_summary().to_dict("records")
+        manager = Mock()
+        manager.call_rpc.side_effect = lambda function, params: rows[
+            params["p_offset"]:params["p_offset"] + min(params["p_limit"], 2)
+        ]
+
+        diff = engine.reconcile_with_supabase(manager, page_size=2)
+
+        assert diff.passed is True
+        assert diff.accounts_compared == len(rows)
+        assert [call.args[1]["p_offset"] for call in manager.call_rpc.call_args_list] == list(
+            range(0, len(rows) + 1, 2)
+        )
@@ -0,0 +1,123 @@
+"""
+Unit tests for ValidationCache and incremental validation
+
+Tests incremental re-validation:
+- Row fingerprints independent of the index
+- Unchanged rows reuse the findings of the last run
+- Rows referencing changed codes are validated again
+- Diff of findings since the last run
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+
+from src.analyzer.data_validator import DataValidator
+from src.analyzer.validation_cache import (
+    ValidationCache,
+    match_rows,
+    row_fingerprints
+)
+
+
+@pytest.fixture
+def lines():
+    return pd.DataFrame({
+        'entry_no': ['1', '1', '2', None],
+        'account_code': ['1101', '9999', '1101', '2101'],
+        'debit': ['10', '0', 'abc', '5'],
+        'credit': ['0', '10', '0', '0'],
+        'line_number': ['1', '2', '1', '1']
+    })
+
+
+def _validator(account_codes):
+    validator = DataValidator()
+    validator.set_valid_account_codes(account_codes)
+    return validator
+
+
+def _error_tuples(result):
+    return [(e.row_number, e.field_name, e.error_type, e.error_message) for e in result.errors]
+
+
+class TestRowFingerprints:
+    """Test content fingerprints"""
+
+    def test_fingerprints_ignore_index(self, lines):
+        """Test that moved rows keep their fingerprint and match the previous run"""
+        previous = row_fingerprints(lines)
+        shifted = pd.concat([lines.iloc[[0]], lines]).reset_index(drop=True)
+
+        source = match_rows(previous, row_fingerprints(shifted))
+
+        assert source.tolist() == [0, 0, 1, 2, 3]
+
+    def test_edited_row_not_matched(self, lines):
+        """Test that a changed value gives a new fingerprint"""
+        edited = lines.copy()
+        edited.loc[2, 'debit'] = '7'
+
+        source = match_rows(row_fingerprints(lines), row_fingerprints(edited))
+
+        assert source.tolist() == [0, 1, -1, 3]
+
+
+class TestIncrementalValidation:
+    """Test validate_incremental"""
+
+    def test_first_run_validates_everything(self, lines, tmp_path):
+        """Test that without a cache every row is validated"""
+        cache = ValidationCache(str(tmp_path))
+
+        result = _validator({'1101', '2101'}).validate_incremental(lines, cache)
+
+        diff = result.summary['since_last_run']
+        assert diff['full_revalidation']
+        assert diff['revalidated_rows'] == 4
+        assert (tmp_path / 'validate_transaction_lines.pkl').exists()
+
+    def test_only_changed_rows_revalidated(self, lines, tmp_path):
+        """Test reuse of unchanged rows and the diff of findings"""
+        cache = ValidationCache(str(tmp_path))
+        _validator({'1101', '2101'}).validate_incremental(lines, cache)
+        edited = lines.copy()
+        edited.loc[2, 'debit'] = '7'
+        edited.loc[3, 'entry_no'] = '3'
+
+        validator = _validator({'1101', '2101'})
+        result = validator.validate_incremental(edited, cache)
+
+        diff = validator.last_diff
+        assert not diff.full_revalidation
+        assert diff.revalidated_rows == 2
+        assert diff.reused_rows == 2
+        assert diff.resolved_findings == {'data_type': 1, 'required_field': 1}
+        assert diff.new_findings == {}
+        assert _error_tuples(result) == _error_tuples(
+            _validator({'1101', '2101'}).validate_transaction_lines(edited)
+        )
+
+    def test_changed_codes_revalidate_referencing_rows(self, lines, tmp_path):
+        """Test that rows using a code whose validity changed are validated again"""
+        cache = ValidationCache(str(tmp_path))
+        _validator({'1101', '2101'}).validate_incremental(lines, cache)
+
+        validator = _validator({'1101', '2101', '9999'})
+        result = validator.validate_incremental(lines, cache)
+
+        assert validator.last_diff.reference_affected_rows == 1
+        assert validator.last_diff.resolved_findings == {'account_code': 1}
+        assert 'account_code' not in result.summary['error_types']
+
+    def test_ruleset_version_change_discards_cache(self, lines, tmp_path, monkeypatch):
+        """Test that a new rule-set version forces a full run"""
+        cache = ValidationCache(str(tmp_path))
+        _validator({'1101'}).validate_incremental(lines, cache)
+        monkeypatch.setattr('src.analyzer.data_validator.RULESET_VERSION', 'next')
+
+        validator = _validator({'1101'})
+        validator.validate_incremental(lines, cache)
+
+        assert validator.last_diff.full_revalidation
+        assert validator.last_diff.revalidated_rows == 4
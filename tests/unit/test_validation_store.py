@@ -0,0 +1,217 @@
+"""
+Unit tests for FindingStore class
+
+Tests columnar finding storage:
+- Counts without building findings
+- Row-then-rule ordering and lazy materialization
+- Streaming export
+- Merging chunk payloads from parallel validation
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+
+from src.analyzer.data_validator import (
+    DataValidator,
+    ValidationError,
+    ValidationResult,
+    create_error_store
+)
+from src.analyzer.validation_store import DeferredDetails
+
+
+@pytest.fixture
+def store():
+    store = create_error_store()
+    row_numbers = np.arange(1, 11)
+    store.add_block('debit', 'range', np.array([4, 1]), row_numbers,
+                    lambda pos: dict(error_message=f"bad debit at {pos}"))
+    store.add_block('credit', 'data_type', np.array([1, 7]), row_numbers,
+                    lambda pos: dict(error_message=f"bad credit at {pos}"))
+    return store
+
+
+class TestFindingStore:
+    """Test the columnar store"""
+
+    def test_counts(self, store):
+        """Test O(1) totals and per-type counts"""
+        assert len(store) == 4
+        assert store.counts_by_type() == {'range': 2, 'data_type': 2}
+        assert store.unique_row_count() == 3
+
+    def test_order_and_materialization(self, store):
+        """Test findings are ordered by row, then by rule"""
+        errors = list(store)
+
+        assert [(e.row_number, e.field_name) for e in errors] == [
+            (2, 'debit'), (2, 'credit'), (5, 'debit'), (8, 'credit')
+        ]
+        assert isinstance(store[-1], ValidationError)
+        assert store[0].error_message == "bad debit at 1"
+        assert len(store[:2]) == 2
+
+    def test_to_frame(self, store):
+        """Test columnar view without messages"""
+        frame = store.to_frame()
+
+        assert frame['row_number'].tolist() == [2, 2, 5, 8]
+        assert frame['type'].tolist() == ['range', 'data_type', 'range', 'data_type']
+
+    def test_export_csv_in_chunks(self, store, tmp_path):
+        """Test that chunked export writes every finding once"""
+        output_path = tmp_path / "errors.csv"
+
+        written = store.export(str(output_path), chunk_size=3)
+
+        exported = pd.read_csv(output_path)
+        assert written == 4
+        assert exported['row_number'].tolist() == [2, 2, 5, 8]
+        assert exported['error_message'].iloc[3] == "bad credit at 7"
+
+    def test_export_parquet_with_varying_chunk_types(self, tmp_path):
+        """Test that chunks whose inferred types differ share one Parquet schema"""
+        pq = pytest.importorskip("pyarrow.parquet")
+        store = create_error_store()
+        store.add_block('debit', 'range', np.array([0, 1, 2, 3]), np.arange(1, 5),
+                        lambda pos: dict(error_message=f"bad debit at {pos}",
+                                         actual_value=None if pos < 2 else ('x' if pos == 2 else 7)))
+        output_path = tmp_path / "errors.parquet"
+
+        written = store.export(str(output_path), chunk_size=2)
+
+        exported = pq.read_table(output_path).to_pandas()
+        assert written == 4
+        assert exported['row_number'].tolist() == [1, 2, 3, 4]
+        assert exported['actual_value'].tolist()[2:] == ['x', '7']
+        assert exported['actual_value'].iloc[:2].isna().all()
+
+    def test_result_wraps_lists(self):
+        """Test that results built from lists still expose a store"""
+        result = ValidationResult(
+            passed=False, total_records=1, valid_records=0, invalid_records=1,
+            errors=[ValidationError(1, 'data', 'EMPTY_DATA', 'Input data is empty')]
+        )
+
+        assert len(result.errors) == 1
+        assert result.errors.counts_by_type() == {'EMPTY_DATA': 1}
+
+
+class TestDeferredDetails:
+    """Test payloads shipped without finding fields"""
+
+    def test_fields_rebuilt_for_repeated_field_and_type(self):
+        """Test that several findings of one field and type on a row keep their order"""
+        def validate(rows):
+            local = create_error_store()
+            row_numbers = np.arange(1, len(rows) + 1)
+            local.add_block('debit', 'range', np.flatnonzero(rows % 2 == 0), row_numbers,
+                            lambda pos: dict(error_message=f"first {rows[pos]}"))
+            local.add_block('debit', 'range', np.arange(len(rows)), row_numbers,
+                            lambda pos: dict(error_message=f"second {rows[pos]}"))
+            return local
+
+        payload = validate(np.arange(4)).to_payload(details=False)
+        merged = create_error_store()
+        merged.add_payload(payload, np.arange(1, 15), offset=10, details=DeferredDetails(validate))
+
+        assert [e.error_message for e in merged] == [
+            "first 10", "second 10", "second 11", "first 12", "second 12", "second 13"
+        ]
+
+    def test_missing_details_rejected(self, store):
+        """Test that a positions-only payload needs a details source"""
+        with pytest.raises(ValueError):
+            create_error_store().add_payload(store.to_payload(details=False), np.arange(1, 11))
+
+
+class TestDataValidatorExamples:
+    """Test capped materialization in validate()"""
+
+    def test_validate_caps_examples(self):
+        """Test that max_examples limits the listed errors but not the counts"""
+        validator = DataValidator()
+        data = pd.DataFrame({'entry_no': [None] * 50, 'entry_date': ['bad'] * 50})
+
+        report = validator.validate(data, max_examples=10)
+
+        assert len(report['errors']) == 10
+        assert report['summary']['error_count'] == 100
+        assert len(validator.last_result.errors) == 100
+
+
+class TestParallelValidation:
+    """Test chunked validation in a process pool"""
+
+    @pytest.fixture
+    def lines(self):
+        data = pd.DataFrame({
+            'entry_no': ['1', None, '2', '3'] * 25,
+            'entry_date': ['2024-01-01', 'bad', None, '2024-02-01'] * 25,
+            'account_code': ['1101', 'x', '1101', None] * 25,
+            'debit': ['10', '-1', 'abc', '0'] * 25,
+            'credit': ['0', '5', None, '0'] * 25,
+            'line_number': 1
+        })
+        data.index = data.index + 100
+        return data
+
+    def _validator(self):
+        validator = DataValidator()
+        validator.set_valid_account_codes({'1101'})
+        return validator
+
+    def test_chunked_matches_serial(self, lines):
+        """Test that merged chunk findings equal a single-process run"""
+        serial = self._validator().validate_transaction_lines(lines)
+
+        chunked = self._validator().validate_in_chunks(
+            lines, 'validate_transaction_lines', workers=2, chunk_size=30
+        )
+
+        assert chunked.summary == serial.summary
+        assert chunked.invalid_records == serial.invalid_records
+        assert chunked.errors.to_frame().equals(serial.errors.to_frame())
+        assert chunked.errors[-1].row_number == serial.errors[-1].row_number
+        assert [vars(e) for e in chunked.errors] == [vars(e) for e in serial.errors]
+        assert [vars(w) for w in chunked.warnings] == [vars(w) for w in serial.warnings]
+
+    def test_workers_ship_positions_only(self, lines, monkeypatch):
+        """Test that worker payloads carry no fields and only read rows are rebuilt"""
+        from src.analyzer import data_validator
+
+        data_validator._init_validation_worker(self._validator()._valid_code_sets(), [])
+        error_payload, _ = data_validator._validate_chunk('validate_transaction_lines', lines.iloc[:30])
+        assert all(columns is None for _, _, _, columns in error_payload['blocks'])
+
+        validated = []
+        original = DataValidator.validate_transaction_lines
+
+        def counting(validator, data):
+            validated.append(len(data))
+            return original(validator, data)
+
+        validator = self._validator()
+        result = validator.validate_in_chunks(lines, 'validate_transaction_lines', workers=2, chunk_size=30)
+        monkeypatch.setattr(DataValidator, 'validate_transaction_lines', counting)
+        examples = result.errors[:5]
+
+        assert validated == [len({e.row_number for e in examples})]
+        assert examples[0].error_message
+
+    def test_referential_integrity_in_reduce(self, lines):
+        """Test that cross-chunk checks run once over the whole frame"""
+        transactions = pd.DataFrame({'entry_no': ['1', '2', '9']})
+
+        result = self._validator().validate_in_chunks(
+            lines, workers=2, chunk_size=30, transactions=transactions
+        )
+
+        assert result.summary['error_types']['referential_integrity'] == 50
+        assert result.summary['warning_types'] == {'referential_integrity': 1}
+
+    def test_rejects_whole_frame_methods(self, lines):
+        """Test that only row-level methods can be chunked"""
+        with pytest.raises(ValueError):
+            self._validator().validate_in_chunks(lines, 'validate_referential_integrity')
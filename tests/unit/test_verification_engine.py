@@ -0,0 +1,132 @@
+"""
+Unit tests for VerificationEngine
+
+Tests reference checks:
+- Aggregate counts from the database function
+- Client fallback over paginated reads
+- Referential integrity, account mapping and dimension checks
+- Concurrent checks over a shared table snapshot
+"""
+
+from unittest.mock import Mock
+
+import pandas as pd
+import pytest
+
+from src.executor.verification_engine import VerificationEngine, REFERENCE_COLUMNS
+
+
+TABLES = {
+    "transactions": [{"id": "t1"}, {"id": "t2"}],
+    "accounts": [{"id": "a1"}],
+    "projects": [{"id": "p1"}],
+    "classifications": [],
+    "work_analysis": [],
+    "sub_tree": [],
+    "transaction_lines": [
+        {"id": 1, "org_id": "o1", "transaction_id": "t1", "account_id": "a1", "project_id": "p1"},
+        {"id": 2, "org_id": "o1", "transaction_id": "t9", "account_id": None, "project_id": "p9"},
+        {"id": 3, "org_id": "o2", "transaction_id": "t2", "account_id": "a7", "sub_tree_id": "s1"},
+    ],
+}
+
+
+def _iter_pages(table, columns="*", filters=None, page_size=1000, order="id"):
+    rows = [row for row in TABLES[table]
+            if all(row.get(key) == value for key, value in (filters or {}).items())]
+    for start in range(0, len(rows), page_size):
+        yield rows[start:start + page_size]
+
+
+@pytest.fixture
+def fallback_manager():
+    manager = Mock()
+    manager.call_rpc.side_effect = Exception("function verify_migration_references does not exist")
+    manager.iter_pages.side_effect = _iter_pages
+    manager.select_in.return_value = []
+    return manager
+
+
+class TestReferenceCounts:
+    """Test where reference counts come from"""
+
+    def test_rpc_counts_used(self):
+        """Test that the database function is called once for all checks"""
+        manager = Mock()
+        manager.call_rpc.return_value = [
+            {"org_id": "o1", "reference_column": column, "total_lines": 5,
+             "missing_lines": 0, "orphaned_lines": 2 if column == "sub_tree_id" else 0}
+            for column in REFERENCE_COLUMNS
+        ]
+        engine = VerificationEngine(manager, org_id="o1")
+
+        assert engine.verify_referential_integrity().passed is True
+        assert engine.verify_account_mappings(None).passed is True
+        dimensions = engine.verify_dimension_integrity()
+
+        assert dimensions.passed is False
+        assert dimensions.actual_value == "Invalid references: 2"
+        manager.call_rpc.assert_called_once_with("verify_migration_references", {"p_org_id": "o1"})
+        manager.execute_query.assert_not_called()
+        assert engine.reference_counts_source == "rpc"
+
+    def test_client_fallback(self, fallback_manager):
+        """Test counts built from paginated reads when the function is missing"""
+        engine = VerificationEngine(fallback_manager, page_size=2)
+
+        referential = engine.verify_referential_integrity()
+        accounts = engine.verify_account_mappings(None)
+        dimensions = engine.verify_dimension_integrity()
+
+        assert engine.reference_counts_source == "client"
+        assert referential.actual_value == "Orphaned lines: 1"
+        assert "By org: {'o1': 1}" in referential.details
+        assert accounts.actual_value == "Unmapped lines: 2"
+        assert dimensions.actual_value == "Invalid references: 2"
+        assert "'project_id': 1" in dimensions.details
+
+    def test_client_fallback_filters_org(self, fallback_manager):
+        """Test that the fallback only reads lines of the organization"""
+        engine = VerificationEngine(fallback_manager, org_id="o2")
+
+        counts = engine.get_reference_counts()
+
+        assert set(counts["org_id"]) == {"o2"}
+        assert engine.verify_account_mappings(None).actual_value == "Unmapped lines: 1"
+
+
+class TestRunAllVerifications:
+    """Test the shared snapshot and concurrent checks"""
+
+    def test_each_table_read_once(self, fallback_manager):
+        """Test that concurrent checks share one read per table"""
+        fallback_manager.count_rows.side_effect = lambda table, filters=None: len(TABLES[table])
+        excel_lines = pd.DataFrame({
+            "entry_no": ["1"], "entry_date": ["2024-01-05"], "account_code": ["1101"], "debit": [10], "credit": [0]
+        })
+        engine = VerificationEngine(fallback_manager)
+
+        report = engine.run_all_verifications(excel_lines, pd.DataFrame({"entry_no": ["1", "2"]}), max_workers=4)
+
+        assert [check.check_name for check in report.checks] == [
+            "Record Count Consistency", "Referential Integrity", "Sample Data Comparison",
+            "Value Reconciliation", "Account Mapping Verification", "Dimension Integrity"
+        ]
+        assert all(check.duration_seconds is not None for check in report.checks)
+        read_tables = [call.args[0] for call in fallback_manager.iter_pages.call_args_list]
+        assert sorted(read_tables) == sorted(set(read_tables))
+        assert read_tables.count("transaction_lines") == 1
+        fallback_manager.execute_query.assert_not_called()
+        assert report.checks[0].actual_value == "Transactions: 2, Lines: 3"
+
+    def test_sequential_matches_concurrent(self, fallback_manager):
+        """Test that running checks in turn gives the same results"""
+        fallback_manager.count_rows.return_value = 3
+        excel_lines = pd.DataFrame(columns=["entry_no", "entry_date", "account_code", "debit", "credit"])
+
+        concurrent = VerificationEngine(fallback_manager).run_all_verifications(excel_lines, excel_lines)
+        sequential = VerificationEngine(fallback_manager).run_all_verifications(excel_lines, excel_lines, max_workers=1)
+
+        assert [(c.check_name, c.passed, c.details) for c in concurrent.checks] == [
+            (c.check_name, c.passed, c.details) for c in sequential.checks
+        ]
@@ -5,14 +5,26 @@ This script reads all SQL files and calculates:
 - Total number of lines
 - Total debit amount
 - Total credit amount
+
+Amounts are summed as int64 minor units, so totals and the balance check are exact.
 """
 
 import re
 import os
-from decimal import Decimal
+import sys
+from pathlib import Path
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+from analyzer.money import to_minor_units, amount_to_minor_units, format_minor_units
+
+# Amounts are numeric(15,4) in transaction_lines
+SCALE = 4
+
+NULL_ACCOUNT_ID = '00000000-0000-0000-0000-000000000000'
 
 def extract_values_from_sql_file(filepath):
-    """Extract all VALUES rows from a SQL file and parse amounts."""
+    """Extract all VALUES rows from a SQL file and parse amounts into minor units."""
     with open(filepath, 'r', encoding='utf-8') as f:
         content = f.read()
     
@@ -20,43 +32,42 @@ def extract_values_from_sql_file(filepath):
     values_match = re.search(r'VALUES\s*\n(.*?)\) AS temp_lines', content, re.DOTALL)
     if not values_match:
         print(f"WARNING: Could not find VALUES section in {filepath}")
-        return []
+        return pd.DataFrame(columns=['row_num', 'txn_ref', 'account_id', 'debit', 'credit'])
     
     values_section = values_match.group(1)
     
     # Parse each row - format: (row_num, txn_ref, account_id, ..., debit, credit, ...)
     # We need to extract debit_amount (position 7) and credit_amount (position 8)
-    rows = []
     pattern = r'\((\d+),\s*\'([^\']*)\',\s*\'([^\']*)\',\s*\'([^\']*)\',\s*\'([^\']*)\',\s*\'([^\']*)\',\s*\'([^\']*)\',\s*([\d.]+),\s*([\d.]+),'
     
-    for match in re.finditer(pattern, values_section):
-        row_num = int(match.group(1))
-        txn_ref = match.group(2)
-        account_id = match.group(3)
-        debit = Decimal(match.group(8))
-        credit = Decimal(match.group(9))
-        
-        # Check if this row will be filtered by WHERE clause
-        # Filter conditions:
-        # 1. Both debit and credit are zero
-        # 2. account_id is NULL or empty
-        # 3. account_id is all-zeros UUID
-        
-        if debit == 0 and credit == 0:
-            continue  # Filtered out
-        
-        if not account_id or account_id == '00000000-0000-0000-0000-000000000000':
-            continue  # Filtered out
-        
-        rows.append({
-            'row_num': row_num,
-            'txn_ref': txn_ref,
-            'account_id': account_id,
-            'debit': debit,
-            'credit': credit
-        })
-    
-    return rows
+    matches = pd.DataFrame(re.findall(pattern, values_section))
+    if matches.empty:
+        return pd.DataFrame(columns=['row_num', 'txn_ref', 'account_id', 'debit', 'credit'])
+    
+    rows = pd.DataFrame({
+        'row_num': matches[0].astype(int),
+        'txn_ref': matches[1],
+        'account_id': matches[2],
+        'debit': to_minor_units(matches[7], SCALE).fillna(0).astype('int64'),
+        'credit': to_minor_units(matches[8], SCALE).fillna(0).astype('int64')
+    })
+    
+    # Rows filtered by the WHERE clause:
+    # 1. Both debit and credit are zero
+    # 2. account_id is NULL or empty
+    # 3. account_id is all-zeros UUID
+    zero_amounts = (rows['debit'] == 0) & (rows['credit'] == 0)
+    missing_account = (rows['account_id'] == '') | (rows['account_id'] == NULL_ACCOUNT_ID)
+    
+    return rows[~zero_amounts & ~missing_account]
+
+def money(units):
+    """Format minor units as an amount."""
+    return format_minor_units(units, SCALE)
+
+def signed_money(units):
+    """Format minor units as an amount with its sign."""
+    return ('+' if units >= 0 else '') + money(units)
 
 def main():
     print("=" * 80)
@@ -65,8 +76,8 @@ def main():
     print()
     
     total_lines = 0
-    total_debits = Decimal('0')
-    total_credits = Decimal('0')
+    total_debits = 0
+    total_credits = 0
     
     files_dir = 'transaction_lines_split'
     
@@ -80,23 +91,23 @@ def main():
         
         rows = extract_values_from_sql_file(filepath)
         
-        file_debits = sum(row['debit'] for row in rows)
-        file_credits = sum(row['credit'] for row in rows)
+        file_debits = int(rows['debit'].sum())
+        file_credits = int(rows['credit'].sum())
         
         total_lines += len(rows)
         total_debits += file_debits
         total_credits += file_credits
         
-        print(f"Part {i:02d}: {len(rows):5d} lines | Debits: {file_debits:15,.2f} | Credits: {file_credits:15,.2f}")
+        print(f"Part {i:02d}: {len(rows):5d} lines | Debits: {money(file_debits):>15} | Credits: {money(file_credits):>15}")
     
     print()
     print("=" * 80)
     print("TOTALS AFTER IMPORT")
     print("=" * 80)
     print(f"Total Lines:   {total_lines:,}")
-    print(f"Total Debits:  {total_debits:,.2f}")
-    print(f"Total Credits: {total_credits:,.2f}")
-    print(f"Difference:    {total_debits - total_credits:,.2f}")
+    print(f"Total Debits:  {money(total_debits)}")
+    print(f"Total Credits: {money(total_credits)}")
+    print(f"Difference:    {money(total_debits - total_credits)}")
     print()
     print("=" * 80)
     print("EXPECTED VALUES (from Excel)")
@@ -109,15 +120,15 @@ def main():
     print("=" * 80)
     
     expected_lines = 14161
-    expected_balance = Decimal('905925674.8')
+    expected_balance = amount_to_minor_units('905925674.8', SCALE)
     
     lines_match = total_lines == expected_lines
-    balance_match = abs(total_debits - expected_balance) < Decimal('0.01') and abs(total_credits - expected_balance) < Decimal('0.01')
-    balanced = abs(total_debits - total_credits) < Decimal('0.01')
+    balance_match = total_debits == expected_balance and total_credits == expected_balance
+    balanced = total_debits == total_credits
     
     print(f"✓ Lines count matches:     {lines_match} ({total_lines} vs {expected_lines})")
-    print(f"✓ Balance matches:         {balance_match} ({total_debits:,.2f} vs {expected_balance:,.2f})")
-    print(f"✓ Debits = Credits:        {balanced} (difference: {total_debits - total_credits:,.2f})")
+    print(f"✓ Balance matches:         {balance_match} ({money(total_debits)} vs {money(expected_balance)})")
+    print(f"✓ Debits = Credits:        {balanced} (difference: {signed_money(total_debits - total_credits)})")
     print()
     
     if lines_match and balance_match and balanced:
@@ -127,9 +138,9 @@ def main():
         if not lines_match:
             print(f"   - Line count mismatch: {total_lines - expected_lines:+,} lines")
         if not balance_match:
-            print(f"   - Balance mismatch: {total_debits - expected_balance:+,.2f}")
+            print(f"   - Balance mismatch: {signed_money(total_debits - expected_balance)}")
         if not balanced:
-            print(f"   - Not balanced: {total_debits - total_credits:+,.2f}")
+            print(f"   - Not balanced: {signed_money(total_debits - total_credits)}")
     
     print("=" * 80)
 